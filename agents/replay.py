@@ -0,0 +1,113 @@
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import multiprocessing
+
+import numpy as np
+
+"""
+Replay store shared by the self-play workers and the learner: a fixed-capacity ring of
+(kind, row, action, return) samples in one 'multiprocessing.shared_memory' segment.
+
+Writers reserve a range of the ring under a lock and copy whole arrays into it, so a
+round of thousands of decisions costs one lock and four slice assignments. Readers keep
+their own cursor into the total write count; samples more than 'capacity' writes behind
+the head have been overwritten and are skipped (and counted as dropped).
+
+The process that creates the buffer owns the segment and must 'unlink' it; workers attach
+with 'ReplayBuffer.attach(name, capacity, lock)' and only 'close' theirs.
+"""
+
+# Header: [samples written, games finished]
+_HEADER = 2
+
+def _layout(capacity: int) -> Tuple[int, ...]:
+    """
+    Byte offsets of the header and the kinds, rows, actions and returns arrays, plus the
+    total size.
+    """
+
+    header = 0
+    rows = header + 8 * _HEADER
+    returns = rows + 8 * capacity
+    kinds = returns + 4 * capacity
+    actions = kinds + capacity
+    return header, rows, returns, kinds, actions, actions + capacity
+
+class ReplayBuffer:
+    def __init__(self, capacity: int, lock=None, name: Optional[str] = None) -> None:
+        self.capacity = capacity
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+        header, rows, returns, kinds, actions, size = _layout(capacity)
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        buf = self.shm.buf
+        self.header = np.ndarray(_HEADER, dtype=np.int64, buffer=buf, offset=header)
+        self.rows = np.ndarray(capacity, dtype=np.int64, buffer=buf, offset=rows)
+        self.returns = np.ndarray(capacity, dtype=np.float32, buffer=buf, offset=returns)
+        self.kinds = np.ndarray(capacity, dtype=np.int8, buffer=buf, offset=kinds)
+        self.actions = np.ndarray(capacity, dtype=np.int8, buffer=buf, offset=actions)
+        if self.owner:
+            self.header[:] = 0
+
+    @classmethod
+    def attach(cls, name: str, capacity: int, lock) -> "ReplayBuffer":
+        return cls(capacity, lock, name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def written(self) -> int:
+        return int(self.header[0])
+
+    @property
+    def games(self) -> int:
+        return int(self.header[1])
+
+    # === Methods ===
+
+    def push(self, kinds: np.ndarray, rows: np.ndarray, actions: np.ndarray,
+             returns: np.ndarray, games: int = 0) -> None:
+        """
+        Appends n samples (only the last 'capacity' of them if n is larger) and counts
+        'games' finished games.
+        """
+
+        n = len(rows)
+        skip = max(0, n - self.capacity)
+        with self.lock:
+            start = int(self.header[0]) + skip
+            first = start % self.capacity
+            head = min(n - skip, self.capacity - first)
+            for target, source in ((self.kinds, kinds), (self.rows, rows),
+                                   (self.actions, actions), (self.returns, returns)):
+                target[first:first + head] = source[skip:skip + head]
+                target[:n - skip - head] = source[skip + head:]
+            self.header[0] += n
+            self.header[1] += games
+
+    def read(self, cursor: int) -> Tuple[int, int, Tuple[np.ndarray, ...]]:
+        """
+        Copies the samples written since 'cursor'. Returns the new cursor, the number of
+        samples lost to overwriting, and the (kinds, rows, actions, returns) arrays.
+        """
+
+        with self.lock:
+            end = int(self.header[0])
+            start = max(cursor, end - self.capacity)
+            index = np.arange(start, end) % self.capacity
+            samples = (self.kinds[index], self.rows[index], self.actions[index], self.returns[index])
+        return end, start - cursor, samples
+
+    def close(self) -> None:
+        # The views hold exports of the segment's buffer, which must be released first
+        self.header = self.rows = self.returns = self.kinds = self.actions = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.close()
+        if self.owner:
+            self.shm.unlink()
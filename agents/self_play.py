@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+
+import multiprocessing
+import time
+
+import numpy as np
+
+from engine.batch_policy import BatchRunner
+from engine.seeding import spawn_seed
+from engine.simulation import PIZZAS_BY_NAME
+from .replay import ReplayBuffer
+from .tabular import QTable, TabularBatchPolicy
+
+"""
+Self-play training of a 'QTable' by every-visit Monte Carlo control: epsilon-greedy games
+label every decision with its decider's outcome (1 for a win, else 0) and the table moves
+towards those returns; acting greedily on the updated table is the policy improvement
+step, so repeated rounds are generalized policy iteration.
+
+Experience comes from batched games ('engine/batch_policy.py' BatchRunner), each worker
+process running its own 'TabularBatchPolicy' against the shared table and pushing whole
+rounds into the shared 'ReplayBuffer'. The learner (the calling process) drains the
+buffer and writes the table in place, so workers act on the freshest values without any
+copying. With workers=0 the rounds alternate with the updates in-process, which is
+deterministic for a given seed.
+"""
+
+@dataclass(frozen=True)
+class SelfPlayConfig:
+    num_players: int
+    draft: Tuple[Tuple[str, ...], ...]
+    seed: int = 0
+    epsilon: float = 0.1
+    alpha: float = 0.02
+    games_per_round: int = 1024         # Games a worker plays between two pushes
+    batch_size: int = 512               # Games in flight per worker
+    buffer_capacity: int = 1 << 21
+
+    def player_recipes(self):
+        return [[PIZZAS_BY_NAME[name] for name in recipes] for recipes in self.draft]
+
+@dataclass
+class TrainingReport:
+    games: int
+    samples: int
+    dropped: int            # Overwritten in the buffer before the learner read them
+    seconds: float
+    workers: int
+
+    @property
+    def samples_per_second(self) -> float:
+        return self.samples / self.seconds if self.seconds else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds else 0.0
+
+# =====================
+#  Experience Collection
+# =====================
+
+def collect_round(config: SelfPlayConfig, policy: TabularBatchPolicy, runner: BatchRunner,
+                  buffer: ReplayBuffer, worker: int, round_index: int) -> None:
+    """
+    Plays one round of self-play games and pushes its labelled decisions.
+    """
+
+    runner.seed = spawn_seed(config.seed, worker, round_index)
+    winners, _ = runner.run(config.games_per_round)
+    buffer.push(*policy.take(winners), games=config.games_per_round)
+
+def _worker(config: SelfPlayConfig, worker: int, table_name: str, buffer_name: str, lock, stop) -> None:
+    table_shm = shared_memory.SharedMemory(name=table_name)
+    table = QTable(config.num_players)
+    table.values = np.ndarray(table.shape, dtype=np.float32, buffer=table_shm.buf)
+    buffer = ReplayBuffer.attach(buffer_name, config.buffer_capacity, lock)
+    try:
+        policy = TabularBatchPolicy(table, config.epsilon, np.random.default_rng(spawn_seed(config.seed, worker)))
+        runner = BatchRunner(config.num_players, config.player_recipes(), policy, config.batch_size)
+        round_index = 0
+        while not stop.is_set():
+            collect_round(config, policy, runner, buffer, worker, round_index)
+            round_index += 1
+    finally:
+        table.values = None
+        buffer.close()
+        table_shm.close()
+
+# =====================
+#  Training
+# =====================
+
+def train(config: SelfPlayConfig, games: int, workers: int = 0, table: Optional[QTable] = None,
+          log: Optional[Callable[[str], None]] = None) -> Tuple[QTable, TrainingReport]:
+    """
+    Trains 'table' (a new one by default) on at least 'games' self-play games collected by
+    'workers' processes, and returns it with the throughput report.
+    """
+
+    table = table if table is not None else QTable(config.num_players)
+    buffer = ReplayBuffer(config.buffer_capacity)
+    cursor = samples = dropped = 0
+    started = time.perf_counter()
+
+    def learn() -> None:
+        nonlocal cursor, samples, dropped
+        cursor, lost, (kinds, rows, actions, returns) = buffer.read(cursor)
+        dropped += lost
+        if len(rows):
+            table.update(rows, actions.astype(np.int64), returns, config.alpha)
+            samples += len(rows)
+            if log:
+                elapsed = time.perf_counter() - started
+                log(f"{buffer.games:,} games, {samples:,} samples, {samples / elapsed:,.0f} samples/s")
+
+    try:
+        if workers <= 0:
+            policy = TabularBatchPolicy(table, config.epsilon, np.random.default_rng(spawn_seed(config.seed, 0)))
+            runner = BatchRunner(config.num_players, config.player_recipes(), policy, config.batch_size)
+            round_index = 0
+            while buffer.games < games:
+                collect_round(config, policy, runner, buffer, 0, round_index)
+                round_index += 1
+                learn()
+        else:
+            table = _train_parallel(config, games, workers, table, buffer, learn)
+        report = TrainingReport(buffer.games, samples, dropped, time.perf_counter() - started, workers)
+    finally:
+        buffer.unlink()
+    return table, report
+
+def _train_parallel(config: SelfPlayConfig, games: int, workers: int, table: QTable,
+                    buffer: ReplayBuffer, learn: Callable[[], None]) -> QTable:
+    """
+    Moves the table into shared memory, runs the workers until 'games' games were pushed
+    and copies the table back out before the segment goes away.
+    """
+
+    table_shm = shared_memory.SharedMemory(create=True, size=table.values.nbytes)
+    shared = np.ndarray(table.shape, dtype=np.float32, buffer=table_shm.buf)
+    shared[:] = table.values
+    table.values = shared
+
+    stop = multiprocessing.Event()
+    processes: List[multiprocessing.Process] = [
+        multiprocessing.Process(target=_worker, daemon=True,
+                                args=(config, worker, table_shm.name, buffer.name, buffer.lock, stop))
+        for worker in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        while buffer.games < games:
+            if not any(process.is_alive() for process in processes):
+                raise RuntimeError("Every self-play worker died")
+            learn()
+            time.sleep(0.01)
+        stop.set()
+        for process in processes:
+            process.join()
+        learn()
+    finally:
+        stop.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        table.values = np.array(shared)
+        del shared
+        table_shm.close()
+        table_shm.unlink()
+    return table
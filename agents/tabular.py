@@ -0,0 +1,225 @@
+from typing import List, Optional, Set
+
+import random
+
+import numpy as np
+
+from engine.batch import random_bit
+from engine.batch_policy import BIT_INDEX, BatchController, DecisionBatch
+from engine.bitmask import INGREDIENTS, MASK_INGREDIENTS, NUM_INGREDIENTS, mask_of, recipe_mask
+from engine.components import Ingredient
+from engine.decision_game import BOARD_SIZE, CHOOSE_LOSE, CHOOSE_OPPONENT, DecisionGame
+from engine.player import PlayerState
+from engine.policy import PlayerController
+
+"""
+Tabular action values for the three decisions of a 'PlayerController', one flat table.
+
+Every decision maps to one row of 'QTable.values' and every action to one of its
+NUM_INGREDIENTS columns:
+
+- CHOOSE_INGREDIENT and CHOOSE_LOSE: row (pawn position, decider's Ingredient mask), the
+  action is the Ingredient index.
+- CHOOSE_OPPONENT: row (pawn position, which opponents hold an Ingredient the decider
+  misses, as a mask of relative seats), the action is the relative seat (1 = next player).
+
+Rows don't depend on the seat, so one table plays every seat of a self-play game. The
+legal actions of a decision are its 'choices' bits; the greedy action is the best legal
+column of one row, so a decision costs one row lookup whatever the training time was.
+"""
+
+_MASKS = 1 << NUM_INGREDIENTS
+
+class QTable:
+    def __init__(self, num_players: int, values: Optional[np.ndarray] = None) -> None:
+        self.num_players = num_players
+        self.lose_offset = (BOARD_SIZE + 1) * _MASKS
+        self.opponent_offset = 2 * self.lose_offset
+        self.num_rows = self.opponent_offset + (BOARD_SIZE + 1) * (1 << num_players)
+        self.shape = (self.num_rows, NUM_INGREDIENTS)
+        # 'values' may be a view of shared memory, so the table is written in place
+        self.values = values if values is not None else np.zeros(self.shape, dtype=np.float32)
+        self.visits: Optional[np.ndarray] = None      # Samples per cell, kept by the learner only
+
+    # === Rows ===
+
+    def rows(self, kinds: np.ndarray, seats: np.ndarray, positions: np.ndarray,
+             inventories: np.ndarray, recipes: np.ndarray) -> np.ndarray:
+        """
+        Rows of n decisions given as in 'DecisionBatch' (inventories and recipes of shape
+        (n, num_players) in absolute seat order).
+        """
+
+        n = len(kinds)
+        r = np.arange(n)
+        positions = positions.astype(np.int64)
+        own = inventories[r, seats].astype(np.int64)
+        rows = positions * _MASKS + own + np.where(kinds == CHOOSE_LOSE, self.lose_offset, 0)
+
+        opponent = kinds == CHOOSE_OPPONENT
+        if opponent.any():
+            missing = recipes[r, seats] & ~inventories[r, seats]
+            targets = np.zeros(n, dtype=np.int64)
+            for k in range(1, self.num_players):
+                holds = inventories[r, (seats + k) % self.num_players] & missing
+                targets |= (holds != 0).astype(np.int64) << k
+            rows = np.where(opponent, self.opponent_offset + positions * (1 << self.num_players) + targets, rows)
+        return rows
+
+    def action_masks(self, kinds: np.ndarray, seats: np.ndarray, choices: np.ndarray) -> np.ndarray:
+        """
+        Legal columns of each decision: 'choices' with opponent seats made relative.
+        """
+
+        choices = choices.astype(np.int64)
+        n = self.num_players
+        relative = ((choices >> seats) | (choices << (n - seats))) & ((1 << n) - 1)
+        return np.where(kinds == CHOOSE_OPPONENT, relative, choices)
+
+    def greedy(self, rows: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        """
+        Best legal column of every row.
+        """
+
+        legal = (masks[:, None] >> np.arange(NUM_INGREDIENTS)) & 1 == 1
+        return np.where(legal, self.values[rows], -np.inf).argmax(axis=1)
+
+    # === Learning ===
+
+    def update(self, rows: np.ndarray, actions: np.ndarray, returns: np.ndarray, alpha: float) -> None:
+        """
+        Moves every sampled value towards its returns: the sample average for the first
+        1 / alpha visits of a cell, then a constant step 'alpha' per sample that keeps
+        tracking the improving policy. Repeated (row, action) pairs are grouped, so their
+        c samples count as c steps towards their mean.
+        """
+
+        if self.visits is None:
+            self.visits = np.zeros(self.values.size, dtype=np.int64)
+        flat = self.values.reshape(-1)
+        cells, group = np.unique(rows * NUM_INGREDIENTS + actions, return_inverse=True)
+        counts = np.bincount(group)
+        means = np.bincount(group, weights=returns) / counts
+        self.visits[cells] += counts
+        step = np.maximum(counts / self.visits[cells], 1 - (1 - alpha) ** counts)
+        flat[cells] += step * (means - flat[cells])
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, num_players=self.num_players, values=self.values)
+
+    @classmethod
+    def load(cls, path: str) -> "QTable":
+        data = np.load(path)
+        return cls(int(data["num_players"]), data["values"])
+
+# =====================
+#  Policies
+# =====================
+
+class TabularBatchPolicy(BatchController):
+    """
+    Epsilon-greedy self-play over a 'BatchRunner': every seat follows the table, and every
+    decision is recorded so 'take' can label it with the game's outcome.
+
+    Games are bound in game index order, so the i-th 'bind' of a run is game i and the
+    winners array returned by 'BatchRunner.run' labels the recorded decisions directly.
+    """
+
+    def __init__(self, table: QTable, epsilon: float = 0.1,
+                rng: Optional[np.random.Generator] = None) -> None:
+        self.table = table
+        self.epsilon = epsilon
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.episode_of_slot = np.zeros(0, dtype=np.int64)
+        self.bound = 0
+        self.records: List[tuple] = []
+
+    def bind(self, slot: int, game: DecisionGame, seat_rngs: List[random.Random]) -> None:
+        if slot >= len(self.episode_of_slot):
+            self.episode_of_slot = np.resize(self.episode_of_slot, slot + 1)
+        self.episode_of_slot[slot] = self.bound
+        self.bound += 1
+
+    def decide(self, batch: DecisionBatch) -> np.ndarray:
+        n = batch.size
+        kinds, seats = batch.kinds[:n], batch.seats[:n]
+        rows = self.table.rows(kinds, seats, batch.positions[:n], batch.inventories[:n], batch.recipes[:n])
+        masks = self.table.action_masks(kinds, seats, batch.choices[:n])
+
+        actions = self.table.greedy(rows, masks)
+        explore = self.rng.random(n) < self.epsilon
+        if explore.any():
+            bits = random_bit(masks[explore], self.rng.random(int(explore.sum())))
+            actions[explore] = BIT_INDEX[bits]
+
+        self.records.append((self.episode_of_slot[batch.slots[:n]], seats.copy(), kinds.copy(), rows, actions))
+        answers = np.where(kinds == CHOOSE_OPPONENT, (seats + actions) % self.table.num_players, actions)
+        batch.answers[:n] = answers
+        return batch.answers[:n]
+
+    def take(self, winners: np.ndarray):
+        """
+        Returns the recorded (kinds, rows, actions, returns) of the finished run, 1 for the
+        decisions of each game's winner and 0 for the others, and clears the records.
+        """
+
+        if not self.records:
+            self.bound = 0
+            empty = np.zeros(0, dtype=np.int64)
+            return empty.astype(np.int8), empty, empty.astype(np.int8), empty.astype(np.float32)
+
+        episodes, seats, kinds, rows, actions = (np.concatenate(column) for column in zip(*self.records))
+        returns = (winners[episodes] == seats).astype(np.float32)
+        self.records = []
+        self.bound = 0
+        return kinds.astype(np.int8), rows, actions.astype(np.int8), returns
+
+class TabularPolicy(PlayerController):
+    """
+    Greedy 'PlayerController' over a trained 'QTable'. 'rng' is unused and only there for
+    the factory signature of 'engine/simulation.py' POLICIES, e.g.
+    POLICIES["tabular"] = functools.partial(TabularPolicy, table).
+    """
+
+    def __init__(self, table: QTable, rng: Optional[random.Random] = None) -> None:
+        self.table = table
+        self.rng = rng
+
+    def bind(self, game) -> None:
+        self.game = game
+        self.recipe_masks = [recipe_mask(player.recipes) for player in game.players]
+
+    def _best(self, row: int, choices: int) -> int:
+        values = self.table.values[row]
+        return max((i for i in range(NUM_INGREDIENTS) if choices >> i & 1), key=lambda i: values[i])
+
+    def choose_ingredient(self, needed: Set[Ingredient], player: PlayerState) -> Optional[Ingredient]:
+        if not needed:
+            return None
+        row = self.game.pawn_position * _MASKS + mask_of(player.ingredients)
+        return INGREDIENTS[self._best(row, mask_of(needed))]
+
+    def choose_opponent(self, player: PlayerState, opponents: List[PlayerState]) -> Optional[PlayerState]:
+        if not opponents:
+            return None
+        n = self.table.num_players
+        missing = self.recipe_masks[player.id] & ~mask_of(player.ingredients)
+        # Opponents with empty hands can't be chosen and never count as targets
+        targets = 0
+        for other in opponents:
+            if mask_of(other.ingredients) & missing:
+                targets |= 1 << (other.id - player.id) % n
+
+        by_seat = {(opponent.id - player.id) % n: opponent for opponent in opponents}
+        row = self.table.opponent_offset + self.game.pawn_position * (1 << n) + targets
+        return by_seat[self._best(row, sum(1 << k for k in by_seat))]
+
+    def choose_ingredients_to_lose(self, player: PlayerState, amount: int) -> List[Ingredient]:
+        # One pick at a time from the remaining mask, as in the self-play games
+        held = mask_of(player.ingredients)
+        lost = []
+        for _ in range(min(amount, len(MASK_INGREDIENTS[held]))):
+            i = self._best(self.table.lose_offset + self.game.pawn_position * _MASKS + held, held)
+            held &= ~(1 << i)
+            lost.append(INGREDIENTS[i])
+        return lost
@@ -0,0 +1,257 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .components import (
+    PizzaCard,
+    LuckCardType, LUCK_DECK_COMPOSITION,
+    BoardSpaceType, BOARD_LAYOUT
+)
+
+from .bitmask import INGREDIENT_BIT, NUM_INGREDIENTS, FULL_MASK, POPCOUNT, recipe_mask
+
+# =====================
+#  Lookup Tables
+# =====================
+
+# --- Board (indexed by pawn position 1-35, index 0 unused) ---
+
+_KIND_CODE = {
+    BoardSpaceType.INGREDIENT: 0,
+    BoardSpaceType.CHEF: 1,
+    BoardSpaceType.GOOD_OR_BAD_LUCK: 2,
+    BoardSpaceType.LOSE_EVERYTHING: 3,
+}
+INGREDIENT_SPACE, CHEF_SPACE, LUCK_SPACE, LOSE_EVERYTHING_SPACE = range(4)
+
+BOARD_SIZE = len(BOARD_LAYOUT)
+BOARD_KIND = np.array([-1] + [_KIND_CODE[s.space_type] for s in BOARD_LAYOUT], dtype=np.int8)
+BOARD_BIT = np.array(
+    [0] + [INGREDIENT_BIT[s.ingredient] if s.ingredient else 0 for s in BOARD_LAYOUT], dtype=np.int16
+)
+
+# --- Luck Deck (card codes follow 'LUCK_DECK_COMPOSITION' order) ---
+
+CARD_TYPES = [card.card_type for card in LUCK_DECK_COMPOSITION]
+CARD_CODE = {card_type: code for code, card_type in enumerate(CARD_TYPES)}
+DECK_COUNTS = np.array([card.count for card in LUCK_DECK_COMPOSITION], dtype=np.int8)
+
+# --- Masks ---
+
+MASK_POPCOUNT = np.array(POPCOUNT, dtype=np.int8)
+
+# SELECT_BIT[mask, k] is the bit value of the k-th set bit of 'mask' (0 when it doesn't exist)
+SELECT_BIT = np.zeros((FULL_MASK + 1, NUM_INGREDIENTS), dtype=np.int16)
+for _mask in range(FULL_MASK + 1):
+    _bits = [1 << i for i in range(NUM_INGREDIENTS) if _mask >> i & 1]
+    SELECT_BIT[_mask, :len(_bits)] = _bits
+
+def random_bit(masks: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    Picks one set bit of each mask uniformly, driven by uniforms 'u' in [0, 1).
+    Empty masks yield 0.
+    """
+
+    k = (u * MASK_POPCOUNT[masks]).astype(np.int64)
+    return SELECT_BIT[masks, k]
+
+def random_member(candidates: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    Picks the column of one True entry per row of the boolean matrix 'candidates'
+    uniformly, driven by uniforms 'u' in [0, 1). Rows without candidates yield -1.
+    """
+
+    counts = candidates.sum(axis=1)
+    k = (u * counts).astype(np.int64)
+    chosen = np.argmax(np.cumsum(candidates, axis=1) > k[:, None], axis=1)
+    return np.where(counts > 0, chosen, -1)
+
+# =====================
+#  Batch Game State
+# =====================
+
+class BatchGameState:
+    """
+    Plays N independent games in lockstep with every player following the random policy
+    ('engine/policies/random_policy.py'). Each 'step()' advances every live game by one
+    turn using array operations only; finished games are compacted out of the live index
+    so long-tail games don't keep the whole batch busy.
+
+    Games follow the same rules and the same choice distributions as 'GameState' but they
+    are not bit-identical to it: dice and luck cards are drawn in bulk from 'rng' and the
+    luck deck is kept as remaining counts per card type.
+    """
+
+    def __init__(self, num_games: int, num_players: int,
+                player_recipes: List[List[PizzaCard]],
+                rng: Optional[np.random.Generator] = None,
+                starting_pos: int = 0) -> None:
+
+        assert num_players in {2, 3, 6}
+        assert len(player_recipes) == num_players
+
+        expected_pizzas = {2: 3, 3: 2, 6: 1}[num_players]
+        for recipes in player_recipes:
+            assert len(recipes) == expected_pizzas
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.num_games = num_games
+        self.num_players = num_players
+
+        # --- Game Arrays ---
+
+        self.recipe_masks = np.tile(
+            np.array([recipe_mask(recipes) for recipes in player_recipes], dtype=np.int16),
+            (num_games, 1)
+        )
+        self.masks = np.zeros((num_games, num_players), dtype=np.int16)
+        self.deck = np.tile(DECK_COUNTS, (num_games, 1))
+
+        if starting_pos:
+            self.pawn = np.full(num_games, starting_pos, dtype=np.int16)
+        else:
+            self.pawn = self.rng.integers(1, BOARD_SIZE + 1, size=num_games).astype(np.int16)
+
+        self.current = np.zeros(num_games, dtype=np.int8)
+        self.turns = np.zeros(num_games, dtype=np.int32)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.winner = np.full(num_games, -1, dtype=np.int8)
+
+        self.live = np.arange(num_games)
+
+    # === Turn Methods ===
+
+    def step(self) -> int:
+        """
+        Plays one turn of every live game and returns how many games are still live.
+        """
+
+        g = self.live
+        if not len(g):
+            return 0
+
+        p = self.current[g].astype(np.int64)
+        rolls = self.rng.integers(1, 7, size=len(g))
+        self.pawn[g] = (self.pawn[g] + rolls - 1) % BOARD_SIZE + 1
+        self.turns[g] += 1
+
+        kind = BOARD_KIND[self.pawn[g]]
+
+        sel = kind == INGREDIENT_SPACE
+        gs, ps = g[sel], p[sel]
+        self.masks[gs, ps] |= BOARD_BIT[self.pawn[gs]] & self.recipe_masks[gs, ps]
+
+        sel = kind == CHEF_SPACE
+        self._gain(g[sel], p[sel], 1)
+
+        sel = kind == LUCK_SPACE
+        self._draw_luck(g[sel], p[sel])
+
+        sel = kind == LOSE_EVERYTHING_SPACE
+        self.masks[g[sel], p[sel]] = 0
+
+        # --- Win Check & Turn Advance ---
+
+        won = (self.recipe_masks[g, p] & ~self.masks[g, p]) == 0
+        self.done[g[won]] = True
+        self.winner[g[won]] = p[won]
+        self.current[g[~won]] = (p[~won] + 1) % self.num_players
+
+        self.live = g[~won]
+        return len(self.live)
+
+    def run(self, max_turns: int = 100_000) -> np.ndarray:
+        """
+        Steps until every game is over (or 'max_turns' is reached) and returns the winners.
+        """
+
+        for _ in range(max_turns):
+            if not self.step():
+                break
+        return self.winner
+
+    # === Luck Deck Methods ===
+
+    def _draw_luck(self, g: np.ndarray, p: np.ndarray):
+        """
+        Draws one luck card for each game in 'g' (reshuffling empty decks) and resolves it.
+        """
+
+        if not len(g):
+            return
+
+        empty = self.deck[g].sum(axis=1) == 0
+        self.deck[g[empty]] = DECK_COUNTS
+
+        counts = self.deck[g].astype(np.int64)
+        k = (self.rng.random(len(g)) * counts.sum(axis=1)).astype(np.int64)
+        card = np.argmax(np.cumsum(counts, axis=1) > k[:, None], axis=1)
+        self.deck[g, card] -= 1
+
+        for card_type, amount, effect in _LUCK_EFFECTS:
+            sel = card == CARD_CODE[card_type]
+            if sel.any():
+                effect(self, g[sel], p[sel], amount)
+
+    # === Ingredient Helpers ===
+
+    def _gain(self, g: np.ndarray, p: np.ndarray, amount: int):
+        """
+        Gives 'amount' distinct random recipe Ingredients to player 'p' of each game 'g'.
+        """
+
+        needed = self.recipe_masks[g, p]
+        for _ in range(amount):
+            bit = random_bit(needed, self.rng.random(len(g)))
+            self.masks[g, p] |= bit
+            needed = needed & ~bit
+
+    def _steal(self, g: np.ndarray, p: np.ndarray, amount: int):
+        """
+        Player 'p' of each game 'g' steals 'amount' times from random opponents that held
+        Ingredients when the card was drawn.
+        """
+
+        rows = np.arange(len(g))
+        opponents = self.masks[g] != 0
+        opponents[rows, p] = False
+
+        for _ in range(amount):
+            victim = random_member(opponents, self.rng.random(len(g)))
+            has_victim = victim >= 0
+            victim_mask = np.where(has_victim, self.masks[g, np.maximum(victim, 0)], 0)
+
+            can_steal = self.recipe_masks[g, p] & victim_mask
+            bit = random_bit(can_steal, self.rng.random(len(g)))
+
+            sel = bit != 0
+            self.masks[g[sel], victim[sel]] &= ~bit[sel]
+            self.masks[g[sel], p[sel]] |= bit[sel]
+
+    def _lose(self, g: np.ndarray, p: np.ndarray, amount: int):
+        """
+        Player 'p' of each game 'g' loses up to 'amount' distinct random held Ingredients.
+        """
+
+        for _ in range(amount):
+            held = self.masks[g, p]
+            self.masks[g, p] = held & ~random_bit(held, self.rng.random(len(g)))
+
+    def _lose_all(self, g: np.ndarray, p: np.ndarray, amount: int):
+        """
+        Player 'p' of each game 'g' loses every Ingredient.
+        """
+
+        self.masks[g, p] = 0
+
+# --- Luck Card Effects (card type, amount, handler) ---
+
+_LUCK_EFFECTS = [
+    (LuckCardType.GAIN_1, 1, BatchGameState._gain),
+    (LuckCardType.GAIN_2, 2, BatchGameState._gain),
+    (LuckCardType.STEAL_1, 1, BatchGameState._steal),
+    (LuckCardType.STEAL_2, 2, BatchGameState._steal),
+    (LuckCardType.LOSE_1, 1, BatchGameState._lose),
+    (LuckCardType.LOSE_2, 2, BatchGameState._lose),
+    (LuckCardType.LOSE_ALL, 0, BatchGameState._lose_all),
+]
@@ -0,0 +1,252 @@
+from typing import Callable, List, Optional, Tuple
+
+import random
+
+import numpy as np
+
+from .batch import random_bit
+from .bitmask import INGREDIENTS, MASK_INGREDIENTS, NUM_INGREDIENTS
+from .components import PizzaCard
+from .decision_game import CHOOSE_INGREDIENT, CHOOSE_OPPONENT, DecisionGame
+from .policy import PlayerController
+from .rules import RuleSet
+from .seeding import game_rngs
+
+"""
+Batched decisions: many games in flight, one policy call per round.
+
+A 'PlayerController' answers one choice of one game per Python call, which is the whole
+cost of a vectorized policy. 'BatchRunner' instead keeps up to 'batch_size' games running
+as 'DecisionGame's, stacks their pending decisions into the preallocated arrays of a
+'DecisionBatch', calls 'BatchController.decide' once, and scatters the answers back.
+
+Answers are Ingredient indices in canonical order (CHOOSE_INGREDIENT / CHOOSE_LOSE) or
+absolute seats (CHOOSE_OPPONENT); as both are bit indices of the row's 'choices' mask,
+a policy can treat every decision the same way. 'ControllerAdapter' runs existing
+per-game controllers behind this interface.
+"""
+
+INGREDIENT_INDEX = {ing: i for i, ing in enumerate(INGREDIENTS)}
+
+# BIT_INDEX[1 << i] = i, every other entry is -1
+BIT_INDEX = np.full(1 << NUM_INGREDIENTS, -1, dtype=np.int64)
+BIT_INDEX[[1 << i for i in range(NUM_INGREDIENTS)]] = np.arange(NUM_INGREDIENTS)
+
+# =====================
+#  Decision Batch
+# =====================
+
+class DecisionBatch:
+    """
+    The pending decisions of up to 'capacity' games. Only the first 'size' rows are live;
+    the arrays are allocated once and rewritten every round, so copy what has to outlive it.
+
+    Row r is the decision of game slot 'slots[r]': its 'kinds' (CHOOSE_*), the deciding
+    'seats', the 'choices' bitmask (Ingredients, or absolute seats for CHOOSE_OPPONENT),
+    the 'lose_amounts' still to pick on LOSE cards, the pawn 'positions', and the
+    'inventories' and 'recipes' masks of every seat in absolute seat order.
+    """
+
+    def __init__(self, capacity: int, num_players: int) -> None:
+        self.capacity = capacity
+        self.num_players = num_players
+        self.size = 0
+
+        self.slots = np.zeros(capacity, dtype=np.int64)
+        self.kinds = np.zeros(capacity, dtype=np.int8)
+        self.seats = np.zeros(capacity, dtype=np.int64)
+        self.choices = np.zeros(capacity, dtype=np.int16)
+        self.lose_amounts = np.zeros(capacity, dtype=np.int8)
+        self.positions = np.zeros(capacity, dtype=np.int8)
+        self.inventories = np.zeros((capacity, num_players), dtype=np.int16)
+        self.recipes = np.zeros((capacity, num_players), dtype=np.int16)
+        self.answers = np.zeros(capacity, dtype=np.int64)
+
+    def fill(self, slots: List[int], games: List[DecisionGame]) -> None:
+        """
+        Stacks the pending decisions of 'games' (running in 'slots') into the first rows,
+        one column at a time.
+        """
+
+        n = self.size = len(games)
+        self.slots[:n] = slots
+        self.kinds[:n] = [game.decision for game in games]
+        self.seats[:n] = [game.decider for game in games]
+        self.choices[:n] = [game.choices for game in games]
+        self.lose_amounts[:n] = [game.lose_amount for game in games]
+        self.positions[:n] = [game.pawn_position for game in games]
+        self.inventories[:n] = [game.masks for game in games]
+        self.recipes[:n] = [game.recipe_masks for game in games]
+
+# =====================
+#  Batch Controllers
+# =====================
+
+class BatchController:
+    def bind(self, slot: int, game: DecisionGame, seat_rngs: List[random.Random]) -> None:
+        """
+        Called whenever game slot 'slot' starts a new game, with the per-seat rngs of that
+        game (see 'engine/seeding.py'). Vectorized policies usually ignore it.
+        """
+        pass
+
+    def decide(self, batch: DecisionBatch) -> np.ndarray:
+        """
+        Returns one answer per live row of 'batch', e.g. written into 'batch.answers'.
+        """
+        raise NotImplementedError
+
+class BatchRandomPolicy(BatchController):
+    """
+    The random policy as array operations: every decision picks a uniform set bit of its
+    'choices' (for LOSE cards, one uniform held Ingredient at a time is the same
+    distribution as 'RandomPolicy' sampling them together).
+    """
+
+    def __init__(self, rng: Optional[np.random.Generator] = None) -> None:
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def decide(self, batch: DecisionBatch) -> np.ndarray:
+        n = batch.size
+        bits = random_bit(batch.choices[:n], self.rng.random(n))
+        batch.answers[:n] = BIT_INDEX[bits]
+        return batch.answers[:n]
+
+class ControllerAdapter(BatchController):
+    """
+    Runs per-game 'PlayerController's behind the batched interface. 'factory' builds a
+    controller from a seat's rng (the signature of 'engine/simulation.py' POLICIES), so
+    with the same seed the games are the same as those of the scalar engines.
+
+    Controllers are bound to the 'DecisionGame', so policies that only read 'players' and
+    'pawn_position' (random, heuristic) work; search policies that need snapshots don't.
+    """
+
+    def __init__(self, factory: Callable[[random.Random], PlayerController]) -> None:
+        self.factory = factory
+        self.games: dict = {}
+        self.controllers: dict = {}
+        self.losses: dict = {}
+
+    def bind(self, slot: int, game: DecisionGame, seat_rngs: List[random.Random]) -> None:
+        controllers = [self.factory(rng) for rng in seat_rngs]
+        for controller in controllers:
+            controller.bind(game)
+        self.games[slot] = game
+        self.controllers[slot] = controllers
+        self.losses[slot] = []
+
+    def decide(self, batch: DecisionBatch) -> np.ndarray:
+        answers = batch.answers
+        for r in range(batch.size):
+            slot = int(batch.slots[r])
+            seat = int(batch.seats[r])
+            game = self.games[slot]
+            controller = self.controllers[slot][seat]
+            choices = int(batch.choices[r])
+
+            if batch.kinds[r] == CHOOSE_INGREDIENT:
+                chosen = controller.choose_ingredient(set(MASK_INGREDIENTS[choices]), game.view(seat))
+                answers[r] = INGREDIENT_INDEX[chosen]
+
+            elif batch.kinds[r] == CHOOSE_OPPONENT:
+                opponents = [game.view(pid) for pid in range(game.num_players) if choices >> pid & 1]
+                answers[r] = controller.choose_opponent(game.view(seat), opponents).id
+
+            else:
+                # The controller picks every Ingredient of a LOSE card at once, the game asks
+                # for them one at a time
+                pending = self.losses[slot]
+                if not pending:
+                    pending.extend(controller.choose_ingredients_to_lose(game.view(seat), int(batch.lose_amounts[r])))
+                answers[r] = INGREDIENT_INDEX[pending.pop(0)]
+
+        return answers[:batch.size]
+
+# =====================
+#  Batch Runner
+# =====================
+
+class BatchRunner:
+    """
+    Plays games of one draft (under 'rules', the standard ones by default) with up to
+    'batch_size' of them in flight, asking 'controller' for every round of pending decisions
+    at once. Game k uses the board rng of 'engine/seeding.py' game_rngs(seed, k, ...), like
+    'engine/simulation.py' build_game.
+    """
+
+    def __init__(self, num_players: int, player_recipes: List[List[PizzaCard]],
+                controller: BatchController, batch_size: int = 1024, seed: int = 0,
+                rules: Optional[RuleSet] = None) -> None:
+
+        self.num_players = num_players
+        self.player_recipes = player_recipes
+        self.rules = rules
+        self.controller = controller
+        self.batch_size = batch_size
+        self.seed = seed
+        self.batch = DecisionBatch(batch_size, num_players)
+        self.rounds = 0                     # 'decide' calls, for benchmarks
+        self.decisions = 0
+
+    def run(self, num_games: int, max_turns: int = 100_000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Plays games 0 .. num_games - 1 and returns their (winners, turns) arrays. Games
+        still running after 'max_turns' turns stop at their next decision, with winner -1.
+        """
+
+        winners = np.full(num_games, -1, dtype=np.int8)
+        turns = np.zeros(num_games, dtype=np.int32)
+        games: List[Optional[DecisionGame]] = [None] * min(self.batch_size, num_games)
+        indices = [0] * len(games)
+        next_game = 0
+
+        def start(slot: int) -> bool:
+            """
+            Starts the next game in 'slot', finishing games that end without a decision.
+            """
+
+            nonlocal next_game
+            while next_game < num_games:
+                k = next_game
+                next_game += 1
+                board_rng, seat_rngs = game_rngs(self.seed, k, self.num_players)
+                game = games[slot]
+                if game is None:
+                    game = games[slot] = DecisionGame(self.num_players, self.player_recipes, board_rng, rules=self.rules)
+                else:
+                    game.reset(board_rng)
+                self.controller.bind(slot, game, seat_rngs)
+                indices[slot] = k
+                if not game.game_over:
+                    return True
+                winners[k], turns[k] = game.winner_id, game.turns
+            return False
+
+        active = [slot for slot in range(len(games)) if start(slot)]
+        batch = self.batch
+        n = self.num_players
+
+        while active:
+            batch.fill(active, [games[slot] for slot in active])
+            answers = self.controller.decide(batch).tolist()
+            self.rounds += 1
+            self.decisions += batch.size
+
+            still_active = []
+            for slot, answer in zip(active, answers):
+                game = games[slot]
+                if game.decision == CHOOSE_OPPONENT:
+                    game.act(NUM_INGREDIENTS + (answer - game.decider) % n)
+                else:
+                    game.act(answer)
+
+                if game.game_over or game.turns >= max_turns:
+                    k = indices[slot]
+                    winners[k], turns[k] = game.winner_id, game.turns
+                    if not start(slot):
+                        continue
+                still_active.append(slot)
+            active = still_active
+
+        return winners, turns
@@ -0,0 +1,66 @@
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from .components import Ingredient, PizzaCard, ALL_PIZZAS
+
+# =====================
+#  Ingredient Masks
+# =====================
+
+# Every Ingredient owns one bit of a 10-bit integer, so a whole inventory, a recipe
+# or a "still missing" set fits into a single small int.
+
+INGREDIENTS: Tuple[Ingredient, ...] = tuple(Ingredient)                 # Canonical (Enum) order
+NUM_INGREDIENTS = len(INGREDIENTS)
+FULL_MASK = (1 << NUM_INGREDIENTS) - 1
+
+INGREDIENT_BIT: Dict[Ingredient, int] = {ing: 1 << i for i, ing in enumerate(INGREDIENTS)}
+
+# The same bits by 'ing._value_' ('auto()' numbers the Ingredients 1-10 in canonical order):
+# a tuple index where INGREDIENT_BIT pays the (Python-level) Enum __hash__
+assert all(ing._value_ == i + 1 for i, ing in enumerate(INGREDIENTS))
+VALUE_BIT: Tuple[int, ...] = (0,) + tuple(INGREDIENT_BIT[ing] for ing in INGREDIENTS)
+
+# --- Lookup Tables (built once) ---
+
+MASK_INGREDIENTS: Tuple[Tuple[Ingredient, ...], ...] = tuple(
+    tuple(ing for i, ing in enumerate(INGREDIENTS) if mask >> i & 1)
+    for mask in range(FULL_MASK + 1)
+)
+
+# Keyed by the set itself: building a frozenset from a set reuses its stored hashes, so a
+# lookup never reaches the (Python-level) Enum __hash__ that INGREDIENT_BIT lookups pay per item
+SET_MASKS: Dict[FrozenSet[Ingredient], int] = {frozenset(ings): mask for mask, ings in enumerate(MASK_INGREDIENTS)}
+
+POPCOUNT: Tuple[int, ...] = tuple(bin(mask).count("1") for mask in range(FULL_MASK + 1))
+
+PIZZA_MASKS: Dict[str, int] = {
+    pizza.name: sum(INGREDIENT_BIT[ing] for ing in set(pizza.ingredients)) for pizza in ALL_PIZZAS
+}
+
+# =====================
+#  Conversions
+# =====================
+
+def mask_of(ingredients: Iterable[Ingredient]) -> int:
+    """
+    Packs an iterable of Ingredients into its bitmask.
+    """
+
+    return SET_MASKS[frozenset(ingredients)]
+
+def ingredients_of(mask: int) -> Set[Ingredient]:
+    """
+    Unpacks a bitmask into a fresh, mutable set of Ingredients.
+    """
+
+    return set(MASK_INGREDIENTS[mask])
+
+def recipe_mask(recipes: List[PizzaCard]) -> int:
+    """
+    Union of the ingredient masks of every recipe in the list.
+    """
+
+    mask = 0
+    for recipe in recipes:
+        mask |= mask_of(recipe.ingredients)
+    return mask
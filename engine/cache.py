@@ -0,0 +1,237 @@
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from .components import ALL_PIZZAS, BOARD_LAYOUT, LUCK_DECK_COMPOSITION
+from .simulation import GameResult, RunningStats, SimulationConfig, run_simulation
+
+"""
+Persistent cache of simulation results, so reruns of the same sweep cost nothing.
+
+An entry is keyed by a hash of the full 'SimulationConfig' and of the rules ('rules_hash'),
+and holds shards: the per-game results of a contiguous range of game indices, plus their
+aggregate. Game k of a config is always the same game ('engine/seeding.py'), so a request
+for games [start, stop) is answered from every shard overlapping it and only the missing
+ranges are simulated, then stored as new shards.
+
+Changing the board, the luck deck or the recipes changes every key, and entries written
+under other rules are deleted when the cache is opened. Shards are evicted least recently
+used first once the cache grows past 'max_bytes'.
+
+Layout: <root>/<key>/meta.json and <root>/<key>/<start>-<stop>.npy
+"""
+
+CACHE_VERSION = 1
+
+RECORD_DTYPE = np.dtype([
+    ("game", "<i8"),
+    ("winner", "i1"),
+    ("turns", "<i4"),
+    ("lose_everything_hits", "<i4"),
+    ("winner_draft", "<i2"),
+])
+
+def rules_hash() -> str:
+    """
+    Hash of everything in 'engine/components.py' that decides how games play out.
+    """
+
+    rules = repr((BOARD_LAYOUT, LUCK_DECK_COMPOSITION, ALL_PIZZAS))
+    return hashlib.sha256(rules.encode()).hexdigest()[:16]
+
+def config_key(config: SimulationConfig, rules: Optional[str] = None) -> str:
+    fields = asdict(config)
+    if fields["rules"] is None:
+        del fields["rules"]         # Standard games keep the keys they had before variants
+    payload = {"version": CACHE_VERSION, "rules": rules or rules_hash(), "config": fields}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+def stats_from_records(num_players: int, records: np.ndarray) -> RunningStats:
+    """
+    Aggregates per-game records into a 'RunningStats'.
+    """
+
+    stats = RunningStats(num_players)
+    if not len(records):
+        return stats
+    winners = records["winner"].astype(np.int64)
+    turns = records["turns"].astype(np.float64)
+    stats.games = len(records)
+    stats.wins = np.bincount(winners[winners >= 0], minlength=num_players).tolist()
+    stats.unfinished = int((winners < 0).sum())
+    stats.lose_everything_hits = int(records["lose_everything_hits"].sum())
+    stats.turns_mean = float(turns.mean())
+    stats.turns_m2 = float(((turns - stats.turns_mean) ** 2).sum())
+    return stats
+
+def _missing(start: int, stop: int, covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Parts of [start, stop) outside the sorted, disjoint 'covered' ranges.
+    """
+
+    gaps, cursor = [], start
+    for a, b in covered:
+        if b <= cursor or a >= stop:
+            continue
+        if a > cursor:
+            gaps.append((cursor, a))
+        cursor = max(cursor, b)
+    if cursor < stop:
+        gaps.append((cursor, stop))
+    return gaps
+
+# =====================
+#  Result Cache
+# =====================
+
+@dataclass
+class CachedRun:
+    stats: RunningStats
+    cached_games: int           # Games answered from the cache
+    simulated_games: int        # Games played by this call
+    seconds: float
+
+class ResultCache:
+    def __init__(self, root: str = os.path.join("data", "cache"), max_bytes: int = 256 * 2**20) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.rules = rules_hash()
+        os.makedirs(root, exist_ok=True)
+        self._prune_stale()
+
+    # === Lookups ===
+
+    def simulate(self, config: SimulationConfig, num_games: int, first_game: int = 0,
+                workers: int = 1, chunk_size: int = 500) -> CachedRun:
+        """
+        Statistics of games [first_game, first_game + num_games) of 'config', simulating
+        (over 'workers' processes) and storing only the ranges no shard covers yet.
+        """
+
+        started = time.perf_counter()
+        start, stop = first_game, first_game + num_games
+        key = config_key(config, self.rules)
+        meta = self._load_meta(key) or {"rules": self.rules, "config": asdict(config), "shards": []}
+
+        stats = RunningStats(config.num_players)
+        cached = 0
+        now = time.time()
+        for shard in meta["shards"]:
+            a, b = max(start, shard["start"]), min(stop, shard["stop"])
+            if a >= b:
+                continue
+            if (a, b) == (shard["start"], shard["stop"]):
+                stats.merge(RunningStats(**shard["stats"]))
+            else:
+                records = np.load(os.path.join(self.root, key, shard["file"]), mmap_mode="r")
+                stats.merge(stats_from_records(config.num_players, records[a - shard["start"]:b - shard["start"]]))
+            shard["used"] = now
+            cached += b - a
+
+        covered = [(shard["start"], shard["stop"]) for shard in meta["shards"]]
+        gaps = _missing(start, stop, covered)
+        for a, b in gaps:
+            results: List[GameResult] = []
+            run_simulation(config, b - a, workers=workers, chunk_size=chunk_size,
+                           on_result=results.append, first_game=a)
+            records = np.array(sorted(results), dtype=RECORD_DTYPE)
+            shard_stats = stats_from_records(config.num_players, records)
+            stats.merge(shard_stats)
+            meta["shards"].append(self._write_shard(key, a, b, records, shard_stats))
+
+        meta["shards"].sort(key=lambda shard: shard["start"])
+        self._save_meta(key, meta)
+        if gaps:
+            self.evict()
+        return CachedRun(stats, cached, sum(b - a for a, b in gaps), time.perf_counter() - started)
+
+    # === Storage ===
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _load_meta(self, key: str) -> Optional[dict]:
+        path = os.path.join(self._entry(key), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_meta(self, key: str, meta: dict) -> None:
+        """
+        Writes through a temporary file, so a crash never leaves a half-written index.
+        """
+
+        os.makedirs(self._entry(key), exist_ok=True)
+        path = os.path.join(self._entry(key), "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def _write_shard(self, key: str, start: int, stop: int, records: np.ndarray, stats: RunningStats) -> dict:
+        os.makedirs(self._entry(key), exist_ok=True)
+        name = f"{start}-{stop}.npy"
+        path = os.path.join(self._entry(key), name)
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, records)
+        os.replace(path + ".tmp", path)
+        return {"start": start, "stop": stop, "file": name, "bytes": os.path.getsize(path),
+                "stats": asdict(stats), "used": time.time()}
+
+    def _metas(self):
+        for key in sorted(os.listdir(self.root)):
+            meta = self._load_meta(key)
+            if meta is not None:
+                yield key, meta
+
+    def _prune_stale(self) -> None:
+        """
+        Deletes the entries written under other rules.
+        """
+
+        for key, meta in list(self._metas()):
+            if meta.get("rules") != self.rules:
+                shutil.rmtree(self._entry(key), ignore_errors=True)
+
+    # === Eviction ===
+
+    def size(self) -> int:
+        return sum(shard["bytes"] for _, meta in self._metas() for shard in meta["shards"])
+
+    def evict(self) -> int:
+        """
+        Drops least recently used shards until the cache fits in 'max_bytes'. Returns the
+        number of bytes freed.
+        """
+
+        metas = dict(self._metas())
+        shards = sorted(((shard["used"], key, shard) for key, meta in metas.items() for shard in meta["shards"]),
+                        key=lambda item: item[0])
+        total = sum(shard["bytes"] for _, _, shard in shards)
+        freed = 0
+        touched = set()
+        for _, key, shard in shards:
+            if total - freed <= self.max_bytes:
+                break
+            os.remove(os.path.join(self._entry(key), shard["file"]))
+            metas[key]["shards"].remove(shard)
+            freed += shard["bytes"]
+            touched.add(key)
+
+        for key in touched:
+            if metas[key]["shards"]:
+                self._save_meta(key, metas[key])
+            else:
+                shutil.rmtree(self._entry(key), ignore_errors=True)
+        return freed
+
+    def clear(self) -> None:
+        for key, _ in list(self._metas()):
+            shutil.rmtree(self._entry(key), ignore_errors=True)
@@ -0,0 +1,206 @@
+from typing import Generator, List, Optional, Tuple
+
+import random
+
+from .components import PizzaCard, LuckCardType, LUCK_DECK_COMPOSITION, BOARD_LAYOUT
+from .bitmask import MASK_INGREDIENTS, NUM_INGREDIENTS, POPCOUNT, recipe_mask
+from .player import PlayerState
+from .rules import CHEF_KIND, INGREDIENT_KIND, LOSE_EVERYTHING_KIND, LUCK_KIND, RuleSet, compile_rules
+
+"""
+The game with control turned inside out, for environments and batched policies.
+
+'GameState' asks its 'PlayerController's for decisions through callbacks. Here the turn
+loop is a generator over Ingredient masks that yields every decision point instead and is
+resumed with the chosen action, so the caller can hand the decision to an agent (see
+'env/') or collect the decisions of many games and answer them at once (see
+'engine/batch_policy.py') without threads. The rules (a 'RuleSet' variant included, see
+'engine/rules.py') and the order in which the game's rng is used are those of 'GameState' /
+'FastGameState':
+
+- 'choose_ingredient' (Chef space, GAIN cards, the pick of a steal) -> CHOOSE_INGREDIENT
+- 'choose_opponent' (STEAL cards) -> CHOOSE_OPPONENT
+- 'choose_ingredients_to_lose' (LOSE cards) -> one CHOOSE_LOSE per Ingredient lost,
+  'lose_amount' counts the ones still to go (this one included)
+
+Actions are one flat Discrete space: 0-9 pick the Ingredient in canonical order, and
+NUM_INGREDIENTS + k picks the opponent k seats after the decider (relative, so one policy
+serves every seat).
+"""
+
+CHOOSE_INGREDIENT, CHOOSE_OPPONENT, CHOOSE_LOSE = range(3)
+NUM_DECISIONS = 3
+
+# Sizes of the standard game, which the environments' observations are laid out for
+BOARD_SIZE = len(BOARD_LAYOUT)
+NUM_CARD_TYPES = len(LUCK_DECK_COMPOSITION)
+FULL_DECK = sum(card.count for card in LUCK_DECK_COMPOSITION)
+
+_INGREDIENT_BITS = tuple(1 << i for i in range(NUM_INGREDIENTS))
+_CARD_INDEX = {card.card_type: i for i, card in enumerate(LUCK_DECK_COMPOSITION)}
+
+def num_actions(num_players: int) -> int:
+    return NUM_INGREDIENTS + num_players
+
+# =====================
+#  Decision Game
+# =====================
+
+class DecisionGame:
+    """
+    One game as a decision generator. After 'reset()' and every 'act(action)', the game has
+    run up to the next decision ('decision', 'decider' and 'choices', a bitmask over Ingredients
+    or absolute seats) or to its end ('game_over'). Decisions are asked of the player whose
+    turn it is.
+
+    Like 'FastGameState' it keeps 'PlayerState' views in 'players' (refreshed by 'view'),
+    so controllers that read 'players' and 'pawn_position' can be bound to it.
+    """
+
+    def __init__(self, num_players: int, player_recipes: List[List[PizzaCard]],
+                rng: Optional[random.Random] = None,
+                starting_pos: int = 0,
+                rules: Optional[RuleSet] = None) -> None:
+
+        assert num_players in {2, 3, 6}
+        assert len(player_recipes) == num_players
+        self.num_players = num_players
+        self.players = [PlayerState(id=i, recipes=player_recipes[i]) for i in range(num_players)]
+        self.recipe_masks = [recipe_mask(recipes) for recipes in player_recipes]
+        self.rng = rng if rng is not None else random.Random()
+        self.rules = compile_rules(rules)                         # Standard rules by default
+        self._board_kind = self.rules.board_kind
+        self._board_bit = self.rules.board_bit
+        self.starting_pos = starting_pos
+        self.reset()
+
+    def reset(self, rng: Optional[random.Random] = None) -> None:
+        if rng is not None:
+            self.rng = rng
+        self.masks = [0] * self.num_players
+        self.pawn_position = self.starting_pos if self.starting_pos else self.rng.randint(1, self.rules.board_size)
+        self.current_player_index = 0
+        self.luck_deck = self._build_luck_deck()
+        self.turns = 0
+        self.game_over = False
+        self.winner_id = -1
+
+        self.decision = -1
+        self.decider = -1
+        self.choices = 0
+        self.lose_amount = 0
+        self._turns = self._play()
+        self._advance(None)
+
+    def act(self, action: int) -> None:
+        """
+        Resumes the game with 'action', which must be one of the current 'choices'.
+        """
+
+        assert not self.game_over, "The game is over"
+        if self.decision == CHOOSE_OPPONENT:
+            victim = (self.decider + action - NUM_INGREDIENTS) % self.num_players
+            assert self.choices >> victim & 1, f"Seat {victim} is not a choice"
+            self._advance(victim)
+        else:
+            assert self.choices >> action & 1, f"Ingredient {action} is not a choice"
+            self._advance(_INGREDIENT_BITS[action])
+
+    def view(self, pid: int) -> PlayerState:
+        """
+        Refreshes and returns the 'PlayerState' view of player 'pid'.
+        """
+
+        player = self.players[pid]
+        player.ingredients = set(MASK_INGREDIENTS[self.masks[pid]])
+        return player
+
+    def _advance(self, choice) -> None:
+        try:
+            self.decision, self.decider, self.choices = self._turns.send(choice)
+        except StopIteration:
+            self.decision, self.decider, self.choices = -1, -1, 0
+
+    def _build_luck_deck(self) -> list:
+        deck = list(self.rules.deck_cards)
+        self.rng.shuffle(deck)
+        self.deck_counts = [card.count for card in self.rules.composition]
+        return deck
+
+    # === Turn Loop ===
+
+    def _play(self) -> Generator[Tuple[int, int, int], object, None]:
+        masks = self.masks
+        while True:
+            pid = self.current_player_index
+            roll = self.rng.randint(1, self.rules.die_sides)
+            self.pawn_position = (self.pawn_position + roll - 1) % self.rules.board_size + 1
+            kind = self._board_kind[self.pawn_position]
+            recipe = self.recipe_masks[pid]
+
+            if kind == INGREDIENT_KIND:
+                bit = self._board_bit[self.pawn_position]
+                if recipe & bit:
+                    masks[pid] |= bit
+
+            elif kind == CHEF_KIND:
+                if recipe:
+                    masks[pid] |= yield CHOOSE_INGREDIENT, pid, recipe
+
+            elif kind == LUCK_KIND:
+                if not self.luck_deck:
+                    self.luck_deck = self._build_luck_deck()
+                card = self.luck_deck.pop()
+                self.deck_counts[_CARD_INDEX[card.card_type]] -= 1
+                yield from self._resolve_luck_card(card.card_type, pid)
+
+            elif kind == LOSE_EVERYTHING_KIND:
+                masks[pid] = 0
+
+            self.turns += 1
+            if not recipe & ~masks[pid]:
+                self.game_over = True
+                self.winner_id = pid
+                return
+            self.current_player_index = (pid + 1) % self.num_players
+
+    def _resolve_luck_card(self, card_type: LuckCardType, pid: int):
+        masks = self.masks
+        recipe = self.recipe_masks[pid]
+
+        if card_type in (LuckCardType.GAIN_1, LuckCardType.GAIN_2):
+            needed = recipe
+            for _ in range(1 if card_type == LuckCardType.GAIN_1 else 2):
+                if not needed:
+                    break
+                bit = yield CHOOSE_INGREDIENT, pid, needed
+                masks[pid] |= bit
+                needed &= ~bit
+
+        elif card_type in (LuckCardType.STEAL_1, LuckCardType.STEAL_2):
+            opponents = 0
+            for other in range(self.num_players):
+                if other != pid and masks[other]:
+                    opponents |= 1 << other
+
+            for _ in range(1 if card_type == LuckCardType.STEAL_1 else 2):
+                if not opponents or not recipe:
+                    break
+                victim = yield CHOOSE_OPPONENT, pid, opponents
+                can_steal = recipe & masks[victim]
+                if not can_steal:
+                    continue
+                bit = yield CHOOSE_INGREDIENT, pid, can_steal
+                masks[victim] &= ~bit
+                masks[pid] |= bit
+
+        elif card_type in (LuckCardType.LOSE_1, LuckCardType.LOSE_2):
+            amount = 1 if card_type == LuckCardType.LOSE_1 else 2
+            picks = min(amount, POPCOUNT[masks[pid]])
+            for k in range(picks):
+                self.lose_amount = picks - k
+                masks[pid] &= ~(yield CHOOSE_LOSE, pid, masks[pid])
+            self.lose_amount = 0
+
+        elif card_type == LuckCardType.LOSE_ALL:
+            masks[pid] = 0
@@ -0,0 +1,309 @@
+from collections import deque
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import json
+import multiprocessing
+import socket
+import struct
+import threading
+import time
+
+from .rules import RuleSet
+from .simulation import RunningStats, SimulationConfig, SimulationReport, play_chunk
+
+"""
+Coordinator / worker protocol that shards one simulation over machines.
+
+The coordinator splits games [first_game, first_game + num_games) into shards and serves
+them over TCP; workers connect, receive the job once, then pull shards one at a time and
+play them with 'play_chunk' ('build_game' with the same seeding as a local run), so the
+merged result of a sharded run counts exactly the wins of 'run_simulation' with the same
+config. Workers return one 'RunningStats' aggregate per shard, never per-game records.
+
+Frames are a FRAME header (message type, payload length) and a fixed struct payload, except
+HELLO (worker name) and JOB (the config as JSON, once per connection):
+
+    worker -> coordinator: HELLO, PROGRESS (shard, games done), RESULT (shard, aggregate)
+    coordinator -> worker: JOB, ASSIGN (shard, start, stop), STOP
+
+A worker that disconnects or stays silent for 'heartbeat_timeout' seconds loses its shard
+to the queue. Once the queue is empty, idle workers also get a copy of any shard running
+for longer than 'straggler_after' seconds; the first result of a shard wins and later ones
+are dropped, so slow machines can't hold the run back or be counted twice.
+"""
+
+PROTOCOL_VERSION = 1
+
+HELLO, JOB, ASSIGN, PROGRESS, RESULT, STOP = range(1, 7)
+
+FRAME = struct.Struct("<BI")                    # Message type, payload length
+ASSIGN_MESSAGE = struct.Struct("<IQQ")          # Shard, first game, stop
+PROGRESS_MESSAGE = struct.Struct("<IQ")         # Shard, games played so far
+RESULT_HEADER = struct.Struct("<IQQQdd")        # Shard, games, unfinished, hits, turns mean, turns M2
+
+# =====================
+#  Framing
+# =====================
+
+def send_message(sock: socket.socket, kind: int, payload: bytes = b"") -> None:
+    sock.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return bytes(data)
+
+def recv_message(sock: socket.socket) -> Tuple[int, bytes]:
+    kind, size = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    return kind, _recv_exact(sock, size)
+
+def encode_result(shard: int, stats: RunningStats) -> bytes:
+    header = RESULT_HEADER.pack(shard, stats.games, stats.unfinished, stats.lose_everything_hits,
+                                stats.turns_mean, stats.turns_m2)
+    return header + struct.pack(f"<{stats.num_players}Q", *stats.wins)
+
+def decode_result(payload: bytes, num_players: int) -> Tuple[int, RunningStats]:
+    shard, games, unfinished, hits, mean, m2 = RESULT_HEADER.unpack_from(payload)
+    wins = list(struct.unpack_from(f"<{num_players}Q", payload, RESULT_HEADER.size))
+    return shard, RunningStats(num_players, games, wins, unfinished, hits, mean, m2)
+
+def encode_job(config: SimulationConfig) -> bytes:
+    return json.dumps({"version": PROTOCOL_VERSION, "config": asdict(config)}).encode()
+
+def decode_job(payload: bytes) -> SimulationConfig:
+    data = json.loads(payload)
+    if data["version"] != PROTOCOL_VERSION:
+        raise ValueError(f"Coordinator speaks protocol {data['version']}, this worker {PROTOCOL_VERSION}")
+    raw = data["config"]
+    rules = raw.get("rules")
+    if rules is not None:
+        rules = RuleSet(**{**rules, "board": tuple(rules["board"]), "deck": tuple(rules["deck"])})
+    return SimulationConfig(**{**raw, "draft": tuple(tuple(recipes) for recipes in raw["draft"]),
+                               "policies": tuple(raw["policies"]), "rules": rules})
+
+# =====================
+#  Coordinator
+# =====================
+
+class Coordinator:
+    """
+    Serves the shards of one run on (host, port); port 0 picks a free one, see 'address'.
+    'run()' blocks until every shard has a result and returns the merged report.
+    """
+
+    def __init__(self, config: SimulationConfig, num_games: int, shard_size: int = 1000,
+                first_game: int = 0, host: str = "127.0.0.1", port: int = 0,
+                heartbeat_timeout: float = 60.0, straggler_after: float = 30.0) -> None:
+
+        self.config = config
+        self.heartbeat_timeout = heartbeat_timeout
+        self.straggler_after = straggler_after
+        self.shards = [(start, min(start + shard_size, first_game + num_games))
+                       for start in range(first_game, first_game + num_games, shard_size)]
+
+        self.pending = deque(range(len(self.shards)))
+        self.running: Dict[int, Set[str]] = {}          # Shard -> workers playing it
+        self.started: Dict[int, float] = {}
+        self.results: Dict[int, RunningStats] = {}
+        self.reassigned = 0
+        self.workers: Set[str] = set()
+        self.condition = threading.Condition()
+        self.connections: List[socket.socket] = []
+        self.log: Optional[Callable[[str], None]] = None
+
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+
+    @property
+    def finished(self) -> bool:
+        return len(self.results) == len(self.shards)
+
+    def run(self, log: Optional[Callable[[str], None]] = None) -> SimulationReport:
+        self.log = log
+        started = time.perf_counter()
+        threading.Thread(target=self._accept, daemon=True).start()
+        with self.condition:
+            while not self.finished:
+                self.condition.wait()
+        self.close()
+
+        stats = RunningStats(self.config.num_players)
+        for shard in sorted(self.results):
+            stats.merge(self.results[shard])
+        return SimulationReport(stats, len(self.workers), time.perf_counter() - started)
+
+    def close(self) -> None:
+        # Shutting down first wakes the threads blocked on these sockets
+        with self.condition:
+            for sock in [self.server] + self.connections:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+
+    # === Scheduling ===
+
+    def _next_shard(self, worker: str) -> Optional[int]:
+        """
+        The next shard for 'worker', a straggler's copy once the queue is empty, or None
+        when the run is over.
+        """
+
+        with self.condition:
+            while not self.finished:
+                if self.pending:
+                    shard = self.pending.popleft()
+                else:
+                    now = time.monotonic()
+                    stragglers = [s for s, workers in self.running.items()
+                                  if len(workers) == 1 and now - self.started[s] > self.straggler_after]
+                    if not stragglers:
+                        self.condition.wait(min(1.0, max(0.05, self.straggler_after)))
+                        continue
+                    shard = min(stragglers, key=lambda s: self.started[s])
+                    self.reassigned += 1
+                    self._log(f"{worker}: copy of straggling shard {shard}")
+                self.running.setdefault(shard, set()).add(worker)
+                self.started.setdefault(shard, time.monotonic())
+                return shard
+            return None
+
+    def _release(self, shard: int, worker: str, stats: Optional[RunningStats]) -> None:
+        with self.condition:
+            workers = self.running.get(shard, set())
+            workers.discard(worker)
+            if stats is not None and shard not in self.results:
+                self.results[shard] = stats
+                self.running.pop(shard, None)
+                self._log(f"{worker}: shard {shard} done, {len(self.results)}/{len(self.shards)}")
+            elif shard not in self.results and not workers:
+                self.running.pop(shard, None)
+                self.started.pop(shard, None)
+                self.pending.appendleft(shard)
+                self.reassigned += 1
+                self._log(f"{worker}: lost shard {shard}, back in the queue")
+            self.condition.notify_all()
+
+    def _log(self, message: str) -> None:
+        if self.log:
+            self.log(message)
+
+    # === Connections ===
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            with self.condition:
+                self.connections.append(connection)
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: socket.socket) -> None:
+        connection.settimeout(self.heartbeat_timeout)
+        shard = None
+        worker = "?"
+        try:
+            kind, payload = recv_message(connection)
+            if kind != HELLO:
+                return
+            with self.condition:
+                # Names only label the log, several workers may share a host name
+                worker = f"{payload.decode() or 'worker'}#{len(self.workers) + 1}"
+                self.workers.add(worker)
+            send_message(connection, JOB, encode_job(self.config))
+
+            while True:
+                shard = self._next_shard(worker)
+                if shard is None:
+                    send_message(connection, STOP)
+                    return
+                send_message(connection, ASSIGN, ASSIGN_MESSAGE.pack(shard, *self.shards[shard]))
+
+                while True:
+                    kind, payload = recv_message(connection)
+                    if kind == RESULT:
+                        index, stats = decode_result(payload, self.config.num_players)
+                        if index == shard:
+                            self._release(shard, worker, stats)
+                            shard = None
+                            break
+                    elif kind != PROGRESS:
+                        raise ConnectionError(f"Unexpected message {kind}")
+        except (OSError, ConnectionError, struct.error):
+            pass
+        finally:
+            if shard is not None:
+                self._release(shard, worker, None)
+            connection.close()
+
+# =====================
+#  Worker
+# =====================
+
+def run_worker(address: Tuple[str, int], name: str = "", progress_every: int = 100,
+               connect_timeout: float = 10.0) -> int:
+    """
+    Connects to a coordinator and plays the shards it assigns until it says STOP or goes
+    away. Returns the number of shards played.
+    """
+
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection(address)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+    played = 0
+    with sock:
+        try:
+            send_message(sock, HELLO, (name or socket.gethostname()).encode())
+            kind, payload = recv_message(sock)
+            config = decode_job(payload)
+
+            while True:
+                kind, payload = recv_message(sock)
+                if kind != ASSIGN:
+                    break
+                shard, start, stop = ASSIGN_MESSAGE.unpack(payload)
+                stats = RunningStats(config.num_players)
+                for lo in range(start, stop, progress_every):
+                    for result in play_chunk(config, lo, min(lo + progress_every, stop)):
+                        stats.add(result)
+                    send_message(sock, PROGRESS, PROGRESS_MESSAGE.pack(shard, stats.games))
+                send_message(sock, RESULT, encode_result(shard, stats))
+                played += 1
+        except (OSError, ConnectionError):
+            pass
+    return played
+
+def run_local(config: SimulationConfig, num_games: int, workers: int = 2, shard_size: int = 1000,
+              first_game: int = 0, log: Optional[Callable[[str], None]] = None) -> SimulationReport:
+    """
+    A whole sharded run on this machine: a coordinator on localhost and 'workers' worker
+    processes connecting to it.
+    """
+
+    coordinator = Coordinator(config, num_games, shard_size, first_game)
+    processes = [multiprocessing.Process(target=run_worker, args=(coordinator.address, f"local-{i}"), daemon=True)
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        return coordinator.run(log)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
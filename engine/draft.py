@@ -0,0 +1,233 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import itertools
+import math
+import time
+
+from .components import ALL_PIZZAS
+from .simulation import RunningStats, SimulationConfig, play_chunk
+
+"""
+Recipe draft analysis: which snake-draft picks are best, found by racing every draft.
+
+Every legal draft (one per way of dealing ALL_PIZZAS along the snake order) is a leaf of
+the draft tree, whose inner nodes are the picks. A leaf is worth its simulated win rate
+per seat, and each inner node is worth the child its picker likes best (backward
+induction), so the path from the root is the optimal pick at each draft step.
+
+Simulation runs in rounds. After each one, a child is eliminated for good once the upper
+end of its picker's 95% win-rate interval falls below the lower end of the best child's,
+and only leaves still reachable through surviving children keep being played. Clearly
+dominated drafts stop early and the budget goes where the win rates are close. Game k of
+every draft replays the same dice and luck deck ('engine/seeding.py'), so draft
+comparisons use common random numbers.
+"""
+
+# Seat picking at each step, from the README setup rules
+SNAKE_ORDERS = {
+    2: (0, 1, 1, 0, 0, 1),
+    3: (0, 1, 2, 2, 1, 0),
+}
+
+Draft = Tuple[Tuple[int, ...], ...]          # Indices into ALL_PIZZAS per seat, ascending
+
+def enumerate_drafts(num_players: int) -> List[Draft]:
+    """
+    Every way of dealing ALL_PIZZAS to the seats with the snake order's card counts.
+    """
+
+    order = SNAKE_ORDERS[num_players]
+    drafts = []
+    for seats in set(itertools.permutations(order)):
+        drafts.append(tuple(tuple(i for i, s in enumerate(seats) if s == seat) for seat in range(num_players)))
+    return sorted(drafts)
+
+def draft_to_names(draft: Draft) -> Tuple[Tuple[str, ...], ...]:
+    return tuple(tuple(ALL_PIZZAS[i].name for i in picks) for picks in draft)
+
+class PickOption(NamedTuple):
+    pizza: str
+    win_rate: float             # Picker's win rate under optimal play after this pick
+    ci: float
+    eliminated: bool
+
+class DraftStep(NamedTuple):
+    step: int
+    seat: int
+    pick: str
+    options: List[PickOption]   # Every pick available at this step, best first
+
+@dataclass
+class DraftAnalysis:
+    num_players: int
+    stats: Dict[Draft, RunningStats]
+    line: List[DraftStep]
+    games: int = 0
+    rounds: int = 0
+    seconds: float = 0.0
+
+    def ranked(self, seat: int = 0) -> List[Tuple[Draft, RunningStats]]:
+        """
+        Every draft with at least one game, best for 'seat' first.
+        """
+
+        played = [(draft, stats) for draft, stats in self.stats.items() if stats.games]
+        return sorted(played, key=lambda item: -item[1].win_rate(seat))
+
+# =====================
+#  Draft Evaluator
+# =====================
+
+class _Value(NamedTuple):
+    means: Tuple[float, ...]
+    cis: Tuple[float, ...]
+
+@dataclass
+class DraftEvaluator:
+    """
+    Races every snake draft of 'num_players' until one optimal line is left, the drafts
+    still in the race are within 'tolerance' (95% half-width), or 'budget' games are spent.
+    Each round plays 'round_games' more games of every draft still racing.
+    """
+
+    num_players: int
+    policies: Tuple[str, ...] = ()
+    seed: int = 0
+    engine: str = "fast"
+    round_games: int = 200
+    tolerance: float = 0.01
+
+    def __post_init__(self) -> None:
+        if self.num_players not in SNAKE_ORDERS:
+            raise ValueError("Snake drafts are only defined for 2 or 3 players.")
+        self.order = SNAKE_ORDERS[self.num_players]
+        self.drafts = enumerate_drafts(self.num_players)
+        self.stats = {draft: RunningStats(self.num_players) for draft in self.drafts}
+        self.eliminated: Set[Tuple[Draft, int]] = set()       # (node, pick) pairs out of the race
+        self._values: Dict[Draft, Dict[int, _Value]] = {}
+
+    def config(self, draft: Draft) -> SimulationConfig:
+        return SimulationConfig(self.num_players, draft_to_names(draft), self.policies, self.seed, self.engine)
+
+    # === Draft Tree ===
+
+    def _children(self, node: Draft, step: int) -> List[Tuple[int, Draft]]:
+        seat = self.order[step]
+        taken = {i for picks in node for i in picks}
+        return [(i, node[:seat] + (tuple(sorted(node[seat] + (i,))),) + node[seat + 1:])
+                for i in range(len(ALL_PIZZAS)) if i not in taken]
+
+    def _leaf_value(self, draft: Draft) -> _Value:
+        stats = self.stats[draft]
+        if not stats.games:
+            return _Value((1 / self.num_players,) * self.num_players, (math.inf,) * self.num_players)
+        seats = range(self.num_players)
+        return _Value(tuple(stats.win_rate(s) for s in seats), tuple(stats.win_rate_ci(s) for s in seats))
+
+    def _solve(self, node: Draft, step: int, memo: Dict[Draft, _Value]) -> _Value:
+        """
+        Backward induction from 'node', eliminating dominated picks on the way.
+        """
+
+        if node in memo:
+            return memo[node]
+        if step == len(self.order):
+            memo[node] = self._leaf_value(node)
+            return memo[node]
+
+        seat = self.order[step]
+        values = {pick: self._solve(child, step + 1, memo) for pick, child in self._children(node, step)}
+        self._values[node] = values
+
+        alive = [pick for pick in values if (node, pick) not in self.eliminated]
+        best = max(alive, key=lambda pick: values[pick].means[seat])
+        lower = values[best].means[seat] - values[best].cis[seat]
+        for pick in alive:
+            if values[pick].means[seat] + values[pick].cis[seat] < lower:
+                self.eliminated.add((node, pick))
+        memo[node] = values[best]
+        return memo[node]
+
+    def _racing(self, root: Draft) -> List[Draft]:
+        """
+        Leaves still reachable from 'root' through picks that weren't eliminated. Different
+        pick orders lead to the same nodes, so the tree is walked as a DAG.
+        """
+
+        frontier, seen = [(root, 0)], {root}
+        leaves = []
+        while frontier:
+            node, step = frontier.pop()
+            if step == len(self.order):
+                leaves.append(node)
+                continue
+            for pick, child in self._children(node, step):
+                if (node, pick) not in self.eliminated and child not in seen:
+                    seen.add(child)
+                    frontier.append((child, step + 1))
+        return sorted(leaves)
+
+    def _line(self) -> List[DraftStep]:
+        node = tuple(() for _ in range(self.num_players))
+        line = []
+        for step, seat in enumerate(self.order):
+            values = self._values[node]
+            ranked = sorted(values, key=lambda pick: ((node, pick) in self.eliminated, -values[pick].means[seat]))
+            options = [PickOption(ALL_PIZZAS[pick].name, values[pick].means[seat], values[pick].cis[seat],
+                                  (node, pick) in self.eliminated) for pick in ranked]
+            line.append(DraftStep(step, seat, options[0].pizza, options))
+            node = dict(self._children(node, step))[ranked[0]]
+        return line
+
+    # === Racing ===
+
+    def _needs_games(self, draft: Draft) -> bool:
+        return self.stats[draft].max_win_rate_ci() > self.tolerance
+
+    def run(self, budget: int = 200_000, workers: int = 1,
+            log: Optional[Callable[[str], None]] = None) -> DraftAnalysis:
+        """
+        Races the drafts with at most 'budget' games over 'workers' processes.
+        """
+
+        started = time.perf_counter()
+        root = tuple(() for _ in range(self.num_players))
+        games = rounds = 0
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        try:
+            while games < budget:
+                reachable = self._racing(root)
+                racing = [draft for draft in reachable if self._needs_games(draft)]
+                if len(reachable) <= 1 or not racing:
+                    break
+
+                per_draft = min(self.round_games, (budget - games) // len(racing))
+                if not per_draft:
+                    break
+                tasks = [(draft, self.stats[draft].games) for draft in racing]
+                if pool is None:
+                    chunks = [play_chunk(self.config(draft), start, start + per_draft) for draft, start in tasks]
+                else:
+                    chunks = list(pool.map(play_chunk, [self.config(draft) for draft, _ in tasks],
+                                           [start for _, start in tasks],
+                                           [start + per_draft for _, start in tasks]))
+
+                for (draft, _), results in zip(tasks, chunks):
+                    for result in results:
+                        self.stats[draft].add(result)
+                games += per_draft * len(tasks)
+                rounds += 1
+
+                self._solve(root, 0, {})
+                if log:
+                    log(f"Round {rounds}: {len(racing)} drafts racing, {games:,} games")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self._solve(root, 0, {})
+        return DraftAnalysis(self.num_players, self.stats, self._line(), games, rounds,
+                             time.perf_counter() - started)
@@ -0,0 +1,319 @@
+from typing import List, Optional, Union
+
+from .components import PizzaCard, LuckCard, LuckCardType
+
+from .bitmask import INGREDIENT_BIT, MASK_INGREDIENTS, POPCOUNT, recipe_mask
+from .luck_deck import CountingLuckDeck
+from .policy import PlayerController
+from .player import PlayerState
+from .rules import CHEF_KIND, INGREDIENT_KIND, LOSE_EVERYTHING_KIND, LUCK_KIND, RuleSet, compile_rules
+from .snapshot import GameSnapshot, deck_counts, deck_cards
+
+import random
+
+# --- Precomputed Board (the tables themselves come from 'engine/rules.py') ---
+
+_INGREDIENT, _CHEF, _LUCK, _LOSE_EVERYTHING = INGREDIENT_KIND, CHEF_KIND, LUCK_KIND, LOSE_EVERYTHING_KIND
+
+# =====================
+#  Fast Game State
+# =====================
+
+class FastGameState:
+    """
+    Drop-in alternative to 'GameState' that keeps every inventory and recipe as a 10-bit
+    Ingredient mask (see 'engine/bitmask.py'). Sets and 'PlayerState' objects are only
+    materialized when a 'PlayerController' callback needs them, and the random stream is
+    consumed in exactly the same order as 'GameState', so both engines play the same game
+    under the same seed.
+    """
+
+    def __init__(self, num_players: int, player_recipes: List[List[PizzaCard]],
+                controllers: List[PlayerController],
+                starting_pos: int = 0,
+                rng: Optional[random.Random] = None,
+                counting_deck: bool = False,
+                rules: Optional[RuleSet] = None) -> None:
+
+        assert num_players in {2, 3, 6}
+        assert len(player_recipes) == num_players
+        assert len(controllers) == num_players
+
+        expected_pizzas = {2: 3, 3: 2, 6: 1}[num_players]
+        for recipes in player_recipes:
+            assert len(recipes) == expected_pizzas
+
+        # 'players' are views handed to the controllers, the masks are the source of truth
+        self.players = [
+            PlayerState(id=i, recipes=player_recipes[i]) for i in range(num_players)
+        ]
+        self.recipe_masks = [recipe_mask(recipes) for recipes in player_recipes]
+        self.masks = [0] * num_players
+
+        self.controllers = controllers
+
+        # --- Game Variables ---
+
+        self.rng = rng if rng is not None else random.Random()    # Drives dice and deck shuffles
+        self.counting_deck = counting_deck                        # See 'engine/luck_deck.py'
+        self.rules = compile_rules(rules)                         # Standard rules by default
+        self._board_kind = self.rules.board_kind
+        self._board_bit = self.rules.board_bit
+
+        self.current_player_index = 0
+        self.pawn_position = starting_pos if starting_pos else self.rng.randint(1, self.rules.board_size)
+
+        self.luck_deck = self._build_luck_deck()
+
+        self.game_over = False
+        self.winner_id = -1
+
+        self._tracer = None                         # Optional per-turn recorder, see 'engine/trace.py'
+        self._traced_row = [0] * (1 + num_players)  # Position and inventory masks handed to it
+
+        self._luck_handlers = {
+            LuckCardType.GAIN_1: lambda pid: self._gain_ingredients(pid, 1),
+            LuckCardType.GAIN_2: lambda pid: self._gain_ingredients(pid, 2),
+            LuckCardType.STEAL_1: lambda pid: self._steal_ingredients(pid, 1),
+            LuckCardType.STEAL_2: lambda pid: self._steal_ingredients(pid, 2),
+            LuckCardType.LOSE_1: lambda pid: self._lose_ingredients(pid, 1),
+            LuckCardType.LOSE_2: lambda pid: self._lose_ingredients(pid, 2),
+            LuckCardType.LOSE_ALL: self._lose_all,
+        }
+
+        for controller in self.controllers:
+            controller.bind(self)
+
+    # === Space Methods ===
+
+    def step(self) -> None:
+        """
+        Simulates a step on the board, rolling the die of the game's rules (6-sided by default).
+        """
+
+        if self.game_over:
+            return
+
+        pid = self.current_player_index
+        roll = self.rng.randint(1, self.rules.die_sides)
+        self.pawn_position = (self.pawn_position + roll - 1) % self.rules.board_size + 1
+
+        self._resolve_space(self.pawn_position, pid)
+
+        if self.missing_count(pid) == 0:
+            self.game_over = True
+            self.winner_id = pid
+
+        if self._tracer is not None:
+            row = self._traced_row
+            row[0] = self.pawn_position
+            row[pid + 1] = self.masks[pid]
+            self._tracer.record(row)
+        if self.game_over:
+            return
+
+        self.current_player_index = (pid + 1) % len(self.players)
+
+    def _resolve_space(self, position: int, pid: int):
+        """
+        Resolves the effect of the space at 'position' for player 'pid'.
+        """
+
+        kind = self._board_kind[position]
+
+        if kind == _INGREDIENT:
+            bit = self._board_bit[position]
+            if self.recipe_masks[pid] & bit:
+                self.masks[pid] |= bit
+
+        elif kind == _CHEF:
+            needed = self.recipe_masks[pid]
+            if needed:
+                chosen = self.controllers[pid].choose_ingredient(
+                    set(MASK_INGREDIENTS[needed]), self._view(pid)
+                )
+                if chosen:
+                    self.masks[pid] |= INGREDIENT_BIT[chosen]
+
+        elif kind == _LUCK:
+            if not self.luck_deck:
+                self.luck_deck = self._build_luck_deck()
+            card = self.luck_deck.pop()
+            if self._tracer is not None:
+                self._tracer.draw(card)
+            self._luck_handlers[card.card_type](pid)
+
+        elif kind == _LOSE_EVERYTHING:
+            self.masks[pid] = 0
+
+    # === Mask Helpers ===
+
+    def missing_count(self, pid: int) -> int:
+        """
+        Number of recipe Ingredients player 'pid' still has to collect.
+        """
+
+        return POPCOUNT[self.recipe_masks[pid] & ~self.masks[pid]]
+
+    def needs(self, pid: int, bit: int) -> bool:
+        """
+        O(1) check of whether 'bit' is an Ingredient of player 'pid' recipes.
+        """
+
+        return bool(self.recipe_masks[pid] & bit)
+
+    def _view(self, pid: int) -> PlayerState:
+        """
+        Refreshes and returns the 'PlayerState' view of player 'pid' for a controller callback.
+        """
+
+        player = self.players[pid]
+        player.ingredients = set(MASK_INGREDIENTS[self.masks[pid]])
+        return player
+
+    def sync_players(self) -> List[PlayerState]:
+        """
+        Refreshes every 'PlayerState' view from the masks and returns them.
+        """
+
+        return [self._view(pid) for pid in range(len(self.players))]
+
+
+    # === Snapshot Methods ===
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Returns an immutable snapshot of the game (see 'engine/snapshot.py'). The rng and
+        the controllers are not part of it.
+        """
+
+        deck = self.luck_deck.snapshot() if self.counting_deck else tuple(self.luck_deck)
+        return GameSnapshot(self.pawn_position, self.current_player_index,
+                            tuple(self.masks), deck, self.game_over, self.winner_id)
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """
+        Puts the game back into the state of 'snapshot'.
+        """
+
+        self.pawn_position = snapshot.pawn_position
+        self.current_player_index = snapshot.current_player
+        self.masks = list(snapshot.masks)
+        if self.counting_deck:
+            self.luck_deck.restore(deck_counts(snapshot.deck))
+        else:
+            self.luck_deck = deck_cards(snapshot.deck, self.rng, self.rules.composition)
+
+        self.game_over = snapshot.game_over
+        self.winner_id = snapshot.winner_id
+        if self._tracer is not None:
+            self._traced_row[1:] = self.masks
+
+    # === Tracing ===
+
+    @property
+    def tracer(self):
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer) -> None:
+        """
+        Hooks 'tracer' (or unhooks with None). The row it gets after each turn is kept in
+        place: the mover's mask is copied in every turn, and a steal also copies the victim's.
+        """
+
+        self._tracer = tracer
+        if tracer is not None:
+            self._traced_row[1:] = self.masks
+
+    # === Luck Deck Methods ===
+
+    def _build_luck_deck(self) -> Union[List[LuckCard], CountingLuckDeck]:
+        """
+        Create and returns the deck list of the game's rules ('LUCK_DECK_COMPOSITION' unless
+        a variant changes it), shuffled with the game's 'rng'. With 'counting_deck' it
+        returns a full 'CountingLuckDeck'.
+        """
+
+        if self.counting_deck:
+            return CountingLuckDeck(self.rules.composition, rng=self.rng)
+
+        deck = list(self.rules.deck_cards)
+        self.rng.shuffle(deck)
+        return deck
+
+    def _resolve_luck_card(self, card: LuckCard, pid: int):
+        """
+        Resolves the effect of a Good or Bad Luck Card.
+        """
+
+        self._luck_handlers[card.card_type](pid)
+
+    # === Ingredient Helpers ===
+
+    def _gain_ingredients(self, pid: int, amount: int):
+        """
+        Adds Ingredients to the player's mask.
+        """
+
+        needed = set(MASK_INGREDIENTS[self.recipe_masks[pid]])
+        controller = self.controllers[pid]
+
+        for _ in range(amount):
+            if not needed:
+                break
+            chosen = controller.choose_ingredient(needed, self._view(pid))
+            if chosen:
+                self.masks[pid] |= INGREDIENT_BIT[chosen]
+                needed.discard(chosen)
+
+    def _steal_ingredients(self, thief: int, amount: int):
+        """
+        Steal Ingredients from one or more players and gives them to the thief.
+        """
+
+        masks = self.masks
+        controller = self.controllers[thief]
+        opponents = [pid for pid in range(len(masks)) if pid != thief and masks[pid]]
+
+        for _ in range(amount):
+            if not opponents:
+                break
+
+            needed = self.recipe_masks[thief]
+            if not needed:
+                break
+
+            victim = controller.choose_opponent(
+                self._view(thief), [self._view(pid) for pid in opponents]
+            )
+            if not victim or not masks[victim.id]:
+                continue
+
+            can_steal = needed & masks[victim.id]
+            if not can_steal:
+                continue
+
+            stolen = controller.choose_ingredient(set(MASK_INGREDIENTS[can_steal]), self._view(thief))
+            bit = INGREDIENT_BIT[stolen] if stolen else 0
+            if masks[victim.id] & bit:
+                masks[victim.id] &= ~bit
+                masks[thief] |= bit
+                if self._tracer is not None:
+                    self._traced_row[victim.id + 1] = masks[victim.id]
+
+    def _lose_ingredients(self, pid: int, amount: int):
+        """
+        Removes Ingredients from the player's mask.
+        """
+
+        to_remove = self.controllers[pid].choose_ingredients_to_lose(self._view(pid), amount)
+        for ing in to_remove:
+            self.masks[pid] &= ~INGREDIENT_BIT[ing]
+
+    def _lose_all(self, pid: int):
+        """
+        Clears the player's mask.
+        """
+
+        self.masks[pid] = 0
@@ -1,13 +1,17 @@
-from typing import List, Set
+from typing import List, Optional, Set, Union
 
 from .components import (
     Ingredient, PizzaCard,
-    LuckCard, LuckCardType, LUCK_DECK_COMPOSITION,
-    BoardSpace, BoardSpaceType, BOARD_LAYOUT
+    LuckCard, LuckCardType,
+    BoardSpace, BoardSpaceType
 ) 
 
+from .bitmask import VALUE_BIT, mask_of, ingredients_of
+from .luck_deck import CountingLuckDeck
 from .policy import PlayerController
 from .player import PlayerState
+from .rules import RuleSet, compile_rules
+from .snapshot import GameSnapshot, deck_counts, deck_cards
 
 import random
     
@@ -18,7 +22,10 @@ import random
 class GameState:
     def __init__(self, num_players: int, player_recipes: List[List[PizzaCard]], 
                 controllers: List[PlayerController],
-                starting_pos: int = 0) -> None:
+                starting_pos: int = 0,
+                rng: Optional[random.Random] = None,
+                counting_deck: bool = False,
+                rules: Optional[RuleSet] = None) -> None:
         
         assert num_players in {2, 3, 6}
         assert len(player_recipes) == num_players
@@ -36,34 +43,49 @@ class GameState:
 
         # --- Game Variables ---
 
+        self.rng = rng if rng is not None else random.Random()                         # Drives dice and deck shuffles
+        self.counting_deck = counting_deck                                              # See 'engine/luck_deck.py'
+        self.rules = compile_rules(rules)                                               # See 'engine/rules.py'
+
         self.current_player_index = 0                                                   
-        self.pawn_position = starting_pos if starting_pos else random.randint(1, 35) 
+        self.pawn_position = starting_pos if starting_pos else self.rng.randint(1, self.rules.board_size) 
         
         self.luck_deck = self._build_luck_deck()
-        random.shuffle(self.luck_deck)  
 
-        self.board = BOARD_LAYOUT
+        self.board = self.rules.board
         self.game_over = False
         self.winner_id = -1
 
+        self._tracer = None                         # Optional per-turn recorder, see 'engine/trace.py'
+        self._traced_row = [0] * (1 + num_players)  # Position and inventory masks handed to it
+
+        for controller in self.controllers:
+            controller.bind(self)
+
     # === Space Methods ===
     
     def step(self) -> None:
         """
-        Simulates a step on the board using a '6-sided dice'.
+        Simulates a step on the board, rolling the die of the game's rules (6-sided by default).
         """
 
         if self.game_over:
             return
         
         player = self.players[self.current_player_index]
-        roll = random.randint(1, 6)
-        self.pawn_position = (self.pawn_position + roll - 1) % 35 + 1
+        roll = self.rng.randint(1, self.rules.die_sides)
+        self.pawn_position = (self.pawn_position + roll - 1) % self.rules.board_size + 1
 
         space = self.board[self.pawn_position - 1]
         self._resolve_space(space, player)
 
-        self._advance_turn()
+        self._check_for_winner()
+        if self._tracer is not None:
+            row = self._traced_row
+            row[0] = self.pawn_position
+            self._tracer.record(row)
+        if not self.game_over:
+            self._advance_turn()
 
     def _resolve_space(self, space: BoardSpace, player: PlayerState):
         """
@@ -75,6 +97,8 @@ class GameState:
         if space.space_type == BoardSpaceType.INGREDIENT:
             if space.ingredient in self._needed_ingredients(player):
                 player.ingredients.add(space.ingredient)
+                if self._tracer is not None:
+                    self._traced_row[player.id + 1] |= self.rules.board_bit[self.pawn_position]
 
         elif space.space_type == BoardSpaceType.CHEF:
             needed = self._needed_ingredients(player)
@@ -82,16 +106,21 @@ class GameState:
                 chosen = controller.choose_ingredient(needed, player)
                 if chosen:
                     player.ingredients.add(chosen)
+                    if self._tracer is not None:
+                        self._traced_row[player.id + 1] |= VALUE_BIT[chosen._value_]
 
         elif space.space_type == BoardSpaceType.GOOD_OR_BAD_LUCK:
             if not self.luck_deck:
                 self.luck_deck = self._build_luck_deck()
-                random.shuffle(self.luck_deck)
             card = self.luck_deck.pop()
+            if self._tracer is not None:
+                self._tracer.draw(card)
             self._resolve_luck_card(card, player)
 
         elif space.space_type == BoardSpaceType.LOSE_EVERYTHING:
             player.ingredients.clear()
+            if self._tracer is not None:
+                self._traced_row[player.id + 1] = 0
 
     def _advance_turn(self):
         """
@@ -110,16 +139,69 @@ class GameState:
             self.game_over = True
             self.winner_id = player.id
 
+
+    # === Snapshot Methods ===
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Returns an immutable snapshot of the game (see 'engine/snapshot.py'). The rng and
+        the controllers are not part of it.
+        """
+
+        deck = self.luck_deck.snapshot() if self.counting_deck else tuple(self.luck_deck)
+        return GameSnapshot(self.pawn_position, self.current_player_index,
+                            tuple(mask_of(p.ingredients) for p in self.players), deck, self.game_over, self.winner_id)
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """
+        Puts the game back into the state of 'snapshot'.
+        """
+
+        self.pawn_position = snapshot.pawn_position
+        self.current_player_index = snapshot.current_player
+        for player, mask in zip(self.players, snapshot.masks):
+            player.ingredients = ingredients_of(mask)
+        if self.counting_deck:
+            self.luck_deck.restore(deck_counts(snapshot.deck))
+        else:
+            self.luck_deck = deck_cards(snapshot.deck, self.rng, self.rules.composition)
+
+        self.game_over = snapshot.game_over
+        self.winner_id = snapshot.winner_id
+        if self._tracer is not None:
+            self._traced_row[1:] = snapshot.masks
+
+    # === Tracing ===
+
+    @property
+    def tracer(self):
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer) -> None:
+        """
+        Hooks 'tracer' (or unhooks with None). The row it gets after each turn is kept in
+        place: every change to an inventory also updates its mask there.
+        """
+
+        self._tracer = tracer
+        if tracer is not None:
+            self._traced_row[1:] = [mask_of(player.ingredients) for player in self.players]
+
     # === Luck Deck Methods ===
     
-    def _build_luck_deck(self) -> List[LuckCard]:
+    def _build_luck_deck(self) -> Union[List[LuckCard], CountingLuckDeck]:
         """
-        Create and returns the deck list built based on the definitons in 'engine/components.py'.
+        Create and returns the deck list of the game's rules ('LUCK_DECK_COMPOSITION' unless
+        a variant changes it), shuffled with the game's 'rng'. With 'counting_deck' it
+        returns a full 'CountingLuckDeck'.
         """
 
-        deck = []
-        for card in LUCK_DECK_COMPOSITION:
-            deck.extend([card] * card.count)
+        if self.counting_deck:
+            return CountingLuckDeck(self.rules.composition, rng=self.rng)
+
+        deck = list(self.rules.deck_cards)
+        self.rng.shuffle(deck)
         return deck
     
     def _resolve_luck_card(self, card: LuckCard, player: PlayerState):
@@ -141,6 +223,8 @@ class GameState:
             self._lose_ingredients(player, 2)
         elif card.card_type == LuckCardType.LOSE_ALL:
             player.ingredients.clear()
+            if self._tracer is not None:
+                self._traced_row[player.id + 1] = 0
 
     # === Ingredient Helpers ===
 
@@ -169,6 +253,8 @@ class GameState:
             if chosen:
                 player.ingredients.add(chosen)
                 needed.discard(chosen)
+                if self._tracer is not None:
+                    self._traced_row[player.id + 1] |= VALUE_BIT[chosen._value_]
 
     def _steal_ingredients(self, thief: PlayerState, amount: int):
         """
@@ -199,6 +285,9 @@ class GameState:
             if stolen in victim.ingredients:
                 victim.ingredients.remove(stolen)
                 thief.ingredients.add(stolen)
+                if self._tracer is not None:
+                    self._traced_row[victim.id + 1] &= ~VALUE_BIT[stolen._value_]
+                    self._traced_row[thief.id + 1] |= VALUE_BIT[stolen._value_]
 
     def _lose_ingredients(self, player: PlayerState, amount: int):
         """
@@ -210,3 +299,5 @@ class GameState:
         for ing in to_remove:
             if ing in player.ingredients:
                 player.ingredients.remove(ing)
+                if self._tracer is not None:
+                    self._traced_row[player.id + 1] &= ~VALUE_BIT[ing._value_]
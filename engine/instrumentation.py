@@ -0,0 +1,253 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import time
+
+from .components import BoardSpaceType
+from .bitmask import POPCOUNT
+from .fast_game import FastGameState
+from .policy import PlayerController
+from .simulation import SimulationConfig, build_game
+
+"""
+Opt-in instrumentation of a game: what happens on the board and where the time goes.
+
+Nothing in the engines knows about it. 'Instrumentation.attach(game)' shadows the game's
+resolution methods and controllers with counting, timing wrappers on that one instance,
+so games that are not instrumented run exactly the code they always did.
+
+Timings are inclusive: a 'resolve_space.GOOD_OR_BAD_LUCK' call includes the luck card it
+resolves, which includes the controller callbacks it makes.
+"""
+
+_CALLBACKS = ("choose_ingredient", "choose_opponent", "choose_ingredients_to_lose")
+
+# =====================
+#  Counters
+# =====================
+
+class Instrumentation:
+    """
+    Counters and timings of one or more instrumented games. Plain data, so it pickles
+    across processes, and 'merge' adds another process's counters in.
+    """
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.spaces: Counter = Counter()                # BoardSpaceType name -> landings
+        self.luck_cards: Counter = Counter()            # LuckCardType name -> cards resolved
+        self.steals_succeeded = 0                       # Per Ingredient a steal card allowed
+        self.steals_failed = 0
+        self.wasted_landings = 0                        # Ingredient spaces whose Ingredient was already held
+        self.timings: Dict[str, List[float]] = {}       # Name -> [calls, total seconds]
+
+    # === Recording ===
+
+    def _timed(self, name: str, function):
+        timing = self.timings.setdefault(name, [0, 0.0])
+        clock = time.perf_counter
+
+        def timed(*args):
+            started = clock()
+            try:
+                return function(*args)
+            finally:
+                timing[0] += 1
+                timing[1] += clock() - started
+        return timed
+
+    def attach(self, game):
+        """
+        Instruments 'game' (a 'GameState' or 'FastGameState') in place and returns it.
+        """
+
+        self.games += 1
+        game.controllers = [_TimedController(controller, self) for controller in game.controllers]
+        if isinstance(game, FastGameState):
+            self._attach_fast(game)
+        else:
+            self._attach_game(game)
+        return game
+
+    def _attach_game(self, game) -> None:
+        resolvers = {space_type: self._timed(f"resolve_space.{space_type.name}", game._resolve_space)
+                     for space_type in BoardSpaceType}
+
+        def resolve_space(space, player):
+            self.spaces[space.space_type.name] += 1
+            if space.space_type == BoardSpaceType.INGREDIENT and space.ingredient in player.ingredients:
+                self.wasted_landings += 1
+            return resolvers[space.space_type](space, player)
+
+        resolve_card = game._resolve_luck_card
+        card_timers = {}
+
+        def resolve_luck_card(card, player):
+            name = card.card_type.name
+            self.luck_cards[name] += 1
+            timer = card_timers.get(name)
+            if timer is None:
+                timer = card_timers[name] = self._timed(f"resolve_luck_card.{name}", resolve_card)
+            return timer(card, player)
+
+        steal = self._timed("steal_ingredients", game._steal_ingredients)
+
+        def steal_ingredients(thief, amount):
+            held = len(thief.ingredients)
+            steal(thief, amount)
+            self._count_steal(len(thief.ingredients) - held, amount)
+
+        game._resolve_space = resolve_space
+        game._resolve_luck_card = resolve_luck_card
+        game._steal_ingredients = steal_ingredients
+        game._gain_ingredients = self._timed("gain_ingredients", game._gain_ingredients)
+        game._lose_ingredients = self._timed("lose_ingredients", game._lose_ingredients)
+
+    def _attach_fast(self, game: FastGameState) -> None:
+        kinds = (None,) + tuple(space.space_type for space in game.rules.board)       # The game's own board
+        bits = game.rules.board_bit
+        resolvers = {space_type: self._timed(f"resolve_space.{space_type.name}", game._resolve_space)
+                     for space_type in BoardSpaceType}
+
+        def resolve_space(position, pid):
+            kind = kinds[position]
+            self.spaces[kind.name] += 1
+            if game.masks[pid] & bits[position]:
+                self.wasted_landings += 1
+            return resolvers[kind](position, pid)
+
+        steal = self._timed("steal_ingredients", game._steal_ingredients)
+
+        def steal_ingredients(thief, amount):
+            held = POPCOUNT[game.masks[thief]]
+            steal(thief, amount)
+            self._count_steal(POPCOUNT[game.masks[thief]] - held, amount)
+
+        # The luck handlers were bound at construction, so the card branches go through them
+        game._steal_ingredients = steal_ingredients
+        game._gain_ingredients = self._timed("gain_ingredients", game._gain_ingredients)
+        game._lose_ingredients = self._timed("lose_ingredients", game._lose_ingredients)
+        game._resolve_space = resolve_space
+        game._luck_handlers = {card_type: self._counted_card(card_type.name, handler)
+                               for card_type, handler in game._luck_handlers.items()}
+
+    def _counted_card(self, name: str, handler):
+        timed = self._timed(f"resolve_luck_card.{name}", handler)
+
+        def resolve(pid):
+            self.luck_cards[name] += 1
+            return timed(pid)
+        return resolve
+
+    def _count_steal(self, stolen: int, amount: int) -> None:
+        self.steals_succeeded += stolen
+        self.steals_failed += amount - stolen
+
+    # === Aggregation ===
+
+    def merge(self, other: "Instrumentation") -> "Instrumentation":
+        self.games += other.games
+        self.spaces.update(other.spaces)
+        self.luck_cards.update(other.luck_cards)
+        self.steals_succeeded += other.steals_succeeded
+        self.steals_failed += other.steals_failed
+        self.wasted_landings += other.wasted_landings
+        for name, (calls, seconds) in other.timings.items():
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += calls
+            timing[1] += seconds
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Structured, JSON-ready report. Timings are sorted by total time, slowest first.
+        """
+
+        timings = sorted(self.timings.items(), key=lambda item: -item[1][1])
+        return {
+            "games": self.games,
+            "turns": sum(self.spaces.values()),
+            "spaces": dict(self.spaces),
+            "luck_cards": dict(self.luck_cards),
+            "steals": {"succeeded": self.steals_succeeded, "failed": self.steals_failed},
+            "wasted_landings": self.wasted_landings,
+            "timings": {
+                name: {"calls": calls, "total_ms": seconds * 1e3, "mean_us": seconds / calls * 1e6}
+                for name, (calls, seconds) in timings if calls
+            },
+        }
+
+    def format(self) -> str:
+        report = self.to_dict()
+        turns = max(report["turns"], 1)
+        lines = [f"Games: {report['games']}  |  Turns: {report['turns']}"]
+
+        lines.append("\nSpaces landed on:")
+        for name, count in sorted(report["spaces"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<18} {count:>10}  ({count / turns:.1%})")
+        lines.append(f"  Wasted Ingredient landings: {report['wasted_landings']}")
+
+        lines.append("\nLuck cards resolved:")
+        for name, count in sorted(report["luck_cards"].items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<18} {count:>10}")
+        steals = report["steals"]
+        lines.append(f"  Steals: {steals['succeeded']} succeeded, {steals['failed']} failed")
+
+        lines.append(f"\n{'Timing (inclusive)':<52} {'calls':>10} {'total ms':>10} {'mean us':>10}")
+        for name, timing in report["timings"].items():
+            lines.append(f"  {name:<50} {timing['calls']:>10} {timing['total_ms']:>10.1f} {timing['mean_us']:>10.2f}")
+        return "\n".join(lines)
+
+class _TimedController(PlayerController):
+    """
+    Times the callbacks of the wrapped controller under '<ClassName>.<callback>'.
+    Anything else (its rng, 'bind', policy state) is passed through.
+    """
+
+    def __init__(self, controller: PlayerController, instrumentation: Instrumentation) -> None:
+        self.controller = controller
+        name = type(controller).__name__
+        for callback in _CALLBACKS:
+            setattr(self, callback, instrumentation._timed(f"{name}.{callback}", getattr(controller, callback)))
+
+    def __getattr__(self, name: str):
+        return getattr(self.controller, name)
+
+# =====================
+#  Instrumented Runs
+# =====================
+
+def instrument_chunk(config: SimulationConfig, start: int, stop: int, max_turns: int = 100_000) -> Instrumentation:
+    """
+    Plays games 'start' to 'stop' of the run described by 'config' instrumented, and
+    returns their combined counters.
+    """
+
+    instrumentation = Instrumentation()
+    for game_index in range(start, stop):
+        game = instrumentation.attach(build_game(config, game_index))
+        for _ in range(max_turns):
+            if game.game_over:
+                break
+            game.step()
+    return instrumentation
+
+def instrument_run(config: SimulationConfig, num_games: int, workers: int = 1, chunk_size: int = 500) -> Instrumentation:
+    """
+    'instrument_chunk' over a pool of 'workers' processes; each chunk comes back as one small
+    'Instrumentation' and is merged into the total.
+    """
+
+    chunks = [(start, min(start + chunk_size, num_games)) for start in range(0, num_games, chunk_size)]
+    total = Instrumentation()
+    if workers <= 1:
+        for start, stop in chunks:
+            total.merge(instrument_chunk(config, start, stop))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(instrument_chunk, config, start, stop) for start, stop in chunks]
+        for future in futures:
+            total.merge(future.result())
+    return total
@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .components import Ingredient, BoardSpace, BoardSpaceType, BOARD_LAYOUT
+from .bitmask import INGREDIENTS
+from .rules import RuleSet, compile_rules
+
+# =====================
+#  Landing Distributions
+# =====================
+
+# Everything about where the shared pawn goes next only depends on the die and the board,
+# so it is computed once per rule set: P^k[a, b] is the probability that k rolls take the
+# pawn from position a to position b (positions are 1 to the board size, arrays are
+# indexed by position - 1).
+
+DIE_SIDES = 6
+
+# --- Space Categories (last axis of the category tables) ---
+
+NUM_INGREDIENT_CATEGORIES = len(INGREDIENTS)        # One per Ingredient, in canonical order
+INGREDIENT_CATEGORY: Dict[Ingredient, int] = {ing: i for i, ing in enumerate(INGREDIENTS)}
+CHEF = NUM_INGREDIENT_CATEGORIES
+LUCK = CHEF + 1
+LOSE_EVERYTHING = LUCK + 1
+NUM_CATEGORIES = LOSE_EVERYTHING + 1
+
+def transition_matrix(board: Sequence[BoardSpace] = BOARD_LAYOUT, die_sides: int = DIE_SIDES) -> np.ndarray:
+    """
+    One-roll transition matrix of the pawn.
+    """
+
+    size = len(board)
+    matrix = np.zeros((size, size))
+    for start in range(size):
+        for roll in range(1, die_sides + 1):
+            matrix[start, (start + roll) % size] += 1 / die_sides
+    return matrix
+
+def category_matrix(board: Sequence[BoardSpace] = BOARD_LAYOUT) -> np.ndarray:
+    """
+    (board size, NUM_CATEGORIES) one-hot category of every space.
+    """
+
+    categories = np.zeros((len(board), NUM_CATEGORIES))
+    for i, space in enumerate(board):
+        if space.space_type == BoardSpaceType.INGREDIENT:
+            categories[i, INGREDIENT_CATEGORY[space.ingredient]] = 1
+        elif space.space_type == BoardSpaceType.CHEF:
+            categories[i, CHEF] = 1
+        elif space.space_type == BoardSpaceType.GOOD_OR_BAD_LUCK:
+            categories[i, LUCK] = 1
+        else:
+            categories[i, LOSE_EVERYTHING] = 1
+    return categories
+
+def landing_tables(horizon: int, board: Sequence[BoardSpace] = BOARD_LAYOUT,
+                   die_sides: int = DIE_SIDES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (landing, hits): landing[k, a, b] is the probability of being on space b after
+    exactly k rolls from space a, and hits[k, a, c] the probability that the k-th roll
+    lands on a space of category c. Index k = 0 is the starting position itself.
+    """
+
+    step = transition_matrix(board, die_sides)
+    landing = np.empty((horizon + 1, len(board), len(board)))
+    landing[0] = np.eye(len(board))
+    for k in range(1, horizon + 1):
+        landing[k] = landing[k - 1] @ step
+    return landing, landing @ category_matrix(board)
+
+@lru_cache(maxsize=None)
+def own_turn_hits(num_players: int, turns: int = 3,
+                  rules: Optional[RuleSet] = None) -> Tuple[Tuple[Tuple[float, ...], ...], ...]:
+    """
+    Expected number of landings on each category during the next 'turns' turns of the
+    player who just moved, indexed [position][category] with the positions of the board of
+    'rules' (the standard rules by default; index 0 unused). With a shared pawn that player
+    rolls again every 'num_players' rolls.
+
+    Returned as nested tuples so policies look values up without NumPy scalar overhead.
+    """
+
+    compiled = compile_rules(rules)
+    _, hits = landing_tables(num_players * turns, compiled.board, compiled.die_sides)
+    own = hits[num_players::num_players].sum(axis=0)
+    return (tuple(0.0 for _ in range(NUM_CATEGORIES)),) + tuple(tuple(row) for row in own.tolist())
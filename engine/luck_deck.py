@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import random
+
+from .components import LuckCard, LuckCardType, LUCK_DECK_COMPOSITION
+
+# =====================
+#  Counting Luck Deck
+# =====================
+
+class CountingLuckDeck:
+    """
+    Luck deck kept as the remaining count of each card type instead of a shuffled list.
+
+    Drawing a uniformly random remaining card (weighted by the counts) gives the same
+    sequence distribution as popping from a shuffled list, and an empty deck is refilled
+    on the next draw, like 'GameState' reshuffles a fresh deck. The whole deck state is
+    the tuple of counts, so it snapshots, clones and hashes for almost nothing.
+
+    It quacks like the list deck where 'GameState' uses it: 'len()', truthiness and 'pop()'.
+    """
+
+    __slots__ = ("cards", "counts", "total", "rng")
+
+    def __init__(self, composition: Sequence[LuckCard] = LUCK_DECK_COMPOSITION,
+                rng: Optional[random.Random] = None,
+                counts: Optional[Sequence[int]] = None) -> None:
+
+        self.cards: Tuple[LuckCard, ...] = tuple(composition)
+        self.counts: List[int] = list(counts) if counts is not None else [card.count for card in self.cards]
+        self.total = sum(self.counts)
+        self.rng = rng if rng is not None else random.Random()
+
+    def __len__(self) -> int:
+        return self.total
+
+    # === Drawing ===
+
+    def draw(self) -> LuckCard:
+        """
+        Draws one card, refilling the deck first if it ran out.
+        """
+
+        if not self.total:
+            self.reset()
+
+        r = int(self.rng.random() * self.total)
+        counts = self.counts
+        for code, count in enumerate(counts):
+            if r < count:
+                counts[code] -= 1
+                self.total -= 1
+                return self.cards[code]
+            r -= count
+        raise AssertionError("Deck counts out of sync")
+
+    pop = draw
+
+    def reset(self) -> None:
+        """
+        Puts every card back (the reshuffle).
+        """
+
+        self.counts = [card.count for card in self.cards]
+        self.total = sum(self.counts)
+
+    # === Inspection ===
+
+    def probabilities(self) -> Dict[LuckCardType, float]:
+        """
+        Exact probability of each card type being the next one drawn.
+        """
+
+        counts = self.counts if self.total else [card.count for card in self.cards]
+        total = sum(counts)
+        return {card.card_type: count / total for card, count in zip(self.cards, counts)}
+
+    # === Snapshots ===
+
+    def snapshot(self) -> Tuple[int, ...]:
+        return tuple(self.counts)
+
+    def restore(self, snapshot: Tuple[int, ...]) -> None:
+        self.counts = list(snapshot)
+        self.total = sum(snapshot)
+
+    def copy(self, rng: Optional[random.Random] = None) -> "CountingLuckDeck":
+        return CountingLuckDeck(self.cards, rng if rng is not None else self.rng, self.counts)
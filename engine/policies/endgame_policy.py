@@ -0,0 +1,110 @@
+import random
+from itertools import combinations
+from typing import List, Optional, Set, Tuple
+
+from ..policy import PlayerController
+from ..components import Ingredient
+from ..bitmask import INGREDIENT_BIT, MASK_INGREDIENTS, recipe_mask
+from ..player import PlayerState
+from ..tablebase import Tablebase
+from .random_policy import RandomPolicy
+
+"""
+Plays out of an endgame tablebase ('engine/tablebase.py') once the game is in its region.
+
+While some player still misses more than the tablebase threshold, every decision goes to
+the 'fallback' controller. Inside the region, each candidate choice is turned into its
+afterstate (the inventories right after the choice, with the turn handed to the next
+player) and the choice whose afterstate the tablebase rates best for the mover wins.
+As in 'MCTSPolicy', the rest of the current card after a choice (the second pick of
+GAIN_2/STEAL_2/LOSE_2) is left to the next decision, which looks it up again.
+"""
+
+class EndgamePolicy(PlayerController):
+    def __init__(self, tablebase: Tablebase, rng: Optional[random.Random] = None,
+                fallback: Optional[PlayerController] = None) -> None:
+
+        self.tablebase = tablebase
+        self.fallback = fallback if fallback is not None else RandomPolicy(rng)
+        self._pending_steal: Optional[Tuple[int, Tuple]] = None
+
+    def bind(self, game) -> None:
+        recipes = tuple(recipe_mask(player.recipes) for player in game.players)
+        if recipes != self.tablebase.index.recipes:
+            raise ValueError("The tablebase was generated for another draft")
+        self.game = game
+        self.fallback.bind(game)
+
+    # === Controller Callbacks ===
+
+    def choose_ingredient(self, needed: Set[Ingredient], player: PlayerState) -> Optional[Ingredient]:
+        root = self._root()
+        victim = None
+        if self._pending_steal and self._pending_steal[1] == root:
+            victim = self._pending_steal[0]
+        self._pending_steal = None
+        if not needed or not self.tablebase.index.contains(root[1]):
+            return self.fallback.choose_ingredient(needed, player)
+
+        pos, masks = root
+        actions = []
+        for ingredient in sorted(needed, key=lambda i: i.value):
+            bit = INGREDIENT_BIT[ingredient]
+            after = list(masks)
+            after[player.id] |= bit
+            if victim is not None:
+                after[victim] &= ~bit
+            actions.append((ingredient, tuple(after)))
+        return self._best(pos, player.id, actions)
+
+    def choose_opponent(self, player: PlayerState, opponents: List[PlayerState]) -> Optional[PlayerState]:
+        root = self._root()
+        if not opponents or not self.tablebase.index.contains(root[1]):
+            return self.fallback.choose_opponent(player, opponents)
+
+        pos, masks = root
+        recipe = self.tablebase.index.recipes[player.id]
+        # An opponent is worth the best Ingredient the next decision can take from them
+        actions = []
+        for opponent in opponents:
+            for ingredient in MASK_INGREDIENTS[recipe & masks[opponent.id]] or (None,):
+                after = list(masks)
+                if ingredient is not None:
+                    bit = INGREDIENT_BIT[ingredient]
+                    after[opponent.id] &= ~bit
+                    after[player.id] |= bit
+                actions.append((opponent, tuple(after)))
+
+        victim = self._best(pos, player.id, actions)
+        self._pending_steal = (victim.id, root)
+        return victim
+
+    def choose_ingredients_to_lose(self, player: PlayerState, amount: int) -> List[Ingredient]:
+        root = self._root()
+        held = sorted(player.ingredients, key=lambda i: i.value)
+        if not held or not self.tablebase.index.contains(root[1]):
+            return self.fallback.choose_ingredients_to_lose(player, amount)
+
+        pos, masks = root
+        actions = []
+        for lost in combinations(held, min(amount, len(held))):
+            after = list(masks)
+            for ingredient in lost:
+                after[player.id] &= ~INGREDIENT_BIT[ingredient]
+            actions.append((list(lost), tuple(after)))
+        return self._best(pos, player.id, actions)
+
+    # === Lookups ===
+
+    def _root(self) -> Tuple[int, Tuple[int, ...]]:
+        snapshot = self.game.snapshot()
+        return snapshot.pawn_position, snapshot.masks
+
+    def _best(self, pos: int, mover: int, actions: List[Tuple[object, Tuple[int, ...]]]):
+        # Ties keep the first candidate, so the choice is deterministic
+        best, best_value = None, -1.0
+        for action, after in actions:
+            value = float(self.tablebase.afterstate_value(pos, mover, after)[mover])
+            if value > best_value:
+                best, best_value = action, value
+        return best
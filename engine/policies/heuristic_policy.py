@@ -0,0 +1,53 @@
+import random
+from typing import Set, List, Optional
+
+from ..policy import PlayerController
+from ..components import Ingredient
+from ..bitmask import POPCOUNT, mask_of, recipe_mask
+from ..landing import INGREDIENT_CATEGORY, own_turn_hits
+from ..player import PlayerState
+
+"""
+Greedy policy driven by the precomputed landing tables in 'engine/landing.py'.
+
+Every decision is a handful of table lookups at the current pawn position:
+- Ingredient picks take a missing Ingredient first, the one the player is least likely to
+  land on during their next turns.
+- Steals target the opponent holding the most Ingredients the thief is missing, then the
+  opponent closest to completing their recipes.
+- Losses give up the held Ingredients the player is most likely to land on again.
+"""
+
+class HeuristicPolicy(PlayerController):
+    def __init__(self, rng: Optional[random.Random] = None, turns: int = 3) -> None:
+        self.rng = rng if rng is not None else random.Random()     # Unused, kept for the factory signature
+        self.turns = turns
+
+    def bind(self, game) -> None:
+        self.game = game
+        self.hits = own_turn_hits(len(game.players), self.turns, game.rules.rules)     # Cached per RuleSet
+        self.recipe_masks = [recipe_mask(player.recipes) for player in game.players]
+
+    def choose_ingredient(self, needed: Set[Ingredient], player: PlayerState) -> Optional[Ingredient]:
+        if not needed:
+            return None
+        hits = self.hits[self.game.pawn_position]
+        held = player.ingredients
+        return min(needed, key=lambda i: (i in held, hits[INGREDIENT_CATEGORY[i]], i.value))
+
+    def choose_opponent(self, player: PlayerState, opponents: List[PlayerState]) -> Optional[PlayerState]:
+        if not opponents:
+            return None
+        missing = self.recipe_masks[player.id] & ~mask_of(player.ingredients)
+
+        def score(opponent: PlayerState):
+            held = mask_of(opponent.ingredients)
+            still_missing = self.recipe_masks[opponent.id] & ~held
+            return (-POPCOUNT[missing & held], POPCOUNT[still_missing], opponent.id)
+
+        return min(opponents, key=score)
+
+    def choose_ingredients_to_lose(self, player: PlayerState, amount: int) -> List[Ingredient]:
+        hits = self.hits[self.game.pawn_position]
+        ranked = sorted(player.ingredients, key=lambda i: (-hits[INGREDIENT_CATEGORY[i]], i.value))
+        return ranked[:amount]
@@ -0,0 +1,276 @@
+import math
+import random
+import time
+from collections import OrderedDict
+from itertools import combinations
+from typing import List, Optional, Set, Tuple
+
+from ..policy import PlayerController
+from ..components import Ingredient, BoardSpaceType
+from ..bitmask import INGREDIENT_BIT, MASK_INGREDIENTS
+from ..fast_game import FastGameState
+from ..player import PlayerState
+from ..snapshot import GameSnapshot, deck_counts
+from ..solver import MarkovSolver
+from .random_policy import RandomPolicy
+
+"""
+Monte Carlo Tree Search over turn-start states.
+
+Every decision is turned into its candidate afterstates (the inventories right after the
+choice, with the turn handed to the next player). Each search iteration picks a candidate
+by UCB, then walks down the tree: chance nodes sample the die and, on luck spaces, the
+next card from the remaining deck counts; the mover then picks among the distinct
+afterstates of that outcome by UCB on their own win rate. New nodes are valued by a
+random rollout on a 'FastGameState' restored from a snapshot.
+
+Nodes live in a transposition table keyed by the canonical state key (pawn, turn, masks,
+deck counts), shared across paths and decisions, with least-recently-used eviction once
+'max_nodes' is reached. Remaining effects of the current card after a choice (the second
+pick of GAIN_2/STEAL_2/LOSE_2) are left to the next decision, which searches again.
+"""
+
+_WIN = -1                                               # Marks terminal keys: (_WIN, winner)
+
+class _Node:
+    __slots__ = ("visits", "wins")
+
+    def __init__(self, num_players: int) -> None:
+        self.visits = 0
+        self.wins = [0.0] * num_players
+
+class MCTSPolicy(PlayerController):
+    def __init__(self, rng: Optional[random.Random] = None,
+                max_rollouts: int = 200,
+                max_seconds: float = 0.05,
+                exploration: float = 1.4,
+                max_nodes: int = 100_000,
+                max_depth: int = 40,
+                rollout_turns: int = 300) -> None:
+
+        self.rng = rng if rng is not None else random.Random()
+        self.max_rollouts = max_rollouts
+        self.max_seconds = max_seconds
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.rollout_turns = rollout_turns
+
+        self.table: "OrderedDict[Tuple, _Node]" = OrderedDict()
+        self._pending_steal: Optional[Tuple[int, Tuple]] = None
+
+    def bind(self, game) -> None:
+        self.game = game
+        recipes = [player.recipes for player in game.players]
+        self.num_players = len(recipes)
+        rules = game.rules                              # Board, deck and die of the game's variant
+        self._rules = MarkovSolver(recipes, board=rules.board, deck=rules.composition, die_sides=rules.die_sides)
+        self._rollout = FastGameState(self.num_players, recipes,
+                                      [RandomPolicy(self.rng) for _ in recipes],
+                                      starting_pos=1, rng=self.rng, counting_deck=True, rules=rules.rules)
+        self.table.clear()
+
+    # === Controller Callbacks ===
+
+    def choose_ingredient(self, needed: Set[Ingredient], player: PlayerState) -> Optional[Ingredient]:
+        if not needed:
+            return None
+        pos, cur, masks, deck = self._root()
+
+        victim = None
+        if self._pending_steal and self._pending_steal[1] == (pos, cur, masks, deck):
+            victim = self._pending_steal[0]
+        self._pending_steal = None
+
+        actions = []
+        for ingredient in sorted(needed, key=lambda i: i.value):
+            bit = INGREDIENT_BIT[ingredient]
+            after = list(masks)
+            after[player.id] |= bit
+            if victim is not None:
+                after[victim] &= ~bit
+            actions.append((ingredient, tuple(after)))
+        return self._search(player.id, actions)
+
+    def choose_opponent(self, player: PlayerState, opponents: List[PlayerState]) -> Optional[PlayerState]:
+        if not opponents:
+            return None
+        root = self._root()
+        masks = root[2]
+        recipe = self._rules.recipes[player.id]
+
+        actions = []
+        for opponent in opponents:
+            stealable = recipe & masks[opponent.id]
+            for ingredient in MASK_INGREDIENTS[stealable] or (None,):
+                after = list(masks)
+                if ingredient is not None:
+                    bit = INGREDIENT_BIT[ingredient]
+                    after[opponent.id] &= ~bit
+                    after[player.id] |= bit
+                actions.append((opponent, tuple(after)))
+
+        victim = self._search(player.id, actions)
+        self._pending_steal = (victim.id, root)
+        return victim
+
+    def choose_ingredients_to_lose(self, player: PlayerState, amount: int) -> List[Ingredient]:
+        held = sorted(player.ingredients, key=lambda i: i.value)
+        if not held:
+            return []
+        masks = self._root()[2]
+        actions = []
+        for lost in combinations(held, min(amount, len(held))):
+            after = list(masks)
+            for ingredient in lost:
+                after[player.id] &= ~INGREDIENT_BIT[ingredient]
+            actions.append((list(lost), tuple(after)))
+        return self._search(player.id, actions)
+
+    # === Search ===
+
+    def _root(self) -> Tuple:
+        snapshot: GameSnapshot = self.game.snapshot()
+        return (snapshot.pawn_position, snapshot.current_player, snapshot.masks, deck_counts(snapshot.deck))
+
+    def _after_key(self, pos: int, mover: int, masks: Tuple[int, ...], deck: Tuple[int, ...]) -> Tuple:
+        """
+        Key of the turn-start state once 'mover' is done with 'masks' (or of its win).
+        """
+
+        if not self._rules.recipes[mover] & ~masks[mover]:
+            return (_WIN, mover)
+        return (pos, (mover + 1) % self.num_players, masks, deck if any(deck) else self._rules.full_deck)
+
+    def _search(self, mover: int, actions: List[Tuple[object, Tuple[int, ...]]]):
+        """
+        Runs the search from the candidate afterstates and returns the most visited action.
+        """
+
+        pos, _, _, deck = self._root()
+        keys = [self._after_key(pos, mover, masks, deck) for _, masks in actions]
+        if len(set(keys)) == 1:
+            return actions[0][0]
+
+        visits = [0] * len(keys)
+        wins = [0.0] * len(keys)
+        deadline = time.perf_counter() + self.max_seconds
+
+        for iteration in range(1, self.max_rollouts + 1):
+            child = self._select(visits, wins, iteration)
+            value = self._simulate(keys[child])
+            visits[child] += 1
+            wins[child] += value[mover]
+            if time.perf_counter() > deadline:
+                break
+
+        best = max(range(len(keys)), key=lambda c: (visits[c], wins[c]))
+        return actions[best][0]
+
+    def _select(self, visits: List[int], wins: List[float], total: int) -> int:
+        """
+        UCB1 over children, unvisited children first.
+        """
+
+        log_total = math.log(total)
+        best, best_score = 0, -math.inf
+        for c, n in enumerate(visits):
+            if not n:
+                return c
+            score = wins[c] / n + self.exploration * math.sqrt(log_total / n)
+            if score > best_score:
+                best, best_score = c, score
+        return best
+
+    def _simulate(self, key: Tuple) -> List[float]:
+        """
+        One iteration below a turn-start state: descend through known nodes sampling the
+        chance outcomes, expand the first unknown node, roll out, back up the result.
+        """
+
+        path = []
+        value = None
+        for _ in range(self.max_depth):
+            if key[0] == _WIN:
+                value = self._terminal(key[1])
+                break
+
+            node = self.table.get(key)
+            if node is None:
+                node = self._insert(key)
+                path.append(node)
+                value = self._rollout_value(key)
+                break
+
+            self.table.move_to_end(key)
+            path.append(node)
+            key = self._descend(key)
+
+        if value is None:
+            value = self._rollout_value(key) if key[0] != _WIN else self._terminal(key[1])
+
+        for node in path:
+            node.visits += 1
+            for pid in range(self.num_players):
+                node.wins[pid] += value[pid]
+        return value
+
+    def _descend(self, key: Tuple) -> Tuple:
+        """
+        Samples the die and luck card of the turn at 'key' and picks the mover's afterstate.
+        """
+
+        pos, cur, masks, deck = key
+        new_pos = (pos + self.rng.randint(1, self._rules.die_sides) - 1) % len(self._rules.board) + 1
+
+        card_type = None
+        if self._rules.board[new_pos - 1].space_type == BoardSpaceType.GOOD_OR_BAD_LUCK:
+            r = int(self.rng.random() * sum(deck))
+            for code, count in enumerate(deck):
+                if r < count:
+                    break
+                r -= count
+            card_type = self._rules.card_types[code]
+            deck = deck[:code] + (deck[code] - 1,) + deck[code + 1:]
+
+        outcomes = {m for m, _ in self._rules.space_outcomes(new_pos, cur, masks, card_type)}
+        children = [self._after_key(new_pos, cur, m, deck) for m in outcomes]
+        if len(children) == 1:
+            return children[0]
+
+        for child in children:
+            if child[0] == _WIN:
+                return child                        # Only the mover can win now, and always wants to
+
+        stats = [self.table.get(child) for child in children]
+        visits = [0 if s is None else s.visits for s in stats]
+        wins = [0.0 if s is None else s.wins[cur] for s in stats]
+        return children[self._select(visits, wins, sum(visits) + 1)]
+
+    # === Table & Rollouts ===
+
+    def _insert(self, key: Tuple) -> _Node:
+        node = self.table[key] = _Node(self.num_players)
+        if len(self.table) > self.max_nodes:
+            self.table.popitem(last=False)
+        return node
+
+    def _terminal(self, winner: int) -> List[float]:
+        value = [0.0] * self.num_players
+        value[winner] = 1.0
+        return value
+
+    def _rollout_value(self, key: Tuple) -> List[float]:
+        """
+        Plays random moves from 'key' and returns the winner as a one-hot vector
+        (an even split if the rollout hits 'rollout_turns').
+        """
+
+        pos, cur, masks, deck = key
+        game = self._rollout
+        game.restore(GameSnapshot(pos, cur, masks, deck, False, -1))
+        for _ in range(self.rollout_turns):
+            game.step()
+            if game.game_over:
+                return self._terminal(game.winner_id)
+        return [1.0 / self.num_players] * self.num_players
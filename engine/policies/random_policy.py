@@ -1,20 +1,44 @@
 import random
-from typing import Set, List, Optional
+from typing import Iterable, Set, List, Optional, Tuple
 
 from ..policy import PlayerController
 from ..components import Ingredient
+from ..bitmask import INGREDIENTS, MASK_INGREDIENTS
 from ..player import PlayerState
 
 """
 This policy will override Player Controller and just make random choices.
+
+Candidates are always taken in the canonical Ingredient order instead of set iteration
+order, which depends on the process hash seed, so a seeded policy makes the same choices
+in every process. The ordered tuple is the precomputed one of the candidates' mask, so the
+hot path neither builds a collection nor hashes an Enum member (which runs Python code).
 """
 
+# 'auto()' numbers the Ingredients 1-10 in canonical order, so value v is bit v - 1
+assert all(ing._value_ == i + 1 for i, ing in enumerate(INGREDIENTS))
+
+def _ordered(candidates: Iterable[Ingredient]) -> Tuple[Ingredient, ...]:
+    mask = 0
+    for ing in candidates:
+        mask |= 1 << ing._value_
+    return MASK_INGREDIENTS[mask >> 1]
+
 class RandomPolicy(PlayerController):
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng if rng is not None else random.Random()
+
     def choose_ingredient(self, needed: Set[Ingredient], player: PlayerState) -> Optional[Ingredient]:
-        return random.choice(list(needed)) if needed else None
+        if not needed:
+            return None
+        candidates = _ordered(needed)
+        return candidates[int(self.rng.random() * len(candidates))]
 
     def choose_opponent(self, player: PlayerState, opponents: List[PlayerState]) -> Optional[PlayerState]:
-        return random.choice(opponents) if opponents else None
+        return opponents[int(self.rng.random() * len(opponents))] if opponents else None
 
     def choose_ingredients_to_lose(self, player: PlayerState, amount: int) -> List[Ingredient]:
-        return random.sample(list(player.ingredients), min(amount, len(player.ingredients)))
+        held = player.ingredients
+        if not held:
+            return []
+        return self.rng.sample(_ordered(held), min(amount, len(held)))
@@ -3,6 +3,13 @@ from .components import Ingredient
 from .player import PlayerState
 
 class PlayerController:
+    def bind(self, game) -> None:
+        """
+        Called by the game with itself when it is built. Search policies keep the reference
+        to read snapshots, the others just ignore it.
+        """
+        pass
+
     def choose_ingredient(self, needed: Set[Ingredient], player: PlayerState) -> Ingredient:
         raise NotImplementedError
 
@@ -0,0 +1,360 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import struct
+
+import numpy as np
+
+from .bitmask import mask_of
+from .rules import RuleSet, compile_rules
+from .simulation import SimulationConfig, build_game
+from .trace import MAX_PLAYERS
+
+"""
+Seekable replays: archived games stored as per-turn deltas with periodic full-state
+keyframes, so any turn of any game is rebuilt from the nearest keyframe before it in at
+most 'keyframe_interval' delta steps.
+
+A delta is what one 'step()' changed, taken from the games' tracer hook (see
+'engine/trace.py'): the pawn position, the luck card drawn and the XOR of every inventory
+that changed, so most turns cost 2 bytes. Deltas are variable-length, which is why they
+can't be indexed directly. A keyframe holds the complete state after its turn: pawn,
+player on the move, every inventory and the counts of the cards left in the deck (the
+order of a list deck is hidden information and is not stored).
+
+Everything lives in one file, read through a single memory map:
+
+    HEADER | the deltas of every game, game after game | KEYFRAME_DTYPE array
+           | GAME_DTYPE array | FOOTER (offsets and lengths of the two arrays)
+
+Keyframe k of a game is the state after turn k * keyframe_interval (keyframe 0 is the
+state the game was attached in) and its 'offset' points at the delta of the next turn.
+A delta is the position byte, a byte with the drawn card code + 1 in the low nibble and
+the number of changed inventories in the high one, then a CHANGE per changed inventory.
+"""
+
+MAGIC = b"PZRP"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHHH")               # magic, version, num players, keyframe interval, card types
+FOOTER = struct.Struct("<QQQQ")                 # keyframes offset and count, games offset and count
+CHANGE = struct.Struct("<BH")                   # Seat, XOR of its inventory
+
+MAX_CARD_TYPES = 8
+
+KEYFRAME_DTYPE = np.dtype([
+    ("turn", "<u4"),
+    ("offset", "<u8"),                          # File offset of the next turn's delta
+    ("position", "u1"),
+    ("player", "u1"),                           # Player on the move
+    ("masks", "<u2", (MAX_PLAYERS,)),
+    ("deck", "u1", (MAX_CARD_TYPES,)),          # Cards left of each type, in composition order
+])
+
+GAME_DTYPE = np.dtype([
+    ("game", "<u4"),
+    ("keyframe", "<u8"),                        # Index of the game's first keyframe
+    ("turns", "<u4"),
+    ("winner", "i1"),                           # -1 if the game was detached before it ended
+    ("full_deck", "u1", (MAX_CARD_TYPES,)),     # Counts of a fresh deck, for the reshuffles
+])
+
+class ReplayState(NamedTuple):
+    """
+    The state of a game after 'turn' turns (turn 0 is the state it was attached in).
+    """
+
+    game: int
+    turn: int
+    position: int
+    player: int                 # Player on the move next
+    mover: int                  # Player who moved this turn, -1 at turn 0
+    card: int                   # Card type drawn this turn (composition index), -1 if none
+    masks: Tuple[int, ...]
+    deck: Tuple[int, ...]
+    winner: int                 # The winner on the final turn of a won game, else -1
+
+# =====================
+#  Recording
+# =====================
+
+class ReplayTracer:
+    """
+    What a recorded game sees as 'game.tracer': like 'GameTracer' it only appends the raw
+    row of each turn, and it notes every drawn card with the row count it was drawn at.
+    """
+
+    __slots__ = ("game", "game_id", "rows", "draws", "record", "draw", "first_player",
+                 "first_position", "first_masks", "first_deck")
+
+    def __init__(self, game, game_id: int, card_codes: Dict, first_deck: Tuple[int, ...]) -> None:
+        self.game = game
+        self.game_id = game_id
+        self.rows: List[int] = []
+        self.draws: List[Tuple[int, int]] = []
+        rows, draws = self.rows, self.draws
+        self.record = rows.extend
+        self.draw = lambda card: draws.append((len(rows), card_codes[card.card_type]))
+        self.first_player = game.current_player_index
+        self.first_position = game.pawn_position
+        self.first_masks = tuple(game.masks) if hasattr(game, "masks") else \
+            tuple(mask_of(player.ingredients) for player in game.players)
+        self.first_deck = first_deck
+
+def encode_game(tracer: ReplayTracer, num_players: int, full_deck: Tuple[int, ...], interval: int,
+                offset: int) -> Tuple[bytes, List[tuple]]:
+    """
+    Encodes a recorded game into its deltas, to be written at file offset 'offset', and
+    its keyframes as KEYFRAME_DTYPE tuples.
+    """
+
+    rows = tracer.rows
+    width = 1 + num_players
+    masks = list(tracer.first_masks)
+    deck = list(tracer.first_deck)
+    pad_masks = (0,) * (MAX_PLAYERS - num_players)
+    pad_deck = (0,) * (MAX_CARD_TYPES - len(deck))
+    keyframes = [(0, offset, tracer.first_position, tracer.first_player,
+                  tuple(masks) + pad_masks, tuple(deck) + pad_deck)]
+
+    out = bytearray()
+    draws = iter(tracer.draws)
+    next_draw = next(draws, (-1, 0))
+    pack_change = CHANGE.pack
+    turn = 0
+    for at in range(0, len(rows), width):
+        turn += 1
+        changes = b""
+        changed = 0
+        for seat in range(num_players):
+            flip = masks[seat] ^ rows[at + 1 + seat]
+            if flip:
+                changes += pack_change(seat, flip)
+                changed += 1
+                masks[seat] ^= flip
+
+        card = 0
+        if next_draw[0] == at:
+            code = next_draw[1]
+            if not any(deck):
+                deck[:] = full_deck
+            deck[code] -= 1
+            card = code + 1
+            next_draw = next(draws, (-1, 0))
+
+        out.append(rows[at])
+        out.append(changed << 4 | card)
+        out += changes
+        if turn % interval == 0:
+            keyframes.append((turn, offset + len(out), rows[at], (tracer.first_player + turn) % num_players,
+                              tuple(masks) + pad_masks, tuple(deck) + pad_deck))
+    return bytes(out), keyframes
+
+class ReplayWriter:
+    """
+    Records games into a replay file. 'attach(game, game_id)' hooks a game so every 'step()'
+    is recorded; finished games are encoded and written out whole, game after game, and
+    'close()' writes the keyframe and game tables. 'rules' is the variant the games play
+    (the standard rules by default), whose deck the reshuffles refill.
+    """
+
+    def __init__(self, path: str, num_players: int, keyframe_interval: int = 32,
+                 rules: Optional[RuleSet] = None) -> None:
+        assert num_players <= MAX_PLAYERS
+        compiled = compile_rules(rules)
+        assert len(compiled.composition) <= MAX_CARD_TYPES
+        self.path = path
+        self.num_players = num_players
+        self.interval = keyframe_interval
+        self.full_deck = tuple(card.count for card in compiled.composition)
+        self.card_codes = {card.card_type: code for code, card in enumerate(compiled.composition)}
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, num_players, keyframe_interval, len(self.full_deck)))
+        self.offset = HEADER.size
+        self.keyframes: List[tuple] = []
+        self.games: List[tuple] = []
+        self.active: List[ReplayTracer] = []
+
+    def attach(self, game, game_id: int) -> ReplayTracer:
+        """
+        Starts recording 'game' (from its current state) under 'game_id'.
+        """
+
+        assert len(game.players) == self.num_players
+        self._collect()
+        tracer = ReplayTracer(game, game_id, self.card_codes, self._deck_counts(game.luck_deck))
+        game.tracer = tracer
+        self.active.append(tracer)
+        return tracer
+
+    def detach(self, game) -> None:
+        """
+        Stops recording 'game'; the turns recorded so far are kept.
+        """
+
+        tracer = game.tracer
+        self.active.remove(tracer)
+        self._write(tracer)
+
+    def _deck_counts(self, deck) -> Tuple[int, ...]:
+        if hasattr(deck, "snapshot"):
+            return deck.snapshot()
+        counts = [0] * len(self.full_deck)
+        for card in deck:
+            counts[self.card_codes[card.card_type]] += 1
+        return tuple(counts)
+
+    def _collect(self) -> None:
+        if any(tracer.game.game_over for tracer in self.active):
+            for tracer in [tracer for tracer in self.active if tracer.game.game_over]:
+                self.active.remove(tracer)
+                self._write(tracer)
+
+    def _write(self, tracer: ReplayTracer) -> None:
+        data, keyframes = encode_game(tracer, self.num_players, self.full_deck, self.interval, self.offset)
+        self.file.write(data)
+        self.offset += len(data)
+        game = tracer.game
+        self.games.append((tracer.game_id, len(self.keyframes), len(tracer.rows) // (1 + self.num_players),
+                           game.winner_id if game.game_over else -1,
+                           self.full_deck + (0,) * (MAX_CARD_TYPES - len(self.full_deck))))
+        self.keyframes += keyframes
+        game.tracer = None
+        tracer.game = None
+
+    def close(self) -> None:
+        """
+        Writes out every recorded game, finished or not, and the tables.
+        """
+
+        if self.file.closed:
+            return
+        for tracer in list(self.active):
+            self.detach(tracer.game)
+        keyframes = np.array(self.keyframes, dtype=KEYFRAME_DTYPE)
+        games = np.array(self.games, dtype=GAME_DTYPE)
+        self.file.write(keyframes.tobytes())
+        self.file.write(games.tobytes())
+        self.file.write(FOOTER.pack(self.offset, len(keyframes), self.offset + keyframes.nbytes, len(games)))
+        self.file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def record_games(config: SimulationConfig, path: str, games: int, keyframe_interval: int = 32,
+                 max_turns: int = 100_000) -> int:
+    """
+    Records games [0, 'games') of a run ('build_game' seeding) into a replay file; games
+    still running after 'max_turns' turns are kept unfinished. Returns the turns recorded.
+    """
+
+    turns = 0
+    with ReplayWriter(path, config.num_players, keyframe_interval, config.rules) as writer:
+        for k in range(games):
+            game = build_game(config, k)
+            writer.attach(game, k)
+            for _ in range(max_turns):
+                if game.game_over:
+                    break
+                game.step()
+                turns += 1
+            writer.detach(game)
+    return turns
+
+# =====================
+#  Reader
+# =====================
+
+class ReplayReader:
+    """
+    Memory-maps a replay file. 'keyframes' and 'games' are zero-copy structured arrays over
+    it, and 'seek(game_id, turn)' only touches one keyframe and the deltas after it, so an
+    archive of any size opens instantly.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.data = np.memmap(path, dtype=np.uint8, mode="r").view(np.ndarray)       # Plain views slice faster
+        magic, version, num_players, interval, card_types = HEADER.unpack(self.data[:HEADER.size].tobytes())
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        self.num_players = num_players
+        self.interval = interval
+        self.card_types = card_types
+
+        keyframes_at, num_keyframes, games_at, num_games = FOOTER.unpack(self.data[-FOOTER.size:].tobytes())
+        self.keyframes = self.data[keyframes_at:keyframes_at + num_keyframes * KEYFRAME_DTYPE.itemsize].view(KEYFRAME_DTYPE)
+        self.games = self.data[games_at:games_at + num_games * GAME_DTYPE.itemsize].view(GAME_DTYPE)
+        self._lookup = {int(game): i for i, game in enumerate(self.games["game"])}
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def turns(self, game_id: int) -> int:
+        return int(self.games[self._lookup[game_id]]["turns"])
+
+    def seek(self, game_id: int, turn: int) -> ReplayState:
+        """
+        The state of game 'game_id' after 'turn' turns (clamped to the game's length).
+        """
+
+        entry = self.games[self._lookup[game_id]]
+        turn = max(0, min(turn, int(entry["turns"])))
+        # A keyframe doesn't know the move that led to it, so turn k * interval replays from keyframe k - 1
+        keyframe = self.keyframes[int(entry["keyframe"]) + max(turn - 1, 0) // self.interval]
+        steps = turn - int(keyframe["turn"])
+        return self._play(entry, keyframe, steps, None)
+
+    def frames(self, game_id: int) -> Iterator[ReplayState]:
+        """
+        Every state of the game in order, from turn 0 to the end.
+        """
+
+        entry = self.games[self._lookup[game_id]]
+        states: List[ReplayState] = []
+        self._play(entry, self.keyframes[int(entry["keyframe"])], int(entry["turns"]), states)
+        return iter(states)
+
+    def _play(self, entry: np.void, keyframe: np.void, steps: int, states: Optional[List[ReplayState]]) -> ReplayState:
+        """
+        Applies 'steps' deltas to 'keyframe'; every state on the way goes into 'states' if given.
+        """
+
+        num_players = self.num_players
+        game_id, _, turns, winner, full_deck = entry.item()
+        full_deck = full_deck[:self.card_types].tolist()
+        turn, offset, position, player, masks, deck = keyframe.item()
+        masks = masks[:num_players].tolist()
+        deck = deck[:self.card_types].tolist()
+
+        # At most 2 + 3 * num_players bytes per turn
+        data = self.data[offset:offset + steps * (2 + CHANGE.size * num_players)].tobytes()
+        state = ReplayState(game_id, turn, position, player, -1, -1, tuple(masks), tuple(deck),
+                            winner if turn == turns else -1)
+        if states is not None:
+            states.append(state)
+
+        at = 0
+        for _ in range(steps):
+            position, flags = data[at], data[at + 1]
+            at += 2
+            for _ in range(flags >> 4):
+                seat, flip = CHANGE.unpack_from(data, at)
+                masks[seat] ^= flip
+                at += CHANGE.size
+            card = (flags & 15) - 1
+            if card >= 0:
+                if not any(deck):
+                    deck[:] = full_deck
+                deck[card] -= 1
+
+            mover = player
+            turn += 1
+            player = (player + 1) % num_players
+            state = ReplayState(game_id, turn, position, player, mover, card, tuple(masks), tuple(deck),
+                                winner if turn == turns else -1)
+            if states is not None:
+                states.append(state)
+        return state
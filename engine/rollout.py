@@ -0,0 +1,270 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+
+from .cache import RECORD_DTYPE, stats_from_records
+from .components import LUCK_DECK_COMPOSITION
+from .rules import LUCK_KIND, compile_rules
+from .simulation import (
+    _chunks, _draft_mask,
+    RunningStats, SimulationConfig, SimulationReport, build_game
+)
+from .trace import GameTracer, record_dtype
+
+# Trace card codes by card type, so variant decks (new 'LuckCard' objects) map like the standard one
+_CARD_CODES = {card.card_type: code for code, card in enumerate(LUCK_DECK_COMPOSITION)}
+
+"""
+Multi-process rollouts that return results through shared memory instead of pickles.
+
+'run_simulation' ships every chunk back as a list of 'GameResult' tuples, and for short
+games pickling them costs about as much as playing them. Here the parent allocates one
+'multiprocessing.shared_memory' segment of fixed-size slots, each able to hold one chunk:
+a RECORD_DTYPE row per game ('engine/cache.py') and, optionally, the first
+'trajectory_turns' turns of every game as the records of 'engine/trace.py' (pawn position,
+luck card drawn and every Ingredient mask after the turn; turn t was played by seat t % n).
+
+Only slot numbers travel through the queues:
+
+- tasks: (start, stop) chunks, fed a couple per worker at a time
+- free: slots a worker may write into; a worker takes one before playing a chunk, so when
+  the consumer falls behind the workers block instead of piling up results
+- filled: (slot, start, count) of every written chunk
+
+The parent reads each filled slot in place (numpy views, no copy) and hands the slot back.
+It owns the segment and unlinks it whatever happens; a worker that dies makes the run
+raise instead of hanging.
+"""
+
+@dataclass
+class RolloutChunk:
+    """
+    One chunk as read by the parent. The arrays are views of a shared slot and only valid
+    during the 'on_chunk' call that receives them; copy what has to outlive it.
+    """
+
+    start: int
+    records: np.ndarray                         # RECORD_DTYPE, one row per game
+    trajectories: Optional[np.ndarray] = None   # Trace records, (games, trajectory_turns)
+
+    def trajectory(self, game: int) -> np.ndarray:
+        """
+        The recorded turns of the chunk's game 'game' (its first trajectory_turns turns).
+        """
+
+        return self.trajectories[game, :min(int(self.records["turns"][game]), self.trajectories.shape[1])]
+
+# =====================
+#  Slots
+# =====================
+
+class SlotArena:
+    """
+    'num_slots' chunk slots in one shared memory segment (or in process memory when
+    'shared' is False). Workers attach to the parent's segment by name.
+    """
+
+    def __init__(self, num_players: int, num_slots: int, chunk_size: int, trajectory_turns: int = 0,
+                shared: bool = True, name: Optional[str] = None) -> None:
+
+        self.num_players = num_players
+        self.num_slots = num_slots
+        self.chunk_size = chunk_size
+        self.trajectory_turns = trajectory_turns
+        self.trajectory_dtype = record_dtype(num_players)
+
+        records_bytes = num_slots * chunk_size * RECORD_DTYPE.itemsize
+        turns_bytes = num_slots * chunk_size * trajectory_turns * self.trajectory_dtype.itemsize
+        self.owner = name is None
+        self.shm = None
+        if shared:
+            self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=records_bytes + turns_bytes)
+            buf = self.shm.buf
+        else:
+            buf = bytearray(records_bytes + turns_bytes)
+
+        self.records = np.ndarray((num_slots, chunk_size), dtype=RECORD_DTYPE, buffer=buf)
+        self.trajectories = None
+        if trajectory_turns:
+            self.trajectories = np.ndarray((num_slots, chunk_size, trajectory_turns), dtype=self.trajectory_dtype,
+                                           buffer=buf, offset=records_bytes)
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.shm.name if self.shm else None
+
+    def chunk(self, slot: int, start: int, count: int) -> RolloutChunk:
+        trajectories = self.trajectories[slot, :count] if self.trajectories is not None else None
+        return RolloutChunk(start, self.records[slot, :count], trajectories)
+
+    def close(self) -> None:
+        # The views hold exports of the segment's buffer, which must be released first
+        self.records = self.trajectories = None
+        if self.shm:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+            self.shm = None
+
+# =====================
+#  Playing Into Slots
+# =====================
+
+def play_chunk_into(config: SimulationConfig, start: int, stop: int, records: np.ndarray,
+                    trajectories: Optional[np.ndarray] = None, max_turns: int = 100_000) -> None:
+    """
+    Plays games [start, stop) like 'play_chunk', writing row i of 'records' (and of
+    'trajectories', through the games' tracer hook) for game start + i.
+    """
+
+    limit = trajectories.shape[1] if trajectories is not None else 0
+    width = 1 + config.num_players
+    is_luck = np.array([kind == LUCK_KIND for kind in compile_rules(config.rules).board_kind])
+    for i, k in enumerate(range(start, stop)):
+        game = build_game(config, k)
+        if limit:
+            tracer = game.tracer = GameTracer(game, k, ())
+        lose_everything = game.rules.lose_everything_positions
+        turns = hits = 0
+        while not game.game_over and turns < max_turns:
+            game.step()
+            turns += 1
+            if game.pawn_position in lose_everything:
+                hits += 1
+        records[i] = (k, game.winner_id, turns, hits, _draft_mask(config, game.winner_id))
+
+        if limit:
+            game.tracer = None
+            n = min(turns, limit)
+            rows = np.array(tracer.rows[:n * width], dtype=np.int64).reshape(n, width)
+            out = trajectories[i, :n]
+            out["position"] = rows[:, 0]
+            out["masks"] = rows[:, 1:]
+            luck = is_luck[rows[:, 0]]
+            out["card"] = -1
+            out["card"][luck] = [_CARD_CODES[card.card_type] for card in tracer.cards[:int(luck.sum())]]
+
+def _rollout_worker(config: SimulationConfig, arena_args: tuple, tasks, free, filled, stop) -> None:
+    arena = SlotArena(*arena_args)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            start, stop_index = task
+            if stop.is_set():
+                filled.put((-1, start, 0))
+                continue
+            slot = free.get()
+            trajectories = arena.trajectories[slot] if arena.trajectories is not None else None
+            play_chunk_into(config, start, stop_index, arena.records[slot], trajectories)
+            filled.put((slot, start, stop_index - start))
+    finally:
+        arena.close()
+
+# =====================
+#  Running
+# =====================
+
+def run_rollouts(config: SimulationConfig, num_games: int, workers: int = 1, chunk_size: int = 500,
+                 slots: Optional[int] = None, trajectory_turns: int = 0, until_ci: Optional[float] = None,
+                 on_chunk: Optional[Callable[[RolloutChunk], None]] = None,
+                 first_game: int = 0) -> SimulationReport:
+    """
+    Plays up to 'num_games' games (indices from 'first_game' on) over 'workers' processes
+    writing into 'slots' shared chunk slots (2 per worker by default), and aggregates each
+    chunk in place as it arrives. 'on_chunk' sees every chunk's views, in completion order.
+    With 'until_ci', stops once every seat's 95% win-rate half-width is at most that value.
+    """
+
+    stats = RunningStats(config.num_players)
+    started = time.perf_counter()
+    chunks = _chunks(first_game, first_game + num_games, chunk_size)
+
+    def absorb(chunk: RolloutChunk) -> bool:
+        stats.merge(stats_from_records(config.num_players, chunk.records))
+        if on_chunk:
+            on_chunk(chunk)
+        return until_ci is not None and stats.max_win_rate_ci() <= until_ci
+
+    if workers <= 1:
+        arena = SlotArena(config.num_players, 1, chunk_size, trajectory_turns, shared=False)
+        for start, stop in chunks:
+            trajectories = arena.trajectories[0] if trajectory_turns else None
+            play_chunk_into(config, start, stop, arena.records[0], trajectories)
+            if absorb(arena.chunk(0, start, stop - start)):
+                break
+        return SimulationReport(stats, 1, time.perf_counter() - started)
+
+    slots = slots or 2 * workers
+    arena = SlotArena(config.num_players, slots, chunk_size, trajectory_turns)
+    arena_args = (config.num_players, slots, chunk_size, trajectory_turns, True, arena.name)
+    tasks, free, filled = multiprocessing.Queue(), multiprocessing.Queue(), multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    for slot in range(slots):
+        free.put(slot)
+
+    processes: List[multiprocessing.Process] = [
+        multiprocessing.Process(target=_rollout_worker, daemon=True,
+                                args=(config, arena_args, tasks, free, filled, stop))
+        for _ in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+
+        outstanding = 0
+        done = False
+        while True:
+            while not done and outstanding < 2 * workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                tasks.put(chunk)
+                outstanding += 1
+            if not outstanding:
+                break
+
+            slot, start, count = _next_filled(filled, processes)
+            outstanding -= 1
+            if slot < 0:
+                continue
+            if not done:
+                done = absorb(arena.chunk(slot, start, count))
+                if done:
+                    stop.set()
+            free.put(slot)
+
+        for _ in processes:
+            tasks.put(None)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for q in (tasks, free, filled):
+            q.close()
+            q.cancel_join_thread()
+        arena.close()
+
+    return SimulationReport(stats, workers, time.perf_counter() - started)
+
+def _next_filled(filled, processes: List[multiprocessing.Process]) -> Tuple[int, int, int]:
+    """
+    Waits for the next written chunk, checking that no worker died meanwhile.
+    """
+
+    while True:
+        try:
+            return filled.get(timeout=0.1)
+        except queue.Empty:
+            for process in processes:
+                if process.exitcode not in (None, 0):
+                    raise RuntimeError(f"Rollout worker {process.pid} died with exit code {process.exitcode}")
@@ -0,0 +1,159 @@
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import random
+
+from .components import (
+    Ingredient,
+    LuckCard, LuckCardType, LUCK_DECK_COMPOSITION,
+    BoardSpace, BoardSpaceType, BOARD_LAYOUT
+)
+
+from .bitmask import INGREDIENT_BIT
+
+"""
+House-rule variants of the board, the luck deck and the die.
+
+A 'RuleSet' only describes a variant, in plain names and counts so it stays small,
+hashable, picklable and JSON-friendly like 'SimulationConfig' (which carries one). The
+engines never read it directly: 'compile_rules' turns it into the lookup tables they step
+with ('CompiledRules': space kinds and Ingredient bits by position, the expanded deck),
+once per process. Every later game of the same variant gets the same compiled object, and
+the standard rules compile to exactly the tables 'GameState' and 'FastGameState' always
+used, so standard games are unchanged.
+
+Board spaces are named by their Ingredient for Ingredient spaces and by their
+'BoardSpaceType' otherwise ("CHEF", "GOOD_OR_BAD_LUCK", "LOSE_EVERYTHING"); the deck is
+the count of every card type, in 'LUCK_DECK_COMPOSITION' order.
+"""
+
+# Space kind codes of the compiled board, shared by the engines
+INGREDIENT_KIND, CHEF_KIND, LUCK_KIND, LOSE_EVERYTHING_KIND = range(4)
+
+_SPACE_KIND = {
+    BoardSpaceType.INGREDIENT: INGREDIENT_KIND,
+    BoardSpaceType.CHEF: CHEF_KIND,
+    BoardSpaceType.GOOD_OR_BAD_LUCK: LUCK_KIND,
+    BoardSpaceType.LOSE_EVERYTHING: LOSE_EVERYTHING_KIND,
+}
+
+_CARD_TYPES = [card.card_type for card in LUCK_DECK_COMPOSITION]
+
+def _space_name(space: BoardSpace) -> str:
+    return space.ingredient.name if space.ingredient else space.space_type.name
+
+def _space(position: int, name: str) -> BoardSpace:
+    if name in Ingredient.__members__:
+        return BoardSpace(position, BoardSpaceType.INGREDIENT, Ingredient[name])
+    if name in BoardSpaceType.__members__ and name != BoardSpaceType.INGREDIENT.name:
+        return BoardSpace(position, BoardSpaceType[name])
+    raise ValueError(f"Unknown board space '{name}'")
+
+# =====================
+#  Rule Set
+# =====================
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str = "standard"
+    board: Tuple[str, ...] = tuple(_space_name(space) for space in BOARD_LAYOUT)
+    deck: Tuple[int, ...] = tuple(card.count for card in LUCK_DECK_COMPOSITION)
+    die_sides: int = 6
+
+    # === Variants ===
+
+    def with_deck(self, **counts: int) -> "RuleSet":
+        """
+        Changes the count of some card types, e.g. with_deck(LOSE_ALL=0, GAIN_2=4).
+        """
+
+        deck = list(self.deck)
+        for card_type, count in counts.items():
+            deck[_CARD_TYPES.index(LuckCardType[card_type])] = count
+        label = ",".join(f"{card_type}={count}" for card_type, count in counts.items())
+        return replace(self, name=f"{self.name}+deck[{label}]", deck=tuple(deck))
+
+    def with_die(self, sides: int) -> "RuleSet":
+        return replace(self, name=f"{self.name}+d{sides}", die_sides=sides)
+
+    def with_extra_chefs(self, count: int, seed: int = 0) -> "RuleSet":
+        """
+        Inserts 'count' CHEF spaces at random places of the board (which grows by 'count').
+        """
+
+        board = list(self.board)
+        rng = random.Random(seed)
+        for _ in range(count):
+            board.insert(rng.randrange(len(board) + 1), BoardSpaceType.CHEF.name)
+        return replace(self, name=f"{self.name}+chef{count}s{seed}", board=tuple(board))
+
+    def shuffled(self, seed: int) -> "RuleSet":
+        """
+        The same spaces in a random order.
+        """
+
+        board = list(self.board)
+        random.Random(seed).shuffle(board)
+        return replace(self, name=f"{self.name}+shuffle{seed}", board=tuple(board))
+
+    def compile(self) -> "CompiledRules":
+        return compile_rules(self)
+
+STANDARD_RULES = RuleSet()
+
+# =====================
+#  Compiled Tables
+# =====================
+
+class CompiledRules:
+    """
+    The lookup tables of a 'RuleSet'. Position-indexed tuples have an unused entry 0, so
+    they index directly by pawn position (1 to board_size).
+    """
+
+    __slots__ = ("rules", "board", "board_size", "die_sides", "board_kind", "board_bit",
+                 "composition", "deck_cards", "lose_everything_positions")
+
+    def __init__(self, rules: RuleSet) -> None:
+        if rules.die_sides < 1:
+            raise ValueError("The die needs at least one side")
+        if len(rules.deck) != len(_CARD_TYPES) or min(rules.deck) < 0:
+            raise ValueError(f"The deck needs a non-negative count for each of {len(_CARD_TYPES)} card types")
+
+        self.rules = rules
+        self.board: List[BoardSpace] = [_space(position, name) for position, name in enumerate(rules.board, 1)]
+        self.board_size = len(self.board)
+        self.die_sides = rules.die_sides
+
+        self.board_kind: Tuple[Optional[int], ...] = (None,) + tuple(_SPACE_KIND[s.space_type] for s in self.board)
+        self.board_bit: Tuple[int, ...] = (0,) + tuple(
+            INGREDIENT_BIT[s.ingredient] if s.ingredient else 0 for s in self.board
+        )
+        self.lose_everything_positions: FrozenSet[int] = frozenset(
+            s.position for s in self.board if s.space_type == BoardSpaceType.LOSE_EVERYTHING
+        )
+
+        # Unchanged card types keep the standard 'LuckCard' objects, which traces key on
+        self.composition: List[LuckCard] = [
+            card if card.count == count else LuckCard(card.card_type, count)
+            for card, count in zip(LUCK_DECK_COMPOSITION, rules.deck)
+        ]
+        if not sum(rules.deck) and LUCK_KIND in self.board_kind:
+            raise ValueError("A board with luck spaces needs a non-empty deck")
+        # Unshuffled deck in composition order, copied and shuffled by every game
+        self.deck_cards: Tuple[LuckCard, ...] = tuple(
+            card for card in self.composition for _ in range(card.count)
+        )
+
+_COMPILED: Dict[RuleSet, CompiledRules] = {}
+
+def compile_rules(rules: Optional[RuleSet] = None) -> CompiledRules:
+    """
+    The compiled tables of 'rules' (the standard rules by default), built once per process.
+    """
+
+    rules = rules if rules is not None else STANDARD_RULES
+    compiled = _COMPILED.get(rules)
+    if compiled is None:
+        compiled = _COMPILED[rules] = CompiledRules(rules)
+    return compiled
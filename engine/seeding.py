@@ -0,0 +1,80 @@
+from typing import List, Tuple
+
+import random
+
+# =====================
+#  Seed Spawning
+# =====================
+
+# Every random stream of a run is derived from (root seed, game index, stream) through
+# SplitMix64, so game k of a run is bit-identical no matter which worker or batch plays
+# it, and no stream depends on how many games were played before it.
+
+_MASK64 = (1 << 64) - 1
+
+BOARD_STREAM = 0        # Dice rolls and luck deck shuffles of a game
+SEAT_STREAM = 1         # Seat i's policy uses stream SEAT_STREAM + i
+
+def _splitmix64(x: int) -> int:
+    """
+    One SplitMix64 round: a bijective, well-mixing 64-bit hash.
+    """
+
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def spawn_seed(root_seed: int, *key: int) -> int:
+    """
+    Derives an independent 64-bit seed from 'root_seed' and a path of integer keys,
+    e.g. spawn_seed(seed, game_index, stream).
+    """
+
+    seed = _splitmix64(root_seed & _MASK64)
+    for k in key:
+        seed = _splitmix64(seed ^ (k & _MASK64))
+    return seed
+
+def spawn_rng(root_seed: int, *key: int, antithetic: bool = False) -> random.Random:
+    """
+    Returns a 'random.Random' seeded with spawn_seed(root_seed, *key), or its mirror image
+    (see 'AntitheticRandom') with 'antithetic'.
+    """
+
+    return (AntitheticRandom if antithetic else random.Random)(spawn_seed(root_seed, *key))
+
+def game_rngs(root_seed: int, game_index: int, num_players: int,
+              antithetic: bool = False) -> Tuple[random.Random, List[random.Random]]:
+    """
+    Returns the board rng (for 'GameState') and one rng per seat (for the policies) of
+    game 'game_index'. Keeping the streams apart means the dice and the deck stay the same
+    when only the policies change, which is what common random numbers need. With
+    'antithetic', every stream is the mirror image of the plain game's.
+    """
+
+    board_rng = spawn_rng(root_seed, game_index, BOARD_STREAM, antithetic=antithetic)
+    seat_rngs = [spawn_rng(root_seed, game_index, SEAT_STREAM + seat, antithetic=antithetic)
+                 for seat in range(num_players)]
+    return board_rng, seat_rngs
+
+# =====================
+#  Antithetic Streams
+# =====================
+
+_ULP = 2.0 ** -53       # Spacing of the floats 'random()' returns
+
+class AntitheticRandom(random.Random):
+    """
+    The mirror image of the 'random.Random' with the same seed: 'random()' returns
+    1 - 2^-53 - u for the u the plain stream returns, and every integer draw in [0, n)
+    (randint, choice, shuffle, sample) returns n - 1 - k for its k. A die roll d becomes
+    7 - d and a shuffle makes the mirrored swap at every step, so a game and its antithetic twin are
+    negatively correlated wherever the outcome is monotone in the draws.
+    """
+
+    def random(self) -> float:
+        return 1.0 - _ULP - super().random()
+
+    def _randbelow(self, n: int) -> int:
+        return n - 1 - super()._randbelow(n)
@@ -0,0 +1,634 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from .bitmask import INGREDIENTS, mask_of
+from .components import ALL_PIZZAS, Ingredient
+from .game import GameState
+from .policy import PlayerController
+from .policies.random_policy import RandomPolicy
+from .seeding import game_rngs, spawn_rng
+from .simulation import PIZZAS_BY_NAME, POLICIES
+
+"""
+Asyncio server hosting many interactive 'GameState' sessions, for humans and remote bots
+playing against the registered policies ('engine/simulation.py' POLICIES).
+
+A seat is either a policy name or "remote". 'GameState' asks its controllers through plain
+callbacks, so a game can't simply wait for a remote move in the middle of 'step()'. Every
+turn of a remote player instead starts from a snapshot of the game and of its rng; the
+seat's controller logs each answer of the turn, and a decision with no logged answer
+aborts the step. The session then sends the decision, awaits the move (or its deadline,
+after which the seat's fallback 'RandomPolicy' answers), restores the snapshot and replays
+the step: the dice, the deck and every earlier answer come out the same, and the new
+answer carries the turn one decision further. A turn has at most a few decisions, so
+replaying costs next to nothing, and no session ever holds a thread.
+
+The protocol is JSON lines, over TCP or a Unix socket. A connection can run any number of
+sessions at once; every session message carries its "session" id.
+
+    client -> server:
+      {"op": "new", "players": 2, "seats": ["remote", "random"], "seed": 7,
+       "draft": [[pizza names], ...], "timeout": 5.0, "watch": false, "tag": ...}
+      {"op": "move", "session": 1, "ask": 3, "choice": ...}
+      {"op": "quit", "session": 1}
+      {"op": "stats"}
+    server -> client:
+      {"event": "started", "session": 1, "tag": ..., "seats": [...], "draft": [...], "pawn": 12}
+      {"event": "decision", "session": 1, "ask": 3, "seat": 0, "kind": "ingredient" | "opponent" | "lose",
+       "choices": [...], "amount": 1, "pawn": 12, "masks": [...], "timeout": 5.0}
+      {"event": "turn", "session": 1, "turn": 8, "player": 0, "pawn": 15, "masks": [...]}   (with "watch")
+      {"event": "over", "session": 1, "winner": 0, "turns": 212, "timeouts": 0}
+      {"event": "stats", ...} and {"event": "error", "message": "...", "session": 1}
+
+Everything but "op" is optional in "new": seat 0 is remote and the others random by
+default, the draft is dealt at random and the seed is the server's. Ingredient choices are
+names, "opponent" choices seat numbers and a "lose" move is the list of "amount" names to
+give up; "masks" are the players' inventories as Ingredient masks ('engine/bitmask.py').
+A move must echo the "ask" number of its decision, so a move arriving after its deadline
+is rejected instead of answering the next decision.
+"""
+
+Address = Union[Tuple[str, int], str]       # (host, port), or the path of a Unix socket
+
+REMOTE = "remote"
+RECIPES_PER_PLAYER = {2: 3, 3: 2, 6: 1}
+
+_DRAFT_STREAM = 100         # Past every seat stream of 'engine/seeding.py'
+_FALLBACK_STREAM = 101
+
+_KINDS = {
+    "choose_ingredient": "ingredient",
+    "choose_opponent": "opponent",
+    "choose_ingredients_to_lose": "lose",
+}
+
+class ProtocolError(ValueError):
+    pass
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+# =====================
+#  Metrics
+# =====================
+
+def _percentiles(values: Deque[float]) -> Dict[str, float]:
+    """
+    Median, 99th percentile and maximum of a latency window, in milliseconds.
+    """
+
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p99 = np.percentile(np.fromiter(values, float, len(values)), [50, 99]) * 1000
+    return {"p50": round(float(p50), 3), "p99": round(float(p99), 3), "max": round(max(values) * 1000, 3)}
+
+class ServerMetrics:
+    """
+    Counters and latency windows of a server. The server is one process on one core, so
+    'sessions_per_core' is the number of concurrent sessions a fully busy core would carry
+    at the observed load (the time-averaged number of active sessions over CPU utilization).
+    """
+
+    def __init__(self, window: int = 10_000) -> None:
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.sessions_started = 0
+        self.sessions_finished = 0
+        self.active = 0
+        self.peak_active = 0
+        self.active_seconds = 0.0       # Integral of 'active' over time
+        self.changed = self.started
+        self.turns = 0
+        self.decisions = 0
+        self.timeouts = 0
+        self.rejected_moves = 0
+        self.move_latency: Deque[float] = deque(maxlen=window)    # Decision sent -> valid move received
+        self.turn_time: Deque[float] = deque(maxlen=window)       # Server time of a turn, waits excluded
+        self.loop_lag: Deque[float] = deque(maxlen=window)        # Event loop wake-up delay
+
+    def session_started(self) -> None:
+        self._tick()
+        self.sessions_started += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def session_ended(self, finished: bool) -> None:
+        self._tick()
+        self.active -= 1
+        self.sessions_finished += finished
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        self.active_seconds += self.active * (now - self.changed)
+        self.changed = now
+
+    def report(self) -> dict:
+        self._tick()
+        seconds = time.perf_counter() - self.started
+        cpu = time.process_time() - self.cpu_started
+        utilization = cpu / seconds if seconds else 0.0
+        mean_active = self.active_seconds / seconds if seconds else 0.0
+        return {
+            "seconds": round(seconds, 3),
+            "cpu_seconds": round(cpu, 3),
+            "cpu_utilization": round(utilization, 4),
+            "sessions_started": self.sessions_started,
+            "sessions_finished": self.sessions_finished,
+            "active": self.active,
+            "peak_active": self.peak_active,
+            "mean_active": round(mean_active, 1),
+            "sessions_per_core": round(mean_active / utilization, 1) if utilization else 0.0,
+            "games_per_cpu_second": round(self.sessions_finished / cpu, 2) if cpu else 0.0,
+            "turns": self.turns,
+            "decisions": self.decisions,
+            "timeouts": self.timeouts,
+            "rejected_moves": self.rejected_moves,
+            "move_latency_ms": _percentiles(self.move_latency),
+            "turn_time_ms": _percentiles(self.turn_time),
+            "loop_lag_ms": _percentiles(self.loop_lag),
+        }
+
+# =====================
+#  Sessions
+# =====================
+
+class _Suspend(Exception):
+    """
+    Raised out of 'GameState.step()' when a remote seat has to decide.
+    """
+
+    def __init__(self, seat: int, method: str, args: tuple) -> None:
+        self.seat = seat
+        self.method = method
+        self.args = args
+
+class _Seat(PlayerController):
+    """
+    Controller of one seat of a session: a local policy, or None for a remote player.
+    """
+
+    def __init__(self, session: "Session", seat: int, policy: Optional[PlayerController]) -> None:
+        self.session = session
+        self.seat = seat
+        self.policy = policy
+
+    def bind(self, game) -> None:
+        if self.policy is not None:
+            self.policy.bind(game)
+
+    def choose_ingredient(self, needed, player):
+        return self.session.answer(self, "choose_ingredient", (needed, player))
+
+    def choose_opponent(self, player, opponents):
+        return self.session.answer(self, "choose_opponent", (player, opponents))
+
+    def choose_ingredients_to_lose(self, player, amount):
+        return self.session.answer(self, "choose_ingredients_to_lose", (player, amount))
+
+class Session:
+    """
+    One game on the server. 'run()' plays it to the end, suspending on remote decisions.
+    """
+
+    def __init__(self, server: "GameServer", session_id: int, send: Callable, num_players: int,
+                 seats: List[str], draft: List[List], seed: int, timeout: float, watch: bool) -> None:
+
+        self.server = server
+        self.id = session_id
+        self.send = send
+        self.seats = seats
+        self.timeout = timeout
+        self.watch = watch
+
+        board_rng, seat_rngs = game_rngs(seed, session_id, num_players)
+        controllers = [_Seat(self, i, None if name == REMOTE else POLICIES[name](rng))
+                       for i, (name, rng) in enumerate(zip(seats, seat_rngs))]
+        self.fallback = RandomPolicy(spawn_rng(seed, session_id, _FALLBACK_STREAM))
+        self.game = GameState(num_players, draft, controllers, rng=board_rng)
+
+        self.turn_answers: List[object] = []        # Every answer of the current turn, in order
+        self.cursor = 0
+        self.turns = 0
+        self.timeouts = 0
+        self.asks = 0
+        self.pending: Optional[Tuple[int, _Suspend, asyncio.Future]] = None
+        self.sent = 0.0
+
+    def answer(self, seat: _Seat, method: str, args: tuple):
+        """
+        Answers a controller callback from the turn's log, the seat's policy, or not at all.
+        """
+
+        if self.cursor < len(self.turn_answers):
+            choice = self.turn_answers[self.cursor]
+        elif seat.policy is None:
+            raise _Suspend(seat.seat, method, args)
+        else:
+            choice = getattr(seat.policy, method)(*args)
+            self.turn_answers.append(choice)
+        self.cursor += 1
+        return choice
+
+    # === Playing ===
+
+    async def run(self) -> None:
+        game = self.game
+        metrics = self.server.metrics
+        while not game.game_over and self.turns < self.server.max_turns:
+            player = game.current_player_index
+            self.turn_answers = []
+            self.cursor = 0
+            busy = 0.0
+            # Only the player on the move is asked anything, so only a remote mover can suspend the turn
+            checkpoint = (game.snapshot(), game.rng.getstate()) if self.seats[player] == REMOTE else None
+            while True:
+                started = time.perf_counter()
+                try:
+                    game.step()
+                    busy += time.perf_counter() - started
+                    break
+                except _Suspend as suspend:
+                    busy += time.perf_counter() - started
+                    # The game is frozen mid-turn, which is the state the decision is about
+                    self.turn_answers.append(await self._decide(suspend))
+                    game.restore(checkpoint[0])
+                    game.rng.setstate(checkpoint[1])
+                    self.cursor = 0
+
+            self.turns += 1
+            metrics.turns += 1
+            metrics.turn_time.append(busy)
+            if self.watch:
+                await self.send({"event": "turn", "session": self.id, "turn": self.turns, "player": player,
+                                 "pawn": game.pawn_position, "masks": self._masks()})
+            if not self.turns % 8:
+                await asyncio.sleep(0)  # Let the other sessions move, even without remote decisions
+
+        await self.send({"event": "over", "session": self.id, "winner": game.winner_id,
+                         "turns": self.turns, "timeouts": self.timeouts})
+
+    async def _decide(self, suspend: _Suspend):
+        """
+        Sends the decision and waits for a valid move, or lets the fallback policy answer.
+        """
+
+        self.asks += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending = (self.asks, suspend, future)
+        self.server.metrics.decisions += 1
+
+        message = {"event": "decision", "session": self.id, "ask": self.asks, "seat": suspend.seat,
+                   "kind": _KINDS[suspend.method], "choices": self._choices(suspend), "amount": 1,
+                   "pawn": self.game.pawn_position, "masks": self._masks(), "timeout": self.timeout}
+        if suspend.method == "choose_ingredients_to_lose":
+            player, amount = suspend.args
+            message["amount"] = min(amount, len(player.ingredients))
+        self.sent = time.perf_counter()
+        await self.send(message)
+
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.server.metrics.timeouts += 1
+            return getattr(self.fallback, suspend.method)(*suspend.args)
+        finally:
+            self.pending = None
+
+    def move(self, ask: int, choice) -> None:
+        """
+        Resolves the pending decision with a client's move; raises 'ProtocolError' if it doesn't fit.
+        """
+
+        if self.pending is None or self.pending[0] != ask or self.pending[2].done():
+            raise ProtocolError(f"No pending decision {ask}")
+        _, suspend, future = self.pending
+        answer = self._parse(suspend, choice)
+        self.server.metrics.move_latency.append(time.perf_counter() - self.sent)
+        future.set_result(answer)
+
+    # === Encoding ===
+
+    def _masks(self) -> List[int]:
+        return [mask_of(player.ingredients) for player in self.game.players]
+
+    def _choices(self, suspend: _Suspend) -> list:
+        if suspend.method == "choose_ingredient":
+            needed, _ = suspend.args
+            return [ingredient.name for ingredient in INGREDIENTS if ingredient in needed]
+        if suspend.method == "choose_opponent":
+            _, opponents = suspend.args
+            return [opponent.id for opponent in opponents]
+        player, _ = suspend.args
+        return [ingredient.name for ingredient in INGREDIENTS if ingredient in player.ingredients]
+
+    def _parse(self, suspend: _Suspend, choice):
+        choices = self._choices(suspend)
+        if suspend.method == "choose_ingredient":
+            if choice not in choices:
+                raise ProtocolError(f"{choice!r} is not one of {choices}")
+            return Ingredient[choice]
+        if suspend.method == "choose_opponent":
+            if choice not in choices:
+                raise ProtocolError(f"{choice!r} is not one of the opponents {choices}")
+            return self.game.players[choice]
+
+        player, amount = suspend.args
+        if (not isinstance(choice, list) or len(set(choice)) != len(choice)
+                or len(choice) != min(amount, len(choices)) or not set(choice) <= set(choices)):
+            raise ProtocolError(f"{choice!r} is not {min(amount, len(choices))} of {choices}")
+        return [Ingredient[name] for name in choice]
+
+# =====================
+#  Server
+# =====================
+
+class GameServer:
+    """
+    Hosts sessions for any number of connections. 'start()' listens on (host, port) (port 0
+    picks a free one) or on a Unix socket path and returns the bound address.
+    """
+
+    def __init__(self, seed: int = 0, timeout: float = 30.0, max_turns: int = 10_000,
+                 max_sessions: int = 100_000, log: Optional[Callable[[str], None]] = None) -> None:
+
+        self.seed = seed
+        self.timeout = timeout
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.log = log
+        self.metrics = ServerMetrics()
+        self.sessions: Dict[int, Session] = {}
+        self.next_session = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._monitor: Optional[asyncio.Task] = None
+
+    async def start(self, address: Address = ("127.0.0.1", 0)) -> Address:
+        if isinstance(address, str):
+            self.server = await asyncio.start_unix_server(self._connection, path=address)
+        else:
+            self.server = await asyncio.start_server(self._connection, *address)
+        self._monitor = asyncio.create_task(self._watch_loop())
+        bound = self.server.sockets[0].getsockname()
+        return bound if isinstance(bound, str) else tuple(bound[:2])
+
+    async def serve_forever(self) -> None:
+        await self.server.serve_forever()
+
+    async def close(self) -> None:
+        if self._monitor:
+            self._monitor.cancel()
+        if self.server:
+            self.server.close()
+            # Closing a connection ends its read loop, which cancels its sessions
+            for writer in self.connections.values():
+                writer.close()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+
+    async def _watch_loop(self, interval: float = 0.05) -> None:
+        """
+        Samples how late the event loop wakes up, the first sign of an overloaded server.
+        """
+
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.metrics.loop_lag.append(max(time.perf_counter() - started - interval, 0.0))
+
+    # === Connections ===
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks: Dict[int, asyncio.Task] = {}
+        self.connections[asyncio.current_task()] = writer
+        peer = writer.get_extra_info("peername") or "unix socket"
+        if self.log:
+            self.log(f"Connection from {peer}")
+
+        async def send(message: dict) -> None:
+            if not writer.is_closing():
+                writer.write(_encode(message))
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                message = {}
+                try:
+                    message = json.loads(line)
+                    await self._handle(message, send, tasks)
+                except (ProtocolError, ValueError, KeyError, TypeError) as error:
+                    if isinstance(error, ProtocolError):
+                        self.metrics.rejected_moves += 1
+                    reply = {"event": "error", "message": str(error)}
+                    if isinstance(message, dict) and "session" in message:
+                        reply["session"] = message["session"]
+                    await send(reply)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            writer.close()
+            del self.connections[asyncio.current_task()]
+            if self.log:
+                self.log(f"Connection from {peer} closed, {len(tasks)} session(s) abandoned")
+
+    async def _handle(self, message: dict, send: Callable, tasks: Dict[int, asyncio.Task]) -> None:
+        op = message["op"]
+        if op == "move":
+            session = self.sessions.get(message["session"])
+            if session is None or message["session"] not in tasks:
+                raise ProtocolError(f"No session {message['session']} on this connection")
+            session.move(message["ask"], message.get("choice"))
+        elif op == "new":
+            session = self._new_session(message, send)
+            await send({"event": "started", "session": session.id, "tag": message.get("tag"),
+                        "seats": session.seats, "pawn": session.game.pawn_position,
+                        "draft": [[pizza.name for pizza in player.recipes] for player in session.game.players]})
+            tasks[session.id] = asyncio.create_task(self._run(session, tasks))
+        elif op == "quit":
+            task = tasks.get(message["session"])
+            if task:
+                task.cancel()
+        elif op == "stats":
+            await send({"event": "stats", **self.metrics.report()})
+        else:
+            raise ValueError(f"Unknown op {op!r}")
+
+    def _new_session(self, message: dict, send: Callable) -> Session:
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError("The server is full")
+        num_players = message.get("players", 2)
+        if num_players not in RECIPES_PER_PLAYER:
+            raise ValueError("Sessions have 2, 3 or 6 players")
+        seats = message.get("seats") or [REMOTE] + ["random"] * (num_players - 1)
+        if len(seats) != num_players or any(name != REMOTE and name not in POLICIES for name in seats):
+            raise ValueError(f"Give one seat per player, each {REMOTE!r} or one of {sorted(POLICIES)}")
+
+        session_id = self.next_session
+        self.next_session += 1
+        seed = message.get("seed", self.seed)
+        if "draft" in message:
+            draft = [[PIZZAS_BY_NAME[name] for name in recipes] for recipes in message["draft"]]
+        else:
+            per_player = RECIPES_PER_PLAYER[num_players]
+            dealt = spawn_rng(seed, session_id, _DRAFT_STREAM).sample(ALL_PIZZAS, per_player * num_players)
+            draft = [dealt[i * per_player:(i + 1) * per_player] for i in range(num_players)]
+
+        session = Session(self, session_id, send, num_players, list(seats), draft, seed,
+                          float(message.get("timeout", self.timeout)), bool(message.get("watch", False)))
+        self.sessions[session_id] = session
+        return session
+
+    async def _run(self, session: Session, tasks: Dict[int, asyncio.Task]) -> None:
+        self.metrics.session_started()
+        finished = False
+        try:
+            await session.run()
+            finished = True
+        except ConnectionError:
+            pass
+        finally:
+            self.metrics.session_ended(finished)
+            del self.sessions[session.id]
+            tasks.pop(session.id, None)
+
+# =====================
+#  Load Test Client
+# =====================
+
+async def _open(address: Address) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+class _BotConnection:
+    """
+    One client connection multiplexing many bot sessions.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.inboxes: Dict[int, asyncio.Queue] = {}
+        self.starting: Dict[int, asyncio.Future] = {}
+        self.stats: Optional[asyncio.Future] = None
+        self.next_tag = 0
+        self.reading = asyncio.create_task(self._read())
+
+    async def send(self, message: dict) -> None:
+        self.writer.write(_encode(message))
+        await self.writer.drain()
+
+    async def open(self, request: dict) -> Tuple[int, asyncio.Queue]:
+        tag = self.next_tag
+        self.next_tag += 1
+        started = self.starting[tag] = asyncio.get_running_loop().create_future()
+        await self.send({**request, "op": "new", "tag": tag})
+        session_id = await started
+        return session_id, self.inboxes[session_id]
+
+    async def server_stats(self) -> dict:
+        self.stats = asyncio.get_running_loop().create_future()
+        await self.send({"op": "stats"})
+        return await self.stats
+
+    async def close(self) -> None:
+        self.reading.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def _read(self) -> None:
+        while line := await self.reader.readline():
+            message = json.loads(line)
+            event = message["event"]
+            if event == "started":
+                self.inboxes[message["session"]] = asyncio.Queue()
+                self.starting.pop(message["tag"]).set_result(message["session"])
+            elif event == "stats":
+                self.stats.set_result(message)
+            elif event == "error" and "session" not in message:
+                raise ProtocolError(message["message"])
+            elif message["session"] in self.inboxes:       # Not a late error of a finished game
+                self.inboxes[message["session"]].put_nowait(message)
+
+def _bot_move(message: dict, rng: random.Random):
+    choices = message["choices"]
+    if message["kind"] == "lose":
+        return rng.sample(choices, message["amount"])
+    return rng.choice(choices)
+
+async def _bot_session(connection: _BotConnection, request: dict, rng: random.Random,
+                       think: float, latencies: List[float]) -> dict:
+    session_id, inbox = await connection.open(request)
+    sent = None
+    while True:
+        message = await inbox.get()
+        if message["event"] == "error":
+            continue                # A move that arrived after its deadline
+        if sent is not None:
+            latencies.append(time.perf_counter() - sent)
+            sent = None
+        if message["event"] == "over":
+            del connection.inboxes[session_id]
+            return message
+        if message["event"] == "decision":
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+            await connection.send({"op": "move", "session": session_id, "ask": message["ask"],
+                                   "choice": _bot_move(message, rng)})
+            sent = time.perf_counter()
+
+async def run_load_test(address: Address, sessions: int = 1000, concurrency: int = 1000,
+                        connections: int = 8, num_players: int = 2, remote_seats: int = 1,
+                        think: float = 0.0, timeout: Optional[float] = None, seed: int = 0,
+                        log: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Plays 'sessions' games against the server at 'address', at most 'concurrency' at a time,
+    over 'connections' connections. The first 'remote_seats' seats of every game are random
+    bots that think for an exponential time of mean 'think' seconds; the others are the
+    server's random policy. Returns the client's view (games per second and the round trip
+    from a move to the session's next message) with the server's stats under "server".
+    """
+
+    rng = random.Random(seed)
+    links = [_BotConnection(*await _open(address)) for _ in range(connections)]
+    request = {"players": num_players, "seats": [REMOTE] * remote_seats + ["random"] * (num_players - remote_seats)}
+    if timeout is not None:
+        request["timeout"] = timeout
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    results: List[dict] = []
+
+    async def one(k: int) -> None:
+        async with gate:
+            results.append(await _bot_session(links[k % connections], request,
+                                              random.Random(rng.random()), think, latencies))
+            if log and len(results) % max(sessions // 10, 1) == 0:
+                log(f"{len(results):,}/{sessions:,} sessions finished")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(k) for k in range(sessions)))
+    seconds = time.perf_counter() - started
+    server = await links[0].server_stats()
+    for link in links:
+        await link.close()
+
+    return {
+        "sessions": len(results),
+        "seconds": round(seconds, 3),
+        "sessions_per_second": round(len(results) / seconds, 2) if seconds else 0.0,
+        "turns": sum(result["turns"] for result in results),
+        "timeouts": sum(result["timeouts"] for result in results),
+        "move_round_trip_ms": _percentiles(deque(latencies)),
+        "server": server,
+    }
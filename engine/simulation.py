@@ -0,0 +1,280 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import math
+import time
+
+from .components import PizzaCard, ALL_PIZZAS
+from .fast_game import FastGameState
+from .game import GameState
+from .policy import PlayerController
+from .policies.heuristic_policy import HeuristicPolicy
+from .policies.mcts_policy import MCTSPolicy
+from .policies.random_policy import RandomPolicy
+from .rules import RuleSet
+from .seeding import game_rngs
+
+import random
+
+# =====================
+#  Configuration
+# =====================
+
+# Policy name -> factory taking the seat's rng. Other modules register their policies here.
+POLICIES: Dict[str, Callable[[random.Random], PlayerController]] = {
+    "random": RandomPolicy,
+    "mcts": MCTSPolicy,
+    "heuristic": HeuristicPolicy,
+}
+
+ENGINES = {
+    "game": GameState,
+    "fast": FastGameState,
+}
+
+PIZZAS_BY_NAME = {pizza.name: pizza for pizza in ALL_PIZZAS}
+_PIZZA_INDEX = {pizza.name: i for i, pizza in enumerate(ALL_PIZZAS)}
+
+Z_95 = 1.959964    # Two-sided 95% normal quantile
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    Everything that determines the outcome of a run, apart from which games are played.
+    The draft is stored as pizza names so the config stays small, hashable and picklable.
+    """
+
+    num_players: int
+    draft: Tuple[Tuple[str, ...], ...]
+    policies: Tuple[str, ...] = ()
+    seed: int = 0
+    engine: str = "fast"
+    rules: Optional[RuleSet] = None     # A house-rule variant, see 'engine/rules.py'
+
+    def player_recipes(self) -> List[List[PizzaCard]]:
+        return [[PIZZAS_BY_NAME[name] for name in recipes] for recipes in self.draft]
+
+    def seat_policies(self) -> Tuple[str, ...]:
+        return self.policies or ("random",) * self.num_players
+
+def draft_names(player_recipes: List[List[PizzaCard]]) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Converts a recipe draft into the name tuples used by 'SimulationConfig'.
+    """
+
+    return tuple(tuple(pizza.name for pizza in recipes) for recipes in player_recipes)
+
+# =====================
+#  Playing Games
+# =====================
+
+class GameResult(NamedTuple):
+    """
+    Compact per-game record streamed back from the workers.
+    """
+
+    game_index: int
+    winner: int                 # Seat of the winner, -1 if the game hit the turn cap
+    turns: int
+    lose_everything_hits: int   # Landings on the LOSE_EVERYTHING space
+    winner_draft: int           # Bitmask of the winner's recipes (indices into ALL_PIZZAS)
+
+def build_game(config: SimulationConfig, game_index: int, starting_pos: int = 0, antithetic: bool = False):
+    """
+    Builds game 'game_index' of the run described by 'config', seeded through 'engine/seeding.py'.
+    'starting_pos' fixes the pawn's start (random by default) and 'antithetic' builds the
+    mirror-image twin of the game (see 'engine/variance.py').
+    """
+
+    board_rng, seat_rngs = game_rngs(config.seed, game_index, config.num_players, antithetic)
+    controllers = [POLICIES[name](rng) for name, rng in zip(config.seat_policies(), seat_rngs)]
+    return ENGINES[config.engine](config.num_players, config.player_recipes(), controllers,
+                                  starting_pos=starting_pos, rng=board_rng, rules=config.rules)
+
+def play_game(config: SimulationConfig, game_index: int, max_turns: int = 100_000) -> GameResult:
+    """
+    Plays one game to the end and returns its compact result.
+    """
+
+    game = build_game(config, game_index)
+    lose_everything = game.rules.lose_everything_positions
+    turns = 0
+    hits = 0
+    while not game.game_over and turns < max_turns:
+        game.step()
+        turns += 1
+        if game.pawn_position in lose_everything:
+            hits += 1
+    return GameResult(game_index, game.winner_id, turns, hits, _draft_mask(config, game.winner_id))
+
+def _draft_mask(config: SimulationConfig, seat: int) -> int:
+    if seat < 0:
+        return 0
+    return sum(1 << _PIZZA_INDEX[name] for name in config.draft[seat])
+
+def play_chunk(config: SimulationConfig, start: int, stop: int) -> List[GameResult]:
+    """
+    Plays games [start, stop) of a run. This is the unit of work sent to the workers.
+    """
+
+    return [play_game(config, k) for k in range(start, stop)]
+
+# =====================
+#  Aggregation
+# =====================
+
+@dataclass
+class RunningStats:
+    """
+    Streaming win-rate and game-length statistics (Welford's algorithm for the turns).
+    """
+
+    num_players: int
+    games: int = 0
+    wins: List[int] = field(default_factory=list)
+    unfinished: int = 0
+    lose_everything_hits: int = 0
+    turns_mean: float = 0.0
+    turns_m2: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.wins:
+            self.wins = [0] * self.num_players
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        if result.winner >= 0:
+            self.wins[result.winner] += 1
+        else:
+            self.unfinished += 1
+        self.lose_everything_hits += result.lose_everything_hits
+
+        delta = result.turns - self.turns_mean
+        self.turns_mean += delta / self.games
+        self.turns_m2 += delta * (result.turns - self.turns_mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        """
+        Folds another aggregate into this one (Chan's parallel variance update).
+        """
+
+        total = self.games + other.games
+        if not other.games:
+            return
+        delta = other.turns_mean - self.turns_mean
+        self.turns_m2 += other.turns_m2 + delta * delta * self.games * other.games / total
+        self.turns_mean += delta * other.games / total
+        self.games = total
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.unfinished += other.unfinished
+        self.lose_everything_hits += other.lose_everything_hits
+
+    # === Estimates ===
+
+    def win_rate(self, seat: int) -> float:
+        return self.wins[seat] / self.games if self.games else 0.0
+
+    def win_rate_ci(self, seat: int) -> float:
+        """
+        Half-width of the 95% normal confidence interval of the seat's win rate.
+        """
+
+        if not self.games:
+            return math.inf
+        p = self.win_rate(seat)
+        variance = max(p * (1 - p), 0.25 / self.games)     # Don't report a zero width at p = 0 or 1
+        return Z_95 * math.sqrt(variance / self.games)
+
+    def turns_std(self) -> float:
+        return math.sqrt(self.turns_m2 / (self.games - 1)) if self.games > 1 else 0.0
+
+    def turns_ci(self) -> float:
+        return Z_95 * self.turns_std() / math.sqrt(self.games) if self.games else math.inf
+
+    def max_win_rate_ci(self) -> float:
+        return max(self.win_rate_ci(seat) for seat in range(self.num_players))
+
+# =====================
+#  Running
+# =====================
+
+@dataclass
+class SimulationReport:
+    stats: RunningStats
+    workers: int
+    seconds: float
+
+    @property
+    def games_per_second(self) -> float:
+        return self.stats.games / self.seconds if self.seconds else 0.0
+
+def _chunks(first: int, stop: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for start in range(first, stop, chunk_size):
+        yield start, min(start + chunk_size, stop)
+
+def run_simulation(config: SimulationConfig, num_games: int, workers: int = 1,
+                chunk_size: int = 500, until_ci: Optional[float] = None,
+                on_result: Optional[Callable[[GameResult], None]] = None,
+                first_game: int = 0, backend: str = "pool") -> SimulationReport:
+    """
+    Plays up to 'num_games' games (indices from 'first_game' on) over a pool of 'workers'
+    processes, 'chunk_size' games per task, streaming each chunk's results into a
+    'RunningStats' as soon as it arrives.
+    With 'until_ci', stops once every seat's 95% win-rate half-width is at most that value.
+
+    Only a couple of chunks per worker are in flight at a time, so stopping early wastes
+    little work. Which games end up in an early-stopped run depends on completion order.
+
+    backend="shared" returns the results through shared memory instead of pickles (see
+    'engine/rollout.py'), which pays off when games are short.
+    """
+
+    if backend == "shared" and workers > 1:
+        from .rollout import run_rollouts       # It builds on this module
+
+        def on_chunk(chunk) -> None:
+            for record in chunk.records.tolist():
+                on_result(GameResult(*record))
+
+        return run_rollouts(config, num_games, workers, chunk_size, until_ci=until_ci,
+                            on_chunk=on_chunk if on_result else None, first_game=first_game)
+
+    stats = RunningStats(config.num_players)
+    started = time.perf_counter()
+
+    def absorb(results: List[GameResult]) -> bool:
+        for result in results:
+            stats.add(result)
+            if on_result:
+                on_result(result)
+        return until_ci is not None and stats.max_win_rate_ci() <= until_ci
+
+    chunks = _chunks(first_game, first_game + num_games, chunk_size)
+
+    if workers <= 1:
+        for start, stop in chunks:
+            if absorb(play_chunk(config, start, stop)):
+                break
+        return SimulationReport(stats, 1, time.perf_counter() - started)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        done = False
+        while not done:
+            while len(in_flight) < 2 * workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight.add(pool.submit(play_chunk, config, *chunk))
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done = absorb(future.result()) or done
+
+        for future in in_flight:
+            future.cancel()
+
+    return SimulationReport(stats, workers, time.perf_counter() - started)
@@ -0,0 +1,65 @@
+from typing import List, NamedTuple, Sequence, Tuple, Union
+
+import random
+
+from .components import LuckCard, LUCK_DECK_COMPOSITION
+
+# =====================
+#  Game Snapshot
+# =====================
+
+class GameSnapshot(NamedTuple):
+    """
+    Compact, immutable copy of everything that changes during a game. Inventories are
+    Ingredient masks (see 'engine/bitmask.py'). 'deck' is the exact remaining card order
+    (a tuple of 'LuckCard') for list decks, or the remaining counts for counting decks.
+    """
+
+    pawn_position: int
+    current_player: int
+    masks: Tuple[int, ...]
+    deck: Union[Tuple[LuckCard, ...], Tuple[int, ...]]
+    game_over: bool
+    winner_id: int
+
+# Keyed by type: deck variants hold their own 'LuckCard' objects for the counts they change
+_CARD_CODE = {card.card_type: code for code, card in enumerate(LUCK_DECK_COMPOSITION)}
+
+def deck_counts(deck: Sequence) -> Tuple[int, ...]:
+    """
+    Remaining count of each card (in 'LUCK_DECK_COMPOSITION' order) of a list deck, a
+    'CountingLuckDeck' or a snapshot of either. This hides the order of a list deck,
+    which players can't see.
+    """
+
+    if hasattr(deck, "snapshot"):
+        return deck.snapshot()
+    if deck and isinstance(deck[0], int):
+        return tuple(deck)
+    counts = [0] * len(LUCK_DECK_COMPOSITION)
+    for card in deck:
+        counts[_CARD_CODE[card.card_type]] += 1
+    return tuple(counts)
+
+def state_key(snapshot: GameSnapshot) -> Tuple:
+    """
+    Canonical, hashable key of the information a player can see: pawn, turn, inventories
+    and the deck counts (not its order).
+    """
+
+    return (snapshot.pawn_position, snapshot.current_player, snapshot.masks, deck_counts(snapshot.deck))
+
+def deck_cards(deck: Sequence, rng: random.Random,
+               composition: Sequence[LuckCard] = LUCK_DECK_COMPOSITION) -> List[LuckCard]:
+    """
+    List deck for a snapshot's deck. Counts are dealt into a list shuffled with 'rng', using
+    the cards of 'composition' (the game's rules, see 'CompiledRules.composition').
+    """
+
+    if deck and isinstance(deck[0], LuckCard):
+        return list(deck)
+    cards = []
+    for card, count in zip(composition, deck_counts(deck)):
+        cards.extend([card] * count)
+    rng.shuffle(cards)
+    return cards
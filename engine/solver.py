@@ -0,0 +1,347 @@
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import hashlib
+import os
+
+import numpy as np
+
+from .components import (
+    PizzaCard,
+    LuckCard, LuckCardType, LUCK_DECK_COMPOSITION,
+    BoardSpace, BoardSpaceType, BOARD_LAYOUT
+)
+
+from .bitmask import INGREDIENT_BIT, MASK_INGREDIENTS, recipe_mask
+
+# =====================
+#  Choice Models
+# =====================
+
+# A fixed policy seen as probability distributions over its choices, at mask level.
+# 'State' inside the solver is (position, current player, masks, deck counts).
+
+Distribution = List[Tuple[int, float]]
+
+class ChoiceModel:
+    def ingredient(self, candidates: int, pid: int, masks: Tuple[int, ...]) -> Distribution:
+        """
+        Distribution over the Ingredient bit picked from the 'candidates' mask.
+        """
+        raise NotImplementedError
+
+    def opponent(self, thief: int, opponents: Sequence[int], masks: Tuple[int, ...]) -> Distribution:
+        """
+        Distribution over the victim picked from 'opponents'.
+        """
+        raise NotImplementedError
+
+    def lose(self, pid: int, amount: int, masks: Tuple[int, ...]) -> Distribution:
+        """
+        Distribution over the mask of Ingredients given up.
+        """
+        raise NotImplementedError
+
+class RandomChoiceModel(ChoiceModel):
+    """
+    The exact choice distributions of 'RandomPolicy'.
+    """
+
+    def ingredient(self, candidates: int, pid: int, masks: Tuple[int, ...]) -> Distribution:
+        bits = [INGREDIENT_BIT[ing] for ing in MASK_INGREDIENTS[candidates]]
+        return [(bit, 1 / len(bits)) for bit in bits]
+
+    def opponent(self, thief: int, opponents: Sequence[int], masks: Tuple[int, ...]) -> Distribution:
+        return [(pid, 1 / len(opponents)) for pid in opponents]
+
+    def lose(self, pid: int, amount: int, masks: Tuple[int, ...]) -> Distribution:
+        bits = [INGREDIENT_BIT[ing] for ing in MASK_INGREDIENTS[masks[pid]]]
+        subsets = list(combinations(bits, min(amount, len(bits))))
+        return [(sum(subset), 1 / len(subsets)) for subset in subsets]
+
+# =====================
+#  Markov Chain
+# =====================
+
+@dataclass
+class SolverResult:
+    """
+    Exact outcome of a draft: 'start_win' and 'start_turns' are indexed by starting
+    position - 1, the plain attributes average over a uniformly random starting position.
+    """
+
+    win_probabilities: np.ndarray   # (num_players,)
+    expected_turns: float
+    start_win: np.ndarray           # (board size, num_players)
+    start_turns: np.ndarray         # (board size,)
+    num_states: int
+    iterations: int
+
+class MarkovSolver:
+    """
+    Enumerates every reachable state of a game where all seats follow fixed policies
+    (given as a 'ChoiceModel'), builds the sparse one-turn transition matrix and solves
+    for exact win probabilities and expected game length by value iteration.
+
+    The luck deck is part of the state (remaining counts per card type, with the
+    reshuffle-on-empty rule), which makes the state space grow with the product of the
+    card counts. The full 35-space, 24-card game with real recipes is far beyond
+    'max_states'; smaller recipes, decks or boards solve in seconds.
+    """
+
+    def __init__(self, player_recipes: List[List[PizzaCard]],
+                model: Optional[ChoiceModel] = None,
+                board: Sequence[BoardSpace] = BOARD_LAYOUT,
+                deck: Sequence[LuckCard] = LUCK_DECK_COMPOSITION,
+                die_sides: int = 6,
+                max_states: int = 2_000_000) -> None:
+
+        self.num_players = len(player_recipes)
+        self.recipes = tuple(recipe_mask(recipes) for recipes in player_recipes)
+        self.model = model if model is not None else RandomChoiceModel()
+        self.board = list(board)
+        self.card_types = [card.card_type for card in deck]
+        self.full_deck = tuple(card.count for card in deck)
+        self.die_sides = die_sides
+        self.max_states = max_states
+
+    # === Enumeration ===
+
+    def initial_states(self) -> List[Tuple]:
+        zeros = (0,) * self.num_players
+        return [(pos, 0, zeros, self.full_deck) for pos in range(1, len(self.board) + 1)]
+
+    def build(self):
+        """
+        Depth-first enumeration of the reachable states. Returns the state index and the
+        sparse transitions as (rows, cols, probs) plus the absorbing (rows, winners, probs).
+        """
+
+        index: Dict[Tuple, int] = {}
+        frontier = []
+        for state in self.initial_states():
+            index[state] = len(index)
+            frontier.append(state)
+
+        rows, cols, probs = [], [], []
+        win_rows, winners, win_probs = [], [], []
+
+        while frontier:
+            state = frontier.pop()
+            row = index[state]
+            for target, prob in self.transitions(state).items():
+                if target[0] == "win":
+                    win_rows.append(row)
+                    winners.append(target[1])
+                    win_probs.append(prob)
+                    continue
+                col = index.get(target)
+                if col is None:
+                    col = index[target] = len(index)
+                    frontier.append(target)
+                    if len(index) > self.max_states:
+                        raise ValueError(f"More than {self.max_states} reachable states, "
+                                         "use smaller recipes, deck or board")
+                rows.append(row)
+                cols.append(col)
+                probs.append(prob)
+
+        return (index,
+                (np.array(rows), np.array(cols), np.array(probs)),
+                (np.array(win_rows, dtype=np.int64), np.array(winners, dtype=np.int64),
+                 np.array(win_probs)))
+
+    def transitions(self, state: Tuple) -> Dict[Tuple, float]:
+        """
+        Distribution over the state after one full turn (or ("win", player) when it ends).
+        """
+
+        pos, cur, masks, deck = state
+        out: Dict[Tuple, float] = {}
+        board_size = len(self.board)
+
+        for roll in range(1, self.die_sides + 1):
+            new_pos = (pos + roll - 1) % board_size + 1
+            for (new_masks, new_deck), prob in self._resolve(new_pos, cur, masks, deck):
+                prob /= self.die_sides
+                if self.recipes[cur] & ~new_masks[cur] == 0:
+                    target = ("win", cur)
+                else:
+                    target = (new_pos, (cur + 1) % self.num_players, new_masks, new_deck)
+                out[target] = out.get(target, 0.0) + prob
+
+        return out
+
+    # === Space Resolution ===
+
+    def space_outcomes(self, pos: int, cur: int, masks: Tuple[int, ...],
+                       card_type: Optional[LuckCardType] = None) -> List[Tuple[Tuple[int, ...], float]]:
+        """
+        Inventories after player 'cur' resolves space 'pos' (with 'card_type' as the luck
+        card already drawn), under the choice model. Used by the search policies.
+        """
+
+        if self.board[pos - 1].space_type == BoardSpaceType.GOOD_OR_BAD_LUCK:
+            return self._luck(card_type, cur, masks)
+        return [(new_masks, p) for (new_masks, _), p in self._resolve(pos, cur, masks, self.full_deck)]
+
+    def _resolve(self, pos: int, cur: int, masks: Tuple[int, ...], deck: Tuple[int, ...]):
+        space = self.board[pos - 1]
+
+        if space.space_type == BoardSpaceType.INGREDIENT:
+            bit = INGREDIENT_BIT[space.ingredient] & self.recipes[cur]
+            return [((_with(masks, cur, masks[cur] | bit), deck), 1.0)]
+
+        if space.space_type == BoardSpaceType.CHEF:
+            return [((masks, deck), p) for masks, p in self._gain(cur, masks, 1)]
+
+        if space.space_type == BoardSpaceType.LOSE_EVERYTHING:
+            return [((_with(masks, cur, 0), deck), 1.0)]
+
+        # --- Good or Bad Luck ---
+
+        if not any(deck):
+            deck = self.full_deck
+        total = sum(deck)
+        outcomes = []
+        for code, count in enumerate(deck):
+            if not count:
+                continue
+            new_deck = deck[:code] + (count - 1,) + deck[code + 1:]
+            if not any(new_deck):
+                new_deck = self.full_deck      # Drawing from an empty deck reshuffles a full one
+            for new_masks, p in self._luck(self.card_types[code], cur, masks):
+                outcomes.append(((new_masks, new_deck), p * count / total))
+        return outcomes
+
+    def _luck(self, card_type: LuckCardType, cur: int, masks: Tuple[int, ...]):
+        if card_type == LuckCardType.GAIN_1:
+            return self._gain(cur, masks, 1)
+        if card_type == LuckCardType.GAIN_2:
+            return self._gain(cur, masks, 2)
+        if card_type == LuckCardType.STEAL_1:
+            return self._steal(cur, masks, 1)
+        if card_type == LuckCardType.STEAL_2:
+            return self._steal(cur, masks, 2)
+        if card_type == LuckCardType.LOSE_1:
+            return self._lose(cur, masks, 1)
+        if card_type == LuckCardType.LOSE_2:
+            return self._lose(cur, masks, 2)
+        return [(_with(masks, cur, 0), 1.0)]
+
+    def _gain(self, cur: int, masks: Tuple[int, ...], amount: int, needed: Optional[int] = None):
+        needed = self.recipes[cur] if needed is None else needed
+        if not amount or not needed:
+            return [(masks, 1.0)]
+        outcomes = []
+        for bit, p in self.model.ingredient(needed, cur, masks):
+            gained = _with(masks, cur, masks[cur] | bit)
+            for final, q in self._gain(cur, gained, amount - 1, needed & ~bit):
+                outcomes.append((final, p * q))
+        return outcomes
+
+    def _steal(self, thief: int, masks: Tuple[int, ...], amount: int,
+               opponents: Optional[Tuple[int, ...]] = None):
+        if opponents is None:
+            opponents = tuple(pid for pid in range(self.num_players) if pid != thief and masks[pid])
+        if not amount or not opponents or not self.recipes[thief]:
+            return [(masks, 1.0)]
+        outcomes = []
+        for victim, p in self.model.opponent(thief, opponents, masks):
+            can_steal = self.recipes[thief] & masks[victim]
+            choices = self.model.ingredient(can_steal, thief, masks) if can_steal else [(0, 1.0)]
+            for bit, q in choices:
+                stolen = _with(_with(masks, victim, masks[victim] & ~bit), thief, masks[thief] | bit)
+                for final, r in self._steal(thief, stolen, amount - 1, opponents):
+                    outcomes.append((final, p * q * r))
+        return outcomes
+
+    def _lose(self, cur: int, masks: Tuple[int, ...], amount: int):
+        if not masks[cur]:
+            return [(masks, 1.0)]
+        return [(_with(masks, cur, masks[cur] & ~lost), p) for lost, p in self.model.lose(cur, amount, masks)]
+
+    # === Solving ===
+
+    def solve(self, tol: float = 1e-12, max_iter: int = 1_000_000) -> SolverResult:
+        """
+        Value iteration of W = R + P W (win probabilities) and T = 1 + P T (turns left).
+        """
+
+        index, (rows, cols, probs), (win_rows, winners, win_probs) = self.build()
+        n = len(index)
+
+        reward = np.zeros((n, self.num_players))
+        np.add.at(reward, (win_rows, winners), win_probs)
+
+        win = reward.copy()
+        turns = np.ones(n)
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            new_win = reward + _propagate(rows, cols, probs, win, n)
+            new_turns = 1.0 + _propagate(rows, cols, probs, turns, n)
+            delta = max(np.abs(new_win - win).max(), np.abs(new_turns - turns).max() / max(new_turns.max(), 1))
+            win, turns = new_win, new_turns
+            if delta < tol:
+                break
+
+        starts = [index[state] for state in self.initial_states()]
+        start_win, start_turns = win[starts], turns[starts]
+        return SolverResult(start_win.mean(axis=0), float(start_turns.mean()),
+                            start_win, start_turns, n, iterations)
+
+def _with(masks: Tuple[int, ...], pid: int, mask: int) -> Tuple[int, ...]:
+    return masks[:pid] + (mask,) + masks[pid + 1:]
+
+def _propagate(rows: np.ndarray, cols: np.ndarray, probs: np.ndarray,
+               values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Sparse product P @ values for the COO matrix (rows, cols, probs).
+    """
+
+    if values.ndim == 1:
+        return np.bincount(rows, weights=probs * values[cols], minlength=n)
+    return np.stack([_propagate(rows, cols, probs, values[:, j], n) for j in range(values.shape[1])], axis=1)
+
+# =====================
+#  Disk Memoization
+# =====================
+
+def solver_key(solver: MarkovSolver) -> str:
+    """
+    Hash of everything that determines a solution: recipes, board, deck, die and policy model.
+    """
+
+    description = repr((
+        solver.recipes,
+        [(s.space_type.name, s.ingredient.name if s.ingredient else None) for s in solver.board],
+        [(t.name, c) for t, c in zip(solver.card_types, solver.full_deck)],
+        solver.die_sides,
+        type(solver.model).__name__,
+    ))
+    return hashlib.sha256(description.encode()).hexdigest()[:32]
+
+def solve_draft(player_recipes: List[List[PizzaCard]],
+                cache_dir: Optional[str] = os.path.join("data", "cache", "solver"),
+                **solver_args) -> SolverResult:
+    """
+    Solves a draft, memoizing the result on disk under 'cache_dir' (None disables it).
+    """
+
+    solver = MarkovSolver(player_recipes, **solver_args)
+    path = os.path.join(cache_dir, solver_key(solver) + ".npz") if cache_dir else None
+
+    if path and os.path.exists(path):
+        with np.load(path) as data:
+            return SolverResult(data["win_probabilities"], float(data["expected_turns"]),
+                                data["start_win"], data["start_turns"],
+                                int(data["num_states"]), int(data["iterations"]))
+
+    result = solver.solve()
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(path, win_probabilities=result.win_probabilities, expected_turns=result.expected_turns,
+                 start_win=result.start_win, start_turns=result.start_turns,
+                 num_states=result.num_states, iterations=result.iterations)
+    return result
@@ -0,0 +1,200 @@
+from typing import List, Optional, Sequence, Tuple
+
+import math
+
+import numpy as np
+
+from .components import PizzaCard, LuckCard, LUCK_DECK_COMPOSITION, BoardSpace, BOARD_LAYOUT
+from .bitmask import NUM_INGREDIENTS, POPCOUNT, recipe_mask
+from .snapshot import GameSnapshot, deck_counts
+from .solver import MarkovSolver
+
+"""
+Canonical encoding of live game states as dense integers, so value tables can be flat
+NumPy arrays indexed by 'StateIndex.rank' instead of dicts keyed by state tuples.
+
+A state is (pawn position, current player, Ingredient masks, deck counts), the same as
+'engine/solver.py' and 'engine/snapshot.py' state_key. Equivalent states share a rank:
+
+- Ingredients outside a player's recipes are dropped, and each mask is compressed to one
+  bit per recipe Ingredient. A player never holds their whole recipe in a live state
+  (they would have won), so each mask has 2^k - 1 values for k recipe Ingredients.
+- An empty deck is the full deck: the next draw reshuffles it anyway.
+- Seat rotations that map every player onto one with the same recipes are symmetries of
+  the game, so the current player is rotated into the smallest equivalent seat (e.g. in
+  2 players with equal recipes only seat 0 is ever to move). Swapping two opponents with
+  the same recipes is not: it changes who moves next.
+
+The ranking is mixed radix over those digits, so every rank in [0, size) decodes to a
+distinct canonical state and 'unrank' inverts 'rank'.
+"""
+
+def _seat_period(recipes: Sequence[int]) -> int:
+    """
+    Smallest seat rotation mapping every player onto one with the same recipes.
+    """
+
+    n = len(recipes)
+    for period in range(1, n + 1):
+        if n % period == 0 and all(recipes[i] == recipes[(i + period) % n] for i in range(n)):
+            return period
+    return n
+
+# =====================
+#  State Index
+# =====================
+
+class StateIndex:
+    def __init__(self, player_recipes: List[List[PizzaCard]],
+                board: Sequence[BoardSpace] = BOARD_LAYOUT,
+                deck: Sequence[LuckCard] = LUCK_DECK_COMPOSITION) -> None:
+
+        self.num_players = len(player_recipes)
+        self.board_size = len(board)
+        self.recipes = tuple(recipe_mask(recipes) for recipes in player_recipes)
+        self.full_deck = tuple(card.count for card in deck)
+        self.period = _seat_period(self.recipes)
+
+        # --- Mask Compression (one table per seat, indexed by the raw 10-bit mask) ---
+
+        self._compress = np.zeros((self.num_players, 1 << NUM_INGREDIENTS), dtype=np.int64)
+        self._expand: List[List[int]] = []
+        for seat, recipe in enumerate(self.recipes):
+            bits = [1 << i for i in range(NUM_INGREDIENTS) if recipe >> i & 1]
+            expand = [sum(bit for j, bit in enumerate(bits) if k >> j & 1) for k in range(1 << len(bits))]
+            for k, mask in enumerate(expand):
+                self._compress[seat, mask] = k
+            self._compress[seat] = self._compress[seat][np.arange(1 << NUM_INGREDIENTS) & recipe]
+            self._expand.append(expand)
+
+        # --- Radices (most significant first: position, player, masks, deck) ---
+
+        self.mask_radix = tuple((1 << POPCOUNT[recipe]) - 1 for recipe in self.recipes)
+        self.deck_radix = tuple(count + 1 for count in self.full_deck)
+        self.deck_states = math.prod(self.deck_radix) - 1          # Without the empty deck
+        self.size = self.board_size * self.period * math.prod(self.mask_radix) * self.deck_states
+
+    # === Canonical Form ===
+
+    def rotation(self, current_player: int) -> int:
+        """
+        Seat offset of the canonical form: seat s there is seat (s + offset) here, so per-seat
+        values of a ranked state map back with np.roll(values, offset).
+        """
+
+        return current_player - current_player % self.period
+
+    def canonical(self, pos: int, cur: int, masks: Sequence[int], deck: Sequence[int]) -> Tuple:
+        shift = self.rotation(cur)
+        n = self.num_players
+        masks = tuple(masks[(seat + shift) % n] & self.recipes[seat] for seat in range(n))
+        deck = tuple(deck) if any(deck) else self.full_deck
+        return pos, cur - shift, masks, deck
+
+    # === Ranking ===
+
+    def rank(self, pos: int, cur: int, masks: Sequence[int], deck: Sequence[int]) -> int:
+        """
+        Dense index of the state's canonical form, in [0, size).
+        """
+
+        pos, cur, masks, deck = self.canonical(pos, cur, masks, deck)
+        index = (pos - 1) * self.period + cur
+        for seat, mask in enumerate(masks):
+            digit = int(self._compress[seat, mask])
+            if digit == self.mask_radix[seat]:
+                raise ValueError(f"Seat {seat} holds all their recipe Ingredients, the game is over")
+            index = index * self.mask_radix[seat] + digit
+
+        deck_index = 0
+        for count, radix in zip(deck, self.deck_radix):
+            deck_index = deck_index * radix + count
+        return index * self.deck_states + deck_index - 1
+
+    def unrank(self, index: int) -> Tuple[int, int, Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Canonical (position, current player, masks, deck counts) of 'index'.
+        """
+
+        if not 0 <= index < self.size:
+            raise IndexError(f"State index {index} is outside [0, {self.size})")
+
+        index, deck_index = divmod(index, self.deck_states)
+        deck_index += 1
+        deck = []
+        for radix in reversed(self.deck_radix):
+            deck_index, count = divmod(deck_index, radix)
+            deck.append(count)
+
+        masks = []
+        for seat in reversed(range(self.num_players)):
+            index, digit = divmod(index, self.mask_radix[seat])
+            masks.append(self._expand[seat][digit])
+
+        pos, cur = divmod(index, self.period)
+        return pos + 1, cur, tuple(reversed(masks)), tuple(reversed(deck))
+
+    def rank_snapshot(self, snapshot: GameSnapshot) -> int:
+        return self.rank(snapshot.pawn_position, snapshot.current_player, snapshot.masks,
+                         deck_counts(snapshot.deck))
+
+    def rank_many(self, pos: np.ndarray, cur: np.ndarray, masks: np.ndarray, deck: np.ndarray) -> np.ndarray:
+        """
+        Vectorized 'rank' of n states: 'pos' and 'cur' of shape (n,), 'masks' (n, players)
+        and 'deck' (n, card types). States must be live, like for 'rank'.
+        """
+
+        cur = np.asarray(cur, dtype=np.int64)
+        shift = cur - cur % self.period
+        seats = (np.arange(self.num_players)[None, :] + shift[:, None]) % self.num_players
+        masks = np.take_along_axis(np.asarray(masks, dtype=np.int64), seats, axis=1)
+
+        deck = np.asarray(deck, dtype=np.int64)
+        deck = np.where(deck.any(axis=1, keepdims=True), deck, np.array(self.full_deck))
+
+        index = (np.asarray(pos, dtype=np.int64) - 1) * self.period + cur - shift
+        for seat in range(self.num_players):
+            index = index * self.mask_radix[seat] + self._compress[seat][masks[:, seat]]
+
+        deck_index = np.zeros(len(index), dtype=np.int64)
+        for card, radix in enumerate(self.deck_radix):
+            deck_index = deck_index * radix + deck[:, card]
+        return index * self.deck_states + deck_index - 1
+
+# =====================
+#  Reachable States
+# =====================
+
+def count_reachable(player_recipes: List[List[PizzaCard]],
+                    board: Sequence[BoardSpace] = BOARD_LAYOUT,
+                    deck: Sequence[LuckCard] = LUCK_DECK_COMPOSITION,
+                    max_states: Optional[int] = 50_000_000) -> int:
+    """
+    Number of canonical states reachable from the game's starts (any position, seat 0 to
+    move, empty hands, full deck), by breadth-first search over the transitions of
+    'engine/solver.py'. Raises ValueError when the index is larger than 'max_states'.
+    """
+
+    index = StateIndex(player_recipes, board, deck)
+    if max_states is not None and index.size > max_states:
+        raise ValueError(f"The index has {index.size:,} states, more than {max_states:,}")
+
+    solver = MarkovSolver(player_recipes, board=board, deck=deck)
+    seen = np.zeros(index.size, dtype=bool)
+    frontier = []
+    for state in solver.initial_states():
+        rank = index.rank(*state)
+        if not seen[rank]:
+            seen[rank] = True
+            frontier.append(rank)
+
+    while frontier:
+        state = index.unrank(frontier.pop())
+        for target in solver.transitions(state):
+            if target[0] == "win":
+                continue
+            rank = index.rank(*target)
+            if not seen[rank]:
+                seen[rank] = True
+                frontier.append(rank)
+    return int(seen.sum())
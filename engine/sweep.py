@@ -0,0 +1,183 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from itertools import product
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import random
+import time
+
+from .components import LUCK_DECK_COMPOSITION
+from .rules import STANDARD_RULES, RuleSet, compile_rules
+from .simulation import RunningStats, SimulationConfig, _chunks, play_chunk
+
+"""
+Sweeps over house-rule variants ('engine/rules.py'): how balanced the seats are and how
+long games last under each variant of a grid or a random search.
+
+Every worker process gets the whole list of variants once, through its initializer, and
+compiles them there; the tasks then only name a variant by index and a range of games,
+so no game rebuilds the board or deck tables. All variants play the same game indices
+with the same seed, so they see the same seat streams and their differences are not
+drowned in independent noise (common random numbers, see 'engine/variance.py'). Every
+policy of 'POLICIES' plans on the board, die and deck of the game it is bound to, so any
+of them can play a sweep.
+"""
+
+# =====================
+#  Variants
+# =====================
+
+def grid(base: RuleSet = STANDARD_RULES, die_sides: Sequence[int] = (6,), extra_chefs: Sequence[int] = (0,),
+         decks: Sequence[Dict[str, int]] = ({},), shuffles: Sequence[Optional[int]] = (None,)) -> List[RuleSet]:
+    """
+    Every combination of a die, a number of extra Chef spaces, a deck change (card type
+    name -> count) and a board shuffle seed (None keeps the board order) applied to 'base'.
+    """
+
+    variants = []
+    for sides, chefs, deck, shuffle in product(die_sides, extra_chefs, decks, shuffles):
+        rules = base
+        if shuffle is not None:
+            rules = rules.shuffled(shuffle)
+        if chefs:
+            rules = rules.with_extra_chefs(chefs)
+        if deck:
+            rules = rules.with_deck(**deck)
+        if sides != rules.die_sides:
+            rules = rules.with_die(sides)
+        variants.append(rules)
+    return variants
+
+def random_variants(count: int, seed: int = 0, base: RuleSet = STANDARD_RULES,
+                    die_sides: Sequence[int] = (4, 6, 8, 10, 12), max_extra_chefs: int = 4,
+                    max_card_count: int = 6, shuffle: bool = True) -> List[RuleSet]:
+    """
+    'count' random variants of 'base': a random die, up to 'max_extra_chefs' extra Chef
+    spaces, every card type's count drawn from [0, 'max_card_count'] and, with 'shuffle',
+    a random board order.
+    """
+
+    rng = random.Random(seed)
+    variants = []
+    for _ in range(count):
+        rules = base.shuffled(rng.randrange(2**31)) if shuffle else base
+        chefs = rng.randint(0, max_extra_chefs)
+        if chefs:
+            rules = rules.with_extra_chefs(chefs, rng.randrange(2**31))
+        deck = {card.card_type.name: rng.randint(0, max_card_count) for card in LUCK_DECK_COMPOSITION}
+        if not any(deck.values()):
+            deck[rng.choice(list(deck))] = 1
+        rules = rules.with_deck(**deck).with_die(rng.choice(die_sides))
+        variants.append(rules)
+    return variants
+
+# =====================
+#  Results
+# =====================
+
+@dataclass
+class VariantResult:
+    rules: RuleSet
+    stats: RunningStats
+
+    @property
+    def imbalance(self) -> float:
+        """
+        Largest distance of a seat's win rate from the fair 1 / num_players.
+        """
+
+        fair = 1 / self.stats.num_players
+        return max(abs(self.stats.win_rate(seat) - fair) for seat in range(self.stats.num_players))
+
+    @property
+    def spread(self) -> float:
+        rates = [self.stats.win_rate(seat) for seat in range(self.stats.num_players)]
+        return max(rates) - min(rates)
+
+    @property
+    def turns(self) -> float:
+        return self.stats.turns_mean
+
+@dataclass
+class SweepReport:
+    results: List[VariantResult]
+    workers: int
+    seconds: float
+
+    def ranked(self) -> List[VariantResult]:
+        """
+        The variants from the most to the least balanced.
+        """
+
+        return sorted(self.results, key=lambda result: result.imbalance)
+
+# =====================
+#  Running
+# =====================
+
+# Set once per process by '_init_worker'
+_CONFIG: Optional[SimulationConfig] = None
+_VARIANTS: List[RuleSet] = []
+
+def _init_worker(config: SimulationConfig, variants: List[RuleSet]) -> None:
+    global _CONFIG, _VARIANTS
+    _CONFIG, _VARIANTS = config, variants
+    for rules in variants:
+        compile_rules(rules)
+
+def _play_variant(index: int, start: int, stop: int) -> Tuple[int, int, RunningStats]:
+    """
+    Plays games [start, stop) of variant 'index'. This is the unit of work sent to the workers.
+    """
+
+    stats = RunningStats(_CONFIG.num_players)
+    for result in play_chunk(replace(_CONFIG, rules=_VARIANTS[index]), start, stop):
+        stats.add(result)
+    return index, start, stats
+
+def run_sweep(config: SimulationConfig, variants: List[RuleSet], games: int, workers: int = 1,
+              chunk_size: int = 500, log: Optional[Callable[[str], None]] = None) -> SweepReport:
+    """
+    Plays games [0, 'games') of 'config' under every variant (its own 'rules' are replaced),
+    over a pool of 'workers' processes. Chunks are merged in game order, so the report does
+    not depend on the number of workers or on completion order.
+    """
+
+    started = time.perf_counter()
+    tasks = [(index, *chunk) for index in range(len(variants)) for chunk in _chunks(0, games, chunk_size)]
+    chunks: List[Dict[int, RunningStats]] = [{} for _ in variants]
+    chunks_per_variant = len(tasks) // len(variants) if variants else 0
+
+    def absorb(index: int, start: int, stats: RunningStats) -> None:
+        chunks[index][start] = stats
+        if log and len(chunks[index]) == chunks_per_variant:
+            log(f"{variants[index].name}: done ({sum(len(c) == chunks_per_variant for c in chunks)}/{len(variants)})")
+
+    if workers <= 1:
+        _init_worker(config, variants)
+        for task in tasks:
+            absorb(*_play_variant(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(config, variants)) as pool:
+            pending = iter(tasks)
+            in_flight = set()
+            while True:
+                while len(in_flight) < 2 * workers:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    in_flight.add(pool.submit(_play_variant, *task))
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    absorb(*future.result())
+
+    results = []
+    for rules, by_start in zip(variants, chunks):
+        stats = RunningStats(config.num_players)
+        for start in sorted(by_start):
+            stats.merge(by_start[start])
+        results.append(VariantResult(rules, stats))
+    return SweepReport(results, max(workers, 1), time.perf_counter() - started)
@@ -0,0 +1,449 @@
+from itertools import product
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import hashlib
+import math
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from .components import PizzaCard, LuckCard, LUCK_DECK_COMPOSITION, BoardSpace, BOARD_LAYOUT
+from .bitmask import NUM_INGREDIENTS, POPCOUNT, recipe_mask
+from .batch import BatchGameState
+from .fast_game import FastGameState
+from .policies.random_policy import RandomPolicy
+from .rules import STANDARD_RULES, RuleSet
+from .seeding import game_rngs
+from .solver import MarkovSolver, solver_key
+
+"""
+Endgame tablebase: win probabilities of every state where each player misses at most
+'threshold' recipe Ingredients, precomputed once per draft and stored as a flat
+memory-mapped array. They are exact only for a region without exits and a deck of a
+single card type; otherwise they are approximations (see below).
+
+States are (pawn position, current player, Ingredient masks) and their one-turn
+transitions come from the rules of 'engine/solver.py' MarkovSolver, i.e. the resolution
+of 'GameState._resolve_space' / '_resolve_luck_card' with every choice following the
+solver's 'ChoiceModel' (random play by default). Two things keep the table small enough
+to precompute:
+
+- The luck deck is not part of the state: every luck space draws a card type with its
+  full-deck frequency. With a single card type this is exact; with the real deck it
+  forgets which cards were drawn since the last reshuffle.
+- Turns that leave the region (a LOSE card, a steal or LOSE_EVERYTHING pushing someone
+  past 'threshold') end in boundary values: the win rates of random-play games at the same
+  current player and missing counts, estimated once on 'BatchGameState' (on 'FastGameState'
+  for another board, deck or die, so the estimate plays the table's rules). A region with
+  'threshold' at least every recipe size has no exits and needs no estimate.
+
+A game with chance and cycles has no move-count order to sweep backwards, so the
+retrograde pass is value iteration: wins are the terminal rewards and values flow back
+through W = R + P W + E B until they stop changing.
+
+Generation is split into one chunk per (position, current player) block: worker
+processes enumerate the transitions of a block and save them as '<block>.npz', so an
+interrupted run resumes with the blocks it doesn't have yet. The solved table is written
+as 'values.npy' next to them and opened with mmap_mode="r", so every process playing
+with it shares one copy through the page cache.
+"""
+
+_RADIX = NUM_INGREDIENTS + 1          # Missing counts are digits of the boundary codes
+
+def _region_masks(recipe: int, threshold: int) -> np.ndarray:
+    """
+    Every mask inside 'recipe' missing between 1 and 'threshold' of its Ingredients.
+    """
+
+    size = POPCOUNT[recipe]
+    return np.array([mask for mask in range(recipe + 1)
+                     if mask & ~recipe == 0 and 1 <= size - POPCOUNT[mask] <= threshold], dtype=np.int64)
+
+# =====================
+#  Endgame Index
+# =====================
+
+class EndgameIndex:
+    """
+    Dense ranks of the endgame states: ((position - 1) * num_players + current player)
+    * block + the mixed radix rank of the masks, the last seat being the fastest digit.
+    """
+
+    def __init__(self, recipes: Sequence[int], board_size: int, threshold: int) -> None:
+        self.recipes = tuple(recipes)
+        self.num_players = len(recipes)
+        self.board_size = board_size
+        self.threshold = threshold
+
+        self.masks = [_region_masks(recipe, threshold) for recipe in self.recipes]
+        self.local = np.full((self.num_players, 1 << NUM_INGREDIENTS), -1, dtype=np.int64)
+        for seat, masks in enumerate(self.masks):
+            self.local[seat, masks] = np.arange(len(masks))
+
+        radix = [len(masks) for masks in self.masks]
+        self.strides = [math.prod(radix[seat + 1:]) for seat in range(self.num_players)]
+        self.block = math.prod(radix)
+        self.num_blocks = board_size * self.num_players
+        self.size = self.num_blocks * self.block
+
+    def contains(self, masks: Sequence[int]) -> bool:
+        return all(self.local[seat, mask] >= 0 for seat, mask in enumerate(masks))
+
+    def rank(self, pos: int, cur: int, masks: Sequence[int]) -> int:
+        """
+        Rank of a state, or -1 when it is outside the region.
+        """
+
+        rank = ((pos - 1) * self.num_players + cur) * self.block
+        for seat, mask in enumerate(masks):
+            local = self.local[seat, mask]
+            if local < 0:
+                return -1
+            rank += int(local) * self.strides[seat]
+        return rank
+
+    def unrank(self, rank: int) -> Tuple[int, int, Tuple[int, ...]]:
+        block, rest = divmod(rank, self.block)
+        masks = []
+        for seat in range(self.num_players):
+            local, rest = divmod(rest, self.strides[seat])
+            masks.append(int(self.masks[seat][local]))
+        return block // self.num_players + 1, block % self.num_players, tuple(masks)
+
+    def block_states(self, block: int):
+        """
+        The states of one block, in rank order.
+        """
+
+        pos, cur = block // self.num_players + 1, block % self.num_players
+        for masks in product(*(masks.tolist() for masks in self.masks)):
+            yield pos, cur, masks
+
+    def boundary_code(self, cur: int, masks: Sequence[int]) -> int:
+        """
+        Boundary key of a state: the current player and every player's missing count.
+        """
+
+        code = cur
+        for recipe, mask in zip(self.recipes, masks):
+            code = code * _RADIX + POPCOUNT[recipe & ~mask]
+        return code
+
+# =====================
+#  Boundary Values
+# =====================
+
+def rule_set(board: Sequence[BoardSpace] = BOARD_LAYOUT, deck: Sequence[LuckCard] = LUCK_DECK_COMPOSITION,
+             die_sides: int = 6) -> Optional[RuleSet]:
+    """
+    The 'RuleSet' of a solver's board, deck and die, or None for the standard rules.
+    """
+
+    counts = {card.card_type: 0 for card in LUCK_DECK_COMPOSITION}
+    for card in deck:
+        counts[card.card_type] += card.count
+    rules = RuleSet("tablebase", tuple(s.ingredient.name if s.ingredient else s.space_type.name for s in board),
+                    tuple(counts.values()), die_sides)
+    standard = (rules.board, rules.deck, rules.die_sides) == \
+        (STANDARD_RULES.board, STANDARD_RULES.deck, STANDARD_RULES.die_sides)
+    return None if standard else rules
+
+def _batch_visits(player_recipes: List[List[PizzaCard]], games: int, seed: int):
+    """
+    (game, code) of every turn-start state of 'games' batched standard games, and the winners.
+    """
+
+    num_players = len(player_recipes)
+    game = BatchGameState(games, num_players, player_recipes, np.random.default_rng(seed))
+    recipes = game.recipe_masks[0].astype(np.int64)
+    popcount = np.array(POPCOUNT, dtype=np.int64)
+
+    visited_games, visited_codes = [], []
+    while len(game.live):
+        g = game.live
+        code = game.current[g].astype(np.int64)
+        for seat in range(num_players):
+            code = code * _RADIX + popcount[recipes[seat] & ~game.masks[g, seat].astype(np.int64)]
+        visited_games.append(g)
+        visited_codes.append(code)
+        game.step()
+    return np.concatenate(visited_games), np.concatenate(visited_codes), game.winner.astype(np.int64)
+
+def _rules_visits(player_recipes: List[List[PizzaCard]], games: int, seed: int, rules: RuleSet):
+    """
+    The same as '_batch_visits', one 'FastGameState' game after the other under 'rules'.
+    """
+
+    num_players = len(player_recipes)
+    recipes = [recipe_mask(recipes) for recipes in player_recipes]
+    visited_games, visited_codes, winners = [], [], []
+    for k in range(games):
+        board_rng, seat_rngs = game_rngs(seed, k, num_players)
+        game = FastGameState(num_players, player_recipes, [RandomPolicy(rng) for rng in seat_rngs],
+                             rng=board_rng, rules=rules)
+        while not game.game_over:
+            code = game.current_player_index
+            for recipe, mask in zip(recipes, game.masks):
+                code = code * _RADIX + POPCOUNT[recipe & ~mask]
+            visited_games.append(k)
+            visited_codes.append(code)
+            game.step()
+        winners.append(game.winner_id)
+    return (np.array(visited_games, dtype=np.int64), np.array(visited_codes, dtype=np.int64),
+            np.array(winners, dtype=np.int64))
+
+def estimate_boundary(player_recipes: List[List[PizzaCard]], games: int = 20_000,
+                      seed: int = 0, rules: Optional[RuleSet] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Win rates of random-play games under 'rules' (the standard rules by default) by
+    boundary code (see 'EndgameIndex.boundary_code'), over every turn-start state of
+    'games' games. Returns the sorted codes and a (codes, num_players) array of win rates,
+    shrunk towards 1 / num_players by one pseudo-game so rarely visited codes stay sensible.
+    """
+
+    num_players = len(player_recipes)
+    if rules is None:
+        visited_games, visited_codes, winners = _batch_visits(player_recipes, games, seed)
+    else:
+        visited_games, visited_codes, winners = _rules_visits(player_recipes, games, seed, rules)
+
+    codes, inverse = np.unique(visited_codes, return_inverse=True)
+    wins = np.zeros((len(codes), num_players))
+    np.add.at(wins, (inverse, winners[visited_games]), 1.0)
+    visits = np.bincount(inverse, minlength=len(codes))[:, None]
+    return codes, (wins + 1 / num_players) / (visits + 1)
+
+# =====================
+#  Generation
+# =====================
+
+_worker_state: Optional[Tuple[MarkovSolver, EndgameIndex, str]] = None
+
+def _init_worker(solver: MarkovSolver, index: EndgameIndex, directory: str) -> None:
+    global _worker_state
+    _worker_state = (solver, index, directory)
+
+def chunk_path(directory: str, block: int) -> str:
+    return os.path.join(directory, "chunks", f"{block:05d}.npz")
+
+def build_block(solver: MarkovSolver, index: EndgameIndex, block: int) -> dict:
+    """
+    Transitions of one block as arrays: in-region (rows, cols, probs) with rows local to
+    the block and cols global ranks, wins (win_rows, winners, win_probs) and exits
+    (exit_rows, exit_codes, exit_probs).
+    """
+
+    rows, cols, probs = [], [], []
+    win_rows, winners, win_probs = [], [], []
+    exit_rows, exit_codes, exit_probs = [], [], []
+
+    for row, (pos, cur, masks) in enumerate(index.block_states(block)):
+        # Targets differ by deck counts only on luck draws, which the table forgets
+        merged = {}
+        for target, prob in solver.transitions((pos, cur, masks, solver.full_deck)).items():
+            key = target if target[0] == "win" else target[:3]
+            merged[key] = merged.get(key, 0.0) + prob
+
+        for target, prob in merged.items():
+            if target[0] == "win":
+                win_rows.append(row)
+                winners.append(target[1])
+                win_probs.append(prob)
+                continue
+            col = index.rank(*target)
+            if col >= 0:
+                rows.append(row)
+                cols.append(col)
+                probs.append(prob)
+            else:
+                exit_rows.append(row)
+                exit_codes.append(index.boundary_code(target[1], target[2]))
+                exit_probs.append(prob)
+
+    return {
+        "rows": np.array(rows, dtype=np.int32), "cols": np.array(cols, dtype=np.int32),
+        "probs": np.array(probs), "win_rows": np.array(win_rows, dtype=np.int32),
+        "winners": np.array(winners, dtype=np.int8), "win_probs": np.array(win_probs),
+        "exit_rows": np.array(exit_rows, dtype=np.int32), "exit_codes": np.array(exit_codes, dtype=np.int64),
+        "exit_probs": np.array(exit_probs),
+    }
+
+def _build_chunk(block: int) -> int:
+    solver, index, directory = _worker_state
+    path = chunk_path(directory, block)
+    with open(path + ".tmp", "wb") as f:
+        np.savez_compressed(f, **build_block(solver, index, block))
+    os.replace(path + ".tmp", path)
+    return block
+
+def tablebase_key(solver: MarkovSolver, threshold: int, boundary_games: int) -> str:
+    return hashlib.sha256(f"{solver_key(solver)}:{threshold}:{boundary_games}".encode()).hexdigest()[:32]
+
+def generate_tablebase(player_recipes: List[List[PizzaCard]], threshold: int = 2,
+                       cache_dir: str = os.path.join("data", "cache", "tablebase"),
+                       workers: Optional[int] = None, boundary_games: int = 20_000,
+                       board: Sequence[BoardSpace] = BOARD_LAYOUT,
+                       deck: Sequence[LuckCard] = LUCK_DECK_COMPOSITION,
+                       die_sides: int = 6, tol: float = 1e-10, max_iter: int = 100_000,
+                       log: Optional[Callable[[str], None]] = None) -> "Tablebase":
+    """
+    Builds (or resumes, or just opens) the tablebase of a draft under 'cache_dir' and
+    returns it. Blocks are built by 'workers' processes (all cores by default).
+    """
+
+    solver = MarkovSolver(player_recipes, board=board, deck=deck, die_sides=die_sides)
+    index = EndgameIndex(solver.recipes, len(solver.board), threshold)
+    directory = os.path.join(cache_dir, tablebase_key(solver, threshold, boundary_games))
+    values_path = os.path.join(directory, "values.npy")
+    if os.path.exists(values_path):
+        return Tablebase.open(directory, index)
+
+    os.makedirs(os.path.join(directory, "chunks"), exist_ok=True)
+    pending = [block for block in range(index.num_blocks) if not os.path.exists(chunk_path(directory, block))]
+    started = time.perf_counter()
+    if log:
+        log(f"{index.size:,} states in {index.num_blocks} blocks, {len(pending)} to build")
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        _init_worker(solver, index, directory)
+        done = (_build_chunk(block) for block in pending)
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(solver, index, directory))
+        done = pool.imap_unordered(_build_chunk, pending)
+    try:
+        for count, _ in enumerate(done, 1):
+            if log and (count % max(1, len(pending) // 20) == 0 or count == len(pending)):
+                log(f"{count}/{len(pending)} blocks, {time.perf_counter() - started:.1f}s")
+    finally:
+        if workers > 1:
+            pool.close()
+            pool.join()
+
+    rules = rule_set(board, deck, die_sides)
+    values, boundary, iterations = _solve(player_recipes, index, directory, boundary_games, rules, tol, max_iter)
+    if log:
+        log(f"solved in {iterations} iterations, {time.perf_counter() - started:.1f}s")
+
+    np.savez(os.path.join(directory, "boundary.npz"), codes=boundary[0], values=boundary[1])
+    table = np.lib.format.open_memmap(values_path + ".tmp", mode="w+", dtype=np.float32, shape=values.shape)
+    table[:] = values
+    table.flush()
+    del table
+    os.replace(values_path + ".tmp", values_path)
+    return Tablebase.open(directory, index)
+
+def _solve(player_recipes: List[List[PizzaCard]], index: EndgameIndex, directory: str,
+           boundary_games: int, rules: Optional[RuleSet], tol: float, max_iter: int):
+    """
+    Assembles the block chunks and runs the value iteration, with boundary games played
+    under 'rules' (None for the standard rules).
+    """
+
+    rows, cols, probs = [], [], []
+    reward = np.zeros((index.size, index.num_players))
+    exit_rows, exit_codes, exit_probs = [], [], []
+    for block in range(index.num_blocks):
+        offset = block * index.block
+        with np.load(chunk_path(directory, block)) as chunk:
+            rows.append(chunk["rows"] + offset)
+            cols.append(chunk["cols"].astype(np.int64))
+            probs.append(chunk["probs"])
+            np.add.at(reward, (chunk["win_rows"] + offset, chunk["winners"].astype(np.int64)), chunk["win_probs"])
+            exit_rows.append(chunk["exit_rows"] + offset)
+            exit_codes.append(chunk["exit_codes"])
+            exit_probs.append(chunk["exit_probs"])
+
+    rows, cols, probs = (np.concatenate(column) for column in (rows, cols, probs))
+    exit_rows, exit_codes, exit_probs = (np.concatenate(column) for column in (exit_rows, exit_codes, exit_probs))
+
+    codes = np.zeros(0, dtype=np.int64)
+    boundary_values = np.zeros((0, index.num_players))
+    if len(exit_rows):
+        codes, boundary_values = estimate_boundary(player_recipes, boundary_games, rules=rules)
+        reward += _exit_values(exit_rows, exit_codes, exit_probs, codes, boundary_values, index)
+
+    values = reward.copy()
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        new_values = reward + np.stack([np.bincount(rows, weights=probs * values[cols, seat], minlength=index.size)
+                                        for seat in range(index.num_players)], axis=1)
+        delta = np.abs(new_values - values).max() if index.size else 0.0
+        values = new_values
+        if delta < tol:
+            break
+    return values, (codes, boundary_values), iterations
+
+def _exit_values(exit_rows, exit_codes, exit_probs, codes, boundary_values, index) -> np.ndarray:
+    """
+    Expected boundary value of every state's exits.
+    """
+
+    values = _lookup(codes, boundary_values, exit_codes, index.num_players)
+    out = np.zeros((index.size, index.num_players))
+    np.add.at(out, exit_rows, exit_probs[:, None] * values)
+    return out
+
+def _lookup(codes: np.ndarray, boundary_values: np.ndarray, keys: np.ndarray, num_players: int) -> np.ndarray:
+    """
+    Boundary values of 'keys', uniform for codes never seen in the estimate.
+    """
+
+    out = np.full((len(keys), num_players), 1 / num_players)
+    if len(codes):
+        at = np.minimum(np.searchsorted(codes, keys), len(codes) - 1)
+        found = codes[at] == keys
+        out[found] = boundary_values[at[found]]
+    return out
+
+# =====================
+#  Tablebase
+# =====================
+
+class Tablebase:
+    """
+    A solved tablebase: 'values[rank]' holds every player's win probability from the
+    turn-start state of that rank (see 'EndgameIndex').
+    """
+
+    def __init__(self, index: EndgameIndex, values: np.ndarray,
+                 boundary_codes: np.ndarray, boundary_values: np.ndarray) -> None:
+        self.index = index
+        self.values = values
+        self.boundary_codes = boundary_codes
+        self.boundary_values = boundary_values
+
+    @classmethod
+    def open(cls, directory: str, index: EndgameIndex) -> "Tablebase":
+        values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r")
+        with np.load(os.path.join(directory, "boundary.npz")) as boundary:
+            codes, boundary_values = boundary["codes"], boundary["values"]
+        if values.shape != (index.size, index.num_players):
+            raise ValueError(f"Tablebase in {directory} doesn't match its index")
+        return cls(index, values, codes, boundary_values)
+
+    def value(self, pos: int, cur: int, masks: Sequence[int]) -> Optional[np.ndarray]:
+        """
+        Win probabilities from a turn-start state, or None outside the region.
+        """
+
+        rank = self.index.rank(pos, cur, masks)
+        return self.values[rank] if rank >= 0 else None
+
+    def afterstate_value(self, pos: int, mover: int, masks: Sequence[int]) -> np.ndarray:
+        """
+        Win probabilities once 'mover' ends their turn on 'pos' with 'masks': a win, a
+        tablebase state, or the boundary estimate outside the region.
+        """
+
+        num_players = self.index.num_players
+        if self.index.recipes[mover] & ~masks[mover] == 0:
+            return np.eye(num_players)[mover]
+        cur = (mover + 1) % num_players
+        value = self.value(pos, cur, masks)
+        if value is not None:
+            return value
+        code = np.array([self.index.boundary_code(cur, masks)])
+        return _lookup(self.boundary_codes, self.boundary_values, code, num_players)[0]
@@ -0,0 +1,258 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import itertools
+import json
+import math
+import os
+import time
+
+from .simulation import GameResult, SimulationConfig, play_chunk
+
+"""
+Round-robin tournaments between policies (names registered in 'engine/simulation.py'
+POLICIES).
+
+Every lineup (multiset of policies with at least two different ones) is played in every
+distinct seating, or only its rotations for large tables. All seatings use the same root
+seed, so game k of every seating rolls the same dice and draws the same luck cards
+('engine/seeding.py'): the comparison between policies is made on common random numbers
+and seat advantage cancels out over the rotations.
+
+Chunks of games are the unit of work. Each idle worker pulls the next chunk from the shared
+schedule, so slow lineups (e.g. MCTS) don't hold the others back. Progress is checkpointed
+to JSON after every chunk and a rerun with the same checkpoint skips what is done.
+
+Ratings fit a Luce choice model to the winners (Hunter's MM algorithm): policy i wins a game
+with probability s_i / sum of s over the seats, which is Bradley-Terry / Elo for two
+players. Strengths are reported on the Elo scale, 1500 on average.
+"""
+
+Seating = Tuple[str, ...]
+
+@dataclass(frozen=True)
+class TournamentConfig:
+    policies: Tuple[str, ...]
+    num_players: int
+    draft: Tuple[Tuple[str, ...], ...]
+    games_per_seating: int = 200
+    seed: int = 0
+    engine: str = "fast"
+    all_permutations: bool = True       # Else only the rotations of each lineup
+
+    def game_config(self, seating: Seating) -> SimulationConfig:
+        return SimulationConfig(self.num_players, self.draft, seating, self.seed, self.engine)
+
+def seatings(config: TournamentConfig) -> List[Seating]:
+    """
+    Every seating of every lineup, each once.
+    """
+
+    policies = sorted(set(config.policies))
+    result = []
+    for lineup in itertools.combinations_with_replacement(policies, config.num_players):
+        if len(set(lineup)) < min(2, len(policies)):
+            continue
+        if config.all_permutations:
+            arrangements = set(itertools.permutations(lineup))
+        else:
+            arrangements = {lineup[i:] + lineup[:i] for i in range(len(lineup))}
+        result.extend(sorted(arrangements))
+    return result
+
+def schedule(config: TournamentConfig, chunk_size: int) -> List[Tuple[Seating, int, int]]:
+    """
+    (seating, start, stop) of every chunk, game index ranges interleaved across seatings so
+    partial results stay balanced.
+    """
+
+    chunks = []
+    for start in range(0, config.games_per_seating, chunk_size):
+        stop = min(start + chunk_size, config.games_per_seating)
+        chunks.extend((seating, start, stop) for seating in seatings(config))
+    return chunks
+
+def play_seating_chunk(config: TournamentConfig, seating: Seating, start: int, stop: int) -> List[GameResult]:
+    return play_chunk(config.game_config(seating), start, stop)
+
+# =====================
+#  Results
+# =====================
+
+@dataclass
+class SeatingRecord:
+    games: int = 0
+    wins: List[int] = field(default_factory=list)      # Per seat
+    unfinished: int = 0
+    done: List[int] = field(default_factory=list)      # Start index of every finished chunk
+
+@dataclass
+class TournamentResult:
+    config: TournamentConfig
+    records: Dict[Seating, SeatingRecord] = field(default_factory=dict)
+
+    def add(self, seating: Seating, start: int, results: List[GameResult]) -> None:
+        record = self.records.setdefault(seating, SeatingRecord(wins=[0] * len(seating)))
+        for result in results:
+            record.games += 1
+            if result.winner >= 0:
+                record.wins[result.winner] += 1
+            else:
+                record.unfinished += 1
+        record.done.append(start)
+
+    @property
+    def games(self) -> int:
+        return sum(record.games for record in self.records.values())
+
+    def policies(self) -> List[str]:
+        return sorted(set(self.config.policies))
+
+    # === Aggregates ===
+
+    def policy_stats(self) -> Dict[str, Tuple[int, int, float]]:
+        """
+        Per policy: (seats played, wins, wins / fair share), where the fair share of a seat
+        is 1 / num_players, so 1.0 is an average policy.
+        """
+
+        seats = dict.fromkeys(self.policies(), 0)
+        wins = dict.fromkeys(self.policies(), 0)
+        for seating, record in self.records.items():
+            for seat, policy in enumerate(seating):
+                seats[policy] += record.games
+                wins[policy] += record.wins[seat]
+        n = self.config.num_players
+        return {p: (seats[p], wins[p], wins[p] * n / seats[p] if seats[p] else 0.0) for p in seats}
+
+    def win_matrix(self) -> Dict[str, Dict[str, float]]:
+        """
+        matrix[a][b]: of the games a and b played together and one of them won, the share
+        a won. Only the winner of a game is known, so this is the head-to-head record.
+        """
+
+        policies = self.policies()
+        beat = {a: dict.fromkeys(policies, 0) for a in policies}
+        for seating, record in self.records.items():
+            for seat, winner in enumerate(seating):
+                for other in set(seating) - {winner}:
+                    beat[winner][other] += record.wins[seat]
+        return {a: {b: beat[a][b] / (beat[a][b] + beat[b][a]) if a != b and beat[a][b] + beat[b][a] else math.nan
+                    for b in policies} for a in policies}
+
+    def ratings(self, iterations: int = 500, tolerance: float = 1e-9) -> Dict[str, float]:
+        """
+        Elo-scale ratings of the Luce choice model fitted to every game's winner.
+        """
+
+        policies = self.policies()
+        wins = dict.fromkeys(policies, 0)
+        for seating, record in self.records.items():
+            for seat, policy in enumerate(seating):
+                wins[policy] += record.wins[seat]
+
+        strength = dict.fromkeys(policies, 1.0)
+        for _ in range(iterations):
+            denominator = dict.fromkeys(policies, 0.0)
+            for seating, record in self.records.items():
+                decided = record.games - record.unfinished
+                total = sum(strength[p] for p in seating)
+                for policy in seating:
+                    denominator[policy] += decided / total
+
+            # A policy that never won would go to zero strength, half a win keeps it finite
+            updated = {p: max(wins[p], 0.5) / denominator[p] if denominator[p] else 1.0 for p in policies}
+            scale = math.exp(sum(math.log(s) for s in updated.values()) / len(updated))
+            updated = {p: s / scale for p, s in updated.items()}
+            change = max(abs(updated[p] - strength[p]) for p in policies)
+            strength = updated
+            if change < tolerance:
+                break
+
+        return {p: 1500 + 400 * math.log10(strength[p]) for p in policies}
+
+    # === Checkpoints ===
+
+    def to_dict(self) -> dict:
+        return {
+            "config": asdict(self.config),
+            "seatings": [{"seating": list(seating), **asdict(record)} for seating, record in self.records.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TournamentResult":
+        raw = data["config"]
+        config = TournamentConfig(**{**raw, "policies": tuple(raw["policies"]),
+                                     "draft": tuple(tuple(recipes) for recipes in raw["draft"])})
+        result = cls(config)
+        for entry in data["seatings"]:
+            seating = tuple(entry.pop("seating"))
+            result.records[seating] = SeatingRecord(**entry)
+        return result
+
+def _save_checkpoint(path: str, result: TournamentResult, chunk_size: int) -> None:
+    """
+    Writes through a temporary file, so an interruption never leaves a broken checkpoint.
+    """
+
+    with open(path + ".tmp", "w") as f:
+        json.dump({**result.to_dict(), "chunk_size": chunk_size}, f)
+    os.replace(path + ".tmp", path)
+
+# =====================
+#  Running
+# =====================
+
+def run_tournament(config: TournamentConfig, workers: int = 1, chunk_size: int = 50,
+                   checkpoint: Optional[str] = None,
+                   log: Optional[Callable[[str], None]] = None) -> TournamentResult:
+    """
+    Plays every chunk of the schedule not already in 'checkpoint' over 'workers' processes
+    and returns the results. With 'checkpoint', progress is saved there after every chunk.
+    """
+
+    result = TournamentResult(config)
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            data = json.load(f)
+        result = TournamentResult.from_dict(data)
+        if result.config != config or data["chunk_size"] != chunk_size:
+            raise ValueError(f"{checkpoint} belongs to a different tournament or chunk size")
+
+    done = {(seating, start) for seating, record in result.records.items() for start in record.done}
+    pending = [chunk for chunk in schedule(config, chunk_size) if (chunk[0], chunk[1]) not in done]
+    total, completed = len(pending), 0
+    started = time.perf_counter()
+
+    def absorb(chunk: Tuple[Seating, int, int], results: List[GameResult]) -> None:
+        nonlocal completed
+        result.add(chunk[0], chunk[1], results)
+        completed += 1
+        if checkpoint:
+            _save_checkpoint(checkpoint, result, chunk_size)
+        if log:
+            log(f"{completed}/{total} chunks, {result.games:,} games, {time.perf_counter() - started:.1f}s")
+
+    if workers <= 1:
+        for chunk in pending:
+            absorb(chunk, play_seating_chunk(config, *chunk))
+        return result
+
+    queue = iter(pending)
+    in_flight: Dict = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(in_flight) < 2 * workers:
+                chunk = next(queue, None)
+                if chunk is None:
+                    break
+                in_flight[pool.submit(play_seating_chunk, config, *chunk)] = chunk
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                absorb(in_flight.pop(future), future.result())
+
+    return result
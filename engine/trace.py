@@ -0,0 +1,353 @@
+from typing import Dict, List, Optional, Tuple
+
+import os
+import struct
+
+import numpy as np
+
+from .components import BoardSpace, BoardSpaceType, LuckCard, BOARD_LAYOUT, LUCK_DECK_COMPOSITION
+from .bitmask import mask_of
+from .rules import RuleSet, compile_rules
+
+# =====================
+#  File Format
+# =====================
+
+# A trace file is a 16-byte header, the board the games were played on (one space code per
+# position, zero-padded to a multiple of 8 bytes; the die is in the header) and then
+# fixed-width little-endian records, one per turn, each game's turns stored back to back.
+# Boards and dice of rule variants (see 'engine/rules.py') are written the same way, so
+# rolls and spaces are always derived from the board actually played. A record only holds
+# what cannot be derived: the pawn position after the roll, the luck card drawn and every
+# inventory as an Ingredient mask (see 'engine/bitmask.py'), so a 3-player game costs 8
+# bytes per turn.
+#
+# The '<path>.idx' sidecar holds one INDEX_DTYPE entry per game (offset, turn count and the
+# state the game was attached in); it is appended after the records it points to, so both
+# files can be read while a run is still writing them. Everything else about a turn (mover,
+# roll, space, victim, gained and lost Ingredients, the win) follows from consecutive records
+# and is expanded by 'TraceReader.turns()'.
+
+MAGIC = b"PZTR"
+VERSION = 2
+MAX_PLAYERS = 6
+
+HEADER = struct.Struct("<4sHHIHH")           # magic, version, record size, num players, board size, die sides
+
+def record_dtype(num_players: int) -> np.dtype:
+    return np.dtype([
+        ("position", "u1"),
+        ("card", "i1"),                         # Index into LUCK_DECK_COMPOSITION, -1 when no card was drawn
+        ("masks", "<u2", (num_players,)),       # Every inventory after the turn
+    ])
+
+INDEX_DTYPE = np.dtype([
+    ("game", "<u4"),
+    ("start", "<u8"),                           # Record offset of the game's first turn
+    ("count", "<u4"),
+    ("first_player", "u1"),                     # State when the game was attached
+    ("first_position", "u1"),
+    ("won", "u1"),                              # Whether the last turn won the game
+    ("first_masks", "<u2", (MAX_PLAYERS,)),
+], align=True)
+
+TURN_DTYPE = np.dtype([
+    ("game", "<u4"),
+    ("turn", "<u4"),                            # 1-based, counted from when the game was attached
+    ("player", "u1"),
+    ("roll", "u1"),
+    ("position", "u1"),
+    ("space", "u1"),                            # SPACE_CODES below
+    ("card", "i1"),
+    ("victim", "i1"),                           # First opponent the mover took Ingredients from, -1 if none
+    ("gained", "<u2"),                          # Ingredients the mover gained this turn
+    ("lost", "<u2"),                            # Ingredients the mover lost this turn
+    ("won", "?"),
+])
+
+SPACE_CODES: Dict[BoardSpaceType, int] = {space_type: i for i, space_type in enumerate(BoardSpaceType)}
+LUCK_SPACE = SPACE_CODES[BoardSpaceType.GOOD_OR_BAD_LUCK]
+
+# 'auto()' numbers the card types 1-7 in LUCK_DECK_COMPOSITION order, so a drawn card's code
+# is its type's value - 1, read without hashing the Enum (variant decks' own cards included)
+assert all(card.card_type._value_ == i + 1 for i, card in enumerate(LUCK_DECK_COMPOSITION))
+
+
+def space_codes(board: List[BoardSpace]) -> np.ndarray:
+    """
+    SPACE_CODES of every position of 'board' (entry 0 unused), as written after the header.
+    """
+
+    return np.array([0] + [SPACE_CODES[space.space_type] for space in board], dtype=np.uint8)
+
+SPACE_BY_POSITION = space_codes(BOARD_LAYOUT)      # Of the standard board
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+def _board_block(size: int) -> int:
+    return -(-size // 8) * 8
+
+# =====================
+#  Writer
+# =====================
+
+class TraceWriter:
+    """
+    Buffered streaming writer. 'attach(game, game_id)' hooks a game so every 'step()'
+    records the turn; finished games are written out once 'buffer_records' turns are
+    pending, together with their index entries.
+
+    The game itself only hands over the raw row of each turn (position and inventories)
+    and every luck card it draws, both straight into plain lists, and a whole buffer is
+    packed at once. That keeps tracing cheap enough to leave on.
+    """
+
+    def __init__(self, path: str, num_players: int, buffer_records: int = 8192,
+                 rules: Optional[RuleSet] = None) -> None:
+        assert num_players <= MAX_PLAYERS
+        self.path = path
+        self.num_players = num_players
+        self.rules = compile_rules(rules)
+        self.space_by_position = space_codes(self.rules.board)
+        self.dtype = record_dtype(num_players)
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.dtype.itemsize, num_players,
+                                    self.rules.board_size, self.rules.die_sides))
+        self.file.write(self.space_by_position[1:].tobytes().ljust(_board_block(self.rules.board_size), b"\0"))
+        self.index_file = open(index_path(path), "wb")
+
+        self.capacity = buffer_records
+        self.pending: List[GameTracer] = []             # Finished games, rows and cards still as the games left them
+        self.buffered = 0                               # Their turns
+        self.active: List[GameTracer] = []
+        self.written = 0
+
+    def attach(self, game, game_id: int) -> "GameTracer":
+        """
+        Starts tracing 'game' (from its current state) under 'game_id'.
+        """
+
+        assert len(game.players) == self.num_players
+        if game.rules is not self.rules and game.rules.rules != self.rules.rules:
+            raise ValueError(f"The game plays the '{game.rules.rules.name}' rules, "
+                             f"the trace records '{self.rules.rules.name}' games")
+        self._collect()
+        if hasattr(game, "masks"):
+            masks = tuple(game.masks)
+        else:
+            masks = tuple(mask_of(player.ingredients) for player in game.players)
+
+        tracer = GameTracer(game, game_id, masks)
+        game.tracer = tracer
+        self.active.append(tracer)
+        return tracer
+
+    def detach(self, game) -> None:
+        """
+        Stops tracing 'game'; the turns recorded so far are kept.
+        """
+
+        tracer = game.tracer
+        self.active.remove(tracer)
+        self._queue(tracer)
+
+    def _collect(self) -> None:
+        """
+        Queues the games that ended since the last call. Games are only written out whole,
+        so each one's records stay contiguous in the file.
+        """
+
+        if any(tracer.game.game_over for tracer in self.active):
+            for tracer in [tracer for tracer in self.active if tracer.game.game_over]:
+                self.active.remove(tracer)
+                self._queue(tracer)
+
+    def _queue(self, tracer: "GameTracer") -> None:
+        tracer.count = len(tracer.rows) // (1 + self.num_players)
+        tracer.won = tracer.game.game_over
+        tracer.game.tracer = None
+        tracer.game = None
+        self.pending.append(tracer)
+        self.buffered += tracer.count
+        if self.buffered >= self.capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes out the finished games queued so far.
+        """
+
+        if not self.pending:
+            return
+        # All pending rows become one '<u2' array laid out like the records (position and card
+        # share the first column), so the ints are converted once per flush, not once per game
+        width = 1 + self.num_players
+        flat = []
+        for tracer in self.pending:
+            flat += tracer.rows
+        rows = np.fromiter(flat, dtype="<u2", count=len(flat)).reshape(-1, width)
+        values = bytes([card.card_type._value_ for tracer in self.pending for card in tracer.cards])
+        codes = np.frombuffer(values, dtype="u1") - 1
+        card = np.full(len(rows), 0xFF, dtype="<u2")                                # -1 as a byte
+        card[self.space_by_position[rows[:, 0]] == LUCK_SPACE] = codes             # One draw per luck space
+        rows[:, 0] |= card << 8
+        self.file.write(rows.data)
+        self.file.flush()
+
+        pad = (0,) * (MAX_PLAYERS - self.num_players)
+        entries = []
+        for tracer in self.pending:
+            entries.append((tracer.game_id, self.written, tracer.count, tracer.first_player,
+                            tracer.first_position, tracer.won, tracer.first_masks + pad))
+            self.written += tracer.count
+        self.index_file.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+        self.index_file.flush()
+
+        self.pending = []
+        self.buffered = 0
+
+    def close(self) -> None:
+        """
+        Writes out every traced game, finished or not, and closes the files.
+        """
+
+        if self.file.closed:
+            return
+        for tracer in list(self.active):
+            self.detach(tracer.game)
+        self.flush()
+        self.file.close()
+        self.index_file.close()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class GameTracer:
+    """
+    What a traced game sees as 'game.tracer': 'record(row)' after every turn, with
+    row = (position, *inventory masks), and 'draw(card)' for every luck card.
+    """
+
+    __slots__ = ("game", "game_id", "rows", "cards", "record", "draw",
+                 "first_player", "first_position", "first_masks", "count", "won")
+
+    def __init__(self, game, game_id: int, masks: Tuple[int, ...]) -> None:
+        self.game = game
+        self.game_id = game_id
+        self.rows: List[int] = []
+        self.cards: List[LuckCard] = []
+        self.record = self.rows.extend
+        self.draw = self.cards.append
+        self.first_player = game.current_player_index
+        self.first_position = game.pawn_position
+        self.first_masks = masks
+        self.count = 0
+        self.won = False
+
+# =====================
+#  Reader
+# =====================
+
+class TraceReader:
+    """
+    Memory-maps a trace file: 'records' is a zero-copy NumPy structured array over the
+    file, 'index' one over the sidecar, and 'game(game_id)' a zero-copy slice of one
+    game's records. 'turns()' expands records into TURN_DTYPE rows.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            magic, version, record_size, num_players, board_size, die_sides = HEADER.unpack(f.read(HEADER.size))
+            board = f.read(board_size)
+        self.num_players = num_players
+        self.dtype = record_dtype(num_players)
+        if magic != MAGIC or version != VERSION or record_size != self.dtype.itemsize:
+            raise ValueError(f"{path} is not a version {VERSION} trace file")
+        self.board_size = board_size
+        self.die_sides = die_sides
+        self.space_by_position = np.frombuffer(b"\0" + board, dtype=np.uint8)
+
+        self.records = _memmap(path, self.dtype, HEADER.size + _board_block(board_size))
+        self.index = _memmap(index_path(path), INDEX_DTYPE, 0)
+        self._lookup = {int(game): i for i, game in enumerate(self.index["game"])}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def games(self) -> np.ndarray:
+        return self.index["game"]
+
+    def game(self, game_id: int) -> np.ndarray:
+        entry = self.index[self._lookup[game_id]]
+        start = int(entry["start"])
+        return self.records[start:start + int(entry["count"])]
+
+    def turns(self, game_id: Optional[int] = None) -> np.ndarray:
+        """
+        Expanded turns of one game, or of every game in file order.
+        """
+
+        if game_id is None:
+            entries, records = self.index, self.records[:int(self.index["count"].sum())]
+        else:
+            entries, records = self.index[[self._lookup[game_id]]], self.game(game_id)
+        return expand_turns(records, entries, self.num_players, self.space_by_position)
+
+def _memmap(path: str, dtype: np.dtype, offset: int) -> np.ndarray:
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if not count:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+def expand_turns(records: np.ndarray, entries: np.ndarray, num_players: int,
+                 space_by_position: np.ndarray = SPACE_BY_POSITION) -> np.ndarray:
+    """
+    Derives TURN_DTYPE rows from the records of the games in 'entries', stored back to back,
+    on the board whose 'space_codes' are 'space_by_position' (the standard board by default).
+    """
+
+    n = len(records)
+    counts = entries["count"].astype(np.int64)
+    starts = np.cumsum(counts) - counts
+    local = np.arange(n) - np.repeat(starts, counts)            # Turn index within its game
+    played = counts > 0
+    starts, ends = starts[played], (starts + counts - 1)[played]
+
+    turns = np.zeros(n, dtype=TURN_DTYPE)
+    turns["game"] = np.repeat(entries["game"], counts)
+    turns["turn"] = local + 1
+    mover = (np.repeat(entries["first_player"].astype(np.int64), counts) + local) % num_players
+    turns["player"] = mover
+
+    position = records["position"].astype(np.int64)
+    before = np.empty_like(position)
+    before[1:] = position[:-1]
+    before[starts] = entries["first_position"][played]
+    turns["position"] = position
+    turns["roll"] = (position - before - 1) % (len(space_by_position) - 1) + 1
+    turns["space"] = space_by_position[position]
+    turns["card"] = records["card"]
+
+    after = records["masks"].astype(np.int64)
+    previous = np.empty_like(after)
+    previous[1:] = after[:-1]
+    previous[starts] = entries["first_masks"][played, :num_players]
+
+    rows = np.arange(n)
+    mover_after, mover_before = after[rows, mover], previous[rows, mover]
+    gained = mover_after & ~mover_before
+    turns["gained"] = gained
+    turns["lost"] = mover_before & ~mover_after
+
+    victim = np.full(n, -1, dtype=np.int8)
+    for pid in reversed(range(num_players)):                    # Lowest victim id wins
+        victim[(previous[:, pid] & ~after[:, pid] & gained != 0) & (mover != pid)] = pid
+    turns["victim"] = victim
+
+    turns["won"][ends[entries["won"][played].astype(bool)]] = True
+    return turns
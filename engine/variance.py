@@ -0,0 +1,283 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .components import LUCK_DECK_COMPOSITION
+from .rules import CHEF_KIND, LOSE_EVERYTHING_KIND, LUCK_KIND, RuleSet, compile_rules
+from .simulation import Z_95, SimulationConfig, build_game
+
+"""
+Variance-reduced estimates of the seats' win rates, each reported next to what plain
+Monte Carlo would have needed for the same precision.
+
+- Antithetic streams: game k is played twice, on its own streams and on their mirror
+  image ('engine/seeding.py' AntitheticRandom: every die d becomes sides + 1 - d), and the
+  pair mean is one observation.
+- Common random numbers: two configurations compared on the same game indices and seed,
+  so they see the same dice and decks and the noise cancels in the difference.
+- Control variates: per seat, the LOSE_EVERYTHING and Chef landings and the draws of every
+  luck card type (LOSE_ALL, LOSE_1, ...) minus their conditional probabilities turn by turn:
+  the chance of a roll from the previous position reaching such a space, the card type's
+  share of the cards left in the deck. These martingale sums have mean exactly zero under
+  any policy, so regressing the win indicators on them removes the luck they explain
+  without biasing the estimate.
+- Stratification: the same number of games from every starting position, weighted
+  equally like the uniform random start they replace.
+
+The landing odds, space positions and deck come from the configuration's rules
+('engine/rules.py'), so the controls stay zero-mean under every house-rule variant.
+
+An 'Estimate' holds the estimator's variance and the per-game variance of plain Monte
+Carlo (estimated from the same games), so 'variance_reduction' is how many times fewer
+games the method needs for the same confidence interval and 'effective_games' how many
+plain games its games are worth.
+"""
+
+class _Tables(NamedTuple):
+    """
+    What the controls of one rule set need, positions indexed from 1.
+    """
+
+    board_size: int
+    lose_everything: FrozenSet[int]
+    chef: FrozenSet[int]
+    luck: FrozenSet[int]
+    lose_everything_odds: List[float]
+    chef_odds: List[float]
+    full_deck: List[int]
+
+def _landing_odds(spaces: FrozenSet[int], board_size: int, die_sides: int) -> List[float]:
+    """
+    Chance that one roll from position p (index) lands on one of 'spaces'.
+    """
+
+    return [0.0] + [sum((p + roll - 1) % board_size + 1 in spaces for roll in range(1, die_sides + 1)) / die_sides
+                    for p in range(1, board_size + 1)]
+
+_TABLES: Dict[Optional[RuleSet], _Tables] = {}
+
+def _tables(rules: Optional[RuleSet]) -> _Tables:
+    tables = _TABLES.get(rules)
+    if tables is None:
+        compiled = compile_rules(rules)
+        positions = {kind: frozenset(p for p, k in enumerate(compiled.board_kind) if k == kind)
+                     for kind in (LOSE_EVERYTHING_KIND, CHEF_KIND, LUCK_KIND)}
+        size, sides = compiled.board_size, compiled.die_sides
+        tables = _TABLES[rules] = _Tables(
+            size, positions[LOSE_EVERYTHING_KIND], positions[CHEF_KIND], positions[LUCK_KIND],
+            _landing_odds(positions[LOSE_EVERYTHING_KIND], size, sides),
+            _landing_odds(positions[CHEF_KIND], size, sides),
+            [card.count for card in compiled.composition],
+        )
+    return tables
+
+_CARD_CODES = {card.card_type: code for code, card in enumerate(LUCK_DECK_COMPOSITION)}
+NUM_CONTROLS = 2 + len(LUCK_DECK_COMPOSITION)        # Per seat: LOSE_EVERYTHING, Chef, one per card type
+
+class Observations(NamedTuple):
+    """
+    Per-game outcomes of a chunk: the winning seat (-1 at the turn cap), the game length
+    and the (games, NUM_CONTROLS * num_players) control variates: the LOSE_EVERYTHING terms
+    of every seat, then the Chef terms, then the terms of each card type in
+    'LUCK_DECK_COMPOSITION' order.
+    """
+
+    winners: np.ndarray
+    turns: np.ndarray
+    controls: np.ndarray
+
+# =====================
+#  Observing Games
+# =====================
+
+class _EventLog:
+    """
+    The 'game.tracer' of an observed game: pawn positions after every turn and the luck
+    cards drawn, all the controls need.
+    """
+
+    __slots__ = ("positions", "cards", "record", "draw")
+
+    def __init__(self, start: int) -> None:
+        self.positions = [start]
+        self.cards = []
+        positions = self.positions
+        self.record = lambda row: positions.append(row[0])
+        self.draw = self.cards.append
+
+def _controls(log: _EventLog, num_players: int, tables: _Tables) -> np.ndarray:
+    """
+    Martingale control variates of one game (seat 0 moves first).
+    """
+
+    controls = [[0.0] * num_players for _ in range(NUM_CONTROLS)]
+    full_deck = tables.full_deck
+    deck = list(full_deck)
+    total = sum(deck)
+    cards = iter(log.cards)
+    for turn, (before, after) in enumerate(zip(log.positions, log.positions[1:])):
+        seat = turn % num_players
+        controls[0][seat] += (after in tables.lose_everything) - tables.lose_everything_odds[before]
+        controls[1][seat] += (after in tables.chef) - tables.chef_odds[before]
+        if after in tables.luck:
+            if not total:
+                deck, total = list(full_deck), sum(full_deck)
+            code = _CARD_CODES[next(cards).card_type]
+            for c, count in enumerate(deck):
+                controls[2 + c][seat] -= count / total
+            controls[2 + code][seat] += 1
+            deck[code] -= 1
+            total -= 1
+    return np.array(controls).reshape(-1)
+
+def observe_chunk(config: SimulationConfig, start: int, stop: int, starting_pos: int = 0,
+                  antithetic: bool = False, max_turns: int = 100_000) -> Observations:
+    """
+    Plays games [start, stop) of a run ('build_game' seeding) and records their outcomes.
+    """
+
+    n = stop - start
+    winners = np.full(n, -1, dtype=np.int64)
+    turns = np.zeros(n, dtype=np.int64)
+    controls = np.zeros((n, NUM_CONTROLS * config.num_players))
+    tables = _tables(config.rules)
+    for i, k in enumerate(range(start, stop)):
+        game = build_game(config, k, starting_pos, antithetic)
+        log = game.tracer = _EventLog(game.pawn_position)
+        while not game.game_over and turns[i] < max_turns:
+            game.step()
+            turns[i] += 1
+        winners[i] = game.winner_id
+        controls[i] = _controls(log, config.num_players, tables)
+    return Observations(winners, turns, controls)
+
+def _observe(config: SimulationConfig, tasks: List[Tuple], workers: int) -> List[Observations]:
+    """
+    Runs 'observe_chunk(config, *task)' for every task, in order.
+    """
+
+    if workers <= 1:
+        return [observe_chunk(config, *task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(observe_chunk, [config] * len(tasks), *zip(*tasks)))
+
+def _split(start: int, stop: int, chunk_size: int, *extra) -> List[Tuple]:
+    return [(lo, min(lo + chunk_size, stop), *extra) for lo in range(start, stop, chunk_size)]
+
+def _concat(observations: List[Observations]) -> Observations:
+    return Observations(*(np.concatenate(column) for column in zip(*observations)))
+
+def _indicators(winners: np.ndarray, num_players: int) -> np.ndarray:
+    return (winners[:, None] == np.arange(num_players)).astype(float)
+
+# =====================
+#  Estimates
+# =====================
+
+@dataclass
+class Estimate:
+    method: str
+    games: int                      # Games played, twins and both configurations included
+    mean: np.ndarray                # Per seat
+    variance: np.ndarray            # Of the estimator, per seat
+    plain_variance: np.ndarray      # Per game of plain Monte Carlo, per seat
+
+    def ci(self) -> np.ndarray:
+        """
+        Half-width of the 95% normal confidence interval of every seat's estimate.
+        """
+
+        return Z_95 * np.sqrt(self.variance)
+
+    @property
+    def variance_reduction(self) -> np.ndarray:
+        plain = self.plain_variance / self.games
+        return np.divide(plain, self.variance, out=np.ones_like(plain), where=self.variance > 0)
+
+    @property
+    def effective_games(self) -> np.ndarray:
+        return self.games * self.variance_reduction
+
+def _sample_variance(values: np.ndarray) -> np.ndarray:
+    return values.var(axis=0, ddof=1) if len(values) > 1 else np.zeros(values.shape[1:])
+
+def estimate_plain(config: SimulationConfig, games: int, workers: int = 1,
+                   chunk_size: int = 500) -> Estimate:
+    y = _indicators(_concat(_observe(config, _split(0, games, chunk_size), workers)).winners, config.num_players)
+    variance = _sample_variance(y)
+    return Estimate("plain", games, y.mean(axis=0), variance / games, variance)
+
+def estimate_antithetic(config: SimulationConfig, games: int, workers: int = 1,
+                        chunk_size: int = 500) -> Estimate:
+    """
+    'games' // 2 games, each with its antithetic twin.
+    """
+
+    pairs = games // 2
+    plain = _concat(_observe(config, _split(0, pairs, chunk_size), workers))
+    twins = _concat(_observe(config, _split(0, pairs, chunk_size, 0, True), workers))
+    y, y_twin = (_indicators(o.winners, config.num_players) for o in (plain, twins))
+    means = (y + y_twin) / 2
+    return Estimate("antithetic", 2 * pairs, means.mean(axis=0), _sample_variance(means) / pairs,
+                    _sample_variance(np.concatenate([y, y_twin])))
+
+def estimate_control_variates(config: SimulationConfig, games: int, workers: int = 1,
+                              chunk_size: int = 500) -> Estimate:
+    """
+    Win indicators adjusted by their least-squares fit on the zero-mean controls.
+    """
+
+    observations = _concat(_observe(config, _split(0, games, chunk_size), workers))
+    y = _indicators(observations.winners, config.num_players)
+    c = observations.controls
+    centered = c - c.mean(axis=0)
+    beta = np.linalg.lstsq(centered, y - y.mean(axis=0), rcond=None)[0]
+    adjusted = y - c @ beta
+    # The card type terms of a seat sum to zero, so count the controls by rank
+    dof = max(games - 1 - np.linalg.matrix_rank(centered), 1)
+    variance = ((adjusted - adjusted.mean(axis=0)) ** 2).sum(axis=0) / dof
+    return Estimate("control variates", games, adjusted.mean(axis=0), variance / games, _sample_variance(y))
+
+def estimate_stratified(config: SimulationConfig, games: int, workers: int = 1,
+                        chunk_size: int = 500) -> Estimate:
+    """
+    'games' // board size games from every starting position, game indices [0, per stratum) each.
+    """
+
+    board_size = _tables(config.rules).board_size
+    per_stratum = max(games // board_size, 2)
+    tasks = [task for pos in range(1, board_size + 1) for task in _split(0, per_stratum, chunk_size, pos)]
+    winners = _concat(_observe(config, tasks, workers)).winners.reshape(board_size, per_stratum)
+    y = _indicators(winners.reshape(-1), config.num_players).reshape(board_size, per_stratum, -1)
+
+    weight = 1 / board_size
+    mean = weight * y.mean(axis=1).sum(axis=0)
+    variance = weight ** 2 * (y.var(axis=1, ddof=1) / per_stratum).sum(axis=0)
+    flat = y.reshape(-1, config.num_players)
+    return Estimate("stratified", len(flat), mean, variance, _sample_variance(flat))
+
+def compare(config_a: SimulationConfig, config_b: SimulationConfig, games: int,
+            workers: int = 1, chunk_size: int = 500) -> Estimate:
+    """
+    Difference A - B of every seat's win rate from 'games' // 2 game indices played under
+    both configurations with A's seed, against two independent plain runs of that size.
+    """
+
+    pairs = games // 2
+    config_b = replace(config_b, seed=config_a.seed)
+    y_a, y_b = (_indicators(_concat(_observe(config, _split(0, pairs, chunk_size), workers)).winners,
+                            config.num_players) for config in (config_a, config_b))
+    difference = y_a - y_b
+    # Independent runs of 'pairs' games each would have variance (var A + var B) / pairs
+    plain = 2 * (_sample_variance(y_a) + _sample_variance(y_b))
+    return Estimate("common random numbers", 2 * pairs, difference.mean(axis=0),
+                    _sample_variance(difference) / pairs, plain)
+
+ESTIMATORS: Dict[str, Callable[..., Estimate]] = {
+    "plain": estimate_plain,
+    "antithetic": estimate_antithetic,
+    "control": estimate_control_variates,
+    "stratified": estimate_stratified,
+}
@@ -0,0 +1,72 @@
+import numpy as np
+
+from engine.bitmask import NUM_INGREDIENTS
+from engine.decision_game import (
+    CHOOSE_OPPONENT, NUM_DECISIONS,
+    BOARD_SIZE, NUM_CARD_TYPES, FULL_DECK, DecisionGame, num_actions
+)
+
+"""
+Array views of 'engine/decision_game.py' for the environments: observations and action
+masks written into preallocated NumPy rows.
+
+Action masks follow the flat action space of 'DecisionGame.act', with opponents relative
+to the decider just like the seats of an observation are relative to the observer.
+"""
+
+# =====================
+#  Observations
+# =====================
+
+# Bits of every 10-bit mask as a float row, so a mask is written with one slice assignment
+MASK_BITS = np.array([[mask >> i & 1 for i in range(NUM_INGREDIENTS)] for mask in range(1 << NUM_INGREDIENTS)],
+                     dtype=np.float32)
+
+def observation_size(num_players: int) -> int:
+    """
+    Pawn position (one-hot), decision type (one-hot), remaining deck share of every card type,
+    then recipe and inventory bits of every seat, starting with the observer's.
+    """
+
+    return BOARD_SIZE + NUM_DECISIONS + NUM_CARD_TYPES + 2 * NUM_INGREDIENTS * num_players
+
+def write_observation(game: DecisionGame, seat: int, out: np.ndarray) -> np.ndarray:
+    """
+    Writes 'seat's view of 'game' into the preallocated row 'out' and returns it.
+    """
+
+    out.fill(0.0)
+    if game.pawn_position:
+        out[game.pawn_position - 1] = 1.0
+    offset = BOARD_SIZE
+    if game.decision >= 0 and game.decider == seat:
+        out[offset + game.decision] = 1.0
+    offset += NUM_DECISIONS
+    counts = game.deck_counts
+    for i in range(NUM_CARD_TYPES):
+        out[offset + i] = counts[i] / FULL_DECK
+    offset += NUM_CARD_TYPES
+
+    n = game.num_players
+    for k in range(n):
+        other = (seat + k) % n
+        out[offset:offset + NUM_INGREDIENTS] = MASK_BITS[game.recipe_masks[other]]
+        out[offset + NUM_INGREDIENTS:offset + 2 * NUM_INGREDIENTS] = MASK_BITS[game.masks[other]]
+        offset += 2 * NUM_INGREDIENTS
+    return out
+
+def action_mask(game: DecisionGame, out: np.ndarray) -> np.ndarray:
+    """
+    Writes the legal actions (1) of the current decision of 'game' into 'out'.
+    """
+
+    out.fill(0)
+    if game.game_over:
+        return out
+    if game.decision == CHOOSE_OPPONENT:
+        for k in range(1, game.num_players):
+            if game.choices >> (game.decider + k) % game.num_players & 1:
+                out[NUM_INGREDIENTS + k] = 1
+    else:
+        out[:NUM_INGREDIENTS] = MASK_BITS[game.choices]
+    return out
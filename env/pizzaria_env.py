@@ -0,0 +1,138 @@
+from typing import Dict, List, Optional
+
+import functools
+import random
+
+import numpy as np
+from gymnasium import spaces
+from pettingzoo import AECEnv
+from pettingzoo.utils import wrappers
+
+from engine.components import PizzaCard
+from scripts.test_random_game import get_default_recipe_draft
+
+from .core import DecisionGame, action_mask, num_actions, observation_size, write_observation
+
+# =====================
+#  AEC Environment
+# =====================
+
+def env(**kwargs) -> AECEnv:
+    """
+    The environment with PettingZoo's standard safety wrappers.
+    """
+
+    wrapped = raw_env(**kwargs)
+    wrapped = wrappers.AssertOutOfBoundsWrapper(wrapped)
+    return wrappers.OrderEnforcingWrapper(wrapped)
+
+class raw_env(AECEnv):
+    """
+    Crazy Pizzaria as a PettingZoo AEC environment. Only decision points are agent turns:
+    dice, spaces and cards that need no choice are played out in between (see 'engine/decision_game.py'),
+    so 'agent_selection' is whoever has to choose next, usually several times in a row.
+
+    Observations are dicts of 'observation' (float32, see 'core.observation_size') and
+    'action_mask' (int8, 1 = legal). Both arrays are preallocated per agent and rewritten
+    on every 'observe' call, so copy them to keep them. The winner gets +1, everyone else -1.
+    """
+
+    metadata = {"name": "crazy_pizzaria_v0", "render_modes": ["human"], "is_parallelizable": False}
+
+    def __init__(self, num_players: int = 3, player_recipes: Optional[List[List[PizzaCard]]] = None,
+                max_turns: int = 10_000, render_mode: Optional[str] = None) -> None:
+
+        super().__init__()
+        self.num_players = num_players
+        self.player_recipes = player_recipes or get_default_recipe_draft(num_players)
+        self.max_turns = max_turns
+        self.render_mode = render_mode
+
+        self.possible_agents = [f"player_{i}" for i in range(num_players)]
+        self._seat = {agent: i for i, agent in enumerate(self.possible_agents)}
+        size, actions = observation_size(num_players), num_actions(num_players)
+        self._observation_space = spaces.Dict({
+            "observation": spaces.Box(0.0, 1.0, (size,), dtype=np.float32),
+            "action_mask": spaces.Box(0, 1, (actions,), dtype=np.int8),
+        })
+        self._action_space = spaces.Discrete(actions)
+
+        self._buffers: Dict[str, Dict[str, np.ndarray]] = {
+            agent: {"observation": np.zeros(size, dtype=np.float32), "action_mask": np.zeros(actions, dtype=np.int8)}
+            for agent in self.possible_agents
+        }
+        self.game = DecisionGame(num_players, self.player_recipes, random.Random())
+
+    @functools.lru_cache(maxsize=None)
+    def observation_space(self, agent: str) -> spaces.Space:
+        return self._observation_space
+
+    @functools.lru_cache(maxsize=None)
+    def action_space(self, agent: str) -> spaces.Space:
+        return self._action_space
+
+    # === AEC Methods ===
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None) -> None:
+        if seed is not None or not hasattr(self, "_rng"):
+            self._rng = random.Random(seed)
+        self.game.reset(self._rng)
+
+        self.agents = self.possible_agents[:]
+        self.rewards = {agent: 0.0 for agent in self.agents}
+        self._cumulative_rewards = {agent: 0.0 for agent in self.agents}
+        self.terminations = {agent: False for agent in self.agents}
+        self.truncations = {agent: False for agent in self.agents}
+        self.infos = {agent: {} for agent in self.agents}
+        self._settle()
+
+    def observe(self, agent: str) -> Dict[str, np.ndarray]:
+        buffers = self._buffers[agent]
+        seat = self._seat[agent]
+        write_observation(self.game, seat, buffers["observation"])
+        if self.game.decider == seat:
+            action_mask(self.game, buffers["action_mask"])
+        else:
+            buffers["action_mask"].fill(0)
+        return buffers
+
+    def step(self, action: int) -> None:
+        agent = self.agent_selection
+        if self.terminations[agent] or self.truncations[agent]:
+            self._was_dead_step(action)
+            return
+
+        self._cumulative_rewards[agent] = 0.0
+        self.game.act(int(action))
+        self._settle()
+        self._accumulate_rewards()
+        if self.render_mode == "human":
+            self.render()
+
+    def _settle(self) -> None:
+        """
+        Points 'agent_selection' at the next decider, or ends the episode for everyone.
+        """
+
+        game = self.game
+        self.rewards = {agent: 0.0 for agent in self.agents}
+        if game.game_over:
+            for agent in self.agents:
+                self.rewards[agent] = 1.0 if self._seat[agent] == game.winner_id else -1.0
+                self.terminations[agent] = True
+        elif game.turns >= self.max_turns:
+            for agent in self.agents:
+                self.truncations[agent] = True
+
+        if game.game_over or game.turns >= self.max_turns:
+            self.agent_selection = self.agents[game.current_player_index]
+        else:
+            self.agent_selection = self.possible_agents[game.decider]
+
+    def render(self) -> None:
+        game = self.game
+        inventories = "  ".join(f"P{i}:{mask:010b}" for i, mask in enumerate(game.masks))
+        print(f"Turn {game.turns:4d} | Pawn {game.pawn_position:2d} | {inventories}")
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,120 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+
+from engine.components import PizzaCard
+from engine.seeding import spawn_rng
+from scripts.test_random_game import get_default_recipe_draft
+
+from .core import DecisionGame, action_mask, num_actions, observation_size, write_observation
+
+# =====================
+#  Vector Environment
+# =====================
+
+class PizzariaVectorEnv(VectorEnv):
+    """
+    Many games stepped in lockstep for self-play: every sub-environment is waiting on one
+    decision, 'step(actions)' answers all of them and plays each game on to its next one.
+
+    Row i of the observations is the view of the seat deciding in game i ('infos["seat"]'),
+    with the legal actions in 'infos["action_mask"]'. The reward is that of the seat whose
+    action was just applied: +1 if the game ended with its win, -1 if it ended otherwise.
+    When a game ends, 'infos["final_rewards"]' holds every seat's result (rows flagged in
+    '"_final_rewards"') and the game is immediately reset in the same step, so the batch
+    always stays full.
+
+    Every array returned (observations, rewards, flags and infos) is preallocated once and
+    rewritten in place on every step; copy whatever has to outlive the next step.
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs: int, num_players: int = 3,
+                player_recipes: Optional[List[List[PizzaCard]]] = None,
+                max_turns: int = 10_000, seed: int = 0) -> None:
+
+        self.num_envs = num_envs
+        self.num_players = num_players
+        self.max_turns = max_turns
+        recipes = player_recipes or get_default_recipe_draft(num_players)
+        self.games = [DecisionGame(num_players, recipes, spawn_rng(seed, i)) for i in range(num_envs)]
+
+        size, actions = observation_size(num_players), num_actions(num_players)
+        self.single_observation_space = spaces.Box(0.0, 1.0, (size,), dtype=np.float32)
+        self.single_action_space = spaces.Discrete(actions)
+        self.observation_space = spaces.Box(0.0, 1.0, (num_envs, size), dtype=np.float32)
+        self.action_space = spaces.MultiDiscrete(np.full(num_envs, actions))
+
+        # --- Preallocated Buffers ---
+        self._observations = np.zeros((num_envs, size), dtype=np.float32)
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._terminations = np.zeros(num_envs, dtype=bool)
+        self._truncations = np.zeros(num_envs, dtype=bool)
+        self._infos = {
+            "seat": np.zeros(num_envs, dtype=np.int64),
+            "action_mask": np.zeros((num_envs, actions), dtype=np.int8),
+            "final_rewards": np.zeros((num_envs, num_players), dtype=np.float32),
+            "_final_rewards": np.zeros(num_envs, dtype=bool),
+        }
+        self.episodes = 0                       # Finished games, for logging
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None) -> Tuple[np.ndarray, dict]:
+        for i, game in enumerate(self.games):
+            game.reset(spawn_rng(seed, i) if seed is not None else None)
+            self._start(i)
+        self._rewards.fill(0.0)
+        self._terminations.fill(False)
+        self._truncations.fill(False)
+        self._infos["_final_rewards"].fill(False)
+        for i in range(self.num_envs):
+            self._write(i)
+        return self._observations, self._infos
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        rewards, terminations, truncations = self._rewards, self._terminations, self._truncations
+        final_rewards, finished = self._infos["final_rewards"], self._infos["_final_rewards"]
+        rewards.fill(0.0)
+        terminations.fill(False)
+        truncations.fill(False)
+        finished.fill(False)
+
+        for i, action in enumerate(np.asarray(actions).tolist()):
+            game = self.games[i]
+            seat = game.decider
+            game.act(action)
+
+            if game.game_over:
+                rewards[i] = 1.0 if game.winner_id == seat else -1.0
+                terminations[i] = True
+                final_rewards[i].fill(-1.0)
+                final_rewards[i, game.winner_id] = 1.0
+                finished[i] = True
+                self.episodes += 1
+                self._start(i, reset=True)
+            elif game.turns >= self.max_turns:
+                truncations[i] = True
+                self._start(i, reset=True)
+            self._write(i)
+
+        return self._observations, rewards, terminations, truncations, self._infos
+
+    def _start(self, i: int, reset: bool = False) -> None:
+        """
+        (Re)starts game i until it reaches a decision. Games that end before anyone had to
+        choose have nobody to reward and are skipped.
+        """
+
+        game = self.games[i]
+        if reset:
+            game.reset()
+        while game.game_over:
+            game.reset()
+
+    def _write(self, i: int) -> None:
+        game = self.games[i]
+        self._infos["seat"][i] = game.decider
+        write_observation(game, game.decider, self._observations[i])
+        action_mask(game, self._infos["action_mask"][i])
@@ -0,0 +1,308 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import argparse
+import math
+
+import pygame
+
+from engine.bitmask import INGREDIENTS
+from engine.components import BoardSpace, BoardSpaceType, BOARD_LAYOUT, Ingredient, LUCK_DECK_COMPOSITION
+from engine.replay import ReplayReader, ReplayState
+
+"""
+Pygame viewer of a replay file ('engine/replay.py'): the board with the shared pawn, every
+player's inventory and the luck deck, at any turn of any archived game.
+
+Every frame seeks its (game, turn) from the memory-mapped file, so scrubbing costs one
+keyframe and at most 'keyframe_interval' deltas whatever the archive's size, and nothing
+of the games but their table is ever loaded.
+
+    Left / Right        one turn back / forward
+    PgUp / PgDn         one keyframe interval back / forward
+    Home / End          first / last turn
+    Up / Down           previous / next game (PgUp / PgDn with Shift: 100 games)
+    Space               play / pause
+    + / -               faster / slower playback
+    Mouse               drag the game or the turn slider
+
+Replays don't store the board, so variant boards are drawn with 'board=' (the standard
+layout by default).
+"""
+
+WIDTH, HEIGHT = 1100, 760
+BOARD_CENTER = (380, 350)
+BOARD_RADIUS = 280
+SPACE_RADIUS = 22
+
+GAME_SLIDER = pygame.Rect(40, 680, 1020, 14)
+TURN_SLIDER = pygame.Rect(40, 720, 1020, 14)
+
+BACKGROUND = (245, 238, 224)
+TEXT = (40, 32, 28)
+MUTED = (150, 140, 130)
+PAWN = (200, 30, 30)
+HIGHLIGHT = (255, 200, 40)
+
+SPACE_COLORS: Dict[BoardSpaceType, Tuple[int, int, int]] = {
+    BoardSpaceType.CHEF: (240, 240, 240),
+    BoardSpaceType.GOOD_OR_BAD_LUCK: (120, 80, 170),
+    BoardSpaceType.LOSE_EVERYTHING: (30, 30, 30),
+}
+
+INGREDIENT_COLORS: Dict[Ingredient, Tuple[int, int, int]] = {
+    Ingredient.SALAMI: (178, 34, 52),
+    Ingredient.BROCCOLI: (34, 120, 50),
+    Ingredient.EGGS: (250, 220, 120),
+    Ingredient.OLIVES: (60, 60, 40),
+    Ingredient.PEAS: (120, 200, 80),
+    Ingredient.CORN: (240, 190, 30),
+    Ingredient.HAM: (240, 150, 160),
+    Ingredient.CHEESE: (250, 240, 170),
+    Ingredient.TOMATO: (230, 60, 40),
+    Ingredient.ONION: (200, 170, 210),
+}
+
+CARD_NAMES = [card.card_type.name for card in LUCK_DECK_COMPOSITION]
+
+def _space_color(space: BoardSpace) -> Tuple[int, int, int]:
+    return INGREDIENT_COLORS[space.ingredient] if space.ingredient else SPACE_COLORS[space.space_type]
+
+def _space_label(space: BoardSpace) -> str:
+    if space.ingredient:
+        return space.ingredient.name[:3].title()
+    return {BoardSpaceType.CHEF: "Chef", BoardSpaceType.GOOD_OR_BAD_LUCK: "Luck",
+            BoardSpaceType.LOSE_EVERYTHING: "LOSE"}[space.space_type]
+
+# =====================
+#  Viewer
+# =====================
+
+class ReplayViewer:
+    def __init__(self, reader: ReplayReader, board: Sequence[BoardSpace] = BOARD_LAYOUT, fps: int = 60,
+                 turns_per_second: float = 8.0) -> None:
+        self.reader = reader
+        self.board = list(board)
+        self.fps = fps
+        self.turns_per_second = turns_per_second
+
+        self.game_ids: List[int] = sorted(int(game) for game in reader.games["game"])
+        self.index = 0
+        self.turn = 0
+        self.playing = False
+        self.dragging: Optional[pygame.Rect] = None
+        self._clock = 0.0                   # Playback time not yet spent on a turn
+        self._state: Optional[ReplayState] = None
+
+        angle = 2 * math.pi / len(self.board)
+        self.centers = [(BOARD_CENTER[0] + BOARD_RADIUS * math.sin(i * angle),
+                         BOARD_CENTER[1] - BOARD_RADIUS * math.cos(i * angle)) for i in range(len(self.board))]
+
+    @property
+    def game_id(self) -> int:
+        return self.game_ids[self.index]
+
+    @property
+    def turns(self) -> int:
+        return self.reader.turns(self.game_id)
+
+    # === Navigation ===
+
+    def select_game(self, index: int) -> None:
+        index = max(0, min(index, len(self.game_ids) - 1))
+        if index != self.index:
+            self.index = index
+            self.turn = min(self.turn, self.turns)
+
+    def select_turn(self, turn: int) -> None:
+        self.turn = max(0, min(turn, self.turns))
+
+    def state(self) -> ReplayState:
+        state = self._state
+        if state is None or state.game != self.game_id or state.turn != self.turn:
+            state = self._state = self.reader.seek(self.game_id, self.turn)
+        return state
+
+    def handle(self, event: pygame.event.Event) -> bool:
+        """
+        Applies one input event; False when the viewer should close.
+        """
+
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN:
+            shift = event.mod & pygame.KMOD_SHIFT
+            interval = self.reader.interval
+            if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                return False
+            elif event.key == pygame.K_SPACE:
+                if self.turn == self.turns:
+                    self.turn = 0
+                self.playing = not self.playing
+            elif event.key == pygame.K_RIGHT:
+                self.select_turn(self.turn + 1)
+            elif event.key == pygame.K_LEFT:
+                self.select_turn(self.turn - 1)
+            elif event.key == pygame.K_PAGEDOWN and shift:
+                self.select_game(self.index + 100)
+            elif event.key == pygame.K_PAGEUP and shift:
+                self.select_game(self.index - 100)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.select_turn(self.turn + interval)
+            elif event.key == pygame.K_PAGEUP:
+                self.select_turn(self.turn - interval)
+            elif event.key == pygame.K_HOME:
+                self.select_turn(0)
+            elif event.key == pygame.K_END:
+                self.select_turn(self.turns)
+            elif event.key == pygame.K_DOWN:
+                self.select_game(self.index + 1)
+            elif event.key == pygame.K_UP:
+                self.select_game(self.index - 1)
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.turns_per_second = min(self.turns_per_second * 2, 1024)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.turns_per_second = max(self.turns_per_second / 2, 0.5)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for slider in (GAME_SLIDER, TURN_SLIDER):
+                if slider.inflate(0, 16).collidepoint(event.pos):
+                    self.dragging = slider
+                    self._drag(event.pos[0])
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = None
+        elif event.type == pygame.MOUSEMOTION and self.dragging is not None:
+            self._drag(event.pos[0])
+        return True
+
+    def _drag(self, x: int) -> None:
+        fraction = min(max((x - self.dragging.left) / self.dragging.width, 0.0), 1.0)
+        if self.dragging is GAME_SLIDER:
+            self.select_game(round(fraction * (len(self.game_ids) - 1)))
+        else:
+            self.select_turn(round(fraction * self.turns))
+
+    def advance(self, seconds: float) -> None:
+        """
+        Moves the playback on by 'seconds' of wall time.
+        """
+
+        if not self.playing:
+            return
+        self._clock += seconds * self.turns_per_second
+        steps = int(self._clock)
+        self._clock -= steps
+        self.select_turn(self.turn + steps)
+        if self.turn == self.turns:
+            self.playing = False
+
+    # === Drawing ===
+
+    def draw(self, screen: pygame.Surface, fonts: Dict[str, pygame.font.Font]) -> None:
+        state = self.state()
+        screen.fill(BACKGROUND)
+        self._draw_board(screen, fonts, state)
+        self._draw_players(screen, fonts, state)
+        self._draw_deck(screen, fonts, state)
+        self._draw_slider(screen, fonts, GAME_SLIDER, self.index, len(self.game_ids) - 1,
+                          f"Game {self.game_id} ({self.index + 1:,}/{len(self.game_ids):,})")
+        self._draw_slider(screen, fonts, TURN_SLIDER, self.turn, self.turns,
+                          f"Turn {self.turn}/{self.turns}" + ("  (playing)" if self.playing else ""))
+
+    def _draw_board(self, screen: pygame.Surface, fonts: Dict[str, pygame.font.Font], state: ReplayState) -> None:
+        for space, center in zip(self.board, self.centers):
+            pygame.draw.circle(screen, _space_color(space), center, SPACE_RADIUS)
+            pygame.draw.circle(screen, TEXT, center, SPACE_RADIUS, 1)
+            label = fonts["small"].render(_space_label(space), True, TEXT)
+            x, y = center
+            outward = ((x - BOARD_CENTER[0]) / BOARD_RADIUS, (y - BOARD_CENTER[1]) / BOARD_RADIUS)
+            screen.blit(label, label.get_rect(center=(x + outward[0] * 42, y + outward[1] * 38)))
+            number = fonts["small"].render(str(space.position), True, MUTED)
+            screen.blit(number, number.get_rect(center=(x - outward[0] * 38, y - outward[1] * 34)))
+
+        if 1 <= state.position <= len(self.board):
+            pawn = self.centers[state.position - 1]
+            pygame.draw.circle(screen, PAWN, pawn, SPACE_RADIUS + 6, 5)
+
+        lines = [f"Game {state.game}", f"Turn {state.turn}"]
+        if state.mover >= 0:
+            lines.append(f"P{state.mover} moved to {state.position}")
+        if state.card >= 0:
+            lines.append(f"Drew {CARD_NAMES[state.card]}")
+        if state.winner >= 0:
+            lines.append(f"P{state.winner} wins!")
+        for i, line in enumerate(lines):
+            text = fonts["large" if i == 0 else "normal"].render(line, True, TEXT)
+            screen.blit(text, text.get_rect(center=(BOARD_CENTER[0], BOARD_CENTER[1] - 60 + 30 * i)))
+
+    def _draw_players(self, screen: pygame.Surface, fonts: Dict[str, pygame.font.Font], state: ReplayState) -> None:
+        left, top = 760, 40
+        screen.blit(fonts["large"].render("Inventories", True, TEXT), (left, top))
+        for seat, mask in enumerate(state.masks):
+            y = top + 44 + 44 * seat
+            if seat == state.mover:
+                pygame.draw.rect(screen, HIGHLIGHT, (left - 8, y - 6, 320, 38), border_radius=6)
+            color = PAWN if seat == state.winner else TEXT
+            screen.blit(fonts["normal"].render(f"P{seat}" + (" >" if seat == state.player else ""),
+                                               True, color), (left, y + 4))
+            for i, ingredient in enumerate(INGREDIENTS):
+                cell = pygame.Rect(left + 52 + 25 * i, y, 22, 26)
+                if mask >> i & 1:
+                    pygame.draw.rect(screen, INGREDIENT_COLORS[ingredient], cell, border_radius=4)
+                pygame.draw.rect(screen, MUTED, cell, 1, border_radius=4)
+
+    def _draw_deck(self, screen: pygame.Surface, fonts: Dict[str, pygame.font.Font], state: ReplayState) -> None:
+        left, top = 760, 80 + 44 * max(len(state.masks), 3)
+        screen.blit(fonts["large"].render(f"Luck deck ({sum(state.deck)} left)", True, TEXT), (left, top))
+        for i, (name, count) in enumerate(zip(CARD_NAMES, state.deck)):
+            y = top + 40 + 26 * i
+            color = PAWN if i == state.card else TEXT
+            screen.blit(fonts["normal"].render(name, True, color), (left, y))
+            for j in range(count):
+                pygame.draw.rect(screen, SPACE_COLORS[BoardSpaceType.GOOD_OR_BAD_LUCK],
+                                 (left + 110 + 14 * j, y + 2, 10, 16), border_radius=2)
+
+    def _draw_slider(self, screen: pygame.Surface, fonts: Dict[str, pygame.font.Font], rect: pygame.Rect,
+                     value: int, maximum: int, label: str) -> None:
+        pygame.draw.rect(screen, (220, 210, 195), rect, border_radius=7)
+        x = rect.left + rect.width * (value / maximum if maximum else 0)
+        pygame.draw.rect(screen, MUTED, (rect.left, rect.top, x - rect.left, rect.height), border_radius=7)
+        pygame.draw.circle(screen, PAWN, (x, rect.centery), rect.height)
+        screen.blit(fonts["small"].render(label, True, TEXT), (rect.left, rect.top - 18))
+
+    # === Main Loop ===
+
+    def run(self, max_frames: Optional[int] = None) -> None:
+        pygame.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Crazy Pizzaria Replays")
+        fonts = {"small": pygame.font.SysFont(None, 18), "normal": pygame.font.SysFont(None, 24),
+                 "large": pygame.font.SysFont(None, 32)}
+        clock = pygame.time.Clock()
+        frames = 0
+        try:
+            while max_frames is None or frames < max_frames:
+                if not all([self.handle(event) for event in pygame.event.get()]):
+                    break
+                self.advance(clock.get_time() / 1000)
+                self.draw(screen, fonts)
+                pygame.display.flip()
+                clock.tick(self.fps)
+                frames += 1
+        finally:
+            pygame.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrubs through the games of a replay file.")
+    parser.add_argument("path", help="Replay file (see 'replay-pizzaria record').")
+    parser.add_argument("--game", type=int, default=None, help="Game to open first.")
+    parser.add_argument("--turn", type=int, default=0, help="Turn to open first.")
+    parser.add_argument("--speed", type=float, default=8.0, help="Playback speed in turns per second.")
+    args = parser.parse_args()
+
+    viewer = ReplayViewer(ReplayReader(args.path), turns_per_second=args.speed)
+    if args.game is not None:
+        viewer.select_game(viewer.game_ids.index(args.game))
+    viewer.select_turn(args.turn)
+    viewer.run()
+
+if __name__ == "__main__":
+    main()
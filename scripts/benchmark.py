@@ -0,0 +1,455 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from engine.components import LUCK_DECK_COMPOSITION
+from engine.batch_policy import BatchController, BatchRandomPolicy, ControllerAdapter, DecisionBatch
+from engine.bitmask import mask_of
+from engine.decision_game import DecisionGame
+from engine.replay import ReplayReader, ReplayWriter, encode_game, record_games
+from engine.luck_deck import CountingLuckDeck
+from engine.seeding import game_rngs
+from engine.simulation import POLICIES, SimulationConfig, build_game, draft_names, run_simulation
+from engine.trace import TraceWriter
+from scripts.test_random_game import get_default_recipe_draft
+
+# =====================
+#  Benchmark Registry
+# =====================
+
+# Micro-benchmark name -> factory that builds its state and returns the operation to time.
+# Operations that change the game put it back first, so every call times the same work.
+MICRO: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+FORMAT_VERSION = 1
+
+def micro(name: str):
+    def register(factory: Callable[[], Callable[[], object]]):
+        MICRO[name] = factory
+        return factory
+    return register
+
+def _config(num_players: int = 3, policy: str = "random", engine: str = "game") -> SimulationConfig:
+    return SimulationConfig(num_players=num_players,
+                            draft=draft_names(get_default_recipe_draft(num_players)),
+                            policies=(policy,) * num_players, engine=engine)
+
+def _mid_game(engine: str = "game", policy: str = "random", turns: int = 30):
+    """
+    A 3-player game a few turns in, so inventories are partly filled.
+    """
+
+    game = build_game(_config(policy=policy, engine=engine), 0)
+    for _ in range(turns):
+        if game.game_over:
+            break
+        game.step()
+    return game
+
+def _full_inventories(game) -> None:
+    """
+    Gives every player but the first all of their recipe Ingredients.
+    """
+
+    for player in game.players[1:]:
+        player.ingredients = {ing for recipe in player.recipes for ing in recipe.ingredients}
+    game.players[0].ingredients = set()
+
+# --- Engine ---
+
+def _step_factory(engine: str) -> Callable[[], Callable[[], object]]:
+    def factory():
+        game = _mid_game(engine)
+        snapshot = game.snapshot()
+
+        def step():
+            if game.game_over:
+                game.restore(snapshot)
+            game.step()
+        return step
+    return factory
+
+micro("game.step")(_step_factory("game"))
+micro("fast.step")(_step_factory("fast"))
+
+@micro("game.needed_ingredients")
+def _needed_ingredients():
+    game = _mid_game()
+    player = game.players[0]
+    return lambda: game._needed_ingredients(player)
+
+@micro("player.has_completed_all_recipes")
+def _has_completed_all_recipes():
+    player = _mid_game().players[0]
+    return player.has_completed_all_recipes
+
+@micro("game.steal_ingredients")
+def _steal_ingredients():
+    game = _mid_game()
+    _full_inventories(game)
+    inventories = [set(player.ingredients) for player in game.players]
+    thief = game.players[0]
+
+    def steal():
+        for player, ingredients in zip(game.players, inventories):
+            player.ingredients = set(ingredients)
+        game._steal_ingredients(thief, 2)
+    return steal
+
+@micro("fast.steal_ingredients")
+def _fast_steal_ingredients():
+    game = _mid_game("fast")
+    masks = [0] + [mask_of(ing for recipe in player.recipes for ing in recipe.ingredients)
+                   for player in game.players[1:]]
+
+    def steal():
+        game.masks[:] = masks
+        game._steal_ingredients(0, 2)
+    return steal
+
+# --- Luck Deck ---
+
+@micro("deck.list_draw")
+def _list_draw():
+    game = _mid_game()
+    holder = [game._build_luck_deck()]
+
+    def draw():
+        if not holder[0]:
+            holder[0] = game._build_luck_deck()         # Includes the reshuffle, like the game
+        return holder[0].pop()
+    return draw
+
+@micro("deck.counting_draw")
+def _counting_draw():
+    return CountingLuckDeck(LUCK_DECK_COMPOSITION).draw
+
+# --- Policy Callbacks ---
+
+def _policy_factories(policy: str) -> None:
+    def choose_ingredient():
+        game = _mid_game(policy=policy)
+        player = game.players[0]
+        needed = {ing for recipe in player.recipes for ing in recipe.ingredients} - player.ingredients
+        controller = game.controllers[0]
+        return lambda: controller.choose_ingredient(needed, player)
+
+    def choose_opponent():
+        game = _mid_game(policy=policy)
+        _full_inventories(game)
+        player, opponents = game.players[0], game.players[1:]
+        controller = game.controllers[0]
+        return lambda: controller.choose_opponent(player, opponents)
+
+    def choose_ingredients_to_lose():
+        game = _mid_game(policy=policy)
+        _full_inventories(game)
+        player = game.players[1]
+        controller = game.controllers[1]
+        return lambda: controller.choose_ingredients_to_lose(player, 2)
+
+    micro(f"policy.{policy}.choose_ingredient")(choose_ingredient)
+    micro(f"policy.{policy}.choose_opponent")(choose_opponent)
+    micro(f"policy.{policy}.choose_ingredients_to_lose")(choose_ingredients_to_lose)
+
+for _policy in sorted(POLICIES):
+    _policy_factories(_policy)
+
+# --- Batched Policies ---
+
+BATCH_SIZE = 1024
+
+def _pending_batch(controller: BatchController) -> DecisionBatch:
+    """
+    The first decisions of 'BATCH_SIZE' 3-player games, bound to 'controller' and stacked.
+    """
+
+    draft = get_default_recipe_draft(3)
+    games = []
+    k = 0
+    while len(games) < BATCH_SIZE:
+        board_rng, seat_rngs = game_rngs(0, k, 3)
+        k += 1
+        game = DecisionGame(3, draft, board_rng)
+        if not game.game_over:
+            controller.bind(len(games), game, seat_rngs)
+            games.append(game)
+
+    batch = DecisionBatch(BATCH_SIZE, 3)
+    batch.fill(list(range(BATCH_SIZE)), games)
+    return batch
+
+@micro("batch.adapter.random.decide")
+def _adapter_decide():
+    controller = ControllerAdapter(POLICIES["random"])
+    batch = _pending_batch(controller)
+    return lambda: controller.decide(batch)
+
+@micro("batch.numpy.random.decide")
+def _numpy_decide():
+    controller = BatchRandomPolicy(np.random.default_rng(0))
+    batch = _pending_batch(controller)
+    return lambda: controller.decide(batch)
+
+# --- Replays ---
+
+@micro("replay.record_step")
+def _record_step():
+    """
+    'game.step' while recorded, so the difference of the two is the recording cost per turn.
+    """
+
+    game = _mid_game()
+    snapshot = game.snapshot()
+    writer = ReplayWriter(os.devnull, 3)
+    writer.attach(game, 0)
+    tracer = game.tracer
+
+    def step():
+        if game.game_over:
+            game.restore(snapshot)
+        if len(tracer.rows) > 1 << 16:
+            tracer.rows.clear()
+            tracer.draws.clear()
+        game.step()
+    return step
+
+@micro("replay.encode_game")
+def _encode_game():
+    writer = ReplayWriter(os.devnull, 3)
+    game = build_game(_config(), 0)
+    tracer = writer.attach(game, 0)
+    while not game.game_over:
+        game.step()
+    return lambda: encode_game(tracer, 3, writer.full_deck, writer.interval, 0)
+
+@micro("replay.seek")
+def _seek():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.pzr")
+        record_games(_config(), path, 50)
+        reader = ReplayReader(path)                   # The memory map outlives the file
+    rng = np.random.default_rng(0)
+    targets = [(int(game), int(rng.integers(reader.turns(int(game)) + 1))) for game in rng.integers(50, size=1024)]
+    holder = [0]
+
+    def seek():
+        holder[0] = (holder[0] + 1) & 1023
+        return reader.seek(*targets[holder[0]])
+    return seek
+
+# =====================
+#  Running
+# =====================
+
+def time_micro(name: str, repeat: int = 5, min_seconds: float = 0.2) -> dict:
+    """
+    Times one micro-benchmark with 'timeit': the loop count is sized so a run takes at least
+    'min_seconds', and the best of 'repeat' runs is the value (the least disturbed one).
+    """
+
+    operation = MICRO[name]()
+    timer = timeit.Timer(operation)
+    number = 1
+    while timer.timeit(number) < min_seconds:
+        number *= 10 if number < 1000 else 2
+    runs = [t / number * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+    return {"kind": "micro", "unit": "ns/op", "higher_is_better": False,
+            "value": min(runs), "median": statistics.median(runs), "loops": number}
+
+def time_macro(num_players: int, engine: str, workers: int, games: int, repeat: int = 3,
+               backend: str = "pool") -> dict:
+    """
+    End-to-end random-policy games per second through 'run_simulation'.
+    """
+
+    config = _config(num_players, engine=engine)
+    chunk_size = max(1, min(500, games // (4 * workers)))
+    runs = [run_simulation(config, games, workers=workers, chunk_size=chunk_size, backend=backend).games_per_second
+            for _ in range(repeat)]
+    return {"kind": "macro", "unit": "games/s", "higher_is_better": True,
+            "value": max(runs), "median": statistics.median(runs), "workers": workers, "games": games}
+
+def time_trace_overhead(engine: str, games: int = 300, repeat: int = 5) -> dict:
+    """
+    How much longer 3-player games take while a 'TraceWriter' records them, in percent of the
+    same games untraced. Traced and untraced plays of a game alternate and each keeps its best
+    time, so load spikes cancel out; the writer's closing flush is counted on the traced side.
+    """
+
+    config = _config(engine=engine)
+    best = {False: [float("inf")] * games, True: [float("inf")] * games}
+    closing = float("inf")
+    with tempfile.TemporaryDirectory() as directory:
+        for run in range(repeat):
+            writer = TraceWriter(os.path.join(directory, "bench.trace"), 3)
+            for k in range(games):
+                for traced in ((True, False) if run % 2 else (False, True)):
+                    game = build_game(config, k)
+                    started = time.perf_counter()
+                    if traced:
+                        writer.attach(game, k)
+                    while not game.game_over:
+                        game.step()
+                    best[traced][k] = min(best[traced][k], time.perf_counter() - started)
+            started = time.perf_counter()
+            writer.close()
+            closing = min(closing, time.perf_counter() - started)
+    overhead = 100 * ((sum(best[True]) + closing) / sum(best[False]) - 1)
+    return {"kind": "trace", "unit": "%", "higher_is_better": False,
+            "value": overhead, "median": overhead, "games": games}
+
+def macro_benchmarks(workers: int) -> List[tuple]:
+    """
+    (name, num_players, engine, workers, backend) of every macro-benchmark.
+    """
+
+    cases = []
+    for num_players in (2, 3, 6):
+        cases.append((f"macro.game.{num_players}p.single", num_players, "game", 1, "pool"))
+        cases.append((f"macro.fast.{num_players}p.single", num_players, "fast", 1, "pool"))
+        if workers > 1:
+            cases.append((f"macro.fast.{num_players}p.multi", num_players, "fast", workers, "pool"))
+            cases.append((f"macro.fast.{num_players}p.shared", num_players, "fast", workers, "shared"))
+    return cases
+
+def run_suite(pattern: str = "", include_micro: bool = True, include_macro: bool = True,
+              quick: bool = False, workers: Optional[int] = None, games: Optional[int] = None,
+              log: Callable[[str], None] = print) -> dict:
+    """
+    Runs every benchmark whose name contains 'pattern' and returns the JSON-ready report.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    results = {}
+
+    if include_micro:
+        for name in MICRO:
+            if pattern in name:
+                results[name] = time_micro(name, repeat=3 if quick else 5, min_seconds=0.05 if quick else 0.2)
+                log(f"{name:<48} {results[name]['value']:>14,.0f} ns/op")
+
+    if include_macro:
+        for name, num_players, engine, pool, backend in macro_benchmarks(workers):
+            if pattern in name:
+                count = games or (200 if quick else 2000) * pool
+                results[name] = time_macro(num_players, engine, pool, count, repeat=1 if quick else 3,
+                                           backend=backend)
+                log(f"{name:<48} {results[name]['value']:>14,.0f} games/s")
+        for engine in ("game", "fast"):
+            name = f"trace.{engine}.overhead"
+            if pattern in name:
+                results[name] = time_trace_overhead(engine, games=100 if quick else 300, repeat=3 if quick else 5)
+                log(f"{name:<48} {results[name]['value']:>14,.1f} %")
+
+    return {
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+# =====================
+#  Comparison
+# =====================
+
+class Comparison(NamedTuple):
+    name: str
+    unit: str
+    baseline: float
+    current: float
+    slowdown: float             # Relative slowdown, positive is worse
+    regressed: bool
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> List[Comparison]:
+    """
+    Compares every benchmark present in both reports. A benchmark regressed when it got
+    slower by more than 'threshold' (0.10 = 10%), whichever direction its unit improves in.
+    """
+
+    comparisons = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or before["unit"] != result["unit"]:
+            continue
+        if result["higher_is_better"]:
+            slowdown = before["value"] / result["value"] - 1
+        else:
+            slowdown = result["value"] / before["value"] - 1
+        comparisons.append(Comparison(name, result["unit"], before["value"], result["value"],
+                                      slowdown, slowdown > threshold))
+    return comparisons
+
+def print_comparison(comparisons: List[Comparison], threshold: float) -> None:
+    print(f"\n{'Benchmark':<48} {'Baseline':>14} {'Current':>14} {'Slowdown':>9}")
+    for c in comparisons:
+        flag = "  REGRESSION" if c.regressed else ""
+        print(f"{c.name:<48} {c.baseline:>14,.0f} {c.current:>14,.0f} {c.slowdown:>+9.1%}{flag}")
+
+    regressions = sum(c.regressed for c in comparisons)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%} out of {len(comparisons)} compared benchmarks.")
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} benchmark report")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the engine hot paths and end-to-end throughput.")
+    parser.add_argument("--output", default=None,
+                        help="Write the results as JSON to this path.")
+    parser.add_argument("--baseline", default=None,
+                        help="Compare against this stored JSON report; exits with 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown counted as a regression (default 0.10).")
+    parser.add_argument("--filter", default="", dest="pattern",
+                        help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--only", choices=["micro", "macro"], default=None,
+                        help="Only run micro- or macro-benchmarks.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes of the multi-core macro-benchmarks.")
+    parser.add_argument("--games", type=int, default=None,
+                        help="Games per macro-benchmark run.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Fewer and shorter runs, for a rough check.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = run_suite(args.pattern, include_micro=args.only != "macro", include_macro=args.only != "micro",
+                       quick=args.quick, workers=args.workers, games=args.games)
+    print(f"\n{len(report['results'])} benchmarks in {time.perf_counter() - started:.1f}s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        if baseline["machine"] != report["machine"]:
+            print("Warning: the baseline was recorded on a different machine or Python.")
+        comparisons = compare(report, baseline, args.threshold)
+        print_comparison(comparisons, args.threshold)
+        if any(c.regressed for c in comparisons):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+
+from engine.distributed import Coordinator, run_local, run_worker
+from engine.simulation import ENGINES, POLICIES, SimulationConfig, draft_names
+from scripts.simulate import print_report
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard a Monte Carlo simulation over worker processes or machines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    job = argparse.ArgumentParser(add_help=False)
+    job.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                     help="Number of players in the game. Must be 2, 3, or 6.")
+    job.add_argument("--games", type=int, default=100_000, help="Number of games to play.")
+    job.add_argument("--first-game", type=int, default=0, dest="first_game", help="Index of the first game.")
+    job.add_argument("--shard-size", type=int, default=1000, dest="shard_size", help="Games per shard.")
+    job.add_argument("--seed", type=int, default=0, help="Root seed of the run.")
+    job.add_argument("--policy", default="random", choices=sorted(POLICIES), help="Policy used by every seat.")
+    job.add_argument("--engine", default="fast", choices=sorted(ENGINES), help="Engine implementation.")
+
+    coordinator = commands.add_parser("coordinator", parents=[job], help="Serve the shards of a job to workers.")
+    coordinator.add_argument("--host", default="0.0.0.0", help="Interface to listen on.")
+    coordinator.add_argument("--port", type=int, default=5757, help="Port to listen on.")
+    coordinator.add_argument("--heartbeat-timeout", type=float, default=60.0, dest="heartbeat_timeout",
+                             help="Seconds of silence after which a worker counts as dead.")
+    coordinator.add_argument("--straggler-after", type=float, default=30.0, dest="straggler_after",
+                             help="Seconds after which idle workers also get a copy of a running shard.")
+
+    worker = commands.add_parser("worker", help="Play shards for a coordinator.")
+    worker.add_argument("--host", default="127.0.0.1", help="Coordinator address.")
+    worker.add_argument("--port", type=int, default=5757, help="Coordinator port.")
+    worker.add_argument("--name", default="", help="Name in the coordinator's log (default: host name).")
+
+    local = commands.add_parser("local", parents=[job], help="Coordinator and workers on this machine.")
+    local.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        try:
+            played = run_worker((args.host, args.port), args.name)
+        except OSError as error:
+            parser.exit(1, f"No coordinator at {args.host}:{args.port} ({error})\n")
+        print(f"Played {played} shard(s)")
+        return
+
+    config = SimulationConfig(
+        num_players=args.num_players,
+        draft=draft_names(get_default_recipe_draft(args.num_players)),
+        policies=(args.policy,) * args.num_players,
+        seed=args.seed,
+        engine=args.engine,
+    )
+    if args.command == "local":
+        report = run_local(config, args.games, args.workers, args.shard_size, args.first_game, log=print)
+    else:
+        server = Coordinator(config, args.games, args.shard_size, args.first_game, args.host, args.port,
+                             args.heartbeat_timeout, args.straggler_after)
+        print(f"Serving {len(server.shards)} shards on {server.address[0]}:{server.address[1]}")
+        report = server.run(log=print)
+    print_report(config, report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+
+from engine.draft import DraftAnalysis, DraftEvaluator, draft_to_names
+from engine.simulation import ENGINES, POLICIES
+
+
+def print_analysis(analysis: DraftAnalysis, rank_seat: int, top: int) -> None:
+    """
+    Prints the optimal pick at each draft step, then the drafts ranked for 'rank_seat'.
+    """
+
+    print(f"\nGames: {analysis.games:,}  |  Rounds: {analysis.rounds}  |  {analysis.seconds:.1f}s")
+
+    print("\nOptimal picks (picker's win rate under optimal play afterwards, x = eliminated):")
+    for step in analysis.line:
+        alternatives = ", ".join(f"{o.pizza} {o.win_rate:.3f}{' x' if o.eliminated else ''}"
+                                 for o in step.options[1:])
+        best = step.options[0]
+        print(f"  {step.step + 1}. P{step.seat + 1} takes {best.pizza:<11} {best.win_rate:.4f} ± {best.ci:.4f}"
+              + (f"   ({alternatives})" if alternatives else ""))
+
+    ranked = analysis.ranked(rank_seat)
+    print(f"\nDrafts ranked by P{rank_seat + 1}'s win rate ({min(top, len(ranked))} of {len(ranked)}):")
+    for rank, (draft, stats) in enumerate(ranked[:top], start=1):
+        seats = "  ".join(f"P{seat + 1} {' + '.join(names):<22} {stats.win_rate(seat):.4f} ± {stats.win_rate_ci(seat):.4f}"
+                          for seat, names in enumerate(draft_to_names(draft)))
+        print(f"{rank:4d}. [{stats.games:6d} games]  {seats}")
+
+def analysis_to_dict(analysis: DraftAnalysis) -> dict:
+    return {
+        "num_players": analysis.num_players,
+        "games": analysis.games,
+        "rounds": analysis.rounds,
+        "line": [{"step": s.step, "seat": s.seat, "pick": s.pick,
+                  "options": [o._asdict() for o in s.options]} for s in analysis.line],
+        "drafts": [{"draft": draft_to_names(draft), "games": stats.games,
+                    "win_rates": [stats.win_rate(seat) for seat in range(analysis.num_players)],
+                    "cis": [stats.win_rate_ci(seat) for seat in range(analysis.num_players)]}
+                   for draft, stats in analysis.ranked()],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Finds the optimal snake-draft picks by racing every recipe draft.")
+    parser.add_argument("--num-players", type=int, default=3, choices=[2, 3], dest="num_players",
+                        help="Number of players in the game. Snake drafts exist for 2 or 3.")
+    parser.add_argument("--budget", type=int, default=200_000,
+                        help="Maximum number of games over all drafts.")
+    parser.add_argument("--round-games", type=int, default=200, dest="round_games",
+                        help="Games per racing draft and round.")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Stop playing a draft once every seat's 95%% win-rate half-width is at most this.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes.")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the run.")
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES),
+                        help="Policy used by every seat.")
+    parser.add_argument("--engine", default="fast", choices=sorted(ENGINES),
+                        help="Engine implementation.")
+    parser.add_argument("--rank-seat", type=int, default=1, dest="rank_seat",
+                        help="Rank the draft table by this player's win rate (1-based).")
+    parser.add_argument("--top", type=int, default=20,
+                        help="Number of drafts printed in the table.")
+    parser.add_argument("--output", default=None,
+                        help="Write the analysis as JSON to this path.")
+    args = parser.parse_args()
+
+    evaluator = DraftEvaluator(args.num_players, policies=(args.policy,) * args.num_players, seed=args.seed,
+                               engine=args.engine, round_games=args.round_games, tolerance=args.tolerance)
+    analysis = evaluator.run(args.budget, workers=args.workers, log=print)
+    print_analysis(analysis, args.rank_seat - 1, args.top)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(analysis_to_dict(analysis), f, indent=2)
+        print(f"\nAnalysis written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+
+from engine.server import GameServer, run_load_test
+
+
+def print_load_report(report: dict) -> None:
+    """
+    Prints the client's view of a load test and the server's metrics.
+    """
+
+    server = report["server"]
+    print(f"{report['sessions']:,} sessions, {report['turns']:,} turns in {report['seconds']:.1f}s "
+          f"({report['sessions_per_second']:,.1f} sessions/s, {report['timeouts']:,} timed-out decisions)")
+    print(f"Server: {server['cpu_utilization']:.0%} CPU, {server['mean_active']:,.0f} sessions active on average "
+          f"(peak {server['peak_active']:,}), {server['sessions_per_core']:,.0f} sessions per core, "
+          f"{server['games_per_cpu_second']:,.1f} games per CPU second")
+    for name, label in (("move_round_trip_ms", "Move round trip (client)"), ("move_latency_ms", "Move latency (server)"),
+                        ("turn_time_ms", "Turn time (server)"), ("loop_lag_ms", "Event loop lag")):
+        latency = report[name] if name in report else server[name]
+        print(f"  {label:<26} p50 {latency['p50']:8.3f} ms   p99 {latency['p99']:8.3f} ms   max {latency['max']:8.3f} ms")
+
+async def serve_forever(address, args) -> None:
+    server = GameServer(args.seed, args.timeout, log=print)
+    print(f"Serving games on {await server.start(address)}")
+    if args.stats_every:
+        async def report() -> None:
+            while True:
+                await asyncio.sleep(args.stats_every)
+                print(json.dumps(server.metrics.report()))
+        asyncio.create_task(report())
+    await server.serve_forever()
+
+async def load_test(address, args, timeout=None) -> dict:
+    return await run_load_test(address, args.sessions, args.concurrency, args.connections, args.num_players,
+                               args.remote_seats, args.think, timeout, log=print)
+
+async def run_local(args) -> dict:
+    server = GameServer(args.seed, args.timeout)
+    address = await server.start(("127.0.0.1", 0))
+    try:
+        return await load_test(address, args, args.timeout)
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve interactive games, or load-test a game server with bots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    where = argparse.ArgumentParser(add_help=False)
+    where.add_argument("--host", default="127.0.0.1", help="Interface or server address.")
+    where.add_argument("--port", type=int, default=5858, help="TCP port.")
+    where.add_argument("--unix", default=None, help="Path of a Unix socket to use instead of TCP.")
+
+    serving = argparse.ArgumentParser(add_help=False)
+    serving.add_argument("--timeout", type=float, default=30.0,
+                         help="Seconds a remote player has per decision before the random fallback moves.")
+    serving.add_argument("--seed", type=int, default=0, help="Root seed of the sessions.")
+
+    load = argparse.ArgumentParser(add_help=False)
+    load.add_argument("--sessions", type=int, default=5_000, help="Games to play.")
+    load.add_argument("--concurrency", type=int, default=2_000, help="Games in flight at once.")
+    load.add_argument("--connections", type=int, default=8, help="Connections the games are spread over.")
+    load.add_argument("--num-players", type=int, default=2, choices=[2, 3, 6], dest="num_players",
+                      help="Number of players in the game. Must be 2, 3, or 6.")
+    load.add_argument("--remote-seats", type=int, default=1, dest="remote_seats",
+                      help="Seats played by the bots; the server's random policy plays the others.")
+    load.add_argument("--think", type=float, default=0.0, help="Mean seconds a bot thinks per decision.")
+
+    serve = commands.add_parser("serve", parents=[where, serving], help="Host sessions until interrupted.")
+    serve.add_argument("--stats-every", type=float, default=10.0, dest="stats_every",
+                       help="Seconds between metric lines in the log (0 for none).")
+    commands.add_parser("load", parents=[where, load], help="Play bot sessions against a running server.")
+    commands.add_parser("local", parents=[serving, load], help="A server and the bots in one process.")
+    args = parser.parse_args()
+
+    address = args.unix if getattr(args, "unix", None) else (getattr(args, "host", "127.0.0.1"), getattr(args, "port", 0))
+    if args.command == "serve":
+        try:
+            asyncio.run(serve_forever(address, args))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "load":
+        try:
+            report = asyncio.run(load_test(address, args))
+        except OSError as error:
+            parser.exit(1, f"No server at {address} ({error})\n")
+        print_load_report(report)
+    else:
+        print_load_report(asyncio.run(run_local(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import time
+
+from engine.components import LUCK_DECK_COMPOSITION
+from engine.replay import ReplayReader, record_games
+from engine.simulation import ENGINES, POLICIES, SimulationConfig, draft_names
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def print_state(reader: ReplayReader, game_id: int, turn: int) -> None:
+    state = reader.seek(game_id, turn)
+    print(f"Game {state.game}, turn {state.turn}/{reader.turns(game_id)}: pawn on {state.position}"
+          + (f", P{state.mover} moved" if state.mover >= 0 else "")
+          + (f", drew {LUCK_DECK_COMPOSITION[state.card].card_type.name}" if state.card >= 0 else "")
+          + (f", P{state.winner} wins" if state.winner >= 0 else ""))
+    for seat, mask in enumerate(state.masks):
+        print(f"  P{seat}{' (next)' if seat == state.player else '':7} {mask:010b}")
+    print("  Deck left: " + ", ".join(f"{card.card_type.name} {count}"
+                                       for card, count in zip(LUCK_DECK_COMPOSITION, state.deck)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Records games into a seekable replay file and inspects it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Play and record games.")
+    record.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    record.add_argument("--games", type=int, default=10_000, help="Games to record.")
+    record.add_argument("--policies", nargs="+", default=None, choices=sorted(POLICIES),
+                        help="One policy per seat (default: random everywhere).")
+    record.add_argument("--engine", default="fast", choices=sorted(ENGINES), help="Game implementation.")
+    record.add_argument("--seed", type=int, default=0, help="Root seed of the games.")
+    record.add_argument("--keyframe-interval", type=int, default=32, dest="keyframe_interval",
+                        help="Turns between full-state keyframes (the most deltas a seek replays).")
+    record.add_argument("--output", default=None,
+                        help="Where to write the replays (default: data/replays/<N>p-seed<S>.pzr).")
+
+    show = commands.add_parser("show", help="Print the state of a game at a turn.")
+    show.add_argument("path", help="Replay file.")
+    show.add_argument("--game", type=int, default=None, help="Game to show (default: the first).")
+    show.add_argument("--turn", type=int, default=0, help="Turn to show (clamped to the game's length).")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if args.policies and len(args.policies) != args.num_players:
+            parser.error(f"Give one policy per seat ({args.num_players})")
+        draft = draft_names(get_default_recipe_draft(args.num_players))
+        config = SimulationConfig(args.num_players, draft, tuple(args.policies or ()), args.seed, args.engine)
+        output = args.output or os.path.join("data", "replays", f"{args.num_players}p-seed{args.seed}.pzr")
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+        started = time.perf_counter()
+        turns = record_games(config, output, args.games, args.keyframe_interval)
+        seconds = time.perf_counter() - started
+        size = os.path.getsize(output)
+        print(f"{args.games:,} games, {turns:,} turns in {seconds:.1f}s written to {output}")
+        print(f"{size / 2**20:.2f} MiB, {size / max(turns, 1):.2f} bytes per turn")
+    else:
+        reader = ReplayReader(args.path)
+        print(f"{len(reader):,} games of {reader.num_players} players, a keyframe every {reader.interval} turns")
+        print_state(reader, args.game if args.game is not None else int(reader.games["game"][0]), args.turn)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+
+from engine.cache import ResultCache
+from engine.instrumentation import instrument_run
+from engine.simulation import (
+    ENGINES, POLICIES, SimulationConfig, SimulationReport, draft_names, run_simulation
+)
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def print_report(config: SimulationConfig, report: SimulationReport) -> None:
+    """
+    Prints win rates and game length with their 95% confidence intervals.
+    """
+
+    stats = report.stats
+    print(f"\nGames: {stats.games}  |  Workers: {report.workers}  |  "
+          f"{report.seconds:.2f}s  |  {report.games_per_second:,.0f} games/s "
+          f"({report.games_per_second / report.workers:,.0f} per worker)")
+
+    for seat, policy in enumerate(config.seat_policies()):
+        recipes = " + ".join(config.draft[seat])
+        print(f"Seat {seat} [{policy}] ({recipes}): "
+              f"{stats.win_rate(seat):.4f} ± {stats.win_rate_ci(seat):.4f}")
+
+    print(f"Turns: {stats.turns_mean:.2f} ± {stats.turns_ci():.2f} (std {stats.turns_std():.2f})")
+    print(f"LOSE_EVERYTHING hits per game: {stats.lose_everything_hits / max(stats.games, 1):.3f}")
+    if stats.unfinished:
+        print(f"Unfinished games: {stats.unfinished}")
+
+def print_scaling(config: SimulationConfig, num_games: int, max_workers: int, chunk_size: int,
+                  backend: str = "pool") -> None:
+    """
+    Plays the same games with 1, 2, 4, ... workers and prints throughput and speedup.
+    """
+
+    print("\nWorkers | games/s | speedup | efficiency")
+    baseline = None
+    workers = 1
+    while True:
+        report = run_simulation(config, num_games, workers=workers, chunk_size=chunk_size, backend=backend)
+        baseline = baseline or report.games_per_second
+        speedup = report.games_per_second / baseline
+        print(f"{workers:7d} | {report.games_per_second:7,.0f} | {speedup:6.2f}x | {speedup / workers:9.0%}")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of many Crazy Pizzaria games.")
+    parser.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--games", type=int, default=10_000,
+                        help="Number of games to play (the cap when --until-ci is given).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes.")
+    parser.add_argument("--chunk-size", type=int, default=500, dest="chunk_size",
+                        help="Games per task sent to a worker.")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the run.")
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES),
+                        help="Policy used by every seat.")
+    parser.add_argument("--engine", default="fast", choices=sorted(ENGINES),
+                        help="Engine implementation.")
+    parser.add_argument("--backend", default="pool", choices=["pool", "shared"],
+                        help="How workers return results: pickled through a process pool, or in shared memory slots.")
+    parser.add_argument("--until-ci", type=float, default=None, dest="until_ci",
+                        help="Stop once every seat's 95%% win-rate half-width is at most this value.")
+    parser.add_argument("--scaling", action="store_true",
+                        help="Also measure throughput with 1, 2, 4, ... workers.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Also play the games instrumented: space, card and steal counts and timings.")
+    parser.add_argument("--profile-output", default=None, dest="profile_output",
+                        help="Write the --profile report as JSON to this path.")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse games already simulated for this exact config and store the new ones.")
+    parser.add_argument("--cache-dir", default=os.path.join("data", "cache"), dest="cache_dir",
+                        help="Directory of the result cache.")
+    parser.add_argument("--cache-size", type=int, default=256, dest="cache_size",
+                        help="Size cap of the result cache in MB, least recently used shards go first.")
+    args = parser.parse_args()
+    if args.cache and args.until_ci is not None:
+        parser.error("--cache needs a fixed game range, it can't be combined with --until-ci")
+
+    config = SimulationConfig(
+        num_players=args.num_players,
+        draft=draft_names(get_default_recipe_draft(args.num_players)),
+        policies=(args.policy,) * args.num_players,
+        seed=args.seed,
+        engine=args.engine,
+    )
+
+    if args.cache:
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_size * 2**20)
+        run = cache.simulate(config, args.games, workers=args.workers, chunk_size=args.chunk_size)
+        report = SimulationReport(run.stats, args.workers, run.seconds)
+        print(f"Cache: {run.cached_games:,} games reused, {run.simulated_games:,} simulated")
+    else:
+        report = run_simulation(config, args.games, workers=args.workers,
+                                chunk_size=args.chunk_size, until_ci=args.until_ci, backend=args.backend)
+    print_report(config, report)
+
+    if args.scaling:
+        print_scaling(config, min(args.games, 20_000), args.workers, args.chunk_size, args.backend)
+
+    if args.profile or args.profile_output:
+        instrumentation = instrument_run(config, args.games, workers=args.workers, chunk_size=args.chunk_size)
+        print("\n" + instrumentation.format())
+        if args.profile_output:
+            with open(args.profile_output, "w") as f:
+                json.dump(instrumentation.to_dict(), f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import math
+
+from engine.bitmask import NUM_INGREDIENTS
+from engine.state_index import StateIndex, count_reachable
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size of the canonical state index of each player configuration.")
+    parser.add_argument("--num-players", type=int, nargs="+", default=[2, 3, 6], choices=[2, 3, 6],
+                        dest="num_players", help="Player counts to report, with their default recipe draft.")
+    parser.add_argument("--max-states", type=int, default=50_000_000, dest="max_states",
+                        help="Count reachable states by search only for indexes up to this size.")
+    args = parser.parse_args()
+
+    print(f"{'Players':>7} {'Raw keys':>12} {'Index size':>12} {'Reduction':>10} {'Reachable':>12} {'Density':>8}")
+    for num_players in args.num_players:
+        draft = get_default_recipe_draft(num_players)
+        index = StateIndex(draft)
+        # Every (position, player, 10-bit masks, deck counts) tuple a dict could be keyed by
+        raw = index.board_size * num_players * (1 << NUM_INGREDIENTS * num_players) * math.prod(index.deck_radix)
+
+        if index.size <= args.max_states:
+            reachable = count_reachable(draft, max_states=args.max_states)
+            counts = f"{reachable:>12,} {reachable / index.size:>8.3f}"
+        else:
+            counts = f"{'-':>12} {'-':>8}"
+        print(f"{num_players:>7} {raw:>12.3e} {index.size:>12.3e} {raw / index.size:>9.3g}x {counts}")
+
+if __name__ == "__main__":
+    main()
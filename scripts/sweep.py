@@ -0,0 +1,66 @@
+import argparse
+import os
+
+from engine.rules import STANDARD_RULES
+from engine.simulation import ENGINES, POLICIES, SimulationConfig, draft_names
+from engine.sweep import SweepReport, grid, random_variants, run_sweep
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def parse_deck(text: str) -> dict:
+    """
+    Parses a deck change like "LOSE_ALL=0,GAIN_2=4" ("standard" for no change).
+    """
+
+    if text == "standard":
+        return {}
+    return {card_type: int(count) for card_type, count in (item.split("=") for item in text.split(","))}
+
+def print_sweep(report: SweepReport, top: int) -> None:
+    """
+    Prints the variants from the most to the least balanced, with every seat's win rate.
+    """
+
+    num_players = report.results[0].stats.num_players
+    print(f"{len(report.results)} variants, {report.results[0].stats.games:,} games each, "
+          f"{report.seconds:.1f}s on {report.workers} workers")
+    print(f"{'Imbalance':>9} {'Spread':>7} {'Turns':>7}  {'Win rate per seat':<{8 * num_players}} Variant")
+    for result in report.ranked()[:top]:
+        seats = " ".join(f"{result.stats.win_rate(seat):7.4f}" for seat in range(num_players))
+        print(f"{result.imbalance:9.4f} {result.spread:7.4f} {result.turns:7.1f}  {seats} {result.rules.name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Seat balance and game length of house-rule variants.")
+    parser.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--games", type=int, default=2_000, help="Games per variant.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    parser.add_argument("--chunk-size", type=int, default=250, dest="chunk_size", help="Games per task.")
+    parser.add_argument("--random", type=int, default=0,
+                        help="Evaluate this many random variants instead of the grid.")
+    parser.add_argument("--die", type=int, nargs="+", default=[4, 6, 8], help="Die sizes of the grid.")
+    parser.add_argument("--extra-chefs", type=int, nargs="+", default=[0, 2], dest="extra_chefs",
+                        help="Numbers of extra Chef spaces of the grid.")
+    parser.add_argument("--decks", nargs="+", default=["standard", "LOSE_ALL=0"],
+                        help='Deck changes of the grid, e.g. "LOSE_ALL=0,GAIN_2=4" or "standard".')
+    parser.add_argument("--policies", nargs="+", default=None, choices=sorted(POLICIES),
+                        help="One policy per seat (default: random everywhere).")
+    parser.add_argument("--engine", default="fast", choices=sorted(ENGINES), help="Game implementation.")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the games (and of the random search).")
+    parser.add_argument("--top", type=int, default=20, help="Variants to print.")
+    args = parser.parse_args()
+
+    if args.policies and len(args.policies) != args.num_players:
+        parser.error(f"Give one policy per seat ({args.num_players})")
+    draft = draft_names(get_default_recipe_draft(args.num_players))
+    config = SimulationConfig(args.num_players, draft, tuple(args.policies or ()), args.seed, args.engine)
+
+    if args.random:
+        variants = [STANDARD_RULES] + random_variants(args.random, args.seed)
+    else:
+        variants = grid(die_sides=args.die, extra_chefs=args.extra_chefs,
+                        decks=[parse_deck(deck) for deck in args.decks])
+    print_sweep(run_sweep(config, variants, args.games, args.workers, args.chunk_size, log=print), args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import random
+
+from engine.policies.endgame_policy import EndgamePolicy
+from engine.policies.heuristic_policy import HeuristicPolicy
+from engine.simulation import POLICIES, draft_names
+from engine.tablebase import generate_tablebase
+from engine.tournament import TournamentConfig, run_tournament
+from scripts.test_random_game import get_default_recipe_draft
+from scripts.tournament import print_tournament
+
+# 2 players at threshold 2 is about 170k states; 3 players at 2 would be about 5M, 6 players at 1 is already 3M
+DEFAULT_THRESHOLD = {2: 2, 3: 1, 6: 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the endgame tablebase of a default draft.")
+    parser.add_argument("--num-players", type=int, default=2, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--threshold", type=int, default=None,
+                        help="Largest number of missing Ingredients per player in the table "
+                             "(default: 2 for 2 players, else 1).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes building the transition blocks.")
+    parser.add_argument("--boundary-games", type=int, default=20_000, dest="boundary_games",
+                        help="Random-play games estimating the values of turns that leave the region.")
+    parser.add_argument("--cache-dir", default=os.path.join("data", "cache", "tablebase"), dest="cache_dir",
+                        help="Where the blocks and the table are kept; a rerun resumes from them.")
+    parser.add_argument("--evaluate", type=int, default=0,
+                        help="Afterwards, play a tournament of this many games per seating against random and heuristic.")
+    args = parser.parse_args()
+
+    draft = get_default_recipe_draft(args.num_players)
+    threshold = args.threshold if args.threshold is not None else DEFAULT_THRESHOLD[args.num_players]
+    table = generate_tablebase(draft, threshold, cache_dir=args.cache_dir, workers=args.workers,
+                               boundary_games=args.boundary_games, log=print)
+    print(f"{table.index.size:,} states ({table.values.nbytes / 2**20:,.1f} MiB), "
+          f"{len(table.boundary_codes):,} boundary codes")
+
+    if args.evaluate:
+        # Serial, so the registered table is visible to the games
+        POLICIES["endgame"] = lambda rng: EndgamePolicy(table, rng, HeuristicPolicy(rng or random.Random()))
+        tournament = TournamentConfig(("endgame", "random", "heuristic"), args.num_players,
+                                      draft_names(draft), args.evaluate)
+        print_tournament(run_tournament(tournament, workers=1))
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from engine.components import PizzaCard, ALL_PIZZAS
 from engine.game import GameState
 from engine.policies.random_policy import RandomPolicy
 from engine.policy import PlayerController
+from engine.seeding import game_rngs
 
 
 def get_default_recipe_draft(num_players: int) -> list[list[PizzaCard]]:
@@ -27,13 +28,21 @@ def main():
     parser.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6],
                         dest="num_players",
                         help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Root seed, makes the game reproducible.")
     args = parser.parse_args()
     num_players = args.num_players
 
     recipe_draft = get_default_recipe_draft(num_players)
-    controllers: list[PlayerController] = [RandomPolicy() for _ in range(num_players)]
 
-    game = GameState(num_players=num_players, player_recipes=recipe_draft, controllers=controllers)
+    if args.seed is None:
+        board_rng, seat_rngs = None, [None] * num_players
+    else:
+        board_rng, seat_rngs = game_rngs(args.seed, 0, num_players)
+    controllers: list[PlayerController] = [RandomPolicy(rng) for rng in seat_rngs]
+
+    game = GameState(num_players=num_players, player_recipes=recipe_draft, controllers=controllers,
+                     rng=board_rng)
 
     turn = 1
     while not game.game_over and game.winner_id == -1:
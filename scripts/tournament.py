@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+
+from engine.simulation import ENGINES, POLICIES, draft_names
+from engine.tournament import TournamentConfig, TournamentResult, run_tournament, seatings
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def print_tournament(result: TournamentResult) -> None:
+    """
+    Prints the ratings with every policy's record, then the head-to-head win matrix.
+    """
+
+    ratings = result.ratings()
+    stats = result.policy_stats()
+    policies = sorted(ratings, key=lambda p: -ratings[p])
+
+    print(f"\nGames: {result.games:,}  |  Seatings: {len(result.records)}")
+    print(f"\n{'Policy':<12} {'Rating':>7} {'Seats':>8} {'Wins':>8} {'Wins/fair':>10}")
+    for policy in policies:
+        seats, wins, share = stats[policy]
+        print(f"{policy:<12} {ratings[policy]:>7.0f} {seats:>8,} {wins:>8,} {share:>10.3f}")
+
+    matrix = result.win_matrix()
+    print("\nHead-to-head (row's share of the games won by row or column):")
+    print(" " * 12 + "".join(f"{p:>12}" for p in policies))
+    for a in policies:
+        cells = "".join(f"{'-':>12}" if a == b else f"{matrix[a][b]:>12.3f}" for b in policies)
+        print(f"{a:<12}{cells}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between policies over every seating.")
+    parser.add_argument("--policies", nargs="+", default=["random", "heuristic"], choices=sorted(POLICIES),
+                        help="Policies taking part.")
+    parser.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="Games per seating (the same dice and decks for every seating).")
+    parser.add_argument("--rotations-only", action="store_true", dest="rotations_only",
+                        help="Play only the rotations of each lineup instead of every permutation.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes.")
+    parser.add_argument("--chunk-size", type=int, default=50, dest="chunk_size",
+                        help="Games per task sent to a worker.")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the run.")
+    parser.add_argument("--engine", default="fast", choices=sorted(ENGINES),
+                        help="Engine implementation.")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Save progress to this JSON file after every chunk, and resume from it.")
+    parser.add_argument("--output", default=None,
+                        help="Write the results as JSON to this path.")
+    args = parser.parse_args()
+
+    config = TournamentConfig(
+        policies=tuple(args.policies),
+        num_players=args.num_players,
+        draft=draft_names(get_default_recipe_draft(args.num_players)),
+        games_per_seating=args.games,
+        seed=args.seed,
+        engine=args.engine,
+        all_permutations=not args.rotations_only,
+    )
+    print(f"{len(seatings(config))} seatings x {args.games} games")
+
+    result = run_tournament(config, workers=args.workers, chunk_size=args.chunk_size,
+                            checkpoint=args.checkpoint, log=print)
+    print_tournament(result)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({**result.to_dict(), "ratings": result.ratings(), "win_matrix": result.win_matrix()}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import functools
+import os
+
+from agents.self_play import SelfPlayConfig, train
+from agents.tabular import QTable, TabularPolicy
+from engine.simulation import POLICIES, draft_names
+from engine.tournament import TournamentConfig, run_tournament
+from scripts.test_random_game import get_default_recipe_draft
+from scripts.tournament import print_tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a tabular policy by batched self-play.")
+    parser.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--games", type=int, default=100_000, help="Self-play games to train on.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Experience collection processes, 0 to collect in the learner's process.")
+    parser.add_argument("--epsilon", type=float, default=0.1, help="Exploration rate of the self-play games.")
+    parser.add_argument("--alpha", type=float, default=0.02, help="Smallest step size of the value updates.")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the run.")
+    parser.add_argument("--resume", default=None, help="Continue training the table saved at this path.")
+    parser.add_argument("--output", default=None,
+                        help="Where to save the table (default: data/models/tabular-<N>p.npz).")
+    parser.add_argument("--evaluate", type=int, default=0,
+                        help="Afterwards, play a tournament of this many games per seating against random and heuristic.")
+    args = parser.parse_args()
+
+    draft = draft_names(get_default_recipe_draft(args.num_players))
+    config = SelfPlayConfig(args.num_players, draft, seed=args.seed, epsilon=args.epsilon, alpha=args.alpha)
+    table = QTable.load(args.resume) if args.resume else None
+
+    table, report = train(config, args.games, workers=args.workers, table=table, log=print)
+    print(f"\nGames: {report.games:,}  |  Samples: {report.samples:,} ({report.dropped:,} dropped)  |  "
+          f"{report.seconds:.1f}s with {report.workers} worker(s)")
+    print(f"{report.samples_per_second:,.0f} samples/s, {report.games_per_second:,.0f} games/s")
+
+    output = args.output or os.path.join("data", "models", f"tabular-{args.num_players}p.npz")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    table.save(output)
+    print(f"Table written to {output}")
+
+    if args.evaluate:
+        # Serial, so the registered table is visible to the games
+        POLICIES["tabular"] = functools.partial(TabularPolicy, table)
+        tournament = TournamentConfig(("tabular", "random", "heuristic"), args.num_players, draft, args.evaluate)
+        print_tournament(run_tournament(tournament, workers=1))
+
+if __name__ == "__main__":
+    main()
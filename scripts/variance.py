@@ -0,0 +1,54 @@
+import argparse
+import os
+
+from engine.simulation import ENGINES, POLICIES, SimulationConfig, draft_names
+from engine.variance import ESTIMATORS, Estimate, compare
+from scripts.test_random_game import get_default_recipe_draft
+
+
+def print_estimate(estimate: Estimate) -> None:
+    """
+    Prints every seat's estimate with its 95% confidence interval, the variance reduction
+    factor and the effective sample size against plain Monte Carlo.
+    """
+
+    seats = "  ".join(f"{mean:+.4f} ± {ci:.4f}" if estimate.method == "common random numbers"
+                      else f"{mean:.4f} ± {ci:.4f}" for mean, ci in zip(estimate.mean, estimate.ci()))
+    print(f"{estimate.method:<22} {estimate.games:>8,}  {seats}  "
+          f"{estimate.variance_reduction.min():>6.2f}x {estimate.effective_games.min():>10,.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Variance-reduced win-rate estimates against plain Monte Carlo.")
+    parser.add_argument("--num-players", type=int, default=3, choices=[2, 3, 6], dest="num_players",
+                        help="Number of players in the game. Must be 2, 3, or 6.")
+    parser.add_argument("--games", type=int, default=10_000, help="Games each method may play.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    parser.add_argument("--methods", nargs="+", default=list(ESTIMATORS), choices=list(ESTIMATORS),
+                        help="Estimators to run.")
+    parser.add_argument("--policies", nargs="+", default=None, choices=sorted(POLICIES),
+                        help="One policy per seat (default: random everywhere).")
+    parser.add_argument("--compare-policies", nargs="+", default=None, choices=sorted(POLICIES),
+                        dest="compare_policies",
+                        help="Also estimate the win-rate difference against these seat policies "
+                             "with common random numbers.")
+    parser.add_argument("--engine", default="fast", choices=sorted(ENGINES), help="Game implementation.")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the run.")
+    args = parser.parse_args()
+
+    draft = draft_names(get_default_recipe_draft(args.num_players))
+    for policies in (args.policies, args.compare_policies):
+        if policies and len(policies) != args.num_players:
+            parser.error(f"Give one policy per seat ({args.num_players})")
+    config = SimulationConfig(args.num_players, draft, tuple(args.policies or ()), args.seed, args.engine)
+
+    # Reduction and effective games are the worst seat's
+    print(f"{'Method':<22} {'Games':>8}  {'Win rate per seat':<{17 * args.num_players - 2}}  {'Factor':>7} {'Effective':>10}")
+    for method in args.methods:
+        print_estimate(ESTIMATORS[method](config, args.games, workers=args.workers))
+
+    if args.compare_policies:
+        other = SimulationConfig(args.num_players, draft, tuple(args.compare_policies), args.seed, args.engine)
+        print_estimate(compare(config, other, args.games, workers=args.workers))
+
+if __name__ == "__main__":
+    main()
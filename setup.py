@@ -12,7 +12,19 @@ setup(
     install_requires=requirements,
     entry_points={
         'console_scripts': [
-            'run-random-pizzaria-game=scripts.test_random_game:main'
+            'run-random-pizzaria-game=scripts.test_random_game:main',
+            'simulate-pizzaria=scripts.simulate:main',
+            'benchmark-pizzaria=scripts.benchmark:main',
+            'draft-pizzaria=scripts.draft_analysis:main',
+            'tournament-pizzaria=scripts.tournament:main',
+            'state-space-pizzaria=scripts.state_space:main',
+            'train-pizzaria=scripts.train_tabular:main',
+            'cluster-pizzaria=scripts.cluster:main',
+            'tablebase-pizzaria=scripts.tablebase:main',
+            'variance-pizzaria=scripts.variance:main',
+            'sweep-pizzaria=scripts.sweep:main',
+            'server-pizzaria=scripts.game_server:main',
+            'replay-pizzaria=scripts.replay:main'
         ]
     }
 )
\ No newline at end of file
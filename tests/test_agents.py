@@ -0,0 +1,68 @@
+import functools
+
+import numpy as np
+from agents.replay import ReplayBuffer
+from agents.self_play import SelfPlayConfig, train
+from agents.tabular import QTable, TabularBatchPolicy, TabularPolicy
+from engine.batch_policy import BatchRunner
+from engine.simulation import POLICIES, SimulationConfig, draft_names, play_game
+from scripts.test_random_game import get_default_recipe_draft
+
+def _config(num_players: int = 3, **kwargs) -> SelfPlayConfig:
+    return SelfPlayConfig(num_players, draft_names(get_default_recipe_draft(num_players)),
+                          games_per_round=128, batch_size=64, **kwargs)
+
+def test_replay_buffer_wraps_and_counts_dropped_samples():
+    """Tests that readers get every sample in order until the ring laps them."""
+    buffer = ReplayBuffer(8)
+    try:
+        def push(start, n):
+            rows = np.arange(start, start + n)
+            buffer.push(np.zeros(n, np.int8), rows, np.zeros(n, np.int8), np.ones(n, np.float32), games=1)
+
+        push(0, 5)
+        cursor, dropped, (_, rows, _, _) = buffer.read(0)
+        assert (cursor, dropped, rows.tolist()) == (5, 0, [0, 1, 2, 3, 4])
+
+        push(5, 6)
+        push(11, 3)
+        cursor, dropped, (_, rows, _, _) = buffer.read(cursor)
+        assert (cursor, dropped, rows.tolist()) == (14, 1, list(range(6, 14)))
+        assert buffer.games == 3
+    finally:
+        buffer.unlink()
+
+def test_serial_training_is_reproducible():
+    """Tests that in-process training gives the same table for the same seed and learns from every game."""
+    table, report = train(_config(), 512)
+    again, _ = train(_config(), 512)
+    assert report.games == 512 and report.dropped == 0
+    assert report.samples > report.games
+    assert np.array_equal(table.values, again.values)
+    assert table.values.any()
+
+def test_exported_policy_plays_the_greedy_self_play_games(monkeypatch):
+    """Tests that the PlayerController export makes the same decisions as the greedy batched policy."""
+    table, _ = train(_config(), 1024)
+    draft = get_default_recipe_draft(3)
+
+    runner = BatchRunner(3, draft, TabularBatchPolicy(table, epsilon=0.0), batch_size=32, seed=5)
+    winners, turns = runner.run(80)
+
+    monkeypatch.setitem(POLICIES, "tabular", functools.partial(TabularPolicy, table))
+    config = SimulationConfig(3, draft_names(draft), ("tabular",) * 3, seed=5)
+    results = [play_game(config, k) for k in range(80)]
+    assert list(winners) == [r.winner for r in results]
+    assert list(turns) == [r.turns for r in results]
+
+def test_worker_processes_fill_the_shared_table(tmp_path):
+    """Tests that training with worker processes collects the requested games and survives a save/load."""
+    table, report = train(_config(2), 256, workers=2)
+    assert report.games >= 256 and report.workers == 2
+    assert report.samples_per_second > 0
+
+    path = str(tmp_path / "table.npz")
+    table.save(path)
+    loaded = QTable.load(path)
+    assert loaded.num_players == 2
+    assert np.array_equal(loaded.values, table.values)
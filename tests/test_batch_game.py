@@ -0,0 +1,50 @@
+import numpy as np
+from engine.batch import BatchGameState, random_bit, random_member, DECK_COUNTS
+from engine.fast_game import FastGameState
+from engine.policies.random_policy import RandomPolicy
+from engine.seeding import game_rngs
+from scripts.test_random_game import get_default_recipe_draft
+
+def test_random_bit_picks_set_bits():
+    """Tests that random_bit only returns set bits, and 0 for empty masks."""
+    masks = np.array([0, 0b1, 0b1010, 0b1111111111], dtype=np.int16)
+    for u in (0.0, 0.5, 0.999):
+        bits = random_bit(masks, np.full(len(masks), u))
+        assert bits[0] == 0
+        assert bits[1] == 1
+        assert np.all((bits[1:] & masks[1:]) == bits[1:])
+
+def test_random_member_handles_empty_rows():
+    """Tests that random_member returns -1 when a row has no candidates."""
+    candidates = np.array([[False, False], [False, True], [True, True]])
+    chosen = random_member(candidates, np.array([0.3, 0.3, 0.7]))
+    assert list(chosen) == [-1, 1, 1]
+
+def test_batch_games_finish_with_valid_winners():
+    """Tests that every batched game ends with a winner holding all their recipe Ingredients."""
+    batch = BatchGameState(500, 3, get_default_recipe_draft(3), rng=np.random.default_rng(7))
+    winners = batch.run()
+
+    assert batch.done.all()
+    assert len(batch.live) == 0
+    rows = np.arange(batch.num_games)
+    assert np.all((batch.recipe_masks[rows, winners] & ~batch.masks[rows, winners]) == 0)
+    assert np.all((batch.deck >= 0) & (batch.deck <= DECK_COUNTS))
+
+def test_batch_game_length_matches_engine():
+    """Tests that the batch simulator's mean game length agrees with the scalar engine."""
+    draft = get_default_recipe_draft(3)
+    batch = BatchGameState(3000, 3, draft, rng=np.random.default_rng(11))
+    batch.run()
+
+    lengths = []
+    for k in range(1000):
+        board_rng, seat_rngs = game_rngs(11, k, 3)
+        game = FastGameState(3, draft, [RandomPolicy(rng) for rng in seat_rngs], rng=board_rng)
+        turns = 0
+        while not game.game_over:
+            game.step()
+            turns += 1
+        lengths.append(turns)
+
+    assert abs(batch.turns.mean() - np.mean(lengths)) < 0.1 * np.mean(lengths)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from engine.batch_policy import BatchRandomPolicy, BatchRunner, ControllerAdapter, DecisionBatch
+from engine.decision_game import CHOOSE_OPPONENT, DecisionGame
+from engine.rules import STANDARD_RULES
+from engine.seeding import spawn_rng
+from engine.simulation import POLICIES, SimulationConfig, draft_names, play_game
+from scripts.test_random_game import get_default_recipe_draft
+
+VARIANT = STANDARD_RULES.with_extra_chefs(2).shuffled(1).with_die(4).with_deck(GAIN_1=3, LOSE_1=10)
+
+@pytest.mark.parametrize("num_players", [2, 3, 6])
+@pytest.mark.parametrize("policy", ["random", "heuristic"])
+@pytest.mark.parametrize("rules", [None, VARIANT])
+def test_adapter_plays_the_same_games_as_the_engine(num_players, policy, rules):
+    """Tests that per-game controllers behind the adapter play exactly the games of 'play_game', variants included."""
+    draft = get_default_recipe_draft(num_players)
+    runner = BatchRunner(num_players, draft, ControllerAdapter(POLICIES[policy]), batch_size=16, seed=3, rules=rules)
+    winners, turns = runner.run(60)
+
+    config = SimulationConfig(num_players, draft_names(draft), (policy,) * num_players, seed=3, rules=rules)
+    results = [play_game(config, k) for k in range(60)]
+    assert list(winners) == [r.winner for r in results]
+    assert list(turns) == [r.turns for r in results]
+    assert runner.rounds < runner.decisions
+
+def test_numpy_policy_answers_are_legal():
+    """Tests that the vectorized policy only answers with bits of each row's choices."""
+    games = [DecisionGame(3, get_default_recipe_draft(3), spawn_rng(k)) for k in range(64)]
+    games = [game for game in games if not game.game_over]
+    batch = DecisionBatch(64, 3)
+    batch.fill(list(range(len(games))), games)
+
+    answers = BatchRandomPolicy(np.random.default_rng(0)).decide(batch)
+    assert len(answers) == len(games)
+    assert np.all(batch.choices[:batch.size] >> answers & 1)
+    for game, answer in zip(games, answers):
+        if game.decision == CHOOSE_OPPONENT:
+            assert answer != game.decider
+
+def test_numpy_policy_game_length_matches_engine():
+    """Tests that the vectorized random policy plays games as long as the scalar one."""
+    draft = get_default_recipe_draft(3)
+    winners, turns = BatchRunner(3, draft, BatchRandomPolicy(np.random.default_rng(5)), seed=5).run(2000)
+    assert (winners >= 0).all()
+
+    config = SimulationConfig(3, draft_names(draft), seed=5)
+    lengths = [play_game(config, k).turns for k in range(1000)]
+    assert abs(turns.mean() - np.mean(lengths)) < 0.1 * np.mean(lengths)
+
+def test_runner_stops_long_games():
+    """Tests that games running past 'max_turns' end without a winner."""
+    runner = BatchRunner(3, get_default_recipe_draft(3), BatchRandomPolicy(np.random.default_rng(1)))
+    winners, turns = runner.run(50, max_turns=5)
+    assert (winners == -1).any()
+    assert (turns[winners == -1] >= 5).all()
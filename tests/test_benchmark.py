@@ -0,0 +1,44 @@
+import json
+
+from scripts.benchmark import MICRO, compare, load_report, run_suite, time_trace_overhead
+
+def _report(**values):
+    results = {}
+    for name, (unit, value) in values.items():
+        results[name] = {"unit": unit, "value": value, "higher_is_better": unit == "games/s"}
+    return {"version": 1, "machine": {}, "results": results}
+
+def test_every_micro_benchmark_builds():
+    """Tests that every registered micro-benchmark sets up and runs its operation."""
+    for name, factory in MICRO.items():
+        if ".mcts." in name:
+            continue                                    # Each call searches for 50ms
+        factory()()
+
+def test_trace_overhead_runs_on_both_engines():
+    """Tests that the tracing overhead benchmark plays and traces games on either engine."""
+    for engine in ("game", "fast"):
+        result = time_trace_overhead(engine, games=5, repeat=2)
+        assert result["unit"] == "%" and result["games"] == 5 and result["value"] > -100
+
+def test_compare_flags_slowdowns_in_both_directions():
+    """Tests that regressions are flagged for slower ns/op and for fewer games/s alike."""
+    baseline = _report(step=("ns/op", 1000.0), games=("games/s", 1000.0), steady=("ns/op", 500.0))
+    current = _report(step=("ns/op", 1200.0), games=("games/s", 800.0), steady=("ns/op", 520.0),
+                      new=("ns/op", 1.0))
+
+    by_name = {c.name: c for c in compare(current, baseline, threshold=0.10)}
+    assert set(by_name) == {"step", "games", "steady"}
+    assert by_name["step"].regressed and abs(by_name["step"].slowdown - 0.2) < 1e-9
+    assert by_name["games"].regressed and abs(by_name["games"].slowdown - 0.25) < 1e-9
+    assert not by_name["steady"].regressed
+
+def test_suite_report_round_trips(tmp_path):
+    """Tests that a filtered quick run writes a JSON report that compares cleanly to itself."""
+    report = run_suite("deck.counting", include_macro=False, quick=True, log=lambda line: None)
+    assert list(report["results"]) == ["deck.counting_draw"]
+
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(report))
+    comparisons = compare(report, load_report(str(path)))
+    assert len(comparisons) == 1 and not comparisons[0].regressed
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+from engine import cache as cache_module
+from engine.cache import ResultCache, config_key
+from engine.simulation import SimulationConfig, draft_names, run_simulation
+from scripts.test_random_game import get_default_recipe_draft
+
+@pytest.fixture
+def config() -> SimulationConfig:
+    return SimulationConfig(num_players=3, draft=draft_names(get_default_recipe_draft(3)), seed=9)
+
+def test_cached_results_match_a_direct_run(tmp_path, config):
+    """Tests that stats served from shards equal those of simulating the same games directly."""
+    cache = ResultCache(str(tmp_path))
+    cache.simulate(config, 120)
+    run = cache.simulate(config, 120)
+    direct = run_simulation(config, 120).stats
+
+    assert (run.cached_games, run.simulated_games) == (120, 0)
+    assert (run.stats.games, run.stats.wins, run.stats.unfinished) == (direct.games, direct.wins, direct.unfinished)
+    assert run.stats.turns_mean == pytest.approx(direct.turns_mean)
+    assert run.stats.turns_std() == pytest.approx(direct.turns_std())
+
+def test_overlapping_ranges_only_simulate_the_gap(tmp_path, config):
+    """Tests that a request overlapping stored shards only plays the games it doesn't have."""
+    cache = ResultCache(str(tmp_path))
+    cache.simulate(config, 50, first_game=0)
+    cache.simulate(config, 50, first_game=100)
+
+    run = cache.simulate(config, 130, first_game=20)
+    assert (run.cached_games, run.simulated_games) == (80, 50)
+    assert run.stats.wins == run_simulation(config, 130, first_game=20).stats.wins
+
+def test_rule_changes_invalidate_entries(tmp_path, config, monkeypatch):
+    """Tests that entries written under other rules are never served and get deleted."""
+    ResultCache(str(tmp_path)).simulate(config, 30)
+    old_key = config_key(config)
+
+    monkeypatch.setattr(cache_module, "rules_hash", lambda: "different-rules")
+    cache = ResultCache(str(tmp_path))
+    assert not os.path.exists(tmp_path / old_key)
+    assert cache.simulate(config, 30).cached_games == 0
+
+def test_eviction_drops_least_recently_used_shards(tmp_path, config):
+    """Tests that the size cap evicts the shard that was used longest ago."""
+    cache = ResultCache(str(tmp_path))
+    cache.simulate(config, 40, first_game=0)
+    cache.simulate(config, 40, first_game=40)
+    cache.simulate(config, 40, first_game=0)          # Touches the first shard again
+
+    cache.max_bytes = cache.size() - 1
+    assert cache.evict() > 0
+    run = cache.simulate(config, 80)
+    assert (run.cached_games, run.simulated_games) == (40, 40)
+    assert run.stats.games == 80
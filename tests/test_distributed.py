@@ -0,0 +1,78 @@
+import socket
+import threading
+
+import pytest
+from engine.distributed import (
+    ASSIGN, HELLO, JOB, Coordinator, decode_result, encode_result, recv_message, run_local, run_worker, send_message
+)
+from engine.simulation import RunningStats, SimulationConfig, draft_names, play_game, run_simulation
+from scripts.test_random_game import get_default_recipe_draft
+
+@pytest.fixture
+def config() -> SimulationConfig:
+    return SimulationConfig(3, draft_names(get_default_recipe_draft(3)), seed=6)
+
+def _assert_matches_local(report, config: SimulationConfig, num_games: int) -> None:
+    local = run_simulation(config, num_games).stats
+    assert (report.stats.games, report.stats.wins, report.stats.unfinished) == (local.games, local.wins, local.unfinished)
+    assert report.stats.turns_mean == pytest.approx(local.turns_mean)
+    assert report.stats.turns_std() == pytest.approx(local.turns_std())
+
+def _start_workers(coordinator: Coordinator, count: int):
+    threads = [threading.Thread(target=run_worker, args=(coordinator.address, f"w{i}"), daemon=True)
+               for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def test_result_messages_round_trip():
+    """Tests that an aggregate survives the binary RESULT encoding."""
+    stats = RunningStats(3)
+    config = SimulationConfig(3, draft_names(get_default_recipe_draft(3)))
+    for k in range(20):
+        stats.add(play_game(config, k))
+    shard, decoded = decode_result(encode_result(7, stats), 3)
+    assert shard == 7 and decoded == stats
+
+def test_local_cluster_matches_a_single_node_run(config):
+    """Tests that worker processes on localhost produce the same wins as 'run_simulation'."""
+    report = run_local(config, 600, workers=2, shard_size=100)
+    _assert_matches_local(report, config, 600)
+    assert report.workers == 2
+
+def test_shards_of_dead_workers_are_reassigned(config):
+    """Tests that a worker disconnecting mid-shard loses the shard to a live worker."""
+    coordinator = Coordinator(config, 300, shard_size=100)
+    reports = []
+    running = threading.Thread(target=lambda: reports.append(coordinator.run()), daemon=True)
+    running.start()
+
+    with socket.create_connection(coordinator.address) as sock:
+        send_message(sock, HELLO, b"dying")
+        assert recv_message(sock)[0] == JOB
+        assert recv_message(sock)[0] == ASSIGN
+    _start_workers(coordinator, 1)
+
+    running.join(timeout=30)
+    _assert_matches_local(reports[0], config, 300)
+    assert coordinator.reassigned >= 1
+
+def test_straggling_shards_are_copied_to_idle_workers(config):
+    """Tests that a silent worker's shard is also played elsewhere and counted once."""
+    coordinator = Coordinator(config, 300, shard_size=100, straggler_after=0.2)
+    stalled = socket.create_connection(coordinator.address)
+    send_message(stalled, HELLO, b"stalled")
+    threading.Thread(target=coordinator.run, daemon=True).start()
+    assert recv_message(stalled)[0] == JOB
+    assert recv_message(stalled)[0] == ASSIGN
+
+    worker = _start_workers(coordinator, 1)[0]
+    worker.join(timeout=30)
+    stalled.close()
+    assert coordinator.finished and coordinator.reassigned >= 1
+
+    stats = RunningStats(3)
+    for shard in sorted(coordinator.results):
+        stats.merge(coordinator.results[shard])
+    local = run_simulation(config, 300).stats
+    assert (stats.games, stats.wins) == (local.games, local.wins)
@@ -0,0 +1,37 @@
+from engine.components import ALL_PIZZAS
+from engine.draft import SNAKE_ORDERS, DraftEvaluator, draft_to_names, enumerate_drafts
+
+def test_enumerate_drafts_follows_the_snake_counts():
+    """Tests that every draft deals all pizzas once with the snake order's cards per seat."""
+    for num_players, expected in ((2, 20), (3, 90)):
+        drafts = enumerate_drafts(num_players)
+        assert len(drafts) == len(set(drafts)) == expected
+        for draft in drafts:
+            assert sorted(i for picks in draft for i in picks) == list(range(len(ALL_PIZZAS)))
+            assert [len(picks) for picks in draft] == [SNAKE_ORDERS[num_players].count(s) for s in range(num_players)]
+
+def test_dominated_first_picks_are_eliminated():
+    """Tests that backward induction finds a dominant pizza and eliminates the other first picks."""
+    evaluator = DraftEvaluator(2)
+    dominant = ALL_PIZZAS[3].name
+    for draft, stats in evaluator.stats.items():
+        p1_wins = 900 if dominant in draft_to_names(draft)[0] else 500
+        stats.games, stats.wins = 1000, [p1_wins, 1000 - p1_wins]
+
+    analysis = evaluator.run(budget=0)
+    assert analysis.games == 0
+    assert analysis.line[0].pick == dominant
+    assert all(option.eliminated for option in analysis.line[0].options[1:])
+    assert [step.seat for step in analysis.line] == list(SNAKE_ORDERS[2])
+
+def test_racing_spends_the_budget_on_the_optimal_line():
+    """Tests that racing stays within budget and the optimal line's draft is played the most."""
+    evaluator = DraftEvaluator(2, round_games=50, seed=1)
+    analysis = evaluator.run(budget=3000)
+    assert analysis.games <= 3000
+    assert sorted(step.pick for step in analysis.line) == sorted(p.name for p in ALL_PIZZAS)
+
+    names = {pizza.name: i for i, pizza in enumerate(ALL_PIZZAS)}
+    leaf = tuple(tuple(sorted(names[step.pick] for step in analysis.line if step.seat == seat)) for seat in range(2))
+    assert analysis.stats[leaf].games == max(stats.games for stats in analysis.stats.values())
+    assert len(analysis.ranked()) == 20
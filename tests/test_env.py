@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from pettingzoo.test import api_test
+
+from engine.bitmask import INGREDIENTS, MASK_INGREDIENTS, NUM_INGREDIENTS
+from engine.fast_game import FastGameState
+from engine.policy import PlayerController
+from engine.seeding import spawn_rng
+from engine.decision_game import CHOOSE_OPPONENT, DecisionGame
+from env.core import action_mask
+from env.pizzaria_env import env
+from env.vector_env import PizzariaVectorEnv
+from scripts.test_random_game import get_default_recipe_draft
+
+class FirstChoicePolicy(PlayerController):
+    """Always takes the first option in canonical order, so both sides can agree without an rng."""
+    def choose_ingredient(self, needed, player):
+        return min(needed, key=INGREDIENTS.index) if needed else None
+
+    def choose_opponent(self, player, opponents):
+        return min(opponents, key=lambda p: p.id) if opponents else None
+
+    def choose_ingredients_to_lose(self, player, amount):
+        return sorted(player.ingredients, key=INGREDIENTS.index)[:amount]
+
+def _lowest_bit(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+@pytest.mark.parametrize("num_players", [2, 3, 6])
+def test_decision_game_follows_the_engine_rules(num_players):
+    """Tests that the decision generator plays the same games as 'FastGameState' under the same seed."""
+    recipes = get_default_recipe_draft(num_players)
+    for seed in range(20):
+        engine = FastGameState(num_players, recipes, [FirstChoicePolicy() for _ in recipes], rng=spawn_rng(seed))
+        while not engine.game_over:
+            engine.step()
+
+        game = DecisionGame(num_players, recipes, spawn_rng(seed))
+        while not game.game_over:
+            if game.decision == CHOOSE_OPPONENT:
+                victim = _lowest_bit(game.choices)
+                game.act(NUM_INGREDIENTS + (victim - game.decider) % num_players)
+            else:
+                game.act(_lowest_bit(game.choices))
+
+        assert (game.winner_id, game.pawn_position, tuple(game.masks)) == \
+               (engine.winner_id, engine.pawn_position, tuple(engine.masks))
+
+def test_action_mask_matches_choices():
+    """Tests that the action mask marks exactly the Ingredients or relative seats on offer."""
+    game = DecisionGame(3, get_default_recipe_draft(3), spawn_rng(1))
+    mask = np.zeros(NUM_INGREDIENTS + 3, dtype=np.int8)
+    for _ in range(200):
+        if game.game_over:
+            break
+        action_mask(game, mask)
+        if game.decision == CHOOSE_OPPONENT:
+            seats = {(game.decider + k) % 3 for k in np.flatnonzero(mask) - NUM_INGREDIENTS}
+            assert seats == {s for s in range(3) if game.choices >> s & 1}
+            assert game.decider not in seats
+        else:
+            assert {INGREDIENTS[i] for i in np.flatnonzero(mask)} == set(MASK_INGREDIENTS[game.choices])
+        game.act(int(np.flatnonzero(mask)[-1]))
+
+@pytest.mark.parametrize("num_players", [2, 3, 6])
+def test_aec_env_passes_the_pettingzoo_api_test(num_players):
+    """Tests the AEC environment against PettingZoo's own API checks."""
+    api_test(env(num_players=num_players), num_cycles=100, verbose_progress=False)
+
+def test_aec_env_rewards_the_winner():
+    """Tests that a played-out episode ends with +1 for the winner and -1 for everyone else."""
+    aec = env(num_players=3)
+    aec.reset(seed=7)
+    totals = {agent: 0.0 for agent in aec.possible_agents}
+    for agent in aec.agent_iter():
+        observation, reward, termination, truncation, _ = aec.last()
+        totals[agent] += reward
+        action = None if termination or truncation else int(np.flatnonzero(observation["action_mask"])[0])
+        aec.step(action)
+    assert sorted(totals.values()) == [-1.0, -1.0, 1.0]
+
+def test_vector_env_reuses_buffers_and_stays_full():
+    """Tests that every step returns the same preallocated arrays, each row waiting on a legal decision."""
+    venv = PizzariaVectorEnv(16, 3, seed=2)
+    observations, infos = venv.reset(seed=2)
+    rng = np.random.default_rng(0)
+    finished = 0
+    for _ in range(300):
+        masks = infos["action_mask"]
+        assert (masks.sum(axis=1) > 0).all()
+        actions = (rng.random(masks.shape) * masks).argmax(axis=1)
+        result = venv.step(actions)
+        assert result[0] is observations and result[4] is infos
+        rewards, terminations = result[1], result[2]
+        assert (rewards[~terminations] == 0).all()
+        assert (infos["final_rewards"][terminations].sum(axis=1) == 3 - 2 * 2).all()
+        finished += int(terminations.sum())
+
+    assert finished == venv.episodes > 0
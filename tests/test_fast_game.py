@@ -0,0 +1,52 @@
+import pytest
+from typing import List
+from engine.bitmask import mask_of, ingredients_of, recipe_mask, POPCOUNT, PIZZA_MASKS
+from engine.components import ALL_PIZZAS, Ingredient
+from engine.fast_game import FastGameState
+from engine.game import GameState
+from engine.policy import PlayerController
+from engine.policies.random_policy import RandomPolicy
+from engine.seeding import game_rngs
+
+def make_draft(num_players: int):
+    recipes_per_player = {2: 3, 3: 2, 6: 1}[num_players]
+    dealer = iter(ALL_PIZZAS)
+    return [[next(dealer) for _ in range(recipes_per_player)] for _ in range(num_players)]
+
+def test_mask_round_trip():
+    """Tests that packing and unpacking Ingredient masks is lossless."""
+    ingredients = {Ingredient.HAM, Ingredient.ONION, Ingredient.EGGS}
+    assert ingredients_of(mask_of(ingredients)) == ingredients
+    assert all(POPCOUNT[mask] == 5 for mask in PIZZA_MASKS.values())
+    assert recipe_mask(ALL_PIZZAS) == (1 << 10) - 1
+
+@pytest.mark.parametrize("num_players", [2, 3, 6])
+@pytest.mark.parametrize("seed", range(5))
+def test_fast_game_matches_game_state(num_players: int, seed: int):
+    """Tests that FastGameState plays the exact same game as GameState under the same seed."""
+    def build(engine):
+        board_rng, seat_rngs = game_rngs(seed, 0, num_players)
+        controllers: List[PlayerController] = [RandomPolicy(rng) for rng in seat_rngs]
+        return engine(num_players=num_players, player_recipes=make_draft(num_players),
+                      controllers=controllers, rng=board_rng)
+
+    reference = build(GameState)
+    reference_turns = []
+    while not reference.game_over and len(reference_turns) < 5000:
+        reference.step()
+        reference_turns.append((
+            reference.pawn_position, reference.current_player_index, len(reference.luck_deck),
+            [mask_of(p.ingredients) for p in reference.players]
+        ))
+
+    fast = build(FastGameState)
+    fast_turns = []
+    while not fast.game_over and len(fast_turns) < 5000:
+        fast.step()
+        fast_turns.append((
+            fast.pawn_position, fast.current_player_index, len(fast.luck_deck), list(fast.masks)
+        ))
+
+    assert fast_turns == reference_turns
+    assert fast.game_over == reference.game_over
+    assert fast.winner_id == reference.winner_id
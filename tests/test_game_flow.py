@@ -9,11 +9,11 @@ def test_advance_turn(game_state: GameState):
     game_state._advance_turn()
     assert game_state.current_player_index == (initial_player_index + 1) % num_players
 
-@patch('random.randint', return_value=4)
-def test_step_advances_turn_and_position(mock_randint, game_state: GameState):
+def test_step_advances_turn_and_position(game_state: GameState):
     """Tests that a step moves the pawn and advances the turn."""
     initial_player = game_state.current_player_index
-    game_state.step()
+    with patch.object(game_state.rng, 'randint', return_value=4):
+        game_state.step()
     assert game_state.pawn_position == 5
     assert game_state.current_player_index != initial_player
 
@@ -0,0 +1,78 @@
+import pickle
+
+import pytest
+from engine.components import BOARD_LAYOUT, BoardSpaceType
+from engine.game import GameState
+from engine.instrumentation import Instrumentation, instrument_run
+from engine.rules import STANDARD_RULES
+from engine.simulation import SimulationConfig, build_game, draft_names
+from scripts.test_random_game import get_default_recipe_draft
+
+def _config(engine: str, rules=None) -> SimulationConfig:
+    return SimulationConfig(num_players=3, draft=draft_names(get_default_recipe_draft(3)), seed=5, engine=engine,
+                            rules=rules)
+
+def _play(game):
+    turns = 0
+    while not game.game_over:
+        game.step()
+        turns += 1
+    return turns
+
+@pytest.mark.parametrize("engine", ["game", "fast"])
+def test_counters_add_up(engine):
+    """Tests that every turn lands once and every luck landing resolves one card."""
+    instrumentation = Instrumentation()
+    turns = sum(_play(instrumentation.attach(build_game(_config(engine), i))) for i in range(5))
+
+    report = instrumentation.to_dict()
+    assert report["games"] == 5
+    assert report["turns"] == turns
+    assert sum(report["luck_cards"].values()) == report["spaces"]["GOOD_OR_BAD_LUCK"]
+    assert report["timings"]["resolve_space.INGREDIENT"]["calls"] == report["spaces"]["INGREDIENT"]
+    assert report["timings"]["RandomPolicy.choose_ingredient"]["calls"] > 0
+
+@pytest.mark.parametrize("rules", [STANDARD_RULES, STANDARD_RULES.with_extra_chefs(3), STANDARD_RULES.shuffled(3)])
+def test_both_engines_count_the_same_games(rules):
+    """Tests that both engines report identical counters, since they play the same games, on any board."""
+    reports = []
+    for engine in ("game", "fast"):
+        instrumentation = Instrumentation()
+        for i in range(5):
+            _play(instrumentation.attach(build_game(_config(engine, rules), i)))
+        report = instrumentation.to_dict()
+        del report["timings"]
+        reports.append(report)
+    assert reports[0] == reports[1]
+
+def test_instrumentation_does_not_change_the_game():
+    """Tests that an instrumented game plays out exactly like an uninstrumented one."""
+    plain = build_game(_config("game"), 3)
+    instrumented = Instrumentation().attach(build_game(_config("game"), 3))
+    assert _play(plain) == _play(instrumented)
+    assert plain.snapshot() == instrumented.snapshot()
+    assert "_resolve_space" not in vars(plain)
+
+def test_wasted_landing(game_state: GameState):
+    """Tests that landing on an Ingredient already held counts as wasted."""
+    instrumentation = Instrumentation()
+    instrumentation.attach(game_state)
+    player = game_state.players[0]
+    space = next(s for s in BOARD_LAYOUT if s.space_type == BoardSpaceType.INGREDIENT)
+    player.ingredients.add(space.ingredient)
+
+    game_state._resolve_space(space, player)
+    assert instrumentation.wasted_landings == 1
+    assert instrumentation.spaces["INGREDIENT"] == 1
+
+def test_counters_merge_across_processes():
+    """Tests that per-process counters pickle and merge into the same totals as one process."""
+    single = instrument_run(_config("fast"), 20, workers=1, chunk_size=5)
+    pooled = instrument_run(_config("fast"), 20, workers=2, chunk_size=5)
+    assert pickle.loads(pickle.dumps(single)).to_dict()["spaces"] == single.to_dict()["spaces"]
+
+    a, b = pooled.to_dict(), single.to_dict()
+    for report in (a, b):
+        for timing in report["timings"].values():
+            timing.pop("total_ms"), timing.pop("mean_us")
+    assert a == b
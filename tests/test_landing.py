@@ -0,0 +1,85 @@
+import random
+import numpy as np
+import pytest
+from engine.components import ALL_PIZZAS, Ingredient
+from engine.fast_game import FastGameState
+from engine.landing import CHEF, INGREDIENT_CATEGORY, LUCK, landing_tables, own_turn_hits
+from engine.policies.heuristic_policy import HeuristicPolicy
+from engine.policies.random_policy import RandomPolicy
+from engine.rules import STANDARD_RULES, compile_rules
+from engine.simulation import SimulationConfig, draft_names, play_game
+from scripts.test_random_game import get_default_recipe_draft
+
+def test_landing_tables_are_distributions():
+    """Tests that landing and category probabilities sum to one for every start and horizon."""
+    landing, hits = landing_tables(12)
+    assert np.allclose(landing.sum(axis=2), 1.0)
+    assert np.allclose(hits.sum(axis=2), 1.0)
+    assert np.allclose(landing[1, 0, 1:7], 1 / 6)          # From space 1, one roll reaches 2-7
+
+def test_own_turn_hits_counts_every_player_turn():
+    """Tests that the mover's table only sums the rolls that are theirs."""
+    _, hits = landing_tables(6)
+    table = own_turn_hits(3, turns=2)
+    assert table[4][CHEF] == pytest.approx(hits[3, 3, CHEF] + hits[6, 3, CHEF])
+    assert sum(table[4]) == pytest.approx(2.0)
+    assert table[4][LUCK] > table[4][INGREDIENT_CATEGORY[Ingredient.EGGS]]
+
+@pytest.mark.parametrize("rules", [STANDARD_RULES.with_extra_chefs(2), STANDARD_RULES.shuffled(3).with_die(4)])
+def test_own_turn_hits_follow_the_rules(rules):
+    """Tests that the mover's table covers the variant's board and rolls its die, and that the heuristic plays it."""
+    compiled = compile_rules(rules)
+    _, hits = landing_tables(6, compiled.board, compiled.die_sides)
+    table = own_turn_hits(3, turns=2, rules=rules)
+    assert len(table) == compiled.board_size + 1
+    assert table[4][CHEF] == pytest.approx(hits[3, 3, CHEF] + hits[6, 3, CHEF])
+
+    config = SimulationConfig(3, draft_names(get_default_recipe_draft(3)), ("heuristic",) * 3, rules=rules)
+    for k in range(20):
+        assert play_game(config, k).winner >= 0
+
+@pytest.fixture
+def heuristic_game():
+    policy = HeuristicPolicy()
+    game = FastGameState(2, [ALL_PIZZAS[:3], ALL_PIZZAS[3:]], [policy, RandomPolicy(random.Random(0))],
+                         starting_pos=1, rng=random.Random(0))
+    return policy, game
+
+def test_heuristic_prefers_missing_ingredients(heuristic_game):
+    """Tests that the heuristic never picks an Ingredient it already holds when one is missing."""
+    policy, game = heuristic_game
+    player = game._view(0)
+    player.ingredients = {Ingredient.HAM, Ingredient.EGGS}
+    assert policy.choose_ingredient({Ingredient.HAM, Ingredient.EGGS, Ingredient.PEAS}, player) == Ingredient.PEAS
+
+def test_heuristic_steals_from_the_richest_victim():
+    """Tests that the heuristic steals from the opponent holding the most of what it misses, then from the closest to winning."""
+    policy = HeuristicPolicy()
+    game = FastGameState(3, [ALL_PIZZAS[:2], ALL_PIZZAS[2:4], ALL_PIZZAS[4:]],
+                         [policy, RandomPolicy(random.Random(0)), RandomPolicy(random.Random(1))],
+                         starting_pos=1, rng=random.Random(0))
+    thief, first, second = game._view(0), game._view(1), game._view(2)
+
+    # The thief misses all of Pepperoni and Portuguese: the second opponent holds two of them, the first one
+    first.ingredients = {Ingredient.SALAMI, Ingredient.TOMATO, Ingredient.ONION}
+    second.ingredients = {Ingredient.HAM, Ingredient.CHEESE}
+    assert policy.choose_opponent(thief, [first, second]) is second
+    assert policy.choose_opponent(thief, [second, first]) is second
+
+    # One useful Ingredient each: the opponent missing fewer of their own is robbed, whatever its seat
+    first.ingredients = {Ingredient.SALAMI, Ingredient.TOMATO, Ingredient.ONION}
+    second.ingredients = {Ingredient.PEAS}
+    assert policy.choose_opponent(thief, [first, second]) is first
+    first.ingredients = {Ingredient.SALAMI}
+    second.ingredients = {Ingredient.PEAS, Ingredient.TOMATO, Ingredient.ONION}
+    assert policy.choose_opponent(thief, [first, second]) is second
+
+def test_heuristic_loses_the_easiest_ingredients(heuristic_game):
+    """Tests that losses give up the Ingredients most likely to be landed on again."""
+    policy, game = heuristic_game
+    player = game._view(0)
+    player.ingredients = {Ingredient.HAM, Ingredient.EGGS, Ingredient.SALAMI}
+    hits = policy.hits[game.pawn_position]
+    lost = policy.choose_ingredients_to_lose(player, 2)
+    kept = (player.ingredients - set(lost)).pop()
+    assert all(hits[INGREDIENT_CATEGORY[i]] >= hits[INGREDIENT_CATEGORY[kept]] for i in lost)
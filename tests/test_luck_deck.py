@@ -0,0 +1,61 @@
+import random
+from collections import Counter
+from engine.components import LuckCardType, LUCK_DECK_COMPOSITION
+from engine.fast_game import FastGameState
+from engine.game import GameState
+from engine.luck_deck import CountingLuckDeck
+from engine.policies.random_policy import RandomPolicy
+from engine.seeding import game_rngs
+from scripts.test_random_game import get_default_recipe_draft
+
+def test_full_cycle_draws_the_whole_composition():
+    """Tests that 24 draws deal exactly the deck composition, then the deck refills."""
+    deck = CountingLuckDeck(rng=random.Random(1))
+    drawn = Counter(deck.draw().card_type for _ in range(24))
+
+    assert drawn == Counter({card.card_type: card.count for card in LUCK_DECK_COMPOSITION})
+    assert not deck
+    deck.draw()
+    assert len(deck) == 23
+
+def test_next_card_probabilities():
+    """Tests that next-card probabilities follow the remaining counts."""
+    deck = CountingLuckDeck(rng=random.Random(1))
+    assert deck.probabilities()[LuckCardType.LOSE_1] == 8 / 24
+
+    deck.restore((0, 0, 0, 0, 0, 0, 1))
+    assert deck.probabilities()[LuckCardType.LOSE_ALL] == 1.0
+    assert deck.draw().card_type == LuckCardType.LOSE_ALL
+    assert deck.probabilities()[LuckCardType.GAIN_1] == 7 / 24
+
+def test_first_draw_distribution_matches_shuffled_list():
+    """Tests that the first card of a counting deck is distributed like a shuffled list's."""
+    rng = random.Random(5)
+    draws = Counter(CountingLuckDeck(rng=rng).draw().card_type for _ in range(24_000))
+    for card in LUCK_DECK_COMPOSITION:
+        assert abs(draws[card.card_type] / 24_000 - card.count / 24) < 0.01
+
+def test_snapshot_and_copy_are_independent():
+    """Tests that snapshots and copies don't share state with the original deck."""
+    deck = CountingLuckDeck(rng=random.Random(2))
+    snapshot = deck.snapshot()
+    clone = deck.copy()
+    for _ in range(5):
+        deck.draw()
+
+    assert len(clone) == 24
+    deck.restore(snapshot)
+    assert deck.snapshot() == snapshot == clone.snapshot()
+
+def test_games_run_with_counting_deck():
+    """Tests that both engines play complete, identical games with the counting deck."""
+    draft = get_default_recipe_draft(3)
+    results = []
+    for engine in (GameState, FastGameState):
+        board_rng, seat_rngs = game_rngs(8, 0, 3)
+        game = engine(3, draft, [RandomPolicy(r) for r in seat_rngs], rng=board_rng, counting_deck=True)
+        assert len(game.luck_deck) == 24
+        while not game.game_over:
+            game.step()
+        results.append((game.winner_id, game.pawn_position, game.luck_deck.snapshot()))
+    assert results[0] == results[1]
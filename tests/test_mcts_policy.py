@@ -0,0 +1,56 @@
+import random
+from engine.bitmask import INGREDIENT_BIT
+from engine.components import ALL_PIZZAS, BoardSpaceType, BOARD_LAYOUT
+from engine.fast_game import FastGameState
+from engine.policies.mcts_policy import MCTSPolicy
+from engine.policies.random_policy import RandomPolicy
+from engine.rules import STANDARD_RULES
+from engine.simulation import SimulationConfig, draft_names, play_game
+from scripts.test_random_game import get_default_recipe_draft
+
+def make_game(policy: MCTSPolicy) -> FastGameState:
+    return FastGameState(6, [[p] for p in ALL_PIZZAS], [policy] + [RandomPolicy(random.Random(i)) for i in range(5)],
+                         starting_pos=1, rng=random.Random(0))
+
+def test_mcts_takes_the_winning_ingredient():
+    """Tests that MCTS completes its recipe when one Chef pick away from winning."""
+    policy = MCTSPolicy(random.Random(1), max_rollouts=50, max_seconds=10)
+    game = make_game(policy)
+    recipe = ALL_PIZZAS[0].ingredients
+    missing = recipe[3]
+    game.masks[0] = sum(INGREDIENT_BIT[i] for i in recipe if i != missing)
+    game.pawn_position = next(s.position for s in BOARD_LAYOUT if s.space_type == BoardSpaceType.CHEF)
+
+    assert policy.choose_ingredient(set(recipe), game._view(0)) == missing
+
+def test_transposition_table_is_bounded():
+    """Tests that the transposition table never grows past max_nodes."""
+    policy = MCTSPolicy(random.Random(2), max_rollouts=100, max_seconds=10, max_nodes=30)
+    game = FastGameState(2, get_default_recipe_draft(2), [policy, RandomPolicy(random.Random(1))],
+                         starting_pos=1, rng=random.Random(0))
+    for _ in range(40):
+        game.step()
+    assert len(policy.table) == 30
+
+def test_mcts_plays_a_full_game():
+    """Tests that a game with an MCTS seat runs to completion with legal choices."""
+    policy = MCTSPolicy(random.Random(3), max_rollouts=5, max_seconds=1)
+    game = make_game(policy)
+    while not game.game_over:
+        game.step()
+    assert 0 <= game.winner_id < 6
+
+def test_mcts_plans_on_the_variant_played():
+    """Tests that MCTS searches the board, deck and die of its game's rules and plays variants through."""
+    rules = STANDARD_RULES.with_extra_chefs(2).with_die(4).with_deck(GAIN_1=3, LOSE_1=10)
+    policy = MCTSPolicy(random.Random(4), max_rollouts=5, max_seconds=1)
+    game = FastGameState(2, get_default_recipe_draft(2), [policy, RandomPolicy(random.Random(1))],
+                         rng=random.Random(0), rules=rules)
+    assert (len(policy._rules.board), policy._rules.die_sides, policy._rules.full_deck) == \
+        (game.rules.board_size, 4, rules.deck)
+    while not game.game_over:
+        game.step()
+
+    config = SimulationConfig(2, draft_names(get_default_recipe_draft(2)), ("mcts", "random"),
+                              rules=STANDARD_RULES.with_deck(GAIN_1=3, LOSE_1=10))
+    assert play_game(config, 0).winner >= 0
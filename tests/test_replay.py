@@ -0,0 +1,80 @@
+import pytest
+from engine.replay import CHANGE, ReplayReader, ReplayWriter, record_games
+from engine.rules import STANDARD_RULES
+from engine.simulation import SimulationConfig, build_game, draft_names
+from engine.snapshot import deck_counts
+from scripts.test_random_game import get_default_recipe_draft
+
+def _play_recorded(writer, config, games):
+    """
+    Records games [0, games) through 'writer' and returns every game's true states and winner.
+    """
+    truth = {}
+    for k in range(games):
+        game = build_game(config, k)
+        writer.attach(game, k)
+        states = [(game.pawn_position, game.snapshot().masks, deck_counts(game.luck_deck))]
+        while not game.game_over:
+            game.step()
+            states.append((game.pawn_position, game.snapshot().masks, deck_counts(game.luck_deck)))
+        truth[k] = (states, game.winner_id)
+    return truth
+
+@pytest.mark.parametrize("engine", ["game", "fast"])
+@pytest.mark.parametrize("num_players", [2, 6])
+def test_seeks_rebuild_every_recorded_state(tmp_path, engine, num_players):
+    """Tests that seeking any turn and playing a game through match the states the game went through."""
+    path = str(tmp_path / "games.pzr")
+    config = SimulationConfig(num_players, draft_names(get_default_recipe_draft(num_players)), seed=3, engine=engine)
+    with ReplayWriter(path, num_players, keyframe_interval=16) as writer:
+        truth = _play_recorded(writer, config, 8)
+
+    reader = ReplayReader(path)
+    assert len(reader) == 8
+    for k, (states, winner) in truth.items():
+        assert reader.turns(k) == len(states) - 1
+        frames = list(reader.frames(k))
+        for turn, (position, masks, deck) in enumerate(states):
+            state = reader.seek(k, turn)
+            assert state == frames[turn]
+            assert (state.position, state.masks, state.deck) == (position, masks, deck)
+            assert state.player == (frames[0].player + turn) % num_players
+        assert frames[-1].winner == winner and frames[-2].winner == -1
+        assert reader.seek(k, 10**6) == frames[-1]
+
+def test_variant_decks_and_unfinished_games(tmp_path):
+    """Tests that reshuffles refill a variant deck and that games cut short are kept as far as they got."""
+    path = str(tmp_path / "variant.pzr")
+    rules = STANDARD_RULES.with_deck(GAIN_1=1, GAIN_2=1, STEAL_1=0, STEAL_2=0, LOSE_1=1, LOSE_2=0, LOSE_ALL=0)
+    config = SimulationConfig(3, draft_names(get_default_recipe_draft(3)), seed=5, rules=rules)
+    assert record_games(config, path, 6, keyframe_interval=8, max_turns=40) <= 6 * 40
+
+    reader = ReplayReader(path)
+    for k in range(6):
+        game = build_game(config, k)
+        for turn in range(reader.turns(k) + 1):
+            state = reader.seek(k, turn)
+            assert (state.position, state.masks, state.deck) == \
+                (game.pawn_position, game.snapshot().masks, deck_counts(game.luck_deck))
+            assert sum(state.deck) <= 3
+            if turn < reader.turns(k):
+                game.step()
+        assert state.winner == (game.winner_id if game.game_over else -1)
+        assert game.game_over or reader.turns(k) == 40
+
+def test_seeks_read_at_most_one_keyframe_interval(tmp_path):
+    """Tests that a seek only replays the deltas after the keyframe before it and that deltas stay small."""
+    path = str(tmp_path / "games.pzr")
+    config = SimulationConfig(3, draft_names(get_default_recipe_draft(3)), seed=1, engine="fast")
+    turns = record_games(config, path, 50, keyframe_interval=10)
+
+    reader = ReplayReader(path)
+    assert len(reader.keyframes) == sum(reader.turns(k) // 10 + 1 for k in range(50))
+    deltas = reader.keyframes["offset"].min(), reader.keyframes["offset"].max()
+    assert deltas[1] - deltas[0] < turns * (2 + CHANGE.size)
+    replayed = []
+    reader._play = lambda entry, keyframe, steps, states: replayed.append(steps)
+    for k in range(50):
+        for turn in range(reader.turns(k) + 1):
+            reader.seek(k, turn)
+    assert 1 <= max(replayed) <= 10 and replayed[0] == 0
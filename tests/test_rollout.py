@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+from engine.rollout import run_rollouts
+from engine.simulation import POLICIES, SimulationConfig, build_game, draft_names, play_game, run_simulation
+from engine.trace import TraceReader, TraceWriter
+from scripts.test_random_game import get_default_recipe_draft
+
+def _config(num_players: int = 3, **kwargs) -> SimulationConfig:
+    return SimulationConfig(num_players, draft_names(get_default_recipe_draft(num_players)), seed=4, **kwargs)
+
+def _segments() -> set:
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+def test_shared_backend_matches_the_process_pool():
+    """Tests that results read from shared slots are those of the pickling backend, game by game."""
+    config = _config()
+    pooled, shared = [], []
+    run_simulation(config, 300, workers=2, chunk_size=40, on_result=pooled.append)
+    report = run_simulation(config, 300, workers=2, chunk_size=40, on_result=shared.append, backend="shared")
+
+    assert sorted(shared) == sorted(pooled) == [play_game(config, k) for k in range(300)]
+    assert report.stats.games == 300
+
+def test_single_slot_backpressure_still_plays_every_game():
+    """Tests that workers wait for the only slot instead of losing or duplicating chunks."""
+    config = _config(2)
+    starts = []
+    report = run_rollouts(config, 200, workers=2, chunk_size=20, slots=1,
+                          on_chunk=lambda chunk: starts.append(chunk.start))
+    assert sorted(starts) == list(range(0, 200, 20))
+    assert report.stats.wins == run_simulation(config, 200).stats.wins
+
+def test_trajectories_match_the_trace_format(tmp_path):
+    """Tests that per-turn trajectories hold the same records as a trace of the same games."""
+    config = _config()
+    path = str(tmp_path / "games.trace")
+    with TraceWriter(path, 3) as writer:
+        for k in range(30):
+            game = build_game(config, k)
+            writer.attach(game, k)
+            while not game.game_over:
+                game.step()
+    reader = TraceReader(path)
+
+    chunks = {}
+    run_rollouts(config, 30, workers=2, chunk_size=10, trajectory_turns=25,
+                 on_chunk=lambda chunk: chunks.update({chunk.start + i: chunk.trajectory(i).copy()
+                                                       for i in range(len(chunk.records))}))
+    for k in range(30):
+        expected = reader.game(k)[:25]
+        assert np.array_equal(chunks[k]["position"], expected["position"])
+        assert np.array_equal(chunks[k]["card"], expected["card"])
+        assert np.array_equal(chunks[k]["masks"], expected["masks"])
+
+def test_worker_crash_raises_and_frees_the_segment(monkeypatch):
+    """Tests that a dead worker fails the run instead of hanging it, and leaves no shared memory behind."""
+    monkeypatch.setitem(POLICIES, "crash", lambda rng: os._exit(3))
+    before = _segments()
+    with pytest.raises(RuntimeError, match="died"):
+        run_rollouts(_config(2, policies=("crash", "random")), 100, workers=2, chunk_size=10)
+    assert _segments() <= before
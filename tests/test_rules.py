@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from engine.components import LUCK_DECK_COMPOSITION
+from engine.distributed import decode_job, encode_job
+from engine.fast_game import FastGameState
+from engine.game import GameState
+from engine.policies.random_policy import RandomPolicy
+from engine.rollout import run_rollouts
+from engine.rules import CHEF_KIND, LUCK_KIND, STANDARD_RULES, RuleSet, compile_rules
+from engine.seeding import game_rngs
+from engine.simulation import POLICIES, SimulationConfig, draft_names, run_simulation
+from engine.sweep import grid, random_variants, run_sweep
+from engine.variance import estimate_stratified, observe_chunk
+from scripts.test_random_game import get_default_recipe_draft
+
+VARIANT = STANDARD_RULES.shuffled(3).with_extra_chefs(2, seed=1).with_deck(LOSE_ALL=0, GAIN_2=5).with_die(8)
+CONFIG = SimulationConfig(2, draft_names(get_default_recipe_draft(2)), seed=7)
+
+def test_engines_play_variants_identically():
+    """Tests that GameState and FastGameState play the same game under a house-rule variant."""
+    def play(engine):
+        board_rng, seat_rngs = game_rngs(11, 0, 3)
+        game = engine(3, get_default_recipe_draft(3), [RandomPolicy(r) for r in seat_rngs],
+                      rng=board_rng, rules=VARIANT)
+        turns = []
+        while not game.game_over and len(turns) < 3000:
+            game.step()
+            turns.append((game.pawn_position, len(game.luck_deck), game.snapshot().masks))
+        return turns
+
+    turns = play(GameState)
+    assert turns == play(FastGameState)
+    assert max(position for position, _, _ in turns) == 37
+
+def test_rules_compile_once_and_validate():
+    """Tests that compiled tables are shared, standard rules keep the standard cards and bad variants fail."""
+    assert compile_rules(VARIANT) is compile_rules(replace(VARIANT))
+    assert compile_rules().board_size == 35 and compile_rules().composition == LUCK_DECK_COMPOSITION
+    compiled = compile_rules(VARIANT)
+    assert compiled.board_size == 37 and compiled.board_kind.count(CHEF_KIND) == 4
+    assert len(compiled.deck_cards) == sum(VARIANT.deck) and VARIANT.deck[1] == 5 and VARIANT.deck[-1] == 0
+
+    for bad in (STANDARD_RULES.with_die(0), RuleSet(deck=(0,) * 7), RuleSet(board=("PINEAPPLE",) * 35)):
+        with pytest.raises(ValueError):
+            compile_rules(bad)
+
+def test_variants_round_trip_through_simulation_configs():
+    """Tests that a config with rules survives the cluster job encoding and changes the games."""
+    config = SimulationConfig(CONFIG.num_players, CONFIG.draft, seed=7, rules=VARIANT)
+    assert decode_job(encode_job(config)) == config
+    assert run_simulation(config, 50).stats.turns_mean != run_simulation(CONFIG, 50).stats.turns_mean
+
+def test_sweep_is_independent_of_workers():
+    """Tests that a sweep reports the same statistics serially and on a pool, standard rules included."""
+    variants = grid(die_sides=(4, 6), extra_chefs=(0, 1)) + random_variants(2, seed=1)
+    assert variants[2] == STANDARD_RULES and len(variants) == 6
+
+    serial = run_sweep(CONFIG, variants, 60, workers=1, chunk_size=25)
+    pooled = run_sweep(CONFIG, variants, 60, workers=2, chunk_size=25)
+    for a, b in zip(serial.results, pooled.results):
+        assert a.stats.wins == b.stats.wins
+        assert a.turns == pytest.approx(b.turns)
+    assert serial.results[2].stats.wins == run_simulation(CONFIG, 60).stats.wins
+    assert all(0 <= result.imbalance <= 0.5 for result in serial.ranked())
+
+@pytest.mark.parametrize("policy", sorted(POLICIES))
+def test_every_policy_sweeps_random_variants(policy):
+    """Tests that each policy plays the boards, dice and decks a random search generates."""
+    config = SimulationConfig(CONFIG.num_players, CONFIG.draft, (policy, "random"), seed=7)
+    report = run_sweep(config, random_variants(2, seed=0), 1)
+    assert all(sum(result.stats.wins) == 1 for result in report.results)
+
+def test_variance_and_rollouts_follow_the_variant_board():
+    """Tests that controls stay zero-mean and trajectories decode on a larger board with another die and deck."""
+    rules = STANDARD_RULES.shuffled(5).with_extra_chefs(6).with_die(4).with_deck(LOSE_ALL=0, GAIN_2=5)
+    config = SimulationConfig(CONFIG.num_players, CONFIG.draft, seed=7, rules=rules)
+    controls = observe_chunk(config, 0, 400).controls
+    spread = controls.std(axis=0) / 20
+    assert (abs(controls.mean(axis=0)) <= 4 * spread + 1e-12).all()
+    assert estimate_stratified(config, 41).games == 41 * 2
+
+    luck = [kind == LUCK_KIND for kind in compile_rules(rules).board_kind]
+    trajectories = []
+    run_rollouts(config, 20, chunk_size=10, trajectory_turns=50,
+                 on_chunk=lambda chunk: trajectories.extend(chunk.trajectory(game).copy() for game in range(10)))
+    turns = np.concatenate(trajectories)
+    assert turns["position"].max() > 35
+    drawn = turns["card"] >= 0
+    assert (drawn == np.array(luck)[turns["position"]]).all() and (turns["card"][drawn] != 6).all()
+
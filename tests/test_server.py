@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+
+from engine.bitmask import INGREDIENTS
+from engine.game import GameState
+from engine.policy import PlayerController
+from engine.policies.random_policy import RandomPolicy
+from engine.seeding import game_rngs
+from engine.server import GameServer, run_load_test
+from engine.simulation import draft_names
+from scripts.test_random_game import get_default_recipe_draft
+
+DRAFT = draft_names(get_default_recipe_draft(2))
+
+class FirstChoice(PlayerController):
+    """Always takes the first choice in canonical order, like the scripted client below."""
+    def choose_ingredient(self, needed, player):
+        return next(i for i in INGREDIENTS if i in needed)
+
+    def choose_opponent(self, player, opponents):
+        return min(opponents, key=lambda p: p.id)
+
+    def choose_ingredients_to_lose(self, player, amount):
+        return [i for i in INGREDIENTS if i in player.ingredients][:amount]
+
+async def _session(address, request: dict, answer=True):
+    """Plays one session over a raw connection; returns the decisions, errors and the 'over' event."""
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(json.dumps({"op": "new", **request}).encode() + b"\n")
+    decisions, errors = [], []
+    while True:
+        message = json.loads(await reader.readline())
+        if message["event"] == "error":
+            errors.append(message)
+        elif message["event"] == "decision":
+            decisions.append(message)
+            if answer:
+                choice = message["choices"][:message["amount"]] if message["kind"] == "lose" else message["choices"][0]
+                if len(decisions) == 1:     # A wrong move first, which must be rejected
+                    writer.write(json.dumps({"op": "move", "session": message["session"],
+                                             "ask": message["ask"], "choice": "PINEAPPLE"}).encode() + b"\n")
+                writer.write(json.dumps({"op": "move", "session": message["session"],
+                                         "ask": message["ask"], "choice": choice}).encode() + b"\n")
+        elif message["event"] == "over":
+            writer.close()
+            return decisions, errors, message
+
+def _serve(coroutine_factory, **server_args):
+    async def run():
+        server = GameServer(**server_args)
+        address = await server.start()
+        try:
+            return await coroutine_factory(address), server.metrics.report()
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+def test_remote_session_replays_the_local_game():
+    """Tests that a game suspended on every remote decision plays exactly like the same game played locally."""
+    (decisions, errors, over), metrics = _serve(
+        lambda address: _session(address, {"players": 2, "seats": ["remote", "random"], "draft": DRAFT, "seed": 4}),
+        timeout=10.0)
+
+    board_rng, seat_rngs = game_rngs(4, 0, 2)
+    game = GameState(2, get_default_recipe_draft(2), [FirstChoice(), RandomPolicy(seat_rngs[1])], rng=board_rng)
+    turns = 0
+    while not game.game_over:
+        game.step()
+        turns += 1
+
+    assert (over["winner"], over["turns"], over["timeouts"]) == (game.winner_id, turns, 0)
+    assert decisions and len(errors) == 1 and metrics["rejected_moves"] == 1
+    assert metrics["decisions"] == len(decisions) and metrics["sessions_finished"] == 1
+
+def test_silent_players_fall_back_to_random():
+    """Tests that unanswered decisions time out into the random fallback and the game still ends."""
+    (decisions, _, over), metrics = _serve(
+        lambda address: _session(address, {"players": 3, "seats": ["remote", "remote", "random"]}, answer=False),
+        timeout=0.001)
+    assert over["winner"] >= 0 and over["timeouts"] == len(decisions) > 0
+    assert metrics["timeouts"] == len(decisions)
+
+def test_load_test_over_a_unix_socket(tmp_path):
+    """Tests that the load-test bots finish every session and the server reports its metrics."""
+    async def run():
+        server = GameServer(timeout=5.0)
+        address = await server.start(os.path.join(str(tmp_path), "server.sock"))
+        try:
+            return await run_load_test(address, sessions=60, concurrency=30, connections=3, num_players=3, remote_seats=2)
+        finally:
+            await server.close()
+
+    report = asyncio.run(run())
+    server = report["server"]
+    assert report["sessions"] == server["sessions_finished"] == 60 and report["timeouts"] == 0
+    assert server["peak_active"] == 30 and server["active"] == 0 and server["rejected_moves"] == 0
+    assert server["turns"] == report["turns"] and server["move_latency_ms"]["p50"] > 0
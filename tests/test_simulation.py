@@ -0,0 +1,47 @@
+import pytest
+from engine.simulation import (
+    RunningStats, SimulationConfig, draft_names, play_chunk, play_game, run_simulation
+)
+from scripts.test_random_game import get_default_recipe_draft
+
+@pytest.fixture
+def config() -> SimulationConfig:
+    return SimulationConfig(num_players=3, draft=draft_names(get_default_recipe_draft(3)), seed=42)
+
+def test_play_game_is_deterministic(config: SimulationConfig):
+    """Tests that a game's result only depends on the config and its index."""
+    assert play_game(config, 3) == play_chunk(config, 0, 5)[3]
+    assert play_game(config, 3).winner >= 0
+
+def test_engines_agree(config: SimulationConfig):
+    """Tests that the reference and bitmask engines produce the same results."""
+    reference = SimulationConfig(config.num_players, config.draft, seed=config.seed, engine="game")
+    assert play_chunk(reference, 0, 20) == play_chunk(config, 0, 20)
+
+def test_parallel_run_matches_serial_run(config: SimulationConfig):
+    """Tests that spreading games over worker processes doesn't change the aggregate."""
+    serial = run_simulation(config, 60, workers=1, chunk_size=7).stats
+    parallel = run_simulation(config, 60, workers=2, chunk_size=7).stats
+
+    assert serial.games == parallel.games == 60
+    assert serial.wins == parallel.wins
+    assert serial.turns_mean == pytest.approx(parallel.turns_mean)
+
+def test_until_ci_stops_early(config: SimulationConfig):
+    """Tests that the run stops once the requested precision is reached."""
+    report = run_simulation(config, 100_000, chunk_size=50, until_ci=0.2)
+    assert report.stats.games < 100_000
+    assert report.stats.max_win_rate_ci() <= 0.2
+
+def test_running_stats_merge(config: SimulationConfig):
+    """Tests that merging partial aggregates equals aggregating everything at once."""
+    results = play_chunk(config, 0, 30)
+    whole, left, right = RunningStats(3), RunningStats(3), RunningStats(3)
+    for i, result in enumerate(results):
+        whole.add(result)
+        (left if i < 12 else right).add(result)
+    left.merge(right)
+
+    assert left.wins == whole.wins
+    assert left.turns_mean == pytest.approx(whole.turns_mean)
+    assert left.turns_std() == pytest.approx(whole.turns_std())
@@ -0,0 +1,60 @@
+import pytest
+from engine.components import Ingredient
+from engine.fast_game import FastGameState
+from engine.game import GameState
+from engine.policies.random_policy import RandomPolicy
+from engine.seeding import game_rngs
+from engine.rules import STANDARD_RULES
+from engine.snapshot import deck_counts, state_key
+from scripts.test_random_game import get_default_recipe_draft
+
+@pytest.mark.parametrize("engine", [GameState, FastGameState])
+@pytest.mark.parametrize("counting_deck", [False, True])
+def test_restore_replays_the_same_game(engine, counting_deck):
+    """Tests that restoring a snapshot (and the rng state) replays identical turns."""
+    board_rng, seat_rngs = game_rngs(4, 0, 3)
+    game = engine(3, get_default_recipe_draft(3), [RandomPolicy(r) for r in seat_rngs],
+                  rng=board_rng, counting_deck=counting_deck)
+    for _ in range(10):
+        game.step()
+
+    snapshot = game.snapshot()
+    rng_states = [game.rng.getstate()] + [c.rng.getstate() for c in game.controllers]
+    first = []
+    for _ in range(20):
+        game.step()
+        first.append(game.snapshot())
+
+    game.restore(snapshot)
+    game.rng.setstate(rng_states[0])
+    for controller, state in zip(game.controllers, rng_states[1:]):
+        controller.rng.setstate(state)
+    assert game.snapshot() == snapshot
+    second = []
+    for _ in range(20):
+        game.step()
+        second.append(game.snapshot())
+
+    assert first == second
+
+def test_state_key_hides_deck_order(game_state: GameState):
+    """Tests that the canonical key only depends on the deck counts, not its order."""
+    game_state.players[0].ingredients.add(Ingredient.HAM)
+    snapshot = game_state.snapshot()
+    reordered = snapshot._replace(deck=tuple(reversed(snapshot.deck)))
+
+    assert state_key(snapshot) == state_key(reordered)
+    assert sum(deck_counts(snapshot.deck)) == 24
+    assert hash(state_key(snapshot))
+
+@pytest.mark.parametrize("engine", [GameState, FastGameState])
+def test_deck_variants_count_and_restore(engine):
+    """Tests that a variant deck is counted by card type and dealt back from counts with its own cards."""
+    rules = STANDARD_RULES.with_deck(GAIN_1=3, LOSE_1=10)
+    board_rng, seat_rngs = game_rngs(4, 0, 3)
+    game = engine(3, get_default_recipe_draft(3), [RandomPolicy(r) for r in seat_rngs], rng=board_rng, rules=rules)
+    assert deck_counts(game.luck_deck) == rules.deck
+
+    snapshot = game.snapshot()
+    game.restore(snapshot._replace(deck=deck_counts(snapshot.deck)))
+    assert sorted(map(id, game.luck_deck)) == sorted(map(id, game.rules.deck_cards))
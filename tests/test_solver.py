@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import patch
+from engine.components import Ingredient, PizzaCard, LuckCard, LuckCardType
+from engine.fast_game import FastGameState
+from engine.rules import RuleSet
+from engine.policies.random_policy import RandomPolicy
+from engine.seeding import game_rngs
+from engine.solver import MarkovSolver, solve_draft
+
+SMALL_DECK = [LuckCard(LuckCardType.GAIN_1, 1), LuckCard(LuckCardType.STEAL_2, 1), LuckCard(LuckCardType.LOSE_2, 1)]
+SMALL_RULES = RuleSet().with_deck(GAIN_1=1, GAIN_2=0, STEAL_1=0, STEAL_2=1, LOSE_1=0, LOSE_2=1, LOSE_ALL=0)
+
+def small_draft():
+    """Two players, three single-ingredient recipes each, sharing HAM."""
+    def pizza(ingredient):
+        return PizzaCard(ingredient.name, [ingredient])
+    return [[pizza(Ingredient.SALAMI), pizza(Ingredient.HAM), pizza(Ingredient.EGGS)],
+            [pizza(Ingredient.CORN), pizza(Ingredient.ONION), pizza(Ingredient.HAM)]]
+
+@pytest.fixture(scope="module")
+def result():
+    return MarkovSolver(small_draft(), deck=SMALL_DECK).solve()
+
+def test_solver_probabilities_are_consistent(result):
+    """Tests that exact win probabilities sum to one for every starting position."""
+    assert result.start_win.sum(axis=1) == pytest.approx(1.0, abs=1e-9)
+    assert result.win_probabilities.sum() == pytest.approx(1.0, abs=1e-9)
+    assert result.expected_turns > 1
+
+def test_solver_matches_monte_carlo(result):
+    """Tests that the exact solution agrees with simulated random-policy games."""
+    wins, turns, games = 0, 0, 4000
+    for k in range(games):
+        board_rng, seat_rngs = game_rngs(3, k, 2)
+        game = FastGameState(2, small_draft(), [RandomPolicy(r) for r in seat_rngs], rng=board_rng,
+                             rules=SMALL_RULES)
+        while not game.game_over:
+            game.step()
+            turns += 1
+        wins += game.winner_id == 0
+
+    assert wins / games == pytest.approx(result.win_probabilities[0], abs=0.03)
+    assert turns / games == pytest.approx(result.expected_turns, rel=0.05)
+
+def test_solve_draft_memoizes_to_disk(tmp_path, result):
+    """Tests that a solved draft is stored and read back from the cache directory."""
+    with patch.object(MarkovSolver, 'solve', return_value=result):
+        first = solve_draft(small_draft(), cache_dir=str(tmp_path), deck=SMALL_DECK)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    with patch.object(MarkovSolver, 'solve', side_effect=AssertionError("not memoized")):
+        second = solve_draft(small_draft(), cache_dir=str(tmp_path), deck=SMALL_DECK)
+    assert second.win_probabilities == pytest.approx(first.win_probabilities)
+
+def test_solver_refuses_huge_state_spaces():
+    """Tests that the solver stops enumerating past max_states."""
+    with pytest.raises(ValueError):
+        MarkovSolver(small_draft(), max_states=1000).build()
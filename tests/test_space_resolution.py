@@ -1,5 +1,5 @@
-from engine.components import Ingredient, BoardSpaceType, ALL_PIZZAS
-from engine.game import GameState, BOARD_LAYOUT
+from engine.components import Ingredient, BoardSpaceType, ALL_PIZZAS, BOARD_LAYOUT
+from engine.game import GameState
 
 def test_resolve_ingredient_space(game_state: GameState):
     """Tests landing on an INGREDIENT space."""
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from engine.solver import MarkovSolver
+from engine.state_index import StateIndex, count_reachable
+from scripts.test_random_game import get_default_recipe_draft
+from tests.test_solver import SMALL_DECK, small_draft
+
+def test_rank_and_unrank_are_inverse_bijections():
+    """Tests that every index decodes to a distinct canonical state that ranks back to it."""
+    index = StateIndex(small_draft(), deck=SMALL_DECK)
+    states = [index.unrank(i) for i in range(index.size)]
+    assert [index.rank(*state) for state in states] == list(range(index.size))
+    assert len(set(states)) == index.size
+    with pytest.raises(IndexError):
+        index.unrank(index.size)
+
+def test_equivalent_states_share_a_rank():
+    """Tests that off-recipe Ingredients, an empty deck and symmetric seats don't change the rank."""
+    index = StateIndex(get_default_recipe_draft(3))
+    deck = (3, 1, 2, 0, 4, 1, 1)
+    full = tuple(radix - 1 for radix in index.deck_radix)
+    off_recipe = [1023 & ~recipe for recipe in index.recipes]
+    masks = (index.recipes[0] & 0b101, 0, index.recipes[2] & 0b1000)
+
+    assert index.rank(12, 1, masks, deck) == index.rank(12, 1, [m | o for m, o in zip(masks, off_recipe)], deck)
+    assert index.rank(12, 1, masks, (0,) * 7) == index.rank(12, 1, masks, full)
+    with pytest.raises(ValueError):
+        index.rank(12, 1, (index.recipes[0], 0, 0), deck)
+
+    same = [get_default_recipe_draft(3)[0]] * 3
+    symmetric = StateIndex(same)
+    assert symmetric.period == 1
+    assert symmetric.rank(5, 2, (1, 2, 4), deck) == symmetric.rank(5, 0, (4, 1, 2), deck)
+    assert symmetric.rotation(2) == 2
+
+def test_rank_many_matches_rank():
+    """Tests that the vectorized ranking agrees with the scalar one."""
+    index = StateIndex(get_default_recipe_draft(6))
+    rng = np.random.default_rng(4)
+    n = 500
+    pos = rng.integers(1, index.board_size + 1, n)
+    cur = rng.integers(0, 6, n)
+    masks = rng.integers(0, 1024, (n, 6)) & ~np.array(index.recipes)[None, :] | rng.integers(0, 2, (n, 6))
+    deck = rng.integers(0, np.array(index.deck_radix)[None, :], (n, len(index.deck_radix)))
+    deck[:10] = 0
+
+    expected = [index.rank(int(p), int(c), tuple(int(m) for m in row), tuple(d))
+                for p, c, row, d in zip(pos, cur, masks, deck)]
+    assert index.rank_many(pos, cur, masks, deck).tolist() == expected
+
+def test_reachable_states_match_the_solver():
+    """Tests that the reachable count equals the solver's state count without symmetry, and shrinks with it."""
+    assert count_reachable(small_draft(), deck=SMALL_DECK) == len(MarkovSolver(small_draft(), deck=SMALL_DECK).build()[0])
+
+    symmetric = [small_draft()[0]] * 2
+    reachable = count_reachable(symmetric, deck=SMALL_DECK)
+    assert reachable < len(MarkovSolver(symmetric, deck=SMALL_DECK).build()[0])
+    assert reachable <= StateIndex(symmetric, deck=SMALL_DECK).size
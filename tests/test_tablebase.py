@@ -0,0 +1,86 @@
+import os
+import random
+import numpy as np
+import pytest
+from unittest.mock import patch
+from engine import tablebase
+from engine.bitmask import INGREDIENT_BIT
+from engine.components import BoardSpaceType, BOARD_LAYOUT, Ingredient, LuckCard, LuckCardType
+from engine.fast_game import FastGameState
+from engine.policies.endgame_policy import EndgamePolicy
+from engine.policies.random_policy import RandomPolicy
+from engine.solver import MarkovSolver
+from engine.tablebase import EndgameIndex, estimate_boundary, generate_tablebase, rule_set
+from tests.test_solver import small_draft
+
+# With a single card type the deck never changes the odds, so the tablebase is exact
+STEAL_DECK = [LuckCard(LuckCardType.STEAL_2, 2)]
+
+@pytest.fixture(scope="module")
+def closed(tmp_path_factory):
+    """Every live state of the small draft: each recipe has 3 Ingredients."""
+    return generate_tablebase(small_draft(), threshold=3, cache_dir=str(tmp_path_factory.mktemp("tb")),
+                              workers=2, deck=STEAL_DECK)
+
+def test_endgame_index_ranks_are_dense():
+    """Tests that every rank decodes to a distinct region state that ranks back to it."""
+    index = EndgameIndex((0b111, 0b11100), 5, 2)
+    states = [index.unrank(i) for i in range(index.size)]
+    assert [index.rank(*state) for state in states] == list(range(index.size))
+    assert len(set(states)) == index.size == 5 * 2 * 6 * 6
+    assert index.rank(1, 0, (0, 0b100)) == -1 and not index.contains((0, 0b100))
+
+def test_closed_tablebase_matches_the_solver(closed):
+    """Tests that a region without exits gives the Markov solver's exact win probabilities."""
+    result = MarkovSolver(small_draft(), deck=STEAL_DECK).solve()
+    starts = np.array([closed.value(pos, 0, (0, 0)) for pos in range(1, len(BOARD_LAYOUT) + 1)])
+    assert starts == pytest.approx(result.start_win, abs=1e-6)
+    assert len(closed.boundary_codes) == 0
+
+def test_generation_resumes_from_its_chunks(tmp_path):
+    """Tests that a rerun only builds the missing blocks and solves to the same table."""
+    first = generate_tablebase(small_draft(), threshold=1, cache_dir=str(tmp_path), workers=1,
+                               deck=STEAL_DECK, boundary_games=500)
+    values = np.array(first.values)
+    directory = next(tmp_path.iterdir())
+    os.remove(directory / "values.npy")
+    os.remove(tablebase.chunk_path(str(directory), 7))
+
+    with patch.object(tablebase, "build_block", wraps=tablebase.build_block) as build:
+        second = generate_tablebase(small_draft(), threshold=1, cache_dir=str(tmp_path), workers=1,
+                                    deck=STEAL_DECK, boundary_games=500)
+    assert [call.args[2] for call in build.call_args_list] == [7]
+    assert np.array(second.values) == pytest.approx(values)
+
+def test_endgame_policy_takes_the_winning_ingredient(closed):
+    """Tests that the tablebase controller completes its recipes from a Chef space."""
+    policy = EndgamePolicy(closed, rng=random.Random(0))
+    game = FastGameState(2, small_draft(), [policy, RandomPolicy(random.Random(1))],
+                         starting_pos=1, rng=random.Random(0))
+    game.masks[0] = INGREDIENT_BIT[Ingredient.SALAMI] | INGREDIENT_BIT[Ingredient.HAM]
+    game.pawn_position = next(s.position for s in BOARD_LAYOUT if s.space_type == BoardSpaceType.CHEF)
+
+    assert policy.choose_ingredient({Ingredient.SALAMI, Ingredient.HAM, Ingredient.EGGS},
+                                    game._view(0)) == Ingredient.EGGS
+
+    while not game.game_over:
+        game.step()
+    assert game.winner_id in (0, 1)
+
+def test_boundary_games_play_the_tables_rules(tmp_path):
+    """Tests that boundary values are estimated under the table's deck and keyed by their number of games."""
+    assert rule_set() is None
+    steal_rules = rule_set(deck=STEAL_DECK)
+    assert steal_rules.deck == (0, 0, 0, 2, 0, 0, 0) and steal_rules.board == rule_set(die_sides=4).board
+
+    table = generate_tablebase(small_draft(), threshold=1, cache_dir=str(tmp_path), workers=1,
+                               deck=STEAL_DECK, boundary_games=300)
+    codes, values = estimate_boundary(small_draft(), 300, rules=steal_rules)
+    assert np.array_equal(table.boundary_codes, codes) and np.allclose(table.boundary_values, values)
+    _, standard_values = estimate_boundary(small_draft(), 300)
+    assert not np.allclose(values, standard_values)
+
+    generate_tablebase(small_draft(), threshold=1, cache_dir=str(tmp_path), workers=1,
+                       deck=STEAL_DECK, boundary_games=400)
+    assert len(list(tmp_path.iterdir())) == 2
+
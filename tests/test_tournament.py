@@ -0,0 +1,61 @@
+import pytest
+from engine import tournament
+from engine.simulation import draft_names
+from engine.tournament import SeatingRecord, TournamentConfig, TournamentResult, run_tournament, seatings
+from scripts.test_random_game import get_default_recipe_draft
+
+def _config(num_players: int = 3, games: int = 20, **kwargs) -> TournamentConfig:
+    return TournamentConfig(("random", "heuristic"), num_players,
+                            draft_names(get_default_recipe_draft(num_players)), games, **kwargs)
+
+def test_seatings_cover_every_permutation_once():
+    """Tests that every mixed lineup appears in each distinct seat order exactly once."""
+    assert seatings(_config(2)) == [("heuristic", "random"), ("random", "heuristic")]
+    assert len(seatings(_config(3))) == 6
+    assert len(seatings(_config(6))) == 62                          # 2^6 minus the two single-policy tables
+    assert len(seatings(_config(6, all_permutations=False))) == 30  # 6 rotations of each of the 5 lineups
+
+def test_ratings_follow_the_winners():
+    """Tests that ratings are even for an even record and favour the policy that wins more."""
+    result = TournamentResult(_config(2))
+    result.records[("heuristic", "random")] = SeatingRecord(games=100, wins=[50, 50])
+    result.records[("random", "heuristic")] = SeatingRecord(games=100, wins=[50, 50])
+    assert result.ratings() == pytest.approx({"heuristic": 1500, "random": 1500})
+
+    result.records[("random", "heuristic")] = SeatingRecord(games=100, wins=[10, 90])
+    ratings = result.ratings()
+    assert ratings["heuristic"] > 1500 > ratings["random"]
+    assert result.win_matrix()["heuristic"]["random"] == pytest.approx(140 / 200)
+
+def test_interrupted_tournament_resumes_from_checkpoint(tmp_path, monkeypatch):
+    """Tests that a rerun after an interruption skips finished chunks and ends with the same results."""
+    config = _config(3, games=20)
+    checkpoint = str(tmp_path / "tournament.json")
+    play = tournament.play_seating_chunk
+    calls = []
+
+    def interrupted(*args):
+        if len(calls) == 5:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return play(*args)
+
+    monkeypatch.setattr(tournament, "play_seating_chunk", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_tournament(config, chunk_size=10, checkpoint=checkpoint)
+    monkeypatch.setattr(tournament, "play_seating_chunk", play)
+
+    resumed = run_tournament(config, chunk_size=10, checkpoint=checkpoint)
+    fresh = run_tournament(config, chunk_size=10)
+    assert resumed.games == fresh.games == 6 * 20
+    assert {s: r.wins for s, r in resumed.records.items()} == {s: r.wins for s, r in fresh.records.items()}
+
+    with pytest.raises(ValueError):
+        run_tournament(config, chunk_size=5, checkpoint=checkpoint)
+
+def test_parallel_tournament_matches_serial():
+    """Tests that the process pool plays the same games as a serial run."""
+    config = _config(2, games=30)
+    serial = run_tournament(config, workers=1, chunk_size=10)
+    parallel = run_tournament(config, workers=2, chunk_size=10)
+    assert {s: r.wins for s, r in serial.records.items()} == {s: r.wins for s, r in parallel.records.items()}
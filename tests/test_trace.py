@@ -0,0 +1,168 @@
+import os
+
+import numpy as np
+import pytest
+from engine.fast_game import FastGameState
+from engine.game import GameState
+from engine.policies.random_policy import RandomPolicy
+from engine.rules import STANDARD_RULES
+from engine.seeding import game_rngs
+from engine.simulation import SimulationConfig, build_game, draft_names
+from engine.trace import LUCK_SPACE, SPACE_CODES, TraceReader, TraceWriter, index_path
+from scripts.test_random_game import get_default_recipe_draft
+
+def _game(engine, index: int):
+    board_rng, seat_rngs = game_rngs(9, index, 3)
+    return engine(3, get_default_recipe_draft(3), [RandomPolicy(r) for r in seat_rngs], rng=board_rng)
+
+def _play(game, max_turns: int = 10_000):
+    history = []
+    for _ in range(max_turns):
+        if game.game_over:
+            break
+        mover = game.current_player_index
+        game.step()
+        history.append((mover, game.pawn_position, game.snapshot().masks))
+    return history
+
+@pytest.mark.parametrize("engine", [GameState, FastGameState])
+def test_trace_round_trip(tmp_path, engine):
+    """Tests that the expanded turns match what the game actually did, game by game."""
+    path = str(tmp_path / "games.trace")
+    histories = {}
+    with TraceWriter(path, 3, buffer_records=100) as writer:
+        for game_id in (7, 3, 11):
+            game = _game(engine, game_id)
+            writer.attach(game, game_id)
+            histories[game_id] = (_play(game), game)
+
+    reader = TraceReader(path)
+    assert list(reader.games) == [7, 3, 11]
+    assert len(reader) == sum(len(history) for history, _ in histories.values())
+
+    for game_id, (history, game) in histories.items():
+        records = reader.game(game_id)
+        turns = reader.turns(game_id)
+        assert len(records) == len(turns) == len(history)
+        assert [tuple(m) for m in records["masks"].tolist()] == [masks for _, _, masks in history]
+        assert list(turns["player"]) == [mover for mover, _, _ in history]
+        assert list(turns["position"]) == [pos for _, pos, _ in history]
+        assert list(turns["turn"]) == list(range(1, len(history) + 1))
+        assert 1 <= turns["roll"].min() and turns["roll"].max() <= 6
+        assert turns["won"].sum() == 1 and turns["won"][-1]
+        assert turns["player"][-1] == game.winner_id
+
+    assert np.array_equal(reader.turns()["game"], np.concatenate([reader.turns(g)["game"] for g in (7, 3, 11)]))
+
+@pytest.mark.parametrize("engine", ["game", "fast"])
+def test_masks_stay_current_through_steals_and_restores(tmp_path, engine):
+    """Tests that games hooked mid-way, stealing often and restored keep recording their true masks."""
+    path = str(tmp_path / "games.trace")
+    rules = STANDARD_RULES.with_deck(GAIN_1=1, GAIN_2=1, STEAL_1=3, STEAL_2=2, LOSE_1=1, LOSE_2=1, LOSE_ALL=1)
+    config = SimulationConfig(3, draft_names(get_default_recipe_draft(3)), seed=9, engine=engine, rules=rules)
+    histories = {}
+    with TraceWriter(path, 3, rules=rules) as writer:
+        for game_id in range(20):
+            game = build_game(config, game_id)
+            _play(game, max_turns=game_id % 7)
+            writer.attach(game, game_id)
+            snapshot = game.snapshot()
+            _play(game, max_turns=6)
+            game.restore(snapshot)
+            writer.active[-1].rows.clear()              # Forget the turns the restore took back
+            writer.active[-1].cards.clear()
+            histories[game_id] = _play(game)
+
+    reader = TraceReader(path)
+    for game_id, history in histories.items():
+        assert list(reader.turns(game_id)["position"]) == [pos for _, pos, _ in history]
+        assert [tuple(m) for m in reader.game(game_id)["masks"].tolist()] == [masks for _, _, masks in history]
+
+def test_variant_boards_are_traced(tmp_path):
+    """Tests that rolls and spaces are derived from the variant's own board and that other rules are refused."""
+    path = str(tmp_path / "games.trace")
+    rules = STANDARD_RULES.with_extra_chefs(4).shuffled(2).with_die(8)
+    config = SimulationConfig(3, draft_names(get_default_recipe_draft(3)), seed=9, engine="fast", rules=rules)
+    played = {}
+    with TraceWriter(path, 3, rules=rules) as writer:
+        with pytest.raises(ValueError):
+            writer.attach(_game(FastGameState, 0), 0)
+        for game_id in range(5):
+            game = build_game(config, game_id)
+            writer.attach(game, game_id)
+            positions = [game.pawn_position]
+            while not game.game_over:
+                game.step()
+                positions.append(game.pawn_position)
+            played[game_id] = (game, positions)
+
+    reader = TraceReader(path)
+    assert (reader.board_size, reader.die_sides) == (39, 8)
+    for game_id, (game, positions) in played.items():
+        turns = reader.turns(game_id)
+        assert list(turns["position"]) == positions[1:]
+        assert list(turns["roll"]) == [(b - a - 1) % 39 + 1 for a, b in zip(positions, positions[1:])]
+        assert 1 <= turns["roll"].min() and turns["roll"].max() <= 8
+        assert list(turns["space"]) == [SPACE_CODES[game.rules.board[p - 1].space_type] for p in positions[1:]]
+        assert ((turns["card"] >= 0) == (turns["space"] == LUCK_SPACE)).all()
+
+def test_gains_and_cards_are_derived(tmp_path):
+    """Tests that gains and losses never overlap and cards only appear on luck spaces."""
+    path = str(tmp_path / "games.trace")
+    with TraceWriter(path, 3) as writer:
+        game = _game(FastGameState, 0)
+        writer.attach(game, 0)
+        _play(game)
+
+    reader = TraceReader(path)
+    turns = reader.turns(0)
+    masks = reader.game(0)["masks"]
+    for pid in range(3):
+        mine = turns[turns["player"] == pid]
+        assert not mine["gained"].any() or (mine["gained"] & mine["lost"] == 0).all()
+
+    luck = turns["space"] == LUCK_SPACE
+    assert (turns["card"][~luck] == -1).all()
+    assert (turns["card"][luck] >= 0).all()
+    assert masks[-1][turns["player"][-1]] == game.recipe_masks[game.winner_id]
+
+def test_reader_is_zero_copy(tmp_path):
+    """Tests that records and per-game slices are views over the memory-mapped file."""
+    path = str(tmp_path / "games.trace")
+    with TraceWriter(path, 3) as writer:
+        for game_id in range(3):
+            game = _game(FastGameState, game_id)
+            writer.attach(game, game_id)
+            _play(game)
+
+    reader = TraceReader(path)
+    assert isinstance(reader.records, np.memmap)
+    assert np.shares_memory(reader.game(1), reader.records)
+    assert os.path.getsize(path) == 16 + 40 + len(reader) * reader.records.dtype.itemsize    # 35 spaces, padded
+
+def test_unfinished_games_are_kept_on_close(tmp_path):
+    """Tests that closing the writer keeps the turns of games that did not end."""
+    path = str(tmp_path / "games.trace")
+    with TraceWriter(path, 3) as writer:
+        game = _game(FastGameState, 0)
+        writer.attach(game, 0)
+        _play(game, max_turns=5)
+
+    reader = TraceReader(path)
+    assert len(reader.game(0)) == 5
+    assert not reader.turns(0)["won"].any()
+    assert game.tracer is None
+
+def test_partially_written_index(tmp_path):
+    """Tests that a reader opened while a run is still writing only sees the flushed games."""
+    path = str(tmp_path / "games.trace")
+    writer = TraceWriter(path, 3, buffer_records=1)
+    game = _game(FastGameState, 0)
+    writer.attach(game, 0)
+    _play(game)
+    writer.attach(_game(FastGameState, 1), 1)           # Queues (and flushes) game 0
+
+    reader = TraceReader(path)
+    assert list(reader.games) == [0]
+    assert os.path.exists(index_path(path))
+    writer.close()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from engine.seeding import spawn_rng
+from engine.simulation import SimulationConfig, draft_names
+from engine.variance import compare, estimate_control_variates, estimate_plain, estimate_stratified, observe_chunk
+from scripts.test_random_game import get_default_recipe_draft
+
+CONFIG = SimulationConfig(2, draft_names(get_default_recipe_draft(2)), seed=5)
+
+def test_antithetic_stream_mirrors_every_draw():
+    """Tests that the antithetic twin of a stream rolls 7 - d and mirrors uniforms."""
+    plain, twin = spawn_rng(3, 1), spawn_rng(3, 1, antithetic=True)
+    rolls = [(plain.randint(1, 6), twin.randint(1, 6)) for _ in range(200)]
+    assert all(a + b == 7 for a, b in rolls)
+    assert all(0 <= twin.random() < 1 for _ in range(1000))
+
+def test_controls_have_zero_mean():
+    """Tests that the martingale control variates average to zero within their standard error."""
+    controls = observe_chunk(CONFIG, 0, 1500).controls
+    error = controls.std(axis=0) / np.sqrt(len(controls))
+    assert np.all(np.abs(controls.mean(axis=0)) <= 4 * error + 1e-12)
+
+def test_reduced_estimates_agree_with_plain_monte_carlo():
+    """Tests that the control-variate and stratified estimates match plain Monte Carlo."""
+    plain = estimate_plain(CONFIG, 1500)
+    assert plain.variance_reduction == pytest.approx(1.0)
+    for estimate in (estimate_control_variates(CONFIG, 1500), estimate_stratified(CONFIG, 1400)):
+        assert estimate.mean.sum() == pytest.approx(1.0)
+        assert np.all(np.abs(estimate.mean - plain.mean) <= plain.ci() + estimate.ci())
+    assert estimate_control_variates(CONFIG, 1500).variance_reduction.min() > 1.0
+
+def test_common_random_numbers_shrink_the_difference_variance():
+    """Tests that identical configs differ by exactly zero and different policies gain from CRN."""
+    same = compare(CONFIG, CONFIG, 400)
+    assert np.all(same.mean == 0) and np.all(same.variance == 0)
+
+    heuristic = SimulationConfig(2, CONFIG.draft, ("heuristic", "random"), seed=5)
+    difference = compare(heuristic, CONFIG, 1600)
+    assert difference.mean[0] > 0
+    assert difference.variance_reduction.min() > 1.0